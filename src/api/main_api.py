@@ -3,6 +3,8 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 import uuid # For generating event IDs
 import asyncio # For WebSocket example
+import os
+import sys
 
 # Import Pydantic models from schemas.py
 from .schemas import (
@@ -11,13 +13,42 @@ from .schemas import (
     SystemStatusResponse,
     SubsystemStatus, # Needed for SystemStatusResponse
     AlertConfirmationResponse,
-    SaciManualAlertRequest
+    SaciManualAlertRequest,
+    NodeDataImpactoFalha,
+    VersionedDependencyGraphResponse,
+    DependencyGraphDeltaResponse,
+    NodeStatusUpdateRequest
 )
 
-# Conceptual: In a real application, the orchestrator might be a class instance
-# that this API interacts with, possibly through a dependency injection system.
-# from core_logic.guardian_orchestrator import GuardianCentralOrchestrator
-# orchestrator = GuardianCentralOrchestrator() # This would need to be async or run in a separate thread
+# The orchestrator is created on first use through get_orchestrator() rather than at
+# import time, so API workers start without importing subsystem or ML code that a
+# given request path never touches.
+_orchestrator = None
+
+
+def get_orchestrator():
+    """
+    Returns the process-wide GuardianCentralOrchestrator, creating it on first call.
+
+    The orchestrator module is imported here (not at module import time) to keep
+    API startup fast. Its subsystems are themselves constructed lazily.
+
+    If the GUARDIAN_STATE_DIR environment variable is set, orchestrator state is
+    snapshotted and journaled there, and restored from it when the pod restarts.
+    """
+    global _orchestrator
+    if _orchestrator is None:
+        # core_logic imports its siblings relative to `src`, as when run as a script.
+        src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        if src_dir not in sys.path:
+            sys.path.append(src_dir)
+        from core_logic.guardian_orchestrator import GuardianCentralOrchestrator
+        from core_logic.orchestrator_state import OrchestratorStateStore
+
+        state_dir = os.environ.get("GUARDIAN_STATE_DIR")
+        state_store = OrchestratorStateStore(state_dir) if state_dir else None
+        _orchestrator = GuardianCentralOrchestrator(state_store=state_store)
+    return _orchestrator
 
 app = FastAPI(
     title="Sistema Guardião - Central API",
@@ -173,6 +204,128 @@ async def report_saci_manual_alert(alert_input: SaciManualAlertRequest = Body(..
         timestamp=timestamp
     )
 
+@app.get(f"{API_VERSION_PREFIX}/boitata/nodes/{{node_id}}/impacto_falha",
+           response_model=NodeDataImpactoFalha,
+           tags=["Subsystems", "BOITATA"],
+           summary="Get the Precomputed Failure Impact of an Infrastructure Node")
+async def get_node_failure_impact(node_id: str):
+    """
+    Returns the node's criticality from BOITATÁ's precomputed index: risk level,
+    cascade reach, expected population impact, betweenness and criticality score.
+    """
+    # Building or refreshing the index is CPU-bound; keep it off the event loop.
+    impact = await asyncio.get_running_loop().run_in_executor(
+        None, get_orchestrator().boitata.assess_component_criticality, node_id)
+    if impact is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Node '{node_id}' is not in the BOITATÁ dependency graph.")
+    return NodeDataImpactoFalha(**impact)
+
+def get_boitata_graph_store():
+    """Returns BOITATÁ's versioned dependency graph, or raises 404 if no graph is loaded."""
+    store = get_orchestrator().boitata.graph_store
+    if store is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="No BOITATÁ dependency graph is loaded.")
+    return store
+
+@app.get(f"{API_VERSION_PREFIX}/boitata/graph",
+           response_model=VersionedDependencyGraphResponse,
+           tags=["Subsystems", "BOITATA"],
+           summary="Get the Full Dependency Graph with its Version")
+async def get_dependency_graph():
+    """
+    Returns every node and edge of the city dependency graph, tagged with the graph
+    version. Clients keep the version and then follow changes through
+    /boitata/graph/deltas or the /ws/v1/boitata/graph WebSocket instead of refetching.
+    """
+    store = get_boitata_graph_store()
+    # Refreshing criticality and serializing the graph are CPU-bound; keep them off the event loop.
+    return await asyncio.get_running_loop().run_in_executor(None, store.snapshot)
+
+@app.get(f"{API_VERSION_PREFIX}/boitata/graph/deltas",
+           response_model=DependencyGraphDeltaResponse,
+           tags=["Subsystems", "BOITATA"],
+           summary="Get Dependency Graph Changes since a Version")
+async def get_dependency_graph_deltas(since_version: int = Query(..., ge=0, description="Last graph version the client has.")):
+    """
+    Returns the node status and dependency changes applied after `since_version`.
+    If that version is no longer in the change log, `resync_required` is true and the
+    client should refetch /boitata/graph.
+    """
+    store = get_boitata_graph_store()
+    version = store.version
+    changes = store.changes_since(since_version)
+    return DependencyGraphDeltaResponse(since_version=since_version,
+                                        version=changes[-1]["version"] if changes else version,
+                                        resync_required=changes is None, changes=changes or [])
+
+@app.put(f"{API_VERSION_PREFIX}/boitata/graph/nodes/{{node_id}}/status",
+           tags=["Subsystems", "BOITATA"],
+           summary="Update the Operational Status of an Infrastructure Node")
+async def update_node_status(node_id: str, status_update: NodeStatusUpdateRequest = Body(...)):
+    """
+    Records a node's operational state in the versioned graph (O(1)) and pushes the
+    change to the /ws/v1/boitata/graph subscribers.
+    """
+    store = get_boitata_graph_store()
+    if node_id not in store.graph.node_index:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Node '{node_id}' is not in the BOITATÁ dependency graph.")
+    fields = status_update.model_dump(exclude_none=True)
+    # The store lock may be held by a snapshot or criticality refresh on another thread.
+    version = await asyncio.get_running_loop().run_in_executor(
+        None, lambda: store.update_node_status(node_id, **fields))
+    return {"node_id": node_id, "version": version}
+
+@app.websocket(f"{API_VERSION_PREFIX}/ws/v1/boitata/graph")
+async def websocket_graph_deltas_endpoint(websocket: WebSocket, since_version: Optional[int] = None):
+    """
+    WebSocket endpoint pushing dependency graph changes as they are applied.
+
+    Connect with `?since_version=N` to first receive the changes missed since version N.
+    Changes applied in a burst are sent together.
+
+    Message Format (Server to Client):
+    {"type": "graph_delta", "version": 45, "changes": [GraphChangeEvent, ...]}
+    or, when N is no longer in the change log (refetch /boitata/graph):
+    {"type": "resync_required", "version": 45}
+    """
+    await websocket.accept()
+    store = get_orchestrator().boitata.graph_store
+    if store is None:
+        await websocket.send_json({"type": "error", "message": "No BOITATÁ dependency graph is loaded."})
+        await websocket.close()
+        return
+
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Queue = asyncio.Queue()
+    # Changes may be applied on other threads; hand them to this connection's event loop.
+    unsubscribe = store.subscribe(lambda change: loop.call_soon_threadsafe(pending.put_nowait, change))
+    try:
+        last_sent = store.version
+        if since_version is not None:
+            missed = store.changes_since(since_version)
+            if missed is None:
+                await websocket.send_json({"type": "resync_required", "version": last_sent})
+            else:
+                last_sent = since_version
+                if missed:
+                    last_sent = missed[-1]["version"]
+                    await websocket.send_json({"type": "graph_delta", "version": last_sent, "changes": missed})
+        while True:
+            changes = [await pending.get()]
+            while not pending.empty():
+                changes.append(pending.get_nowait())
+            changes = [change for change in changes if change["version"] > last_sent]
+            if changes:
+                last_sent = changes[-1]["version"]
+                await websocket.send_json({"type": "graph_delta", "version": last_sent, "changes": changes})
+    except WebSocketDisconnect:
+        print(f"Client disconnected from WebSocket /ws/v1/boitata/graph")
+    finally:
+        unsubscribe()
+
 @app.websocket(f"{API_VERSION_PREFIX}/ws/v1/alerts")
 async def websocket_alerts_endpoint(websocket: WebSocket):
     """
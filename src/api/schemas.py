@@ -183,6 +183,11 @@ class NodeDataImpactoFalha(BaseModel):
     populacao_diretamente_afetada: Optional[str] = Field(None, example="500 pacientes internados, 2000 atendimentos/dia")
     servicos_criticos_interrompidos: Optional[List[str]] = Field(None, example=["UTI", "Centro Cirúrgico"])
     tempo_backup_disponivel: Optional[Dict[str, str]] = Field(None, example={"energia_gerador": "8 horas", "agua_reservatorio": "24 horas"})
+    # Precomputed by BOITATÁ's criticality index (subsystems/boitata_criticality.py)
+    alcance_cascata_componentes: Optional[int] = Field(None, example=42, description="Components a failure of this node cascades to")
+    impacto_populacional_esperado: Optional[float] = Field(None, example=15230.5, description="Expected population impacted if this node fails")
+    centralidade_intermediacao: Optional[float] = Field(None, example=0.0031, description="Betweenness on the dependency graph")
+    indice_criticidade: Optional[float] = Field(None, example=0.97, ge=0.0, le=1.0, description="Combined criticality score (percentile-based)")
 
 class NodeData(BaseModel):
     # Matching the structure from docs/DASHBOARD_SPECIFICATIONS.md (section 2.2 "Informações Detalhadas por Nó")
@@ -212,6 +217,28 @@ class DependencyGraphResponse(BaseModel):
     nodes: List[GraphNode]
     edges: List[GraphEdge]
 
+class VersionedDependencyGraphResponse(DependencyGraphResponse):
+    version: int = Field(..., example=42, description="Graph version of this snapshot; request deltas since it.")
+
+class GraphChangeEvent(BaseModel):
+    version: int = Field(..., example=43)
+    op: str = Field(..., example="node_status", description="One of: node_status, edge_upsert, edge_remove")
+    node_id: Optional[str] = Field(None, example="SUB-ENERGIA-003", description="Node of a node_status change")
+    source: Optional[str] = Field(None, example="HOSP-BH-001", description="Dependent node of an edge change")
+    target: Optional[str] = Field(None, example="SUB-ENERGIA-003", description="Node the source depends on")
+    data: Optional[Dict[str, Any]] = Field(None, example={"estado_atual": "Falha"})
+    timestamp: datetime
+
+class DependencyGraphDeltaResponse(BaseModel):
+    since_version: int = Field(..., example=42)
+    version: int = Field(..., example=45, description="Current graph version")
+    resync_required: bool = Field(False, description="True if since_version is no longer in the change log; refetch the full graph")
+    changes: List[GraphChangeEvent] = Field(default_factory=list)
+
+class NodeStatusUpdateRequest(BaseModel):
+    estado_atual: str = Field(..., example="Falha")
+    capacidade_operacional_percentual: Optional[float] = Field(None, ge=0.0, le=100.0, example=0.0)
+
 # 7. CorrelatedEventTimelineResponse Model
 class TimelineEvent(BaseModel):
     event_id: str # Matching dashboard spec
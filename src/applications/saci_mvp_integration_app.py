@@ -27,7 +27,16 @@ Options:
     --baud BAUD_RATE         Baud rate for serial communication (default: 115200).
     --model_path MODEL_FILE  Path to the trained .joblib model file
                              (default: models/saci_logistic_regression_model.joblib,
-                             expected in the 'models' directory relative to the project root).
+                             expected in the 'models' directory relative to the project root),
+                             or a lookup table (.npz) compiled with `saci_fire_predictor.py compile-lut`.
+    --registry_dir DIR       Serve the current version of a model registry (see
+                             ml_models/model_registry.py) instead, hot-swapping to newly
+                             published versions without a restart.
+    --cache_size N           Predictions kept in the LRU prediction cache (default: 4096, 0 disables).
+    --cache_quantization T H S
+                             Quantize readings to these steps before the cache lookup.
+    --drift_window N         Readings per device between drift checks against the model's
+                             training profile (default: 500, 0 disables drift monitoring).
 
 Example:
     python src/applications/saci_mvp_integration_app.py --port /dev/ttyS0 --baud 9600 \
@@ -65,6 +74,10 @@ if PROJECT_ROOT not in sys.path:
 # Now, import custom modules after sys.path modification.
 from src.data_collection.saci_serial_reader import SACISerialReader
 from src.ml_models.saci_fire_predictor import load_model, predict_saci_fire_risk
+from src.ml_models.saci_feature_engine import RollingFeatureEngine
+from src.ml_models.model_registry import HotSwappableModel, ModelRegistry
+from src.ml_models.prediction_cache import PredictionCache
+from src.ml_models.drift_monitor import DEFAULT_WINDOW, DriftMonitor
 
 # --- Global Logger Configuration ---
 # It's good practice to get a logger instance for the current module.
@@ -77,6 +90,9 @@ DEFAULT_SERIAL_PORT = '/dev/ttyUSB0' if os.name != 'nt' else 'COM3' # OS-depende
 DEFAULT_BAUD_RATE = 115200
 # Default model path assumes the script is run from the project root.
 DEFAULT_MODEL_PATH = os.path.join(PROJECT_ROOT, 'models', 'saci_fire_risk_model.joblib')
+DEFAULT_CACHE_SIZE = 4096  # Cached predictions; 0 disables the prediction cache
+CACHE_STATS_EVERY = 1000   # Log prediction cache statistics every N readings
+DEFAULT_DRIFT_WINDOW = DEFAULT_WINDOW  # Readings per device between drift checks; 0 disables them
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -108,11 +124,42 @@ def parse_arguments() -> argparse.Namespace:
         "--model_path",
         type=str,
         default=DEFAULT_MODEL_PATH,
-        help="Path to the trained machine learning model file (.joblib)."
+        help="Path to the trained machine learning model file (.joblib, or a .npz lookup table)."
+    )
+    parser.add_argument(
+        "--registry_dir",
+        type=str,
+        default=None,
+        help="Serve the current version of this model registry instead of --model_path, "
+             "hot-swapping to newly published versions without a restart."
+    )
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="Maximum predictions kept in the LRU prediction cache (0 disables it)."
+    )
+    parser.add_argument(
+        "--cache_quantization",
+        type=float,
+        nargs=3,
+        metavar=("TEMP_STEP", "HUM_STEP", "SMOKE_STEP"),
+        default=None,
+        help="Quantize readings to these steps before the cache lookup (default: exact values)."
+    )
+    parser.add_argument(
+        "--drift_window",
+        type=int,
+        default=DEFAULT_DRIFT_WINDOW,
+        help="Readings per device between drift checks against the model's training profile "
+             "(0 disables drift monitoring)."
     )
     return parser.parse_args()
 
-def process_sensor_reading(line: str, reader: SACISerialReader, model: any) -> None:
+def process_sensor_reading(line: str, reader: SACISerialReader, model: any,
+                           feature_engine: RollingFeatureEngine = None,
+                           prediction_cache: PredictionCache = None,
+                           drift_monitor: DriftMonitor = None) -> None:
     """
     Processes a single line of sensor data: parses, predicts, and logs the result.
 
@@ -120,6 +167,10 @@ def process_sensor_reading(line: str, reader: SACISerialReader, model: any) -> N
         line: The raw data line read from the serial port.
         reader: Instance of SACISerialReader used for parsing.
         model: The pre-trained machine learning model for prediction.
+        feature_engine: Per-device rolling feature state, if the model was trained with
+                        rolling features. Readings are keyed by the serial port, one device per port.
+        prediction_cache: Optional cache of predictions for repeated readings.
+        drift_monitor: Optional drift and data-quality monitor, fed after the prediction is logged.
     """
     parsed_data = reader.parse_sensor_data(line) #SACISerialReader.parse_sensor_data now returns dict with specific keys
 
@@ -132,8 +183,10 @@ def process_sensor_reading(line: str, reader: SACISerialReader, model: any) -> N
 
         if temp is not None and hum is not None and smoke_adc is not None:
             try:
-                predicted_label, probability_scores = predict_saci_fire_risk(
-                    model, temp, hum, smoke_adc # predict_saci_fire_risk expects temp, hum, smoke_adc
+                predict = prediction_cache.predict if prediction_cache is not None else predict_saci_fire_risk
+                predicted_label, probability_scores = predict(
+                    model, temp, hum, smoke_adc, # predict_saci_fire_risk expects temp, hum, smoke_adc
+                    feature_engine=feature_engine, device_id=reader.port
                 )
 
                 # Validate the structure of probability_scores before indexing
@@ -159,6 +212,9 @@ def process_sensor_reading(line: str, reader: SACISerialReader, model: any) -> N
             # This case handles if parsing was successful but some expected keys were still None.
             logger.info(f"Incomplete sensor data after parsing (some values are None), "
                         f"skipping prediction. Raw line: '{line}', Parsed: {parsed_data}")
+
+        if drift_monitor is not None:
+            drift_monitor.observe(reader.port, {'temperature': temp, 'humidity': hum, 'smoke_level': smoke_adc})
     elif line: # If parsing failed (parsed_data is None) and the line was not empty
         # Log non-empty lines that couldn't be parsed by SACISerialReader.parse_sensor_data.
         # This helps identify unexpected output from the ESP32 (e.g., debug messages, errors).
@@ -171,6 +227,49 @@ def process_sensor_reading(line: str, reader: SACISerialReader, model: any) -> N
             logger.info(f"RAW ESP32 Output (Unparsed by SACISerialReader): \"{line}\"")
 
 
+def build_feature_engine(model: any) -> RollingFeatureEngine:
+    """
+    Returns the rolling feature engine a model needs, or None for raw-reading models.
+
+    Models trained with `--rolling_features` list the derived features in `feature_names_in_`.
+    """
+    feature_engine = RollingFeatureEngine.from_feature_names(getattr(model, 'feature_names_in_', []))
+    if feature_engine is not None:
+        logger.info(f"Model uses rolling features (windows {feature_engine.windows}, "
+                    f"EWMA spans {feature_engine.ewma_spans}); tracking per-device history.")
+    return feature_engine
+
+
+def build_drift_monitor(model: any, window: int) -> DriftMonitor:
+    """
+    Returns a drift monitor for the model's training profile, or None if drift monitoring
+    is disabled or the model was saved without a profile (`training_profile_`).
+    """
+    training_profile = getattr(model, 'training_profile_', None)
+    if window <= 0 or not training_profile:
+        if window > 0:
+            logger.info("Model has no training profile; drift monitoring is disabled.")
+        return None
+    drift_monitor = DriftMonitor(training_profile, window=window)
+    logger.info(f"Drift monitoring {', '.join(drift_monitor.features)} every {window} readings per device.")
+    return drift_monitor
+
+
+def log_drift_status(drift_monitor: DriftMonitor) -> None:
+    """Logs the drift monitor's reading, data-quality and drift alert counts."""
+    status = drift_monitor.status()
+    logger.info(f"Drift monitor: {status['readings_observed']} readings from {status['devices']} device(s), "
+                f"{status['quality_issues']} data-quality issues, {status['drift_alerts']} recent drift alerts.")
+
+
+def log_cache_stats(prediction_cache: PredictionCache) -> None:
+    """Logs the prediction cache hit rate and size."""
+    stats = prediction_cache.stats()
+    logger.info(f"Prediction cache: {stats['hits']} hits / {stats['misses']} misses "
+                f"(hit rate {stats['hit_rate']:.1%}), {stats['size']}/{stats['max_entries']} entries, "
+                f"{stats['evictions']} evictions, {stats['invalidations']} invalidations.")
+
+
 def main() -> None:
     """
     Main function to run the SACI MVP Integration Application.
@@ -186,19 +285,40 @@ def main() -> None:
     args = parse_arguments()
 
     logger.info("--- SACI MVP Integration Application Starting ---")
-    logger.info(f"Attempting to load ML model from: {args.model_path}")
+    model_source = args.registry_dir or args.model_path
+    logger.info(f"Attempting to load ML model from: {model_source}")
     model = None
+    hot_model = None
+    feature_engine = None
     try:
-        model = load_model(args.model_path)
+        if args.registry_dir:
+            # Memory-mapped load; a watcher thread swaps in newly published versions.
+            hot_model = HotSwappableModel(ModelRegistry(args.registry_dir))
+            hot_model.start_watching()
+            model = hot_model.model
+            logger.info(f"Serving model registry version {hot_model.version}; watching for new versions.")
+        else:
+            model = load_model(args.model_path)
         logger.info(f"Successfully loaded ML model: {type(model).__name__}")
+        feature_engine = build_feature_engine(model)
     except FileNotFoundError:
-        logger.error(f"FATAL: Model file not found at '{args.model_path}'. "
-                     "Please provide a valid path using --model_path.")
+        logger.error(f"FATAL: Model file not found at '{model_source}'. "
+                     "Please provide a valid path using --model_path or --registry_dir.")
         sys.exit(1) # Use sys.exit for cleaner termination from main
     except Exception as e:
-        logger.error(f"FATAL: Could not load ML model from '{args.model_path}': {e}")
+        logger.error(f"FATAL: Could not load ML model from '{model_source}': {e}")
         sys.exit(1)
 
+    prediction_cache = None
+    if args.cache_size > 0:
+        prediction_cache = PredictionCache(args.cache_size, args.cache_quantization)
+        if hot_model is not None:
+            hot_model.add_swap_listener(prediction_cache.on_model_swap)
+        if feature_engine is not None:
+            logger.info("Model predictions depend on reading history; the prediction cache will be bypassed.")
+    drift_monitor = build_drift_monitor(model, args.drift_window)
+    readings_processed = 0
+
     logger.info(f"Initializing serial reader for port {args.port} at {args.baud} baud.")
     reader = SACISerialReader(port=args.port, baud_rate=args.baud)
 
@@ -222,7 +342,19 @@ def main() -> None:
                     line_str = line_bytes.decode('utf-8', errors='ignore').strip()
 
                     if line_str:
-                        process_sensor_reading(line_str, reader, model)
+                        # Fetch the model once per reading; a hot swap takes effect on the next one.
+                        if hot_model is not None and hot_model.model is not model:
+                            previous_features = list(getattr(model, 'feature_names_in_', []))
+                            model = hot_model.model
+                            if list(getattr(model, 'feature_names_in_', [])) != previous_features:
+                                feature_engine = build_feature_engine(model)
+                            # A new model brings its own training profile to compare against.
+                            drift_monitor = build_drift_monitor(model, args.drift_window)
+                        process_sensor_reading(line_str, reader, model, feature_engine, prediction_cache,
+                                               drift_monitor)
+                        readings_processed += 1
+                        if prediction_cache is not None and readings_processed % CACHE_STATS_EVERY == 0:
+                            log_cache_stats(prediction_cache)
 
                 # Adjust sleep time: lower for faster data, higher for less CPU.
                 # 0.1s is a reasonable starting point for many serial applications.
@@ -243,6 +375,12 @@ def main() -> None:
         logger.info("\nKeyboardInterrupt received. Initiating graceful shutdown...")
     finally:
         logger.info("--- SACI MVP Integration Application Shutting Down ---")
+        if hot_model is not None:
+            hot_model.stop_watching()
+        if prediction_cache is not None:
+            log_cache_stats(prediction_cache)
+        if drift_monitor is not None:
+            log_drift_status(drift_monitor)
         if reader and reader.serial_conn and reader.serial_conn.is_open:
             logger.info("Disconnecting serial reader and closing port.")
             reader.disconnect()
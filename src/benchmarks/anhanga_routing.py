@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Anhangá Routing Benchmark
+Sistema Guardião - ANHANGÁ
+
+Builds a seeded synthetic mesh of radio nodes scattered over a city-sized area
+(each linked to its nearest neighbours, with latency and reliability degrading
+with distance) and times MeshRouter on it: A* and plain Dijkstra for the primary
+path between random node pairs, and the full route with link-disjoint backups.
+The target is a 10k-node mesh route in milliseconds (p99 under 10 ms). With
+--hot-pairs, it also replays traffic concentrated on a few pairs through the
+RouteCache while links on random cached paths degrade, and reports the hit rate.
+
+Usage:
+    python src/benchmarks/anhanga_routing.py [--nodes N] [--neighbors K] [--routes N] [--seed N]
+                                             [--hot-pairs N]
+"""
+
+# Standard library imports
+import argparse
+import os
+import sys
+import time
+
+# Third-party imports
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.anhanga_route_cache import RouteCache
+from subsystems.anhanga_routing import MeshRouter
+from subsystems.anhanga_simulator import synthetic_city_mesh
+
+TARGET_SECONDS = 0.010
+
+
+def time_routes(router: MeshRouter, pairs: np.ndarray, priority: str, n_backups: int) -> np.ndarray:
+    topology = router.topology
+    timings = []
+    for source, target in pairs:
+        started = time.perf_counter()
+        if n_backups:
+            router.route(topology.node_ids[source], topology.node_ids[target], priority, n_backups=n_backups)
+        else:
+            router.shortest_path(int(source), int(target), priority)
+        timings.append(time.perf_counter() - started)
+    return np.asarray(timings)
+
+
+def time_cached_traffic(router: MeshRouter, hot_pairs: np.ndarray, n_messages: int,
+                        degrade_every: int, seed: int) -> np.ndarray:
+    """Routes `n_messages` over random hot pairs through a RouteCache, degrading a cached link every `degrade_every`."""
+    topology = router.topology
+    cache = RouteCache(router)
+    rng = np.random.default_rng(seed)
+    timings = []
+    for message in range(n_messages):
+        source, target = hot_pairs[rng.integers(len(hot_pairs))]
+        started = time.perf_counter()
+        found = cache.route(topology.node_ids[source], topology.node_ids[target], "CRITICAL")
+        timings.append(time.perf_counter() - started)
+        if found is not None and found[0].links and message % degrade_every == degrade_every - 1:
+            link = found[0].links[rng.integers(len(found[0].links))]
+            a, b = topology.link_nodes[link]
+            topology.update_link(topology.node_ids[a], topology.node_ids[b],
+                                 reliability=topology.link_reliability[link] * 0.9)
+    print(f"Route cache: {cache.stats()}")
+    return np.asarray(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks ANHANGÁ mesh routing on a synthetic city-wide mesh.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--nodes", type=int, default=10_000, help="Mesh nodes.")
+    parser.add_argument("--neighbors", type=int, default=5, help="Nearest neighbours each node links to.")
+    parser.add_argument("--routes", type=int, default=200, help="Random sender/recipient pairs to route.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the mesh and the node pairs.")
+    parser.add_argument("--hot-pairs", type=int, default=0,
+                        help="Also replay cached traffic over this many sender/recipient pairs (0 to skip).")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    topology = synthetic_city_mesh(args.nodes, args.neighbors, args.seed)
+    print("===== ANHANGÁ Routing Benchmark =====")
+    print(f"Mesh: {topology.num_nodes} nodes, {topology.num_links} links, "
+          f"built in {(time.perf_counter() - started) * 1e3:.0f} ms")
+
+    pairs = np.random.default_rng(args.seed).integers(0, args.nodes, (args.routes, 2))
+    a_star, dijkstra = MeshRouter(topology), MeshRouter(topology, n_landmarks=0)
+    started = time.perf_counter()
+    a_star.shortest_path(0, 1, "CRITICAL")
+    print(f"First route (builds arcs, costs and landmarks): {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+    worst_p99 = 0.0
+    for label, router, n_backups in (("Dijkstra, primary path", dijkstra, 0),
+                                     ("A*, primary path", a_star, 0),
+                                     ("A*, primary + 2 disjoint backups", a_star, 2)):
+        timings = time_routes(router, pairs, "CRITICAL", n_backups)
+        p99 = np.percentile(timings, 99)
+        if router is a_star and not n_backups:
+            worst_p99 = p99
+        print(f"{label:34s} p50 {np.percentile(timings, 50) * 1e3:7.3f} ms, p99 {p99 * 1e3:7.3f} ms, "
+              f"max {timings.max() * 1e3:7.3f} ms")
+
+    source, target = topology.node_ids[pairs[0][0]], topology.node_ids[pairs[0][1]]
+    found = a_star.route(source, target, "CRITICAL")
+    if found is not None:
+        route, backups = found
+        print(f"Example {source} -> {target}: {len(route)} hops, {route.delivery_time_seconds:.3f} s, "
+              f"reliability {route.reliability:.3f}, {len(backups)} backups")
+    if args.hot_pairs:
+        hot_pairs = np.random.default_rng(args.seed + 1).integers(0, args.nodes, (args.hot_pairs, 2))
+        timings = time_cached_traffic(a_star, hot_pairs, args.routes * 10, degrade_every=50, seed=args.seed)
+        print(f"{'Cached hot-pair traffic':34s} p50 {np.percentile(timings, 50) * 1e3:7.3f} ms, "
+              f"p99 {np.percentile(timings, 99) * 1e3:7.3f} ms, max {timings.max() * 1e3:7.3f} ms")
+    print(f"A* primary path p99 {worst_p99 * 1e3:.2f} ms vs target {TARGET_SECONDS * 1e3:.0f} ms: "
+          f"{'PASS' if worst_p99 < TARGET_SECONDS else 'FAIL'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Boitatá Cascade Benchmark
+Sistema Guardião - BOITATÁ
+
+Builds a seeded synthetic city dependency graph (power plants and substations
+feeding water, telecom, hospitals and buildings, each depending on one to three
+earlier components) and times `DependencyGraph.cascade` on it: the graph build,
+a cascade from the most depended-upon component, and cascades from random
+components. The target is a 100k-node city cascade in under 100 ms. With
+--monte-carlo-runs, it also times a Monte Carlo analysis of the hub failure; with
+--criticality, the criticality index build and an incremental status update.
+
+Usage:
+    python src/benchmarks/boitata_cascade.py [--nodes N] [--cascades N] [--seed N]
+        [--monte-carlo-runs N] [--workers N] [--criticality]
+"""
+
+# Standard library imports
+import argparse
+import os
+import sys
+import time
+
+# Third-party imports
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.boitata_criticality import CriticalityIndex
+from subsystems.boitata_dependency_graph import DependencyGraph
+from subsystems.boitata_monte_carlo import run_monte_carlo_cascade
+
+TARGET_SECONDS = 0.100
+
+# Component types in dependency order, with their share of the city's nodes.
+CITY_LAYERS = [
+    ("power_plant", 0.0005),
+    ("power_substation", 0.01),
+    ("water_pumping", 0.03),
+    ("telecom", 0.05),
+    ("hospital", 0.005),
+    ("building", 0.9045),
+]
+
+
+def make_city_graph(n_nodes: int, seed: int = 42) -> DependencyGraph:
+    """Synthetic city: every component depends on 1-3 components of the same or earlier layers."""
+    rng = np.random.default_rng(seed)
+    counts = np.maximum(1, (np.array([share for _, share in CITY_LAYERS]) * n_nodes).astype(int))
+    counts[-1] = n_nodes - counts[:-1].sum()
+    node_types = np.repeat([name for name, _ in CITY_LAYERS], counts)
+    node_ids = [f"{node_type}_{index}" for index, node_type in enumerate(node_types)]
+
+    n_dependencies = rng.integers(1, 4, n_nodes)
+    n_dependencies[0] = 0
+    dependent = np.repeat(np.arange(n_nodes), n_dependencies)
+    # Bias dependencies toward the upstream layers: u**3 picks low (earlier) indices more often.
+    upstream = (dependent * rng.random(len(dependent)) ** 3).astype(np.int64)
+    population = np.where(node_types == "building", rng.integers(10, 500, n_nodes), 0)
+    return DependencyGraph.from_edges(node_ids, node_types, upstream, dependent,
+                                      weights=rng.uniform(0.5, 1.0, len(dependent)),
+                                      latency_minutes=rng.uniform(5, 240, len(dependent)),
+                                      population=population)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks BOITATÁ cascade propagation on a synthetic city dependency graph.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--nodes", type=int, default=100_000, help="Components in the synthetic city.")
+    parser.add_argument("--cascades", type=int, default=50, help="Cascades from random components to time.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the graph and the failed components.")
+    parser.add_argument("--monte-carlo-runs", type=int, default=0,
+                        help="Monte Carlo runs of the hub failure to time (0 to skip).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes for the Monte Carlo runs (default: all CPUs).")
+    parser.add_argument("--criticality", action="store_true",
+                        help="Also time the criticality index build and an incremental update.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    graph = make_city_graph(args.nodes, args.seed)
+    build_seconds = time.perf_counter() - started
+    print("===== BOITATÁ Cascade Benchmark =====")
+    print(f"Graph: {graph.num_nodes} nodes, {graph.num_edges} edges, {graph.nbytes / 2**20:.1f} MiB CSR, "
+          f"built in {build_seconds * 1e3:.1f} ms")
+
+    hub = graph.node_ids[int(np.argmax(np.diff(graph.indptr)))]
+    started = time.perf_counter()
+    graph.cascade(hub)  # First cascade imports scipy.sparse and builds the -log(strength) matrix
+    print(f"First cascade (includes setup): {(time.perf_counter() - started) * 1e3:.1f} ms")
+    started = time.perf_counter()
+    result = graph.cascade(hub)
+    hub_seconds = time.perf_counter() - started
+    print(f"Cascade from hub '{hub}': {len(result)} components reached in {hub_seconds * 1e3:.1f} ms")
+
+    rng = np.random.default_rng(args.seed)
+    timings, reached = [], []
+    for node in rng.integers(0, graph.num_nodes, args.cascades):
+        started = time.perf_counter()
+        reached.append(len(graph.cascade(graph.node_ids[node])))
+        timings.append(time.perf_counter() - started)
+    print(f"Random cascades ({args.cascades}): p50 {np.percentile(timings, 50) * 1e3:.2f} ms, "
+          f"max {max(timings) * 1e3:.2f} ms, mean reach {np.mean(reached):.0f} components")
+    worst = max(hub_seconds, max(timings))
+    print(f"Worst cascade {worst * 1e3:.1f} ms vs target {TARGET_SECONDS * 1e3:.0f} ms: "
+          f"{'PASS' if worst < TARGET_SECONDS else 'FAIL'}")
+
+    if args.monte_carlo_runs > 0:
+        started = time.perf_counter()
+        analysis = run_monte_carlo_cascade(graph, hub, n_runs=args.monte_carlo_runs, seed=args.seed,
+                                           n_workers=args.workers)
+        low, high = analysis.impacted_population_interval()
+        print(f"Monte Carlo ({args.monte_carlo_runs} runs of the hub failure): "
+              f"{(time.perf_counter() - started) * 1e3:.0f} ms, {len(analysis.nodes)} components at risk, "
+              f"expected impacted population {analysis.expected_impacted_population:,.0f} "
+              f"({analysis.confidence:.0%} CI {low:,.0f}-{high:,.0f})")
+
+
+    if args.criticality:
+        started = time.perf_counter()
+        index = CriticalityIndex(graph)
+        print(f"Criticality index: {graph.num_nodes} components in {(time.perf_counter() - started) * 1e3:.0f} ms")
+        node_id = graph.node_ids[int(rng.integers(0, graph.num_nodes))]
+        started = time.perf_counter()
+        index.set_status(node_id, "Falha", refresh=False)
+        recomputed = index.refresh()
+        print(f"Status update of '{node_id}': {recomputed} components recomputed in "
+              f"{(time.perf_counter() - started) * 1e3:.0f} ms")
+        started = time.perf_counter()
+        for node_id in graph.node_ids[:1000]:
+            index.impacto_falha(node_id)
+        print(f"Lookups: {(time.perf_counter() - started) * 1e6 / 1000:.1f} us each, "
+              f"most critical {index.most_critical(1)[0]}")
+
+
+if __name__ == "__main__":
+    main()
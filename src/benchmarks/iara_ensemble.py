@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Iara Region Risk Ensemble Benchmark
+Sistema Guardião - IARA
+
+Builds a seeded state-sized RegionTable (log-normal densities, sparse case counts of
+three pathogens, random weather and vaccination, a random sparse mobility matrix)
+and times three ways of scoring it: one `predict_outbreak_probability` call per
+region (measured on a sample and extrapolated), the batch nominal scores, and the
+parameter-perturbed SEIR ensemble inline and across a process pool. Prints the
+uncertainty band widths and whether the pooled ensemble matches the inline one.
+
+Usage:
+    python src/benchmarks/iara_ensemble.py [--regions N] [--members M] [--workers W] [--seed N]
+"""
+
+# Standard library imports
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Third-party imports
+import numpy as np
+from scipy import sparse
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.iara_ensemble import RegionTable, run_risk_ensemble
+from subsystems.iara_subsystem import IaraEpidemicPredictor
+
+TARGET_SECONDS = 10.0
+LOOP_SAMPLE = 50
+
+
+def synthetic_state(n_regions: int, rng: np.random.Generator):
+    density = rng.lognormal(np.log(300), 1.2, n_regions)
+    seeded = lambda share, mean: np.where(rng.random(n_regions) < share, rng.poisson(mean, n_regions), 0)
+    table = RegionTable(population_density=density,
+                        case_counts={"dengue": seeded(0.05, 4), "flu": seeded(0.1, 6), "covid19": seeded(0.02, 3)},
+                        avg_temperature_c=rng.uniform(16, 32, n_regions),
+                        avg_humidity_percent=rng.uniform(40, 95, n_regions),
+                        air_quality_index=rng.uniform(20, 120, n_regions),
+                        vaccination_rate=rng.uniform(0.3, 0.9, n_regions))
+    rows = np.repeat(np.arange(n_regions), 5)
+    mobility = sparse.csr_matrix((np.full(len(rows), 0.01), (rows, rng.integers(0, n_regions, len(rows)))),
+                                 shape=(n_regions, n_regions))
+    return table, mobility
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks IARA batch region risk scoring and its SEIR ensembles.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--regions", type=int, default=853, help="Regions (853: municipalities of Minas Gerais).")
+    parser.add_argument("--members", type=int, default=64, help="Ensemble members.")
+    parser.add_argument("--workers", type=int, default=None, help="Pool processes (default: all CPUs).")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic state and the ensemble.")
+    args = parser.parse_args()
+
+    table, mobility = synthetic_state(args.regions, np.random.default_rng(args.seed))
+    print("===== IARA Region Risk Ensemble Benchmark =====")
+    print(f"Regions: {table.n_regions}, pathogens: {len(table.case_counts)}, mobility links: {mobility.nnz}")
+
+    with contextlib.redirect_stdout(io.StringIO()):  # The per-region API prints every call
+        predictor = IaraEpidemicPredictor()
+        sample = min(LOOP_SAMPLE, table.n_regions)
+        started = time.perf_counter()
+        for region in range(sample):
+            predictor.predict_outbreak_probability({
+                "population": table.columns["population"][region],
+                "population_density": table.columns["population_density"][region],
+                "recent_case_counts": {pathogen: cases[region] for pathogen, cases in table.case_counts.items()},
+                "vaccination_rate": table.columns["vaccination_rate"][region]})
+        per_region = (time.perf_counter() - started) / sample
+    print(f"Per-region calls: {per_region * 1e3:.1f} ms each, ~{per_region * table.n_regions:.1f} s for the state "
+          f"(no mobility coupling)")
+
+    started = time.perf_counter()
+    nominal = run_risk_ensemble(table, mobility, n_members=0)
+    print(f"Batch nominal scores: {time.perf_counter() - started:.3f} s, "
+          f"{np.count_nonzero(nominal.probability > 0.5)} regions above 0.5")
+
+    timings = {}
+    results = {}
+    for label, n_workers in (("inline", 1), ("pool", args.workers)):
+        started = time.perf_counter()
+        results[label] = run_risk_ensemble(table, mobility, n_members=args.members, seed=args.seed,
+                                           n_workers=n_workers)
+        timings[label] = time.perf_counter() - started
+        print(f"Ensemble ({args.members} members, {label}, workers={n_workers or os.cpu_count()}): "
+              f"{timings[label]:.2f} s")
+    result = results["pool"]
+    width = result.band_high - result.band_low
+    print(f"Uncertainty band width: median {np.median(width):.3f}, p90 {np.percentile(width, 90):.3f}; "
+          f"pooled == inline: {np.array_equal(result.member_probability, results['inline'].member_probability)}")
+    best = min(timings.values())
+    print(f"{args.members}-member ensemble of {table.n_regions} regions in {best:.2f} s vs target "
+          f"{TARGET_SECONDS:.0f} s: {'PASS' if best < TARGET_SECONDS else 'FAIL'}")
+
+
+if __name__ == "__main__":
+    main()
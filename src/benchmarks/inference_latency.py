@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Inference Latency Benchmark
+Sistema Guardião - SACI
+
+Compares the latency of the SACI fire risk models through the native
+scikit-learn path and, if skl2onnx and onnxruntime are installed, through the
+onnxruntime inference backend. For each model family it reports the median and
+p99 latency of a single reading via `predict_saci_fire_risk` (the live
+ingestion path) and the per-row cost of `predict_saci_fire_risk_batch`, along
+with the largest probability difference between the two backends.
+
+Usage:
+    python src/benchmarks/inference_latency.py [--rows N] [--single-calls N] [--batch-size N]
+"""
+
+# Standard library imports
+import argparse
+import contextlib
+import itertools
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+# Third-party imports
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.inference_backend import create_backend
+from ml_models.saci_fire_predictor import FEATURE_COLUMNS, predict_saci_fire_risk, predict_saci_fire_risk_batch
+
+
+def make_training_data(rows: int, seed: int = 42):
+    """Synthetic readings labelled like fire_risk_dataset.csv."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "temperature": rng.normal(27, 6, rows).round(1),
+        "humidity": rng.uniform(15, 90, rows).round(1),
+        "smoke_level": rng.gamma(2.0, 1.5, rows).round(1),
+    })[FEATURE_COLUMNS]
+    y = (((X["temperature"] > 32) & (X["humidity"] < 40)) | (X["smoke_level"] > 6)).astype(int)
+    return X, y
+
+
+def build_models(X: pd.DataFrame, y: pd.Series) -> Dict[str, object]:
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    return {
+        "logistic_regression": LogisticRegression(solver="liblinear").fit(X, y),
+        "random_forest": RandomForestClassifier(n_estimators=100, max_depth=8, random_state=0).fit(X, y),
+        "gradient_boosting": HistGradientBoostingClassifier(max_iter=100, random_state=0).fit(X, y),
+    }
+
+
+def time_calls(call: Callable[[], object], repeats: int) -> List[float]:
+    """Wall time of each of `repeats` calls, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks SACI model inference latency for the sklearn and onnxruntime backends.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=20_000, help="Training rows for the benchmark models.")
+    parser.add_argument("--single-calls", type=int, default=500, help="Single-reading predictions to time.")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per batch prediction.")
+    args = parser.parse_args()
+
+    X, y = make_training_data(args.rows)
+    batch = X.sample(args.batch_size, replace=True, random_state=1)
+    readings = X.head(args.single_calls).to_numpy()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        models = build_models(X, y)
+
+    print("===== SACI Inference Latency Benchmark =====")
+    print(f"{'Model':<22} {'Backend':<12} {'Single p50 (us)':>16} {'Single p99 (us)':>16} "
+          f"{'Batch (us/row)':>15} {'Max |dP|':>10}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for family, model in models.items():
+            backends = {"sklearn": create_backend("sklearn", model)}
+            try:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    backends["onnxruntime"] = create_backend(
+                        "onnxruntime", model, onnx_path=os.path.join(temp_dir, f"{family}.onnx"))
+            except ImportError as e:
+                print(f"[INFO] onnxruntime backend unavailable for {family}: {e}")
+
+            _, reference = predict_saci_fire_risk_batch(model, batch)
+            for name, backend in backends.items():
+                rows = itertools.cycle(readings)
+                single = time_calls(lambda: predict_saci_fire_risk(backend, *next(rows)), args.single_calls)
+                batch_seconds = min(time_calls(lambda: predict_saci_fire_risk_batch(backend, batch), 3))
+                _, probabilities = predict_saci_fire_risk_batch(backend, batch)
+                print(f"{family:<22} {name:<12} {np.percentile(single, 50) * 1e6:>16.1f} "
+                      f"{np.percentile(single, 99) * 1e6:>16.1f} {batch_seconds / len(batch) * 1e6:>15.3f} "
+                      f"{np.abs(probabilities - reference).max():>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Orchestrator Throughput Benchmark
+Sistema Guardião
+
+Deterministic simulation harness that measures how many threat events per
+second the GuardianCentralOrchestrator can correlate, plan and dispatch.
+
+The harness:
+1. Generates a seeded stream of synthetic multi-subsystem ThreatEvent batches
+   (wildfire, coordinated attack, outbreak and compound scenarios such as the
+   orchestrator's `__main__` demo).
+2. Replaces the five subsystems with stubs that answer `execute_response_plan`
+   after a seeded, configurable latency, so results do not depend on real
+   subsystem implementations.
+3. Drives the orchestrator through the ThreatPriorityScheduler with a fixed
+   number of workers and reports events/sec, plan latency percentiles and
+   memory growth (measured in a second, identical tracemalloc pass).
+4. Optionally saves the results as a baseline, or compares them against a
+   saved baseline and exits with status 1 on regression.
+
+Usage:
+    python src/benchmarks/orchestrator_throughput.py [--batches N] [--workers N] [--seed N]
+                                                     [--latency-scale X] [--save-baseline] [--no-compare]
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from core_logic.guardian_orchestrator import GuardianCentralOrchestrator, ThreatEvent
+from core_logic.sharded_orchestrator import ShardedGuardianOrchestrator
+from core_logic.threat_scheduler import ThreatPriorityScheduler, _percentile
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'orchestrator_throughput.json')
+
+# Mean stub latency per subsystem for `execute_response_plan`, in seconds.
+STUB_SUBSYSTEM_LATENCIES = {
+    "saci": 0.004,
+    "curupira": 0.003,
+    "iara": 0.006,
+    "boitata": 0.008,
+    "anhanga": 0.002,
+}
+
+# Scenario templates: each entry is (subsystem_source, threat_type, severity range, metadata).
+SCENARIOS: Dict[str, List[tuple]] = {
+    "wildfire": [
+        ("saci", "wildfire", (0.6, 1.0), {"wind_speed": 15, "humidity": 30}),
+        ("boitata", "power_line_risk", (0.3, 0.7), {"asset_type": "transmission_line"}),
+    ],
+    "coordinated_attack": [
+        ("curupira", "coordinated_attack", (0.5, 0.9), {"attack_vectors": ["ddos", "physical_breach"]}),
+        ("anhanga", "mesh_node_offline", (0.2, 0.6), {"nodes_offline": 3}),
+    ],
+    "outbreak": [
+        ("iara", "outbreak_signal", (0.1, 0.5), {"pathogen": "dengue", "case_growth": 1.4}),
+    ],
+    "compound": [
+        ("saci", "wildfire", (0.7, 1.0), {"wind_speed": 20, "humidity": 25}),
+        ("curupira", "coordinated_attack", (0.5, 0.9), {"attack_vectors": ["ddos"]}),
+        ("iara", "outbreak_signal", (0.2, 0.6), {"pathogen": "respiratory", "smoke_exposure": True}),
+    ],
+}
+SCENARIO_WEIGHTS = {"wildfire": 0.3, "coordinated_attack": 0.2, "outbreak": 0.4, "compound": 0.1}
+
+# Belo Horizonte metropolitan area bounding box used for synthetic locations.
+LATITUDE_RANGE = (-20.05, -19.75)
+LONGITUDE_RANGE = (-44.10, -43.85)
+STREAM_EPOCH = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def generate_threat_stream(seed: int, num_batches: int) -> List[List[ThreatEvent]]:
+    """
+    Generates a reproducible stream of ThreatEvent batches.
+
+    Args:
+        seed: Seed for the random generator; the same seed always yields the same stream.
+        num_batches: Number of batches (incidents) to generate.
+
+    Returns:
+        A list of batches, each a list of ThreatEvent objects from one scenario.
+    """
+    rng = random.Random(seed)
+    scenario_names = list(SCENARIO_WEIGHTS)
+    weights = [SCENARIO_WEIGHTS[name] for name in scenario_names]
+
+    stream = []
+    for batch_index in range(num_batches):
+        scenario = rng.choices(scenario_names, weights=weights)[0]
+        center = (rng.uniform(*LATITUDE_RANGE), rng.uniform(*LONGITUDE_RANGE))
+        timestamp = STREAM_EPOCH + timedelta(seconds=batch_index * 2)
+        batch = []
+        for event_index, (source, threat_type, severity_range, metadata) in enumerate(SCENARIOS[scenario]):
+            batch.append(ThreatEvent(
+                event_id=f"SIM-{batch_index:06d}-{event_index}",
+                subsystem_source=source,
+                threat_type=threat_type,
+                severity=round(rng.uniform(*severity_range), 3),
+                location=(center[0] + rng.gauss(0, 0.005), center[1] + rng.gauss(0, 0.005)),
+                timestamp=timestamp,
+                metadata=dict(metadata, scenario=scenario),
+                confidence_score=round(rng.uniform(0.6, 1.0), 3),
+                origin_sensor_id=f"{source}_sensor_{rng.randrange(500):03d}",
+            ))
+        stream.append(batch)
+    return stream
+
+
+class StubSubsystem:
+    """Subsystem stand-in that executes response plans after a seeded latency."""
+    def __init__(self, name: str, mean_latency_seconds: float, seed: int):
+        self.name = name
+        self.mean_latency_seconds = mean_latency_seconds
+        self._rng = random.Random(f"{seed}-{name}")
+
+    async def execute_response_plan(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.mean_latency_seconds > 0:
+            # Uniform jitter of +/-50% around the mean keeps latencies bounded and reproducible.
+            await asyncio.sleep(self.mean_latency_seconds * self._rng.uniform(0.5, 1.5))
+        return [{"action_id": action["action_id"], "status": "success"} for action in actions]
+
+
+class _TimedOrchestrator:
+    """Wraps an orchestrator and records the latency of every coordinated batch."""
+    def __init__(self, orchestrator: GuardianCentralOrchestrator):
+        self.orchestrator = orchestrator
+        self.plan_latencies: List[float] = []
+
+    async def coordinate_multi_threat_response(self, threat_events: List[ThreatEvent]) -> Dict:
+        started = time.perf_counter()
+        response = await self.orchestrator.coordinate_multi_threat_response(threat_events)
+        self.plan_latencies.append(time.perf_counter() - started)
+        return response
+
+
+def build_stubbed_orchestrator(seed: int, latency_scale: float) -> GuardianCentralOrchestrator:
+    """Creates an orchestrator whose five subsystems are latency stubs (never the real classes)."""
+    orchestrator = GuardianCentralOrchestrator()
+    for name, latency in STUB_SUBSYSTEM_LATENCIES.items():
+        setattr(orchestrator, name, StubSubsystem(name, latency * latency_scale, seed))
+    return orchestrator
+
+
+async def _drive(stream: List[List[ThreatEvent]], seed: int, workers: int, latency_scale: float,
+                 shards: int = 0) -> Dict[str, Any]:
+    """Runs the whole stream through the scheduler and orchestrator (or sharded orchestrator) once."""
+    sharded = None
+    if shards:
+        # Shard processes build their own stubbed orchestrators from this picklable factory.
+        sharded = ShardedGuardianOrchestrator(
+            num_shards=shards, orchestrator_factory=functools.partial(build_stubbed_orchestrator, seed, latency_scale)
+        )
+        timed = _TimedOrchestrator(sharded)
+    else:
+        timed = _TimedOrchestrator(build_stubbed_orchestrator(seed, latency_scale))
+    scheduler = ThreatPriorityScheduler(timed, num_workers=workers)
+    started = time.perf_counter()
+    scheduler.start()
+    futures = [scheduler.submit(batch) for batch in stream]
+    responses = await asyncio.gather(*futures)
+    await scheduler.stop()
+    elapsed = time.perf_counter() - started
+    # Sample memory while the orchestrator (and its accumulated state) is still alive.
+    traced_bytes = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    if sharded is not None:
+        sharded.shutdown()
+    return {
+        "traced_bytes": traced_bytes,
+        "elapsed_seconds": elapsed,
+        "plan_latencies": timed.plan_latencies,
+        "successful_plans": sum(1 for response in responses if response.get("coordination_successful")),
+        "queue_metrics": scheduler.get_queue_metrics(),
+    }
+
+
+def run_benchmark(num_batches: int, workers: int, seed: int, latency_scale: float,
+                  measure_memory: bool = True, shards: int = 0) -> Dict[str, Any]:
+    """
+    Runs the throughput pass (and optionally the memory pass) and summarises the results.
+
+    With `shards` > 0 the stream goes through a ShardedGuardianOrchestrator with that many
+    shard processes. Batches reach a shard in groups, one process round trip per group, so
+    compare sharded runs with `latency_scale=0` to measure how orchestration CPU work and
+    that inter-process cost scale with cores. The
+    memory pass only sees the coordinator process in sharded mode.
+
+    Returns:
+        A dictionary with the configuration, events/sec, plan latency percentiles (ms)
+        and memory growth figures.
+    """
+    stream = generate_threat_stream(seed, num_batches)
+    num_events = sum(len(batch) for batch in stream)
+
+    # The orchestrator and its placeholder components print per event; keep that out of the timing.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        run = asyncio.run(_drive(stream, seed, workers, latency_scale, shards))
+
+        memory = None
+        if measure_memory:
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            after = asyncio.run(_drive(stream, seed, workers, latency_scale, shards))["traced_bytes"]
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory = {
+                "growth_bytes": after - before,
+                "peak_bytes": peak - before,
+                "growth_bytes_per_1k_events": (after - before) * 1000 / max(num_events, 1),
+            }
+
+    latencies = sorted(run["plan_latencies"])
+    return {
+        "config": {"batches": num_batches, "events": num_events, "workers": workers,
+                   "seed": seed, "latency_scale": latency_scale, "shards": shards},
+        "events_per_second": num_events / run["elapsed_seconds"],
+        "batches_per_second": num_batches / run["elapsed_seconds"],
+        "elapsed_seconds": run["elapsed_seconds"],
+        "successful_plans": run["successful_plans"],
+        "plan_latency_ms": {
+            "p50": _percentile(latencies, 0.50) * 1000,
+            "p95": _percentile(latencies, 0.95) * 1000,
+            "p99": _percentile(latencies, 0.99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+        "memory": memory,
+        "python_version": sys.version.split()[0],
+    }
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compares results against a saved baseline.
+
+    Args:
+        results: Output of run_benchmark().
+        baseline: A previously saved output of run_benchmark().
+        tolerance: Allowed relative regression (e.g., 0.2 for 20%).
+
+    Returns:
+        A list of human-readable regression descriptions (empty if none).
+    """
+    regressions = []
+    if results["config"] != baseline.get("config"):
+        print(f"  [WARN] Configuration differs from baseline ({baseline.get('config')}); comparison is indicative only.")
+
+    baseline_eps = baseline["events_per_second"]
+    if results["events_per_second"] < baseline_eps * (1 - tolerance):
+        regressions.append(f"events/sec dropped from {baseline_eps:.1f} to {results['events_per_second']:.1f}")
+    for key in ("p50", "p95", "p99"):
+        old, new = baseline["plan_latency_ms"][key], results["plan_latency_ms"][key]
+        if new > old * (1 + tolerance):
+            regressions.append(f"plan latency {key} rose from {old:.2f} ms to {new:.2f} ms")
+    old_memory, new_memory = baseline.get("memory"), results.get("memory")
+    if old_memory and new_memory:
+        old_growth = old_memory["growth_bytes_per_1k_events"]
+        new_growth = new_memory["growth_bytes_per_1k_events"]
+        if new_growth > old_growth * (1 + tolerance):
+            regressions.append(f"memory growth per 1k events rose from {old_growth:.0f} B to {new_growth:.0f} B")
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    config = results["config"]
+    print("===== Sistema Guardião - Orchestrator Throughput Benchmark =====")
+    print(f"  Stream: {config['batches']} batches / {config['events']} events (seed={config['seed']})")
+    print(f"  Workers: {config['workers']} | Shards: {config.get('shards') or 'none'} | "
+          f"Stub latency scale: {config['latency_scale']}")
+    print(f"  Elapsed: {results['elapsed_seconds']:.3f}s | Successful plans: {results['successful_plans']}")
+    print(f"  Throughput: {results['events_per_second']:.1f} events/sec ({results['batches_per_second']:.1f} batches/sec)")
+    latency = results["plan_latency_ms"]
+    print(f"  Plan latency: p50={latency['p50']:.2f} ms, p95={latency['p95']:.2f} ms, "
+          f"p99={latency['p99']:.2f} ms, max={latency['max']:.2f} ms")
+    if results["memory"]:
+        memory = results["memory"]
+        print(f"  Memory: growth={memory['growth_bytes'] / 1024:.1f} KiB "
+              f"({memory['growth_bytes_per_1k_events'] / 1024:.1f} KiB per 1k events), "
+              f"peak={memory['peak_bytes'] / 1024:.1f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Deterministic throughput benchmark for GuardianCentralOrchestrator.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--batches", type=int, default=2000, help="Number of threat batches to generate.")
+    parser.add_argument("--workers", type=int, default=8, help="Scheduler worker coroutines.")
+    parser.add_argument("--seed", type=int, default=20250601, help="Seed for the synthetic stream and stub latencies.")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiplier for stub subsystem latencies (0 measures pure orchestration overhead).")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Run through ShardedGuardianOrchestrator with this many shard processes (0 = unsharded).")
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the tracemalloc memory pass.")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE_PATH, help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Save these results as the new baseline.")
+    parser.add_argument("--no-compare", action="store_true", help="Do not compare against the saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression vs. baseline.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.batches, args.workers, args.seed, args.latency_scale,
+                            measure_memory=not args.skip_memory, shards=args.shards)
+    print_report(results)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"\n[INFO] Baseline saved to '{args.baseline}'")
+        return
+
+    if not args.no_compare and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline: Optional[Dict[str, Any]] = json.load(baseline_file)
+        print(f"\n--- Comparison with baseline '{args.baseline}' (tolerance {args.tolerance:.0%}) ---")
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"  [REGRESSION] {regression}")
+        if regressions:
+            sys.exit(1)
+        print("  No regressions detected.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Startup Import-Time Benchmark
+Sistema Guardião
+
+Measures how long the API, orchestrator and CLI entry points take to import,
+using CPython's `-X importtime` instrumentation. Each target is imported in a
+fresh interpreter so results are not skewed by modules cached from earlier
+targets. The report lists the cumulative import time of each target, the
+slowest modules it pulled in, and whether it stays within the startup budget.
+
+Usage:
+    python src/benchmarks/startup_importtime.py [--budget SECONDS] [--top N] [--repeat N]
+
+Exits with status 1 if any target exceeds the budget, so it can gate CI.
+"""
+
+# Standard library imports
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.dirname(SRC_DIR)
+
+# Each target is a (label, python statement) pair. Statements run with both the
+# project root and `src` on sys.path, mirroring how the scripts themselves are run.
+STARTUP_TARGETS: List[Tuple[str, str]] = [
+    ("orchestrator import", "import core_logic.guardian_orchestrator"),
+    ("orchestrator construction",
+     "from core_logic.guardian_orchestrator import GuardianCentralOrchestrator; GuardianCentralOrchestrator()"),
+    ("fire predictor import", "import ml_models.saci_fire_predictor"),
+    ("integration app import", "import src.applications.saci_mvp_integration_app"),
+    ("central API import", "import src.api.main_api"),
+]
+
+DEFAULT_BUDGET_SECONDS = 0.5
+
+
+def parse_importtime(stderr_text: str) -> List[Tuple[str, int, int]]:
+    """
+    Parses `-X importtime` output into (module, self_us, cumulative_us) tuples.
+
+    Args:
+        stderr_text: The stderr of an interpreter run with `-X importtime`.
+
+    Returns:
+        A list with one entry per imported module, in the order reported. Module names
+        keep their leading indentation, which encodes the import nesting depth.
+    """
+    entries = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue  # Skip unrelated output and the header line
+        try:
+            _, fields = line.split(":", 1)
+            self_us, cumulative_us, module = fields.split("|", 2)
+            entries.append((module.rstrip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return entries
+
+
+def measure_target(statement: str) -> Tuple[Optional[float], List[Tuple[str, int, int]], str]:
+    """
+    Imports a target in a fresh interpreter and measures its import time.
+
+    Args:
+        statement: The Python statement to time (e.g., "import core_logic.guardian_orchestrator").
+
+    Returns:
+        A tuple of (total_seconds, import entries, error message). total_seconds is the
+        sum of cumulative time over top-level imports, or None if the statement failed.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, SRC_DIR, env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    entries = parse_importtime(completed.stderr)
+    if completed.returncode != 0:
+        last_line = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "unknown error"
+        return None, entries, last_line
+
+    # Interpreter startup modules (site, encodings, ...) are imported before -c runs;
+    # only count the imports that happen after them.
+    startup_modules = parse_importtime(subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "pass"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    ).stderr)
+    startup_names = {module.strip() for module, _, _ in startup_modules}
+    top_level_indent = min(len(m) - len(m.lstrip()) for m, _, _ in entries) if entries else 0
+    top_level = [(m, s, c) for m, s, c in entries
+                 if len(m) - len(m.lstrip()) == top_level_indent and m.strip() not in startup_names]
+    total_us = sum(cumulative for _, _, cumulative in top_level)
+    return total_us / 1e6, entries, ""
+
+
+def run_benchmark(budget_seconds: float, top_n: int, repeat: int) -> bool:
+    """
+    Runs every startup target and prints the report.
+
+    Args:
+        budget_seconds: Maximum acceptable import time per target.
+        top_n: Number of slowest modules to list per target.
+        repeat: Number of runs per target; the fastest run is reported to reduce noise.
+
+    Returns:
+        True if all targets that could be imported are within the budget.
+    """
+    print("===== Sistema Guardião - Startup Import-Time Benchmark =====")
+    print(f"Python: {sys.version.split()[0]} | Budget per target: {budget_seconds:.3f}s | Runs per target: {repeat}")
+    print("=" * 70)
+
+    all_within_budget = True
+    summary: Dict[str, Optional[float]] = {}
+    for label, statement in STARTUP_TARGETS:
+        best_seconds, best_entries, error = None, [], ""
+        for _ in range(repeat):
+            seconds, entries, error = measure_target(statement)
+            if seconds is None:
+                break
+            if best_seconds is None or seconds < best_seconds:
+                best_seconds, best_entries = seconds, entries
+        summary[label] = best_seconds
+
+        print(f"\n--- {label} ---")
+        print(f"  Statement: {statement}")
+        if best_seconds is None:
+            print(f"  [SKIP] Could not import target: {error}")
+            continue
+
+        within_budget = best_seconds <= budget_seconds
+        all_within_budget &= within_budget
+        print(f"  Import time: {best_seconds * 1000:.1f} ms  [{'OK' if within_budget else 'OVER BUDGET'}]")
+        slowest = sorted(best_entries, key=lambda entry: entry[1], reverse=True)[:top_n]
+        print(f"  Slowest modules (self time):")
+        for module, self_us, cumulative_us in slowest:
+            print(f"    {self_us / 1000:8.1f} ms self | {cumulative_us / 1000:8.1f} ms cumulative | {module.strip()}")
+
+    print("\n" + "=" * 70)
+    print("===== Summary =====")
+    for label, seconds in summary.items():
+        result = "skipped" if seconds is None else f"{seconds * 1000:.1f} ms"
+        print(f"  {label:<28} {result}")
+    return all_within_budget
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures import time of Sistema Guardião entry points with -X importtime.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Maximum acceptable import time per target, in seconds.")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest modules to list per target.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target (fastest is reported).")
+    args = parser.parse_args()
+
+    sys.exit(0 if run_benchmark(args.budget, args.top, args.repeat) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Training Data Loading Benchmark
+Sistema Guardião - SACI
+
+Compares the load time and peak memory of the original `load_data` (full
+pd.read_csv with inferred dtypes) against `load_training_data` (column pruning
+plus explicit dtypes), in one pass and chunked, on a synthetic copy of
+fire_risk_dataset.csv scaled up to the requested number of rows. If pyarrow is
+installed, the same data is also loaded from Parquet.
+
+Usage:
+    python src/benchmarks/training_data_loading.py [--rows N] [--chunksize N] [--keep-file PATH]
+"""
+
+# Standard library imports
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+# Third-party imports
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.saci_fire_predictor import load_data, load_training_data
+
+
+def write_synthetic_dataset(path: str, rows: int, seed: int = 42) -> None:
+    """Writes a CSV with the fire_risk_dataset.csv schema and `rows` random readings."""
+    rng = np.random.default_rng(seed)
+    devices = np.array([f"ESP32_{i:03d}" for i in range(200)])
+    timestamps = pd.date_range("2022-01-01", periods=rows, freq="15s", tz="UTC")
+    temperature = rng.normal(27, 6, rows).round(1)
+    humidity = rng.uniform(15, 90, rows).round(1)
+    smoke = rng.gamma(2.0, 1.5, rows).round(1)
+    df = pd.DataFrame({
+        "timestamp": timestamps.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "device_id": devices[rng.integers(0, len(devices), rows)],
+        "latitude": rng.uniform(-20.1, -19.6, rows).round(4),
+        "longitude": rng.uniform(-44.1, -43.5, rows).round(4),
+        "temperature": temperature,
+        "humidity": humidity,
+        "smoke_level": smoke,
+        "co2_ppm": rng.normal(450, 50, rows).round(0),
+        "wind_speed": rng.gamma(2.0, 3.0, rows).round(1),
+        "wind_direction": rng.integers(0, 360, rows),
+        "soil_moisture": rng.uniform(10, 50, rows).round(1),
+        "light_intensity": rng.uniform(0, 2200, rows).round(0),
+        "air_pressure": rng.normal(1013, 1.5, rows).round(2),
+        "fire_risk_label": ((temperature > 32) & (humidity < 40) | (smoke > 6)).astype(int),
+    })
+    df.to_csv(path, index=False)
+
+
+def measure(loader: Callable[[], pd.DataFrame]) -> Dict[str, float]:
+    """Runs a loader once, returning elapsed seconds, traced peak memory and result size."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tracemalloc.start()
+        started = time.perf_counter()
+        df = loader()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "peak_mb": peak / (1024 * 1024),
+        "frame_mb": df.memory_usage(deep=True).sum() / (1024 * 1024),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks SACI training data loaders on a synthetic dataset.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic dataset.")
+    parser.add_argument("--chunksize", type=int, default=250_000, help="Chunk size for the chunked loader.")
+    parser.add_argument("--keep-file", type=str, default=None, help="Write the synthetic CSV here and keep it.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = args.keep_file or os.path.join(temp_dir, "fire_risk_large.csv")
+        print(f"[INFO] Writing synthetic dataset with {args.rows} rows to '{csv_path}'...")
+        write_synthetic_dataset(csv_path, args.rows)
+        print(f"[INFO] File size: {os.path.getsize(csv_path) / (1024 * 1024):.1f} MB")
+
+        loaders = {
+            "load_data (inferred dtypes, all columns)": lambda: load_data(csv_path),
+            "load_training_data (pruned, typed)": lambda: load_training_data(csv_path),
+            f"load_training_data (chunks of {args.chunksize})": lambda: load_training_data(csv_path, chunksize=args.chunksize),
+        }
+        try:
+            import pyarrow  # noqa: F401 - only checking availability
+            parquet_path = os.path.join(temp_dir, "fire_risk_large.parquet")
+            pd.read_csv(csv_path).to_parquet(parquet_path, index=False)
+            loaders["load_training_data (Parquet)"] = lambda: load_training_data(parquet_path)
+        except ImportError:
+            print("[INFO] pyarrow not installed; skipping the Parquet loader.")
+
+        print("\n===== SACI Training Data Loading Benchmark =====")
+        print(f"{'Loader':<48} {'Time (s)':>9} {'Peak (MB)':>10} {'Frame (MB)':>11}")
+        baseline = None
+        for name, loader in loaders.items():
+            result = measure(loader)
+            baseline = baseline or result
+            print(f"{name:<48} {result['seconds']:>9.3f} {result['peak_mb']:>10.1f} {result['frame_mb']:>11.1f}"
+                  f"   (x{baseline['seconds'] / result['seconds']:.1f} faster, "
+                  f"x{baseline['peak_mb'] / max(result['peak_mb'], 1e-9):.1f} less peak memory)")
+
+
+if __name__ == "__main__":
+    main()
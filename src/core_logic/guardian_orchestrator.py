@@ -5,16 +5,18 @@ This module defines the central coordination system for the Sistema Guardião,
 orchestrating responses across all five subsystems (CURUPIRA, IARA, SACI, BOITATÁ, ANHANGÁ).
 """
 
+import asyncio
+import importlib
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional # Ensure Optional is here
+from typing import Deque, Dict, Any, List, Optional, Tuple # Ensure Optional is here
 from datetime import datetime
 
-# Import the subsystem classes
-from subsystems.curupira_subsystem import CurupiraHybridDetector
-from subsystems.iara_subsystem import IaraEpidemicPredictor
-from subsystems.saci_subsystem import SaciFireSwarmIntelligence
-from subsystems.boitata_subsystem import BoitataUrbanTwin
-from subsystems.anhanga_subsystem import AnhangaMeshNetwork
+from core_logic.orchestrator_state import OrchestratorStateStore
+
+# Subsystem classes are imported and constructed lazily (see `_LazySubsystem`), so
+# importing this module or creating an orchestrator does not pay for subsystems
+# that are never used (e.g., SACI allocates its whole swarm on construction).
 
 
 @dataclass
@@ -126,6 +128,47 @@ class MultiThreatCorrelator:
         return {"report": "No significant correlations found by placeholder logic for a single event."}
 
 
+# Default action issued to a subsystem for each event it reported, keyed by subsystem name.
+RESPONSE_ACTION_TYPES: Dict[str, str] = {
+    "saci": "deploy_drones",
+    "curupira": "isolate_network_segment",
+    "iara": "issue_health_advisory",
+    "boitata": "assess_cascade_risk",
+    "anhanga": "broadcast_emergency_alert",
+}
+
+DEFAULT_MAX_RESPONSE_HISTORY = 1000  # Response plans kept for the meta-learning engine and snapshots
+DEFAULT_MAX_ACTIVE_THREATS = 10000   # Most recent threat events kept in memory and snapshots
+
+
+class _LazySubsystem:
+    """
+    Descriptor that imports and constructs a subsystem on first attribute access.
+
+    This is a non-data descriptor: the constructed instance is stored in the
+    orchestrator's `__dict__` under the same name, so every later access is a
+    plain attribute lookup. Assigning the attribute directly (e.g., a stub in a
+    benchmark) replaces the subsystem without ever constructing the real one.
+    """
+    def __init__(self, module_name: str, class_name: str, **init_kwargs: Any):
+        self.module_name = module_name
+        self.class_name = class_name
+        self.init_kwargs = init_kwargs
+        self.attribute_name: Optional[str] = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.attribute_name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        subsystem_class = getattr(importlib.import_module(self.module_name), self.class_name)
+        init_kwargs = {**self.init_kwargs, **instance.subsystem_options.get(self.attribute_name, {})}
+        subsystem = subsystem_class(**init_kwargs)
+        instance.__dict__[self.attribute_name] = subsystem
+        return subsystem
+
+
 class GuardianCentralOrchestrator:
     """
     The central coordination system for Sistema Guardião.
@@ -134,35 +177,65 @@ class GuardianCentralOrchestrator:
     across different domains, and coordinates unified response strategies.
     It serves as the "brain" that enables emergent intelligence from the
     interaction of specialized subsystems.
+
+    The five subsystems are constructed on first use, so creating an orchestrator
+    is cheap and only the subsystems a deployment actually touches are built.
     """
-    def __init__(self):
+    # The five Guardian subsystems, constructed lazily on first access
+    curupira = _LazySubsystem("subsystems.curupira_subsystem", "CurupiraHybridDetector")
+    iara = _LazySubsystem("subsystems.iara_subsystem", "IaraEpidemicPredictor")
+    saci = _LazySubsystem("subsystems.saci_subsystem", "SaciFireSwarmIntelligence", num_agents=100)
+    boitata = _LazySubsystem("subsystems.boitata_subsystem", "BoitataUrbanTwin", city_name="belo_horizonte")
+    anhanga = _LazySubsystem("subsystems.anhanga_subsystem", "AnhangaMeshNetwork")
+
+    SUBSYSTEM_NAMES = ("curupira", "iara", "saci", "boitata", "anhanga")
+
+    def __init__(self, subsystem_options: Optional[Dict[str, Dict[str, Any]]] = None,
+                 state_store: Optional[OrchestratorStateStore] = None, snapshot_interval: int = 1000,
+                 max_response_history: int = DEFAULT_MAX_RESPONSE_HISTORY,
+                 max_active_threats: int = DEFAULT_MAX_ACTIVE_THREATS):
         """
         Initializes the GuardianCentralOrchestrator.
         
-        Sets up instances of all five subsystems and the meta-learning components
-        that enable cross-domain threat analysis and coordinated responses.
+        Sets up the meta-learning components that enable cross-domain threat
+        analysis and coordinated responses. The five subsystems are not built
+        here; each one is imported and constructed the first time it is accessed.
+
+        Args:
+            subsystem_options (Optional[Dict[str, Dict[str, Any]]]): Constructor keyword
+                arguments per subsystem, overriding the defaults when that subsystem is
+                first built. Example: `{'saci': {'num_agents': 50}, 'boitata': {'city_name': 'sao_paulo'}}`.
+            state_store (Optional[OrchestratorStateStore]): If given, orchestrator state is restored
+                from it here (snapshot plus journal tail) and every later state change is journaled.
+            snapshot_interval (int): Number of journal records after which a new snapshot is taken.
+                Inside a running event loop the snapshot is written on the default executor.
+            max_response_history (int): Most recent response plans kept in `response_history`;
+                older plans are dropped.
+            max_active_threats (int): Most recent threat events kept in `active_threats`;
+                older events are dropped.
         """
-        # Initialize all five Guardian subsystems
-        self.curupira = CurupiraHybridDetector()
-        self.iara = IaraEpidemicPredictor()
-        self.saci = SaciFireSwarmIntelligence(num_agents=100)
-        self.boitata = BoitataUrbanTwin(city_name="belo_horizonte")
-        self.anhanga = AnhangaMeshNetwork()
-        
+        self.subsystem_options: Dict[str, Dict[str, Any]] = subsystem_options or {}
+
         # Initialize meta-learning and correlation components
         self.meta_ai = MetaLearningEngine()
         self.threat_correlator = MultiThreatCorrelator()
         
         # Orchestrator state
-        self.active_threats: List[ThreatEvent] = []
-        self.response_history: List[Dict] = []
+        self.active_threats: Deque[ThreatEvent] = deque(maxlen=max_active_threats)
+        self.response_history: Deque[Dict] = deque(maxlen=max_response_history)
+
+        self.state_store = state_store
+        self.snapshot_interval: int = snapshot_interval
+        self._pending_snapshot: Optional[asyncio.Future] = None
+        if self.state_store is not None:
+            self._restore_state()
         
-        print("GuardianCentralOrchestrator initialized with all subsystems.")
-        print("  - CURUPIRA: Hybrid Threat Detection")
-        print("  - IARA: Epidemic Prediction")
-        print("  - SACI: Fire Swarm Intelligence")
-        print("  - BOITATÁ: Urban Digital Twin")
-        print("  - ANHANGÁ: Mesh Communications")
+        print("GuardianCentralOrchestrator initialized (subsystems are constructed on first use).")
+
+    @property
+    def initialized_subsystems(self) -> List[str]:
+        """Names of the subsystems that have been constructed so far."""
+        return [name for name in self.SUBSYSTEM_NAMES if name in self.__dict__]
 
     async def coordinate_multi_threat_response(self, threat_events: List[ThreatEvent]) -> Dict:
         """
@@ -177,8 +250,9 @@ class GuardianCentralOrchestrator:
                                               Each event contains details about detected threats.
         
         Returns:
-            Dict: A comprehensive response plan coordinating all relevant subsystems.
-                  Returns an empty dict or a dict with coordination_successful: False if issues occur.
+            Dict: A comprehensive response plan coordinating all relevant subsystems, including
+                  the per-action `action_results`. `coordination_successful` is False if any
+                  subsystem failed to execute its actions. Returns an empty dict for an empty batch.
         """
         # Conceptual flow:
         # 1. **Threat Correlation (MultiThreatCorrelator):**
@@ -255,12 +329,177 @@ class GuardianCentralOrchestrator:
                 print(f"    Origin Sensor ID: {event.origin_sensor_id}")
             print(f"    Metadata: {event.metadata}")
 
-        self.active_threats.extend(threat_events)
-        
-        # Placeholder: Actual plan generation and execution would occur here.
-        # For now, returning an empty dictionary as per the original skeleton.
-        # A real implementation would return the 'response_plan' or a confirmation.
-        return {} # Example: response_plan or {'coordination_successful': True, 'plan_id': '...'}
+        if not threat_events:
+            return {}
+        self._apply_state_change("threats_received", list(threat_events))
+        self._record_state_change("threats_received", list(threat_events))
+
+        # Steps 1-3: correlate, ask the meta-learning engine for a strategy, formulate the plan.
+        correlations = await self.threat_correlator.analyze_correlations(threat_events)
+        strategy = await self.meta_ai.suggest_response_strategies(
+            correlations.get("correlation_groups", {}), self.response_history
+        )
+        response_plan = self._formulate_response_plan(threat_events, correlations, strategy)
+
+        # Steps 4-5: dispatch to subsystems concurrently, then record and learn.
+        action_results = await self._dispatch_subsystem_actions(response_plan)
+        response_plan["action_results"] = action_results
+        response_plan["coordination_successful"] = all(
+            result.get("status") != "failed" for result in action_results
+        )
+        self._apply_state_change("response_recorded", response_plan)
+        self._record_state_change("response_recorded", response_plan)
+        await self.meta_ai.learn_from_response(
+            response_plan, action_results, {"success": response_plan["coordination_successful"]}
+        )
+        return response_plan
+
+    def _formulate_response_plan(self, threat_events: List[ThreatEvent], correlations: Dict[str, Any],
+                                 strategy: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Builds a response plan with one default action per reported event, grouped by subsystem.
+
+        Args:
+            threat_events (List[ThreatEvent]): The events being coordinated.
+            correlations (Dict[str, Any]): Output of `MultiThreatCorrelator.analyze_correlations()`.
+            strategy (Dict[str, Any]): Output of `MetaLearningEngine.suggest_response_strategies()`.
+
+        Returns:
+            Dict[str, Any]: The response plan, structured as documented in `coordinate_multi_threat_response`.
+        """
+        subsystem_actions: Dict[str, List[Dict[str, Any]]] = {}
+        for event in threat_events:
+            subsystem = event.subsystem_source.lower()
+            action_type = RESPONSE_ACTION_TYPES.get(subsystem, "monitor")
+            subsystem_actions.setdefault(subsystem, []).append({
+                "action_id": f"{subsystem}_{action_type}_{event.event_id}",
+                "action_type": action_type,
+                "target_event_id": event.event_id,
+                "target_area": event.location,
+                "priority": event.severity * event.confidence_score,
+                "parameters": dict(event.metadata),
+            })
+
+        max_priority = max(event.severity * event.confidence_score for event in threat_events)
+        return {
+            "plan_id": f"rp_{datetime.utcnow().timestamp()}",
+            "target_event_ids": [event.event_id for event in threat_events],
+            "correlation_groups": correlations.get("correlation_groups", {}),
+            "subsystem_actions": subsystem_actions,
+            "coordination_strategy": strategy.get("suggested_strategy", "simultaneous_execution"),
+            "priority": "high" if max_priority >= 0.5 else "normal",
+        }
+
+    async def _dispatch_subsystem_actions(self, response_plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Executes the plan's actions on every involved subsystem concurrently.
+
+        Subsystems are dispatched through their async `execute_response_plan(actions)`
+        method. Subsystems that do not implement it yet (or are unknown) get their
+        actions recorded as "not_dispatched" instead of failing the whole plan.
+
+        Returns:
+            List[Dict[str, Any]]: One result dict per action.
+        """
+        dispatched_subsystems, tasks, action_results = [], [], []
+        for subsystem_name, actions in response_plan["subsystem_actions"].items():
+            subsystem = getattr(self, subsystem_name) if subsystem_name in self.SUBSYSTEM_NAMES else None
+            execute = getattr(subsystem, "execute_response_plan", None)
+            if execute is None:
+                action_results.extend({"action_id": action["action_id"], "status": "not_dispatched"}
+                                      for action in actions)
+                continue
+            dispatched_subsystems.append(subsystem_name)
+            tasks.append(execute(actions))
+
+        for subsystem_name, outcome in zip(dispatched_subsystems, await asyncio.gather(*tasks, return_exceptions=True)):
+            if isinstance(outcome, Exception):
+                print(f"GuardianCentralOrchestrator: {subsystem_name} failed to execute its actions: {outcome}")
+                action_results.extend({"action_id": action["action_id"], "status": "failed", "error": str(outcome)}
+                                      for action in response_plan["subsystem_actions"][subsystem_name])
+            else:
+                action_results.extend(outcome)
+        return action_results
+
+    def _apply_state_change(self, change_type: str, data: Any) -> None:
+        """Applies one state change; used both live and when replaying the journal."""
+        if change_type == "threats_received":
+            self.active_threats.extend(data)
+        elif change_type == "response_recorded":
+            self.response_history.append(data)
+        else:
+            print(f"GuardianCentralOrchestrator: Ignoring unknown state change '{change_type}'.")
+
+    def _record_state_change(self, change_type: str, data: Any) -> None:
+        """
+        Journals a state change and takes a snapshot every `snapshot_interval` records.
+
+        Inside a running event loop the snapshot (pickling, compression and fsync) is
+        written on the default executor so it does not block coordination; a new one
+        is not started while the previous one is still being written.
+        """
+        if self.state_store is None:
+            return
+        self.state_store.append(change_type, data)
+        if self.state_store.records_since_snapshot < self.snapshot_interval:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.snapshot_state()
+            return
+        if self._pending_snapshot is not None and not self._pending_snapshot.done():
+            return
+        state, sequence = self._capture_state()
+        self._pending_snapshot = loop.run_in_executor(None, self.state_store.write_snapshot, state, sequence)
+        self._pending_snapshot.add_done_callback(self._on_snapshot_written)
+
+    @staticmethod
+    def _on_snapshot_written(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            # The rotated journal is kept, so nothing is lost; the next snapshot retries.
+            print(f"GuardianCentralOrchestrator: Background snapshot failed: {future.exception()}")
+
+    def _capture_state(self) -> Tuple[Dict[str, Any], int]:
+        """Copies the state containers and rotates the journal at the same point."""
+        state = {
+            "active_threats": list(self.active_threats),
+            "response_history": list(self.response_history),
+            "threat_correlator": self.threat_correlator,
+            "meta_ai": self.meta_ai,
+        }
+        return state, self.state_store.rotate_journal()
+
+    def snapshot_state(self) -> None:
+        """
+        Writes a snapshot of the orchestrator state and truncates the journal.
+
+        Called automatically every `snapshot_interval` journal records; can also be
+        called explicitly, e.g., on graceful shutdown. Blocks the caller while the
+        snapshot is written. No-op without a state store.
+        """
+        if self.state_store is None:
+            return
+        self.state_store.write_snapshot(*self._capture_state())
+
+    async def wait_for_snapshot(self) -> None:
+        """Waits until a snapshot being written in the background, if any, has finished."""
+        if self._pending_snapshot is not None:
+            await asyncio.wait([self._pending_snapshot])
+
+    def _restore_state(self) -> None:
+        """Loads the latest snapshot and replays the journal records written after it."""
+        state, records = self.state_store.restore()
+        if state is not None:
+            self.active_threats = deque(state["active_threats"], maxlen=self.active_threats.maxlen)
+            self.response_history = deque(state["response_history"], maxlen=self.response_history.maxlen)
+            self.threat_correlator = state["threat_correlator"]
+            self.meta_ai = state["meta_ai"]
+        for change_type, data in records:
+            self._apply_state_change(change_type, data)
+        if state is not None or records:
+            print(f"GuardianCentralOrchestrator: Restored {len(self.active_threats)} active threats and "
+                  f"{len(self.response_history)} response plans ({len(records)} journal records replayed).")
 
     def get_system_status(self) -> Dict:
         """
@@ -279,6 +518,7 @@ class GuardianCentralOrchestrator:
                 "boitata": "operational",
                 "anhanga": "operational"
             },
+            "initialized_subsystems": self.initialized_subsystems,
             "last_update": datetime.utcnow().isoformat()
         }
 
@@ -308,7 +548,6 @@ if __name__ == '__main__':
     ]
     
     # Test coordination
-    import asyncio
     async def test_coordination():
         response = await orchestrator.coordinate_multi_threat_response(sample_threats)
         print(f"Orchestrator Response: {response}")
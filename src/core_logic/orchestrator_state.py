@@ -0,0 +1,225 @@
+"""
+Orchestrator State Store
+
+This module defines the OrchestratorStateStore, which lets a restarted
+GuardianCentralOrchestrator become operational again without rebuilding its
+state from scratch.
+
+State is persisted as:
+- A compact binary snapshot (zlib-compressed pickle) of the orchestrator state
+  (`active_threats`, `response_history`, correlator and meta-learning objects),
+  tagged with the sequence number of the last journal record it includes.
+- An append-only journal of state changes made since that snapshot. Each
+  record is framed with its sequence number, length and CRC32, so a record
+  torn by a crash mid-write is detected and dropped on restore.
+
+Restoring loads the snapshot and replays only the journal records newer than
+it. Taking a snapshot first rotates the journal (the records the snapshot will
+cover move to a ".prev" file and new records go to a fresh journal), then
+rewrites the snapshot atomically and deletes the rotated journal. The slow
+second step can therefore run on another thread while records keep being
+appended. Files are pickles, so only point the store at trusted directories.
+"""
+
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Any, Dict, IO, List, Optional, Tuple
+
+
+SNAPSHOT_FILENAME = "orchestrator_snapshot.bin"
+JOURNAL_FILENAME = "orchestrator_journal.bin"
+ROTATED_JOURNAL_SUFFIX = ".prev"
+
+_SNAPSHOT_MAGIC = b"GSNP1"
+_SNAPSHOT_HEADER = struct.Struct("<QI")   # last journal sequence, CRC32 of the compressed payload
+_RECORD_HEADER = struct.Struct("<QII")    # sequence, payload length, CRC32 of the payload
+
+
+class OrchestratorStateStore:
+    """
+    Persists orchestrator state as periodic snapshots plus an append-only journal.
+    """
+    def __init__(self, state_dir: str, fsync: bool = False):
+        """
+        Initializes the OrchestratorStateStore.
+
+        Args:
+            state_dir (str): Directory holding the snapshot and journal files. Created if missing.
+            fsync (bool): If True, every journal append is fsync'ed. This survives host crashes,
+                          at the cost of one disk sync per record; without it, records survive
+                          process crashes (the common pod restart case).
+        """
+        self.state_dir: str = state_dir
+        self.fsync: bool = fsync
+        self.snapshot_path: str = os.path.join(state_dir, SNAPSHOT_FILENAME)
+        self.journal_path: str = os.path.join(state_dir, JOURNAL_FILENAME)
+        self.rotated_journal_path: str = self.journal_path + ROTATED_JOURNAL_SUFFIX
+        os.makedirs(state_dir, exist_ok=True)
+
+        self.last_sequence: int = 0              # Sequence of the last record written or replayed
+        self.records_since_snapshot: int = 0
+        self._journal_file: Optional[IO[bytes]] = None
+        self._snapshot_sequence: int = 0         # Sequence covered by the snapshot on disk
+        self._rotated_sequence: int = 0          # Last sequence moved to the rotated journal
+        self._snapshot_lock = threading.Lock()
+
+    def append(self, record_type: str, data: Any) -> int:
+        """
+        Appends a state-change record to the journal.
+
+        Args:
+            record_type (str): Kind of change (e.g., "threats_received").
+            data (Any): Picklable payload describing the change.
+
+        Returns:
+            int: The sequence number assigned to the record.
+        """
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, "ab")
+        payload = pickle.dumps((record_type, data), protocol=pickle.HIGHEST_PROTOCOL)
+        self.last_sequence += 1
+        self._journal_file.write(_RECORD_HEADER.pack(self.last_sequence, len(payload), zlib.crc32(payload)))
+        self._journal_file.write(payload)
+        self._journal_file.flush()
+        if self.fsync:
+            os.fsync(self._journal_file.fileno())
+        self.records_since_snapshot += 1
+        return self.last_sequence
+
+    def rotate_journal(self) -> int:
+        """
+        Moves the journal aside so a snapshot can be written while new records are appended.
+
+        Call it on the thread that appends, at the moment the state to snapshot is
+        captured. If an earlier rotated journal is still waiting for its snapshot, the
+        journal is appended to it.
+
+        Returns:
+            int: The sequence of the last rotated record, to pass to `write_snapshot`.
+        """
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        if os.path.exists(self.journal_path):
+            with self._snapshot_lock:
+                if os.path.exists(self.rotated_journal_path):
+                    with open(self.journal_path, "rb") as journal_file, \
+                            open(self.rotated_journal_path, "ab") as rotated_file:
+                        rotated_file.write(journal_file.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.rotated_journal_path)
+                self._rotated_sequence = self.last_sequence
+        self.records_since_snapshot = 0
+        return self.last_sequence
+
+    def write_snapshot(self, state: Dict[str, Any], sequence: Optional[int] = None) -> None:
+        """
+        Atomically replaces the snapshot with `state` and drops the journal records it covers.
+
+        May run on another thread than the one appending records when `sequence` comes
+        from `rotate_journal`. A snapshot older than the one on disk is discarded.
+
+        Args:
+            state (Dict[str, Any]): Picklable orchestrator state covering every journal
+                                    record up to `sequence`.
+            sequence (Optional[int]): Value returned by `rotate_journal` when `state` was
+                                      captured. None rotates now (state covers every record).
+        """
+        if sequence is None:
+            sequence = self.rotate_journal()
+        compressed = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 6)
+        temp_path = f"{self.snapshot_path}.{sequence}.tmp"
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(_SNAPSHOT_MAGIC)
+            snapshot_file.write(_SNAPSHOT_HEADER.pack(sequence, zlib.crc32(compressed)))
+            snapshot_file.write(compressed)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+
+        with self._snapshot_lock:
+            if sequence < self._snapshot_sequence:
+                os.remove(temp_path)  # A newer snapshot won the race
+                return
+            os.replace(temp_path, self.snapshot_path)
+            self._snapshot_sequence = sequence
+            # Records up to `sequence` are now in the snapshot. If we crash before the
+            # removal below, restore() skips them by sequence number anyway.
+            if sequence >= self._rotated_sequence and os.path.exists(self.rotated_journal_path):
+                os.remove(self.rotated_journal_path)
+
+    def restore(self) -> Tuple[Optional[Dict[str, Any]], List[Tuple[str, Any]]]:
+        """
+        Loads the latest snapshot and the journal records written after it.
+
+        A torn or corrupt record at the end of the journal (e.g., from a crash
+        mid-append) ends the replay and is cut off so new records append cleanly.
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], List[Tuple[str, Any]]]: The snapshot state
+            (None if there is no snapshot) and the (record_type, data) records to replay,
+            in order.
+
+        Raises:
+            ValueError: If the snapshot file exists but is corrupt.
+        """
+        state, snapshot_sequence = self._read_snapshot()
+        self.last_sequence = self._snapshot_sequence = snapshot_sequence
+
+        # A rotated journal left by a crash before its snapshot completed comes first.
+        records: List[Tuple[str, Any]] = []
+        for journal_path in (self.rotated_journal_path, self.journal_path):
+            if not os.path.exists(journal_path):
+                continue
+            valid_length = self._read_journal(journal_path, snapshot_sequence, records)
+            if journal_path == self.rotated_journal_path:
+                self._rotated_sequence = self.last_sequence
+            elif valid_length < os.path.getsize(journal_path):
+                with open(journal_path, "r+b") as journal_file:
+                    journal_file.truncate(valid_length)
+        self.records_since_snapshot = len(records)
+        return state, records
+
+    def _read_journal(self, journal_path: str, snapshot_sequence: int, records: List[Tuple[str, Any]]) -> int:
+        """Appends a journal's records newer than the snapshot to `records`; returns its valid length."""
+        valid_length = 0
+        with open(journal_path, "rb") as journal_file:
+            while True:
+                header = journal_file.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                sequence, length, checksum = _RECORD_HEADER.unpack(header)
+                payload = journal_file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    print(f"OrchestratorStateStore: Dropping torn journal record {sequence} in '{journal_path}'.")
+                    break
+                valid_length = journal_file.tell()
+                if sequence <= snapshot_sequence or sequence <= self.last_sequence:
+                    continue  # Already covered by the snapshot (or replayed from the rotated journal)
+                records.append(pickle.loads(payload))
+                self.last_sequence = sequence
+        return valid_length
+
+    def _read_snapshot(self) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Reads the snapshot file, returning (state, last journal sequence) or (None, 0)."""
+        if not os.path.exists(self.snapshot_path):
+            return None, 0
+        with open(self.snapshot_path, "rb") as snapshot_file:
+            blob = snapshot_file.read()
+        header_end = len(_SNAPSHOT_MAGIC) + _SNAPSHOT_HEADER.size
+        if not blob.startswith(_SNAPSHOT_MAGIC) or len(blob) < header_end:
+            raise ValueError(f"'{self.snapshot_path}' is not an orchestrator snapshot.")
+        sequence, checksum = _SNAPSHOT_HEADER.unpack(blob[len(_SNAPSHOT_MAGIC):header_end])
+        compressed = blob[header_end:]
+        if zlib.crc32(compressed) != checksum:
+            raise ValueError(f"Snapshot '{self.snapshot_path}' failed its checksum; it is corrupt.")
+        return pickle.loads(zlib.decompress(compressed)), sequence
+
+    def close(self) -> None:
+        """Closes the journal file handle."""
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
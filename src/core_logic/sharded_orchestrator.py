@@ -0,0 +1,383 @@
+"""
+Sharded Guardian Orchestrator
+
+This module defines the ShardedGuardianOrchestrator, which spreads threat
+orchestration over worker processes by geographic region so that throughput
+scales with the number of cores.
+
+Threat events are routed by the geohash prefix of `ThreatEvent.location`:
+every region (geohash prefix of `shard_precision` characters) is owned by
+exactly one shard, and each shard is a dedicated worker process holding its own
+GuardianCentralOrchestrator (its own correlator and active threat registry).
+Events that fall in a border cell (a fine geohash cell adjacent to a cell owned
+by another shard) are also kept by the coordinator, which correlates them
+against recent border events of neighbouring shards. Interior events never
+leave their shard.
+
+Batches sent to a shard while it is still busy are queued and handed over together
+in one call, so the process round trip is paid once per group of batches rather than
+once per batch. The shard coordinates the batches of a group concurrently on its
+event loop, as an unsharded orchestrator behind a multi-worker scheduler would.
+"""
+
+import asyncio
+import os
+import sys
+import zlib
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from core_logic.guardian_orchestrator import GuardianCentralOrchestrator, MultiThreatCorrelator, ThreatEvent
+
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+DEFAULT_MAX_BORDER_CELLS = 65536   # Border cells tracked (registry and border-cell cache), least recent evicted
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 6) -> str:
+    """
+    Encodes a coordinate as a geohash string.
+
+    Args:
+        latitude (float): Latitude in degrees (-90 to 90).
+        longitude (float): Longitude in degrees (-180 to 180).
+        precision (int): Number of geohash characters. 4 characters is a cell of
+                         roughly 39 x 20 km, 6 characters roughly 1.2 x 0.6 km.
+
+    Returns:
+        str: The geohash of the cell containing the coordinate.
+    """
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Geohash interleaves longitude (even bits) and latitude (odd bits).
+        interval, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Returns the (lat_min, lat_max, lon_min, lon_max) bounding box of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            mid = (interval[0] + interval[1]) / 2
+            if (value >> shift) & 1:
+                interval[0] = mid
+            else:
+                interval[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def geohash_neighbors(geohash: str) -> List[str]:
+    """Returns the geohashes of the (up to 8) cells surrounding a geohash cell."""
+    lat_min, lat_max, lon_min, lon_max = geohash_bounds(geohash)
+    lat_step, lon_step = lat_max - lat_min, lon_max - lon_min
+    center_lat, center_lon = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+    neighbors = []
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            if d_lat == 0 and d_lon == 0:
+                continue
+            lat = center_lat + d_lat * lat_step
+            if not -90.0 < lat < 90.0:
+                continue  # No neighbors beyond the poles
+            lon = (center_lon + d_lon * lon_step + 180.0) % 360.0 - 180.0
+            neighbors.append(geohash_encode(lat, lon, len(geohash)))
+    return neighbors
+
+
+# --- Worker process side ---
+# Each shard is a single-process pool, so these globals are that shard's own orchestrator
+# and the event loop it runs on (kept for the life of the process).
+_shard_orchestrator: Optional[GuardianCentralOrchestrator] = None
+_shard_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_shard_worker(orchestrator_factory: Optional[Callable[[], GuardianCentralOrchestrator]],
+                       quiet: bool) -> None:
+    """Process initializer: builds the shard's orchestrator and event loop."""
+    global _shard_orchestrator, _shard_loop
+    if quiet:
+        # The orchestrator reports every event on stdout; shards would interleave unreadably.
+        sys.stdout = open(os.devnull, "w")
+    _shard_orchestrator = orchestrator_factory() if orchestrator_factory else GuardianCentralOrchestrator()
+    _shard_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_shard_loop)
+
+
+async def _coordinate_batches(batches: List[List[ThreatEvent]]) -> List[Any]:
+    async def coordinate(threat_events: List[ThreatEvent]) -> Dict[str, Any]:
+        response_plan = await _shard_orchestrator.coordinate_multi_threat_response(threat_events)
+        response_plan["shard_active_threats"] = len(_shard_orchestrator.active_threats)
+        return response_plan
+    return await asyncio.gather(*(coordinate(threat_events) for threat_events in batches), return_exceptions=True)
+
+
+def _coordinate_in_shard(batches: List[List[ThreatEvent]]) -> List[Any]:
+    """
+    Runs batches concurrently through the shard's orchestrator.
+
+    Returns one response plan per batch, in order, or the exception a batch raised
+    (so one failing batch does not fail the others sent with it).
+    """
+    return _shard_loop.run_until_complete(_coordinate_batches(batches))
+
+
+def _shard_status() -> Dict[str, Any]:
+    """Returns the shard orchestrator's system status."""
+    return _shard_orchestrator.get_system_status()
+
+
+class ShardedGuardianOrchestrator:
+    """
+    Coordinator for region-sharded orchestration across worker processes.
+
+    Exposes the same async `coordinate_multi_threat_response(threat_events)` entry
+    point as GuardianCentralOrchestrator, so it can be placed behind the
+    ThreatPriorityScheduler unchanged.
+    """
+    def __init__(self, num_shards: Optional[int] = None, shard_precision: int = 4, border_precision: int = 6,
+                 border_history: int = 32, max_border_cells: int = DEFAULT_MAX_BORDER_CELLS,
+                 orchestrator_factory: Optional[Callable[[], GuardianCentralOrchestrator]] = None,
+                 quiet_workers: bool = True):
+        """
+        Initializes the ShardedGuardianOrchestrator and starts one worker process per shard.
+
+        Args:
+            num_shards (Optional[int]): Number of shard processes. Defaults to the CPU count.
+            shard_precision (int): Geohash length of a region. Each region belongs to one shard.
+            border_precision (int): Geohash length of the cells used to detect region borders.
+                                    Must be greater than `shard_precision`.
+            border_history (int): Recent border events kept per border cell for cross-shard correlation.
+            max_border_cells (int): Border cells tracked for correlation (and cells whose border status
+                                    is cached); the least recently used are evicted beyond it.
+            orchestrator_factory (Optional[Callable]): Picklable callable that builds each shard's
+                                                       orchestrator (defaults to GuardianCentralOrchestrator()).
+            quiet_workers (bool): If True, shard processes discard their stdout.
+
+        Raises:
+            ValueError: If `num_shards` is less than 1 or the precisions are inconsistent.
+        """
+        if num_shards is None:
+            num_shards = os.cpu_count() or 1
+        if num_shards < 1:
+            raise ValueError(f"num_shards must be at least 1, got {num_shards}.")
+        if border_precision <= shard_precision:
+            raise ValueError(f"border_precision ({border_precision}) must be greater than "
+                             f"shard_precision ({shard_precision}).")
+
+        self.num_shards: int = num_shards
+        self.shard_precision: int = shard_precision
+        self.border_precision: int = border_precision
+        self.threat_correlator = MultiThreatCorrelator()
+        self.border_history: int = border_history
+        self.max_border_cells: int = max_border_cells
+        self.border_registry: "OrderedDict[str, Deque[Tuple[int, ThreatEvent]]]" = OrderedDict()
+        self._border_cell_cache: "OrderedDict[str, bool]" = OrderedDict()
+        # Per shard: batches waiting for the shard, and whether a sender task is draining them.
+        self._pending: List[List[Tuple[List[ThreatEvent], asyncio.Future]]] = [[] for _ in range(num_shards)]
+        self._sending: List[bool] = [False] * num_shards
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, initializer=_init_shard_worker,
+                                initargs=(orchestrator_factory, quiet_workers))
+            for _ in range(num_shards)
+        ]
+        print(f"ShardedGuardianOrchestrator initialized with {num_shards} shards "
+              f"(region precision {shard_precision}, border precision {border_precision}).")
+
+    def shard_for_region(self, region: str) -> int:
+        """Returns the shard owning a region geohash. Uses CRC32, which is stable across processes."""
+        return zlib.crc32(region.encode("ascii")) % self.num_shards
+
+    def shard_for_location(self, location: tuple) -> int:
+        """Returns the shard owning the region that contains a (latitude, longitude) location."""
+        return self.shard_for_region(geohash_encode(location[0], location[1], self.shard_precision))
+
+    def is_border_cell(self, cell: str) -> bool:
+        """True if a fine cell touches a cell owned by a different shard (cached per cell)."""
+        cache = self._border_cell_cache
+        cached = cache.get(cell)
+        if cached is None:
+            own_shard = self.shard_for_region(cell[:self.shard_precision])
+            cached = any(self.shard_for_region(neighbor[:self.shard_precision]) != own_shard
+                         for neighbor in geohash_neighbors(cell))
+            cache[cell] = cached
+            if len(cache) > self.max_border_cells:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(cell)
+        return cached
+
+    async def coordinate_multi_threat_response(self, threat_events: List[ThreatEvent]) -> Dict:
+        """
+        Routes a batch to the shards owning its events and merges the shard responses.
+
+        Args:
+            threat_events (List[ThreatEvent]): Events from any subsystem and region.
+
+        Returns:
+            Dict: `{'target_event_ids': [...], 'shard_plans': {shard_index: response_plan},
+                    'cross_shard_correlations': [...], 'coordination_successful': bool}`.
+                  Returns an empty dict for an empty batch.
+        """
+        if not threat_events:
+            return {}
+
+        events_by_shard: Dict[int, List[ThreatEvent]] = defaultdict(list)
+        border_events: List[Tuple[str, int, ThreatEvent]] = []
+        for event in threat_events:
+            cell = geohash_encode(event.location[0], event.location[1], self.border_precision)
+            shard = self.shard_for_region(cell[:self.shard_precision])
+            events_by_shard[shard].append(event)
+            if self.is_border_cell(cell):
+                border_events.append((cell, shard, event))
+
+        shard_indices = list(events_by_shard)
+        shard_results = await asyncio.gather(*(
+            self._submit_to_shard(shard, events_by_shard[shard]) for shard in shard_indices
+        ), return_exceptions=True)
+
+        shard_plans: Dict[int, Dict[str, Any]] = {}
+        for shard, result in zip(shard_indices, shard_results):
+            if isinstance(result, Exception):
+                print(f"ShardedGuardianOrchestrator: shard {shard} failed: {result}")
+                shard_plans[shard] = {"coordination_successful": False, "error": str(result),
+                                      "target_event_ids": [e.event_id for e in events_by_shard[shard]]}
+            else:
+                shard_plans[shard] = result
+
+        cross_shard_correlations = await self._correlate_border_events(border_events)
+        return {
+            "target_event_ids": [event.event_id for event in threat_events],
+            "shard_plans": shard_plans,
+            "cross_shard_correlations": cross_shard_correlations,
+            "coordination_successful": all(plan.get("coordination_successful") for plan in shard_plans.values()),
+        }
+
+    def _submit_to_shard(self, shard: int, threat_events: List[ThreatEvent]) -> asyncio.Future:
+        """Queues a batch for a shard; the future resolves to its response plan."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[shard].append((threat_events, future))
+        if not self._sending[shard]:
+            self._sending[shard] = True
+            loop.create_task(self._drain_shard(shard))
+        return future
+
+    async def _drain_shard(self, shard: int) -> None:
+        """Sends a shard its queued batches, all waiting batches per round trip, until none are left."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending[shard]:
+                queued, self._pending[shard] = self._pending[shard], []
+                try:
+                    results = await loop.run_in_executor(self._executors[shard], _coordinate_in_shard,
+                                                         [threat_events for threat_events, _ in queued])
+                except Exception as error:
+                    results = [error] * len(queued)
+                for (_, future), result in zip(queued, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            self._sending[shard] = False
+
+    async def _correlate_border_events(self, border_events: List[Tuple[str, int, ThreatEvent]]) -> List[Dict]:
+        """
+        Correlates border events against recent border events of other shards in adjacent cells.
+
+        Only border events are considered here; correlation inside a region is the
+        owning shard's job.
+        """
+        correlations = []
+        for cell, shard, event in border_events:
+            candidates = [other for other_shard, other in self._recent_border_events(cell)
+                          if other_shard != shard]
+            if candidates:
+                report = await self.threat_correlator.analyze_correlations([event] + candidates)
+                if report.get("correlation_groups"):
+                    correlations.append(report)
+            self._register_border_event(cell, shard, event)
+        return correlations
+
+    def _register_border_event(self, cell: str, shard: int, event: ThreatEvent) -> None:
+        """Records a border event, evicting the least recently used cell beyond `max_border_cells`."""
+        registry = self.border_registry
+        events = registry.get(cell)
+        if events is None:
+            events = registry[cell] = deque(maxlen=self.border_history)
+            if len(registry) > self.max_border_cells:
+                registry.popitem(last=False)
+        else:
+            registry.move_to_end(cell)
+        events.append((shard, event))
+
+    def _recent_border_events(self, cell: str) -> List[Tuple[int, ThreatEvent]]:
+        """Recent border events recorded in a cell and its neighbours."""
+        events = []
+        for nearby_cell in [cell] + geohash_neighbors(cell):
+            events.extend(self.border_registry.get(nearby_cell, ()))
+        return events
+
+    def get_system_status(self) -> Dict:
+        """
+        Returns the status of every shard plus the coordinator's border registry size.
+        """
+        statuses = [executor.submit(_shard_status) for executor in self._executors]
+        return {
+            "orchestrator_status": "operational",
+            "num_shards": self.num_shards,
+            "shards": [status.result() for status in statuses],
+            "border_cells_tracked": len(self.border_registry),
+        }
+
+    def shutdown(self) -> None:
+        """Stops all shard processes."""
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ShardedGuardianOrchestrator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+
+if __name__ == '__main__':
+    # Example Usage: a wildfire in Belo Horizonte and an attack in São Paulo.
+    sample_threats = [
+        ThreatEvent(event_id="FIRE-001", subsystem_source="saci", threat_type="wildfire", severity=0.8,
+                    location=(-19.9167, -43.9333), metadata={"wind_speed": 15, "humidity": 30}),
+        ThreatEvent(event_id="CYBER-001", subsystem_source="curupira", threat_type="coordinated_attack",
+                    severity=0.6, location=(-23.5505, -46.6333), metadata={"attack_vectors": ["ddos"]}),
+    ]
+
+    async def demo_sharding():
+        with ShardedGuardianOrchestrator(num_shards=2) as sharded:
+            response = await sharded.coordinate_multi_threat_response(sample_threats)
+            print(f"Shards used: {sorted(response['shard_plans'])}")
+            print(f"Cross-shard correlations: {response['cross_shard_correlations']}")
+            print(f"Coordination successful: {response['coordination_successful']}")
+
+    asyncio.run(demo_sharding())
@@ -0,0 +1,246 @@
+"""
+SACI Drift and Data-Quality Monitor.
+
+A model's P(fire) is only as good as the match between live inputs and its
+training data. A sensor that drifts (a fouled smoke sensor, a humidity probe in
+direct sun) silently shifts predictions without any error being raised. This
+module watches the live readings and reports such shifts through logging.
+
+- `build_training_profile` summarizes the training features as fixed histograms:
+  bin edges at training quantiles (plus open-ended outer bins) and the share of
+  training rows per bin. The profile is JSON-serializable and is stored on the
+  model itself (`training_profile_`), so it travels inside the model artifact.
+- `DriftMonitor.observe` adds a live reading to per-device, per-feature
+  histograms over the same bins: constant memory per (device, feature) and a
+  bisect per feature per reading. Every `window` readings of a device, the
+  window's histogram is compared with the training one using the population
+  stability index (PSI) and the Kolmogorov-Smirnov distance between the binned
+  CDFs, and a drift alert is logged if either crosses its threshold.
+- Data-quality checks run per reading: missing values, values outside the
+  sensor's physical range, and stuck sensors (the same value many readings in a row).
+  A missing or out-of-range value is alerted once when it starts for a (device,
+  feature), repeated only every `repeat_alert_every` readings while it persists,
+  and logged as cleared when a valid value arrives.
+"""
+# src/ml_models/drift_monitor.py
+
+# Standard library imports
+import logging
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+# Third-party imports
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_BINS = 10
+DEFAULT_WINDOW = 500              # Readings per device between drift checks
+DEFAULT_PSI_THRESHOLD = 0.25      # PSI > 0.25 is the conventional "significant shift"
+DEFAULT_KS_THRESHOLD = 0.2
+DEFAULT_STUCK_READINGS = 50       # Identical consecutive values before a sensor counts as stuck
+DEFAULT_REPEAT_ALERT_EVERY = 1000 # Readings between reminders of a persisting data-quality issue
+_PSI_FLOOR = 1e-4                 # Keeps empty bins from making PSI infinite
+
+# Physical ranges of the ESP32 sensors (DHT22 temperature/humidity, 12-bit smoke ADC).
+SENSOR_RANGES: Dict[str, Tuple[float, float]] = {
+    'temperature': (-40.0, 80.0),
+    'humidity': (0.0, 100.0),
+    'smoke_level': (0.0, 4095.0),
+}
+
+
+def build_training_profile(X: Any, n_bins: int = DEFAULT_PROFILE_BINS) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarizes training features as fixed-bin histograms for drift detection.
+
+    Args:
+        X: Training features (DataFrame); every column is profiled.
+        n_bins: Number of quantile bins per feature (ties may merge some).
+
+    Returns:
+        {feature: {'edges', 'proportions', 'count', 'mean', 'std'}}. `edges` are the
+        interior bin edges; the first and last bins are open-ended, so there are
+        len(edges) + 1 proportions.
+    """
+    profile = {}
+    for column in X.columns:
+        values = np.asarray(X[column], dtype=float)
+        values = values[~np.isnan(values)]
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])) if len(values) else np.array([])
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        profile[str(column)] = {
+            'edges': edges.tolist(),
+            'proportions': (counts / max(len(values), 1)).tolist(),
+            'count': int(len(values)),
+            'mean': float(values.mean()) if len(values) else None,
+            'std': float(values.std()) if len(values) else None,
+        }
+    return profile
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """PSI between two binned distributions (proportions over the same bins)."""
+    expected = np.maximum(np.asarray(expected, dtype=float), _PSI_FLOOR)
+    actual = np.maximum(np.asarray(actual, dtype=float), _PSI_FLOOR)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks_distance(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov distance between two binned distributions, evaluated at the bin edges."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+class _DeviceWindow:
+    """Live histograms and stuck-value tracking of one device."""
+    __slots__ = ('counts', 'readings', 'last_values', 'repeats')
+
+    def __init__(self, bins_per_feature: List[int]):
+        self.counts = [[0] * bins for bins in bins_per_feature]
+        self.readings = 0
+        self.last_values: List[Optional[float]] = [None] * len(bins_per_feature)
+        self.repeats = [0] * len(bins_per_feature)
+
+
+class DriftMonitor:
+    """
+    Streaming per-device drift and data-quality monitor for live sensor readings.
+    """
+    def __init__(self, training_profile: Mapping[str, Mapping[str, Any]],
+                 window: int = DEFAULT_WINDOW,
+                 psi_threshold: float = DEFAULT_PSI_THRESHOLD,
+                 ks_threshold: float = DEFAULT_KS_THRESHOLD,
+                 stuck_readings: int = DEFAULT_STUCK_READINGS,
+                 sensor_ranges: Optional[Mapping[str, Tuple[float, float]]] = None,
+                 max_alerts: int = 100,
+                 repeat_alert_every: int = DEFAULT_REPEAT_ALERT_EVERY):
+        """
+        Initializes the DriftMonitor.
+
+        Args:
+            training_profile: Output of `build_training_profile` (e.g., `model.training_profile_`).
+                              Features in it that are not raw readings (e.g., rolling
+                              features) are ignored.
+            window: Readings per device in each drift comparison.
+            psi_threshold: PSI above which a feature is reported as drifted.
+            ks_threshold: Binned KS distance above which a feature is reported as drifted.
+            stuck_readings: Identical consecutive values that flag a stuck sensor.
+            sensor_ranges: Valid (min, max) per feature; defaults to SENSOR_RANGES.
+            max_alerts: Recent alerts kept for `recent_alerts()`.
+            repeat_alert_every: Readings between repeated alerts of a missing or out-of-range
+                                value that persists on a (device, feature).
+        """
+        self.sensor_ranges = dict(sensor_ranges or SENSOR_RANGES)
+        self.features = [name for name in training_profile if name in self.sensor_ranges]
+        self._edges = [list(training_profile[name]['edges']) for name in self.features]
+        self._expected = [np.asarray(training_profile[name]['proportions']) for name in self.features]
+        self.window = window
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.stuck_readings = stuck_readings
+        self.repeat_alert_every = repeat_alert_every
+        self._devices: Dict[str, _DeviceWindow] = {}
+        # (kind, device, feature) of ongoing data-quality issues -> readings since they started
+        self._open_issues: Dict[Tuple[str, str, str], int] = {}
+        self._alerts: Deque[Dict[str, Any]] = deque(maxlen=max_alerts)
+        self.latest_scores: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.readings_observed = 0
+        self.quality_issues = 0
+
+    def observe(self, device_id: str, reading: Mapping[str, Optional[float]]) -> None:
+        """
+        Adds one live reading. Runs the data-quality checks and, every `window` readings
+        of the device, the drift comparison.
+
+        Args:
+            device_id: Device the reading came from.
+            reading: Feature values; None or NaN counts as missing.
+        """
+        state = self._devices.get(device_id)
+        if state is None:
+            state = _DeviceWindow([len(edges) + 1 for edges in self._edges])
+            self._devices[device_id] = state
+
+        for index, feature in enumerate(self.features):
+            value = reading.get(feature)
+            if value is None or value != value:  # value != value catches NaN
+                self._report_issue('missing_value', device_id, feature, f"missing {feature} reading")
+                continue
+            self._clear_issue('missing_value', device_id, feature)
+            low, high = self.sensor_ranges[feature]
+            if not low <= value <= high:
+                self._report_issue('out_of_range', device_id, feature,
+                                   f"{feature}={value} outside the sensor range [{low}, {high}]")
+            else:
+                self._clear_issue('out_of_range', device_id, feature)
+            if value == state.last_values[index]:
+                state.repeats[index] += 1
+                if state.repeats[index] == self.stuck_readings:
+                    self._alert('stuck_sensor', device_id, feature,
+                                f"{feature} stuck at {value} for {self.stuck_readings} readings")
+            else:
+                state.last_values[index], state.repeats[index] = value, 1
+            state.counts[index][bisect_right(self._edges[index], value)] += 1
+
+        state.readings += 1
+        self.readings_observed += 1
+        if state.readings >= self.window:
+            self._check_drift(device_id, state)
+
+    def _check_drift(self, device_id: str, state: _DeviceWindow) -> None:
+        """Compares the device's window with the training profile, then starts a new window."""
+        for index, feature in enumerate(self.features):
+            counts = np.asarray(state.counts[index], dtype=float)
+            total = counts.sum()
+            if total == 0:
+                continue
+            actual = counts / total
+            psi = population_stability_index(self._expected[index], actual)
+            ks = binned_ks_distance(self._expected[index], actual)
+            self.latest_scores[(device_id, feature)] = {'psi': psi, 'ks': ks, 'readings': int(total)}
+            if psi > self.psi_threshold or ks > self.ks_threshold:
+                self._alert('drift', device_id, feature,
+                            f"{feature} distribution drifted from training data "
+                            f"(PSI={psi:.3f}, KS={ks:.3f} over {int(total)} readings)",
+                            psi=psi, ks=ks)
+            state.counts[index] = [0] * len(state.counts[index])
+        state.readings = 0
+
+    def _report_issue(self, kind: str, device_id: str, feature: str, message: str) -> None:
+        """Alerts a per-reading issue when it starts and every `repeat_alert_every` readings after."""
+        key = (kind, device_id, feature)
+        readings = self._open_issues.get(key, 0) + 1
+        self._open_issues[key] = readings
+        if readings == 1:
+            self._alert(kind, device_id, feature, message)
+        elif (readings - 1) % self.repeat_alert_every == 0:
+            self._alert(kind, device_id, feature, f"{message} (ongoing for {readings} readings)")
+
+    def _clear_issue(self, kind: str, device_id: str, feature: str) -> None:
+        readings = self._open_issues.pop((kind, device_id, feature), None)
+        if readings is not None:
+            logger.info(f"Data quality [{device_id}]: {kind} on {feature} cleared after {readings} readings")
+
+    def _alert(self, kind: str, device_id: str, feature: str, message: str, **scores: float) -> None:
+        if kind != 'drift':
+            self.quality_issues += 1
+        self._alerts.append({'kind': kind, 'device_id': device_id, 'feature': feature, 'message': message, **scores})
+        logger.warning(f"{'Drift' if kind == 'drift' else 'Data quality'} alert [{device_id}]: {message}")
+
+    def recent_alerts(self) -> List[Dict[str, Any]]:
+        """Most recent alerts (up to `max_alerts`), oldest first."""
+        return list(self._alerts)
+
+    def status(self) -> Dict[str, Any]:
+        """Summary of the monitor: readings, devices, quality issues and latest drift scores."""
+        return {
+            'readings_observed': self.readings_observed,
+            'devices': len(self._devices),
+            'quality_issues': self.quality_issues,
+            'open_quality_issues': len(self._open_issues),
+            'drift_alerts': sum(1 for alert in self._alerts if alert['kind'] == 'drift'),
+            'latest_scores': {f"{device}/{feature}": scores
+                              for (device, feature), scores in self.latest_scores.items()},
+        }
@@ -0,0 +1,237 @@
+"""
+SACI Inference Backends.
+
+Scoring one reading through scikit-learn costs mostly Python-level overhead
+(input validation, DataFrame handling, per-estimator dispatch), which dominates
+for tree ensembles such as gradient boosting or random forests. This module puts
+the fire risk models behind a small backend interface so callers can run them
+either natively or through onnxruntime on CPU:
+
+- `SklearnBackend`: wraps a fitted scikit-learn compatible model.
+- `OnnxRuntimeBackend`: runs a model exported with `export_model_to_onnx`.
+
+Backends expose `predict`, `predict_proba`, `classes_` and `feature_names_in_`,
+so they can be passed anywhere a model is accepted, e.g. `predict_saci_fire_risk`
+or `predict_saci_fire_risk_batch` in saci_fire_predictor.
+
+ONNX support is optional: it needs `skl2onnx` (export) and `onnxruntime`
+(inference). xgboost models additionally need `onnxmltools`.
+"""
+# src/ml_models/inference_backend.py
+
+# Standard library imports
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Sequence
+
+# Third-party imports
+import numpy as np
+
+
+BACKEND_KINDS = ('sklearn', 'onnxruntime')
+
+
+def _as_float_matrix(X: Any, feature_names: Sequence[str]) -> np.ndarray:
+    """Returns X as a 2-D float32 array, with DataFrame columns put in `feature_names` order."""
+    if hasattr(X, 'columns'):
+        X = X[list(feature_names)]
+    return np.ascontiguousarray(np.asarray(X, dtype=np.float32).reshape(-1, len(feature_names)))
+
+
+def export_model_to_onnx(model: Any, output_path: str,
+                         feature_names: Optional[Sequence[str]] = None,
+                         target_opset: Optional[int] = None) -> str:
+    """
+    Converts a fitted classifier to an ONNX file that takes one float tensor of features.
+
+    The graph outputs the label and a plain [n_rows, n_classes] probability tensor
+    (no ZipMap), which is what OnnxRuntimeBackend expects.
+
+    Args:
+        model: Fitted scikit-learn compatible classifier (or Pipeline).
+        output_path: Where to write the .onnx file.
+        feature_names: Input feature order. Defaults to the model's `feature_names_in_`.
+        target_opset: ONNX opset to target; the converter's default if None.
+
+    Returns:
+        The output path.
+
+    Raises:
+        ImportError: If skl2onnx (or onnxmltools, for xgboost models) is not installed.
+        ValueError: If the feature order cannot be determined.
+    """
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    if feature_names is None:
+        if not hasattr(model, 'feature_names_in_'):
+            raise ValueError("Model has no feature_names_in_; pass feature_names explicitly.")
+        feature_names = [str(name) for name in model.feature_names_in_]
+    if 'xgboost' in type(model).__module__:
+        _register_xgboost_converter()
+
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[('input', FloatTensorType([None, len(feature_names)]))],
+        options={id(model): {'zipmap': False}},
+        target_opset=target_opset,
+    )
+    # Record the feature order so the backend can reorder DataFrame inputs.
+    entry = onnx_model.metadata_props.add()
+    entry.key, entry.value = 'feature_names', ','.join(feature_names)
+
+    dir_name = os.path.dirname(output_path)
+    if dir_name:
+        os.makedirs(dir_name, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"[INFO] Model exported to ONNX at '{output_path}'")
+    return output_path
+
+
+def _register_xgboost_converter() -> None:
+    """Registers onnxmltools' XGBClassifier converter with skl2onnx."""
+    from onnxmltools.convert.xgboost.operator_converters.XGBoost import convert_xgboost
+    from skl2onnx import update_registered_converter
+    from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+    from xgboost import XGBClassifier
+
+    update_registered_converter(
+        XGBClassifier, 'XGBoostXGBClassifier', calculate_linear_classifier_output_shapes,
+        convert_xgboost, options={'nocl': [True, False], 'zipmap': [True, False, 'columns']},
+    )
+
+
+class InferenceBackend(ABC):
+    """
+    Common interface of the inference backends. Subclasses implement `predict_proba`.
+
+    `input_dtype` is the dtype callers should build input arrays in, so the backend
+    does not have to convert them.
+    """
+    name = 'base'
+    input_dtype = np.float32
+
+    def __init__(self, feature_names: Sequence[str], classes: Sequence[Any]):
+        self.feature_names_in_ = np.asarray(list(feature_names), dtype=object)
+        self.classes_ = np.asarray(list(classes))
+
+    @abstractmethod
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Returns an [n_rows, n_classes] array of class probabilities."""
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Returns the most probable class of every row."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class SklearnBackend(InferenceBackend):
+    """
+    Runs a fitted scikit-learn compatible model in-process.
+    """
+    name = 'sklearn'
+    input_dtype = np.float64
+
+    def __init__(self, model: Any, feature_names: Optional[Sequence[str]] = None):
+        """
+        Args:
+            model: Fitted classifier with `predict_proba` and `classes_`.
+            feature_names: Input feature order. Defaults to the model's `feature_names_in_`.
+        """
+        if feature_names is None:
+            feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is None:
+            raise ValueError("Model has no feature_names_in_; pass feature_names explicitly.")
+        super().__init__(feature_names, model.classes_)
+        self.model = model
+        self._wants_frame = hasattr(model, 'feature_names_in_')
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        if self._wants_frame and not hasattr(X, 'columns'):
+            import pandas as pd
+            X = pd.DataFrame(np.asarray(X, dtype=float).reshape(-1, len(self.feature_names_in_)),
+                             columns=list(self.feature_names_in_))
+        return self.model.predict_proba(X)
+
+    def predict(self, X: Any) -> np.ndarray:
+        if self._wants_frame and not hasattr(X, 'columns'):
+            return super().predict(X)
+        return self.model.predict(X)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """
+    Runs an ONNX model (from `export_model_to_onnx`) with onnxruntime on CPU.
+
+    Inputs are cast to float32, as in the exported graph; probabilities can differ
+    from the native model in the last float32 digits.
+    """
+    name = 'onnxruntime'
+
+    def __init__(self, onnx_path: str, classes: Sequence[Any] = (0, 1),
+                 feature_names: Optional[Sequence[str]] = None, intra_op_threads: int = 1):
+        """
+        Args:
+            onnx_path: Path to the .onnx file.
+            classes: Class labels, in the order of the probability columns.
+            feature_names: Input feature order. Defaults to the order stored in the file.
+            intra_op_threads: onnxruntime threads per call; 1 is fastest for single readings.
+
+        Raises:
+            ImportError: If onnxruntime is not installed.
+            ValueError: If the feature order cannot be determined.
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+        if feature_names is None:
+            stored = self.session.get_modelmeta().custom_metadata_map.get('feature_names')
+            if not stored:
+                raise ValueError(f"'{onnx_path}' does not record its feature order; pass feature_names.")
+            feature_names = stored.split(',')
+        super().__init__(feature_names, classes)
+        self.onnx_path = onnx_path
+        self._input_name = self.session.get_inputs()[0].name
+        output_names = [output.name for output in self.session.get_outputs()]
+        self._probability_output = 'probabilities' if 'probabilities' in output_names else output_names[-1]
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        matrix = _as_float_matrix(X, list(self.feature_names_in_))
+        return self.session.run([self._probability_output], {self._input_name: matrix})[0]
+
+
+def create_backend(kind: str, model: Any = None, onnx_path: Optional[str] = None,
+                   feature_names: Optional[Sequence[str]] = None) -> InferenceBackend:
+    """
+    Builds an inference backend.
+
+    Args:
+        kind: 'sklearn' or 'onnxruntime'.
+        model: Fitted model. Required for 'sklearn'; for 'onnxruntime' it supplies the class
+               labels and, if `onnx_path` does not exist yet, is exported there first.
+        onnx_path: ONNX file for 'onnxruntime'.
+        feature_names: Input feature order, if the model does not record it.
+
+    Returns:
+        The backend.
+
+    Raises:
+        ValueError: If `kind` is unknown or required arguments are missing.
+    """
+    if kind == 'sklearn':
+        if model is None:
+            raise ValueError("The sklearn backend needs a fitted model.")
+        return SklearnBackend(model, feature_names)
+    if kind == 'onnxruntime':
+        if onnx_path is None:
+            raise ValueError("The onnxruntime backend needs an onnx_path.")
+        if not os.path.exists(onnx_path):
+            if model is None:
+                raise ValueError(f"ONNX file '{onnx_path}' not found and no model given to export.")
+            export_model_to_onnx(model, onnx_path, feature_names)
+        classes = model.classes_ if model is not None else (0, 1)
+        return OnnxRuntimeBackend(onnx_path, classes, feature_names)
+    raise ValueError(f"Unknown inference backend '{kind}'. Available: {', '.join(BACKEND_KINDS)}")
@@ -0,0 +1,358 @@
+"""
+SACI Lookup-Table Risk Model.
+
+For a model over three quantized sensor readings, P(fire) can be precomputed
+once on a grid over (temperature, humidity, smoke_level) and then scored by
+trilinear interpolation: a few array lookups per reading, no scikit-learn call,
+and a float32 table of a few MiB at most (`max_table_points`) regardless of the
+source model's size.
+
+- `compile_lookup_table` builds the grid adaptively (refined where P(fire)
+  changes fastest, snapped to the sensor resolution) until the interpolated
+  P(fire) stays within a bound of the model's at the verified points.
+- `LookupTableRiskModel` scores batches with NumPy and single readings in pure
+  Python (`predict_reading`), and saves to / loads from a NumPy .npz archive.
+- `lookup_table_report` compares a table with direct inference of its model
+  (memory, latency and error).
+
+`saci_fire_predictor` loads .npz tables in `load_model`, uses `predict_reading`
+in `predict_saci_fire_risk`, and exposes compilation as the `compile-lut` command.
+"""
+# src/ml_models/lookup_table_model.py
+
+# Postponed evaluation keeps pandas names in annotations from being resolved at import time.
+from __future__ import annotations
+
+# Standard library imports
+import os
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Iterable
+
+# Third-party imports
+import numpy as np
+
+# Local imports; the fallback covers running the predictor's directory as scripts.
+try:
+    from .drift_monitor import SENSOR_RANGES
+    from .saci_fire_predictor import FEATURE_COLUMNS, predict_saci_fire_risk, predict_saci_fire_risk_batch
+except ImportError:
+    from drift_monitor import SENSOR_RANGES
+    from saci_fire_predictor import FEATURE_COLUMNS, predict_saci_fire_risk, predict_saci_fire_risk_batch
+
+if TYPE_CHECKING:  # Only evaluated by static type checkers
+    import pandas as pd
+
+
+# Resolution of the live readings (ESP32 reports 0.1 °C / 0.1 % and integer smoke ADC values).
+SENSOR_RESOLUTION = {'temperature': 0.1, 'humidity': 0.1, 'smoke_level': 1.0}
+
+
+class LookupTableRiskModel:
+    """
+    P(fire) precomputed on a 3-D grid over (temperature, humidity, smoke_level) and
+    scored by trilinear interpolation; built by `compile_lookup_table`.
+
+    Grid axes are non-uniform (refined where P(fire) changes fastest). Readings outside
+    the grid bounds are clipped to them. Exposes `predict`, `predict_proba`, `classes_`
+    and `feature_names_in_` like the model it was compiled from, plus `predict_reading`
+    for single readings without building a DataFrame.
+    """
+    def __init__(self, axes: list[np.ndarray], table: np.ndarray, classes: Iterable = (0, 1),
+                 max_error: float | None = None, training_profile: dict | None = None):
+        self.axes = [np.asarray(nodes, dtype=float) for nodes in axes]
+        self.table = np.ascontiguousarray(table, dtype=np.float32)
+        self.classes_ = np.asarray(list(classes))
+        self.feature_names_in_ = np.asarray(FEATURE_COLUMNS, dtype=object)
+        self.max_error_ = max_error  # Largest |P(fire) error| measured at compile time
+        if training_profile:
+            self.training_profile_ = training_profile
+        self._build_reading_views()
+
+    def _build_reading_views(self) -> None:
+        """Scalar-friendly views used by `predict_reading`."""
+        self._axis_lists = [nodes.tolist() for nodes in self.axes]  # bisect is faster on lists for scalars
+        # A flat view of the table, not a copy: indexing it yields Python floats as fast as
+        # a list would, without a list's 32 bytes per entry.
+        self._flat_table = memoryview(self.table).cast('B').cast('f')
+        self._strides = (self.table.shape[1] * self.table.shape[2], self.table.shape[2])
+
+    def __getstate__(self) -> dict:
+        # Memoryviews cannot be pickled (joblib / ModelRegistry); they are rebuilt on load.
+        return {name: value for name, value in self.__dict__.items()
+                if name not in ('_axis_lists', '_flat_table', '_strides')}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._build_reading_views()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the table and its axes."""
+        return self.table.nbytes + sum(nodes.nbytes for nodes in self.axes)
+
+    def fire_probability(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """Interpolated P(fire) for an [n_rows, 3] array or DataFrame with FEATURE_COLUMNS."""
+        import pandas as pd
+
+        if isinstance(X, pd.DataFrame):
+            X = X[FEATURE_COLUMNS]
+        points = np.asarray(X, dtype=float).reshape(-1, len(FEATURE_COLUMNS))
+        indices, weights = [], []
+        for axis, nodes in enumerate(self.axes):
+            values = np.clip(points[:, axis], nodes[0], nodes[-1])
+            index = np.clip(np.searchsorted(nodes, values, side='right') - 1, 0, len(nodes) - 2)
+            indices.append(index)
+            weights.append((values - nodes[index]) / (nodes[index + 1] - nodes[index]))
+        (i, j, k), (u, v, w) = indices, weights
+        t = self.table
+        c00 = t[i, j, k] * (1 - w) + t[i, j, k + 1] * w
+        c01 = t[i, j + 1, k] * (1 - w) + t[i, j + 1, k + 1] * w
+        c10 = t[i + 1, j, k] * (1 - w) + t[i + 1, j, k + 1] * w
+        c11 = t[i + 1, j + 1, k] * (1 - w) + t[i + 1, j + 1, k + 1] * w
+        return (c00 * (1 - v) + c01 * v) * (1 - u) + (c10 * (1 - v) + c11 * v) * u
+
+    def predict_proba(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """Returns [P(no fire), P(fire)] for every row."""
+        fire = self.fire_probability(X)
+        return np.column_stack([1.0 - fire, fire])
+
+    def predict(self, X: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """Returns the most probable class of every row."""
+        return self.classes_[(self.fire_probability(X) > 0.5).astype(int)]
+
+    def predict_reading(self, temperature: float, humidity: float, smoke: float) -> tuple[int, np.ndarray]:
+        """Scores one reading in pure Python; returns (label, [P(no fire), P(fire)])."""
+        offsets, weights = [], []
+        for nodes, value in zip(self._axis_lists, (temperature, humidity, smoke)):
+            value = min(max(float(value), nodes[0]), nodes[-1])
+            index = min(max(bisect_right(nodes, value) - 1, 0), len(nodes) - 2)
+            offsets.append(index)
+            weights.append((value - nodes[index]) / (nodes[index + 1] - nodes[index]))
+        (u, v, w), (s0, s1), t = weights, self._strides, self._flat_table
+        base = offsets[0] * s0 + offsets[1] * s1 + offsets[2]
+        fire = 0.0
+        for di, wi in ((0, 1 - u), (s0, u)):
+            for dj, wj in ((0, 1 - v), (s1, v)):
+                corner = base + di + dj
+                fire += wi * wj * (t[corner] * (1 - w) + t[corner + 1] * w)
+        return int(self.classes_[int(fire > 0.5)]), np.array([1.0 - fire, fire])
+
+    def save(self, file_path: str) -> None:
+        """Saves the table as a NumPy .npz archive (no pickling, loads without this module's classes)."""
+        import json
+
+        dir_name = os.path.dirname(file_path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        np.savez(file_path, table=self.table, classes=self.classes_,
+                 **{f'axis_{axis}': nodes for axis, nodes in enumerate(self.axes)},
+                 max_error=np.nan if self.max_error_ is None else self.max_error_,
+                 training_profile=json.dumps(getattr(self, 'training_profile_', None)))
+        print(f"[INFO] Lookup table ({self.table.shape}, {self.nbytes / 1024:.1f} KiB) saved to '{file_path}'")
+
+    @classmethod
+    def load(cls, file_path: str) -> LookupTableRiskModel:
+        """Loads a table saved by `save`."""
+        import json
+
+        with np.load(file_path, allow_pickle=False) as archive:
+            max_error = float(archive['max_error'])
+            return cls([archive[f'axis_{axis}'] for axis in range(len(FEATURE_COLUMNS))],
+                       archive['table'], archive['classes'],
+                       max_error=None if np.isnan(max_error) else max_error,
+                       training_profile=json.loads(str(archive['training_profile'])))
+
+
+def _fire_probability_on_grid(model: any, axes: list[np.ndarray], batch_rows: int = 250_000) -> np.ndarray:
+    """P(fire) of `model` at every node of the grid spanned by `axes`, shaped like the grid."""
+    import pandas as pd
+
+    mesh = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(axes))
+    fire = np.empty(len(mesh))
+    for start in range(0, len(mesh), batch_rows):
+        _, probabilities = predict_saci_fire_risk_batch(
+            model, pd.DataFrame(mesh[start:start + batch_rows], columns=FEATURE_COLUMNS))
+        fire[start:start + batch_rows] = probabilities[:, 1]
+    return fire.reshape([len(nodes) for nodes in axes])
+
+
+def _snap(values: np.ndarray, resolution: float | np.ndarray) -> np.ndarray:
+    """Rounds values to multiples of `resolution`, landing on the same floats as parsed readings (e.g. 39.8)."""
+    return np.round(np.round(values / resolution) * resolution, 6)
+
+
+def _split_intervals(nodes: np.ndarray, split: np.ndarray, resolution: float) -> np.ndarray:
+    """Inserts the (resolution-snapped) midpoints of the flagged intervals into `nodes`."""
+    midpoints = _snap((nodes[:-1][split] + nodes[1:][split]) / 2, resolution)
+    return np.unique(np.concatenate([nodes, midpoints]))
+
+
+def compile_lookup_table(model: any,
+                         bounds: dict[str, tuple[float, float]] | None = None,
+                         max_error: float = 0.01,
+                         initial_points: int = 9,
+                         max_table_points: int = 2_000_000,
+                         n_check: int = 20_000,
+                         resolution: dict[str, float] | None = None,
+                         check_data: pd.DataFrame | None = None,
+                         random_state: int = 42) -> LookupTableRiskModel:
+    """
+    Compiles a trained model into a LookupTableRiskModel whose P(fire) stays within
+    `max_error` of the model's at readings within the bounds (at sensor resolution).
+
+    The grid starts at `initial_points` uniform nodes per axis and is refined adaptively:
+    each pass evaluates the model at the midpoints of every grid interval along each axis
+    and splits the intervals whose linear interpolation misses by more than a third of
+    `max_error` (leaving room for the three axes' errors to add up). Once no interval
+    needs splitting, the table is verified at `n_check` random points, all cell centres
+    and `check_data`; intervals around points still over the bound are split and the
+    passes continue. The bound is thus guaranteed at the verified points, not proven for
+    every input. Nodes are snapped to the sensor resolution (SENSOR_RESOLUTION), so an
+    interval one sensor step wide is exact for real readings and never split further.
+    Models with step-shaped outputs (tree ensembles) may need more nodes than
+    `max_table_points`; compilation then stops with a warning.
+
+    Args:
+        model: Fitted binary classifier over FEATURE_COLUMNS (no rolling features).
+        bounds: (min, max) per feature; defaults to the sensors' physical ranges.
+        max_error: Bound on |P(fire) difference| from the model.
+        initial_points: Uniform nodes per axis before refinement.
+        max_table_points: Largest grid allowed. If refinement would exceed it, compilation
+                          stops with a warning and the table's measured error is reported.
+        n_check: Random points used to verify the bound.
+        resolution: Node snapping step per feature; defaults to SENSOR_RESOLUTION.
+        check_data: Real readings (e.g., the training features) verified in addition to the
+                    random points; they catch narrow regions random points can miss.
+        random_state: Seed for the verification points.
+
+    Returns:
+        The compiled LookupTableRiskModel; `max_error_` holds the largest error measured.
+
+    Raises:
+        ValueError: If the model is not a binary classifier over exactly FEATURE_COLUMNS.
+    """
+    feature_names = list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS))
+    if feature_names != FEATURE_COLUMNS or len(getattr(model, 'classes_', ())) != 2:
+        raise ValueError(f"Lookup tables need a binary classifier over {FEATURE_COLUMNS}; "
+                         f"got features {feature_names}.")
+    bounds = {**SENSOR_RANGES, **(bounds or {})}
+    resolutions = [{**SENSOR_RESOLUTION, **(resolution or {})}[name] for name in FEATURE_COLUMNS]
+    axes = [np.unique(_snap(np.linspace(*bounds[name], initial_points), step))
+            for name, step in zip(FEATURE_COLUMNS, resolutions)]
+    rng = np.random.default_rng(random_state)
+    lows, highs = np.array([bounds[name] for name in FEATURE_COLUMNS], dtype=float).T
+    # Live readings are quantized, so the bound is checked at quantized points.
+    check_points = _snap(rng.uniform(lows, highs, size=(n_check, len(FEATURE_COLUMNS))), np.array(resolutions))
+    if check_data is not None:
+        check_points = np.vstack([check_points, np.clip(np.asarray(check_data[FEATURE_COLUMNS], dtype=float),
+                                                        lows, highs)])
+    true_check = predict_saci_fire_risk_batch(model, check_points)[1][:, 1]
+
+    passes = 0
+    while True:
+        passes += 1
+        table = _fire_probability_on_grid(model, axes)
+        splits = []
+        for axis, nodes in enumerate(axes):
+            # Model vs interpolation at the interval midpoints along this axis, other axes on nodes.
+            midpoints = (nodes[:-1] + nodes[1:]) / 2
+            true_mid = _fire_probability_on_grid(model, axes[:axis] + [midpoints] + axes[axis + 1:])
+            lower, upper = np.delete(table, -1, axis=axis), np.delete(table, 0, axis=axis)
+            error = np.abs(true_mid - (lower + upper) / 2)
+            other_axes = tuple(a for a in range(len(axes)) if a != axis)
+            splits.append((error.max(axis=other_axes) > max_error / 3) & (np.diff(nodes) > resolutions[axis] * 1.5))
+
+        lut = LookupTableRiskModel(axes, table, model.classes_, training_profile=getattr(model, 'training_profile_', None))
+        if not any(split.any() for split in splits):
+            # Verify at random points and cell centres; split the intervals around any misses.
+            centre_axes = [_snap((nodes[:-1] + nodes[1:]) / 2, step)
+                           for nodes, step in zip(axes, resolutions)]
+            centres = np.stack(np.meshgrid(*centre_axes, indexing='ij'), axis=-1).reshape(-1, len(axes))
+            verify = np.vstack([check_points, centres])
+            true_verify = np.concatenate([true_check, _fire_probability_on_grid(model, centre_axes).ravel()])
+            error = np.abs(lut.fire_probability(verify) - true_verify)
+            lut.max_error_ = float(error.max())
+            misses = verify[error > max_error]
+            if not len(misses):
+                break
+            for axis, nodes in enumerate(axes):
+                index = np.clip(np.searchsorted(nodes, misses[:, axis], side='right') - 1, 0, len(nodes) - 2)
+                split = np.zeros(len(nodes) - 1, dtype=bool)
+                split[index] = True
+                splits[axis] = split & (np.diff(nodes) > resolutions[axis] * 1.5)
+            if not any(split.any() for split in splits):
+                print(f"[WARN] Lookup table error {lut.max_error_:.4f} exceeds {max_error} at sensor resolution.")
+                break
+
+        refined = [_split_intervals(nodes, split, step) for nodes, split, step in zip(axes, splits, resolutions)]
+        if np.prod([len(nodes) for nodes in refined]) > max_table_points:
+            if lut.max_error_ is None:
+                lut.max_error_ = float(np.abs(lut.fire_probability(check_points) - true_check).max())
+            print(f"[WARN] Lookup table refinement stopped at {table.shape} ({table.size} points, cap "
+                  f"{max_table_points}); measured max error {lut.max_error_:.4f} vs bound {max_error}.")
+            break
+        axes = refined
+
+    print(f"[INFO] Compiled lookup table {lut.table.shape} in {passes} refinement passes; "
+          f"max |P(fire) error| {lut.max_error_:.4f} (bound {max_error}).")
+    return lut
+
+
+def lookup_table_report(lut: LookupTableRiskModel,
+                        model: any,
+                        X: pd.DataFrame,
+                        single_calls: int = 200) -> dict[str, float]:
+    """
+    Compares a compiled lookup table with direct inference of its source model.
+
+    Args:
+        lut: Table compiled from `model`.
+        model: The source model.
+        X: Readings to compare on (e.g., a test set or random points within the bounds).
+        single_calls: Single-reading predictions timed through predict_saci_fire_risk.
+
+    Returns:
+        Memory (bytes), latency (seconds per row: batch and single reading) and accuracy
+        (max/mean |P(fire)| difference and label agreement) of both.
+    """
+    import pickle
+    import time
+
+    def best_time(call, repeats=3):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            call()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    X = X[FEATURE_COLUMNS]
+    readings = X.to_numpy()[:single_calls]
+    model_labels, model_proba = predict_saci_fire_risk_batch(model, X)
+    lut_labels, lut_proba = predict_saci_fire_risk_batch(lut, X)
+    difference = np.abs(model_proba[:, 1] - lut_proba[:, 1])
+    return {
+        'model_bytes': len(pickle.dumps(model)),
+        'lut_bytes': lut.nbytes,
+        'lut_shape': list(lut.table.shape),
+        'model_batch_s_per_row': best_time(lambda: model.predict_proba(X)) / len(X),
+        'lut_batch_s_per_row': best_time(lambda: lut.predict_proba(X)) / len(X),
+        'model_single_s': best_time(lambda: [predict_saci_fire_risk(model, *row) for row in readings]) / len(readings),
+        'lut_single_s': best_time(lambda: [predict_saci_fire_risk(lut, *row) for row in readings]) / len(readings),
+        'max_abs_error': float(difference.max()),
+        'mean_abs_error': float(difference.mean()),
+        'label_agreement': float(np.mean(model_labels == lut_labels)),
+    }
+
+
+def print_lookup_table_report(report: dict[str, float]) -> None:
+    """Prints a lookup_table_report as a model vs table comparison."""
+    print("\n--- Lookup Table vs Direct Inference ---")
+    print(f"  Table grid: {' x '.join(str(n) for n in report['lut_shape'])}")
+    print(f"  {'':<22} {'Model':>14} {'Lookup table':>14}")
+    print(f"  {'Memory (KiB)':<22} {report['model_bytes'] / 1024:>14.1f} {report['lut_bytes'] / 1024:>14.1f}")
+    print(f"  {'Batch (us/row)':<22} {report['model_batch_s_per_row'] * 1e6:>14.3f} "
+          f"{report['lut_batch_s_per_row'] * 1e6:>14.3f}")
+    print(f"  {'Single reading (us)':<22} {report['model_single_s'] * 1e6:>14.1f} {report['lut_single_s'] * 1e6:>14.1f}")
+    print(f"  Max |P(fire) error|: {report['max_abs_error']:.5f}  Mean: {report['mean_abs_error']:.5f}  "
+          f"Label agreement: {report['label_agreement']:.4%}")
@@ -0,0 +1,363 @@
+"""
+SACI Model Registry.
+
+A versioned directory of trained model artifacts, so applications can pick up a
+retrained model without a restart and several processes can share one copy of
+the model's arrays.
+
+Layout:
+    <registry_dir>/
+        v0001/model.joblib      Uncompressed joblib dump (required for memory mapping)
+        v0001/manifest.json     Version, feature order, metrics, SHA-256 of model.joblib, ...
+        v0001/<attachments>     Optional files stored with the model (e.g., evaluation reports)
+        v0002/...
+        CURRENT                 Name of the active version (replaced atomically)
+
+Versions are immutable once published: a new version is written to a temporary
+directory and renamed into place, then CURRENT is switched with `os.replace`.
+Version numbers are claimed with an exclusively created `.vNNNN.reserved` marker,
+so concurrent publishers never pick the same number.
+
+Models are loaded with joblib's `mmap_mode`, so large numpy arrays inside the
+model (e.g., forest node arrays, wide coefficient matrices) are mapped from the
+page cache instead of copied into every process that loads them.
+
+`HotSwappableModel` holds the active (model, manifest) pair for an application
+and replaces it when CURRENT changes. The swap is a single reference assignment,
+so a caller that fetched the model for a reading or batch keeps using that model
+for the whole of it, and the next reading uses the new one; nothing is dropped.
+"""
+# src/ml_models/model_registry.py
+
+# Standard library imports
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+MODEL_FILENAME = 'model.joblib'
+MANIFEST_FILENAME = 'manifest.json'
+CURRENT_POINTER_FILENAME = 'CURRENT'
+DEFAULT_REGISTRY_DIR = os.path.join('models', 'registry')
+
+_VERSION_PATTERN = re.compile(r'^v(\d{4,})$')
+_RESERVATION_PATTERN = re.compile(r'^\.v(\d{4,})\.reserved$')
+
+
+def file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    """Returns the hex SHA-256 digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Publishes, lists and loads versioned model artifacts in a registry directory.
+    """
+    def __init__(self, registry_dir: str = DEFAULT_REGISTRY_DIR):
+        """
+        Initializes the ModelRegistry.
+
+        Args:
+            registry_dir: Root directory of the registry. Created if missing.
+        """
+        self.registry_dir = registry_dir
+        self.current_pointer_path = os.path.join(registry_dir, CURRENT_POINTER_FILENAME)
+        os.makedirs(registry_dir, exist_ok=True)
+
+    # --- Publishing ---
+    def publish(self, model: Any,
+                metrics: Optional[Dict[str, float]] = None,
+                feature_order: Optional[List[str]] = None,
+                extra: Optional[Dict[str, Any]] = None,
+                attachments: Optional[List[str]] = None,
+                activate: bool = True) -> Dict[str, Any]:
+        """
+        Stores a model as a new registry version.
+
+        Args:
+            model: Trained model to store.
+            metrics: Evaluation metrics to record (e.g., {'accuracy': 0.93, 'f1': 0.91}).
+            feature_order: Input feature names, in order. Defaults to the model's
+                           `feature_names_in_` when it has one.
+            extra: Additional JSON-serializable manifest fields (e.g., training data path).
+            attachments: Files to store in the version directory next to the model (e.g.,
+                         evaluation reports); listed with their hashes under 'artifacts'.
+            activate: If True, the new version becomes the current one.
+
+        Returns:
+            The manifest of the new version.
+        """
+        import joblib
+
+        if feature_order is None and hasattr(model, 'feature_names_in_'):
+            feature_order = [str(name) for name in model.feature_names_in_]
+
+        version = self._reserve_version()
+        temp_dir = os.path.join(self.registry_dir, f".{version}.tmp")
+        os.makedirs(temp_dir)
+        model_path = os.path.join(temp_dir, MODEL_FILENAME)
+        joblib.dump(model, model_path)  # No compression: compressed dumps cannot be memory mapped
+        artifacts = {}
+        for attachment in attachments or []:
+            name = os.path.basename(attachment)
+            if name in (MODEL_FILENAME, MANIFEST_FILENAME):
+                raise ValueError(f"Attachment name '{name}' is reserved.")
+            shutil.copyfile(attachment, os.path.join(temp_dir, name))
+            artifacts[name] = file_sha256(attachment)
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'model_class': f"{type(model).__module__}.{type(model).__name__}",
+            'model_file': MODEL_FILENAME,
+            'sha256': file_sha256(model_path),
+            'size_bytes': os.path.getsize(model_path),
+            'feature_order': list(feature_order) if feature_order is not None else None,
+            'metrics': {name: float(value) for name, value in (metrics or {}).items()},
+            'artifacts': artifacts,
+        }
+        manifest.update(extra or {})
+        with open(os.path.join(temp_dir, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(temp_dir, os.path.join(self.registry_dir, version))
+        os.remove(self._reservation_path(version))
+        print(f"[INFO] Model registry: published version {version} to '{self.registry_dir}'.")
+
+        if activate:
+            self.activate(version)
+        return manifest
+
+    def activate(self, version: str) -> None:
+        """
+        Makes `version` the current version (atomically replaces the CURRENT pointer).
+
+        Raises:
+            FileNotFoundError: If the version does not exist.
+        """
+        if not os.path.isfile(os.path.join(self.registry_dir, version, MANIFEST_FILENAME)):
+            raise FileNotFoundError(f"Model version '{version}' not found in registry '{self.registry_dir}'.")
+        temp_path = f"{self.current_pointer_path}.{os.getpid()}.{threading.get_ident()}.tmp"  # One per publisher
+        with open(temp_path, 'w') as f:
+            f.write(version + '\n')
+        os.replace(temp_path, self.current_pointer_path)
+        print(f"[INFO] Model registry: version {version} is now current.")
+
+    # --- Lookup ---
+    def list_versions(self) -> List[str]:
+        """Returns all published versions, oldest first."""
+        versions = [name for name in os.listdir(self.registry_dir) if _VERSION_PATTERN.match(name)]
+        return sorted(versions, key=lambda name: int(name[1:]))
+
+    def current_version(self) -> Optional[str]:
+        """Returns the current version, the latest one if no CURRENT pointer exists, or None if empty."""
+        try:
+            with open(self.current_pointer_path) as f:
+                version = f.read().strip()
+            if version:
+                return version
+        except FileNotFoundError:
+            pass
+        versions = self.list_versions()
+        return versions[-1] if versions else None
+
+    def artifact_path(self, name: str, version: Optional[str] = None) -> str:
+        """
+        Returns the path of a file attached to a version (the current one by default).
+
+        Raises:
+            FileNotFoundError: If the version has no such attachment.
+        """
+        manifest = self.get_manifest(version)
+        if name not in manifest.get('artifacts', {}):
+            raise FileNotFoundError(f"Version {manifest['version']} has no attachment '{name}'.")
+        return os.path.join(self.registry_dir, manifest['version'], name)
+
+    def get_manifest(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Reads the manifest of a version (the current one by default).
+
+        Raises:
+            FileNotFoundError: If the registry is empty or the version does not exist.
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(f"Model registry '{self.registry_dir}' has no published versions.")
+        with open(os.path.join(self.registry_dir, version, MANIFEST_FILENAME)) as f:
+            return json.load(f)
+
+    def load(self, version: Optional[str] = None,
+             mmap_mode: Optional[str] = 'r',
+             verify: bool = True) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Loads a model version (the current one by default).
+
+        Args:
+            version: Version to load, e.g. 'v0003'.
+            mmap_mode: joblib memory-map mode for the model's numpy arrays ('r' shares
+                       read-only pages between processes); None loads them into memory.
+            verify: If True, the model file's SHA-256 is checked against the manifest.
+
+        Returns:
+            A tuple of (model, manifest).
+
+        Raises:
+            FileNotFoundError: If the registry is empty or the version does not exist.
+            ValueError: If the model file does not match the manifest hash.
+        """
+        import joblib
+
+        manifest = self.get_manifest(version)
+        model_path = os.path.join(self.registry_dir, manifest['version'], manifest['model_file'])
+        if verify and file_sha256(model_path) != manifest['sha256']:
+            raise ValueError(f"Model file '{model_path}' does not match its manifest hash; refusing to load it.")
+        model = joblib.load(model_path, mmap_mode=mmap_mode)
+        print(f"[INFO] Model registry: loaded version {manifest['version']} ({manifest['model_class']}).")
+        return model, manifest
+
+    def _reserve_version(self) -> str:
+        """Claims the next version number by exclusively creating its reservation marker."""
+        while True:
+            version = self._next_version()
+            try:
+                os.close(os.open(self._reservation_path(version), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                continue  # Another publisher claimed it first
+            # A publisher removes its marker only after renaming its version into place, so
+            # a listing taken meanwhile can miss both; the version directory tells.
+            if not os.path.exists(os.path.join(self.registry_dir, version)):
+                return version
+            os.remove(self._reservation_path(version))
+
+    def _next_version(self) -> str:
+        """One past the highest published or reserved version number."""
+        numbers = [int(match.group(1)) for match in
+                   map(lambda name: _VERSION_PATTERN.match(name) or _RESERVATION_PATTERN.match(name),
+                       os.listdir(self.registry_dir)) if match]
+        return f"v{max(numbers, default=0) + 1:04d}"
+
+    def _reservation_path(self, version: str) -> str:
+        return os.path.join(self.registry_dir, f".{version}.reserved")
+
+
+class HotSwappableModel:
+    """
+    The active model of a registry, replaced in place when the registry's current version changes.
+
+    Callers fetch `model` (or `get()` for the model with its manifest) once per reading or
+    batch and use that reference throughout; swaps only affect later fetches.
+    """
+    def __init__(self, registry: ModelRegistry,
+                 mmap_mode: Optional[str] = 'r',
+                 poll_interval: float = 2.0):
+        """
+        Initializes the HotSwappableModel and loads the registry's current version.
+
+        Args:
+            registry: Registry to serve models from.
+            mmap_mode: Passed to `ModelRegistry.load`.
+            poll_interval: Seconds between checks of the CURRENT pointer when watching.
+
+        Raises:
+            FileNotFoundError: If the registry has no published versions.
+        """
+        self.registry = registry
+        self.mmap_mode = mmap_mode
+        self.poll_interval = poll_interval
+        self._active: Tuple[Any, Dict[str, Any]] = registry.load(mmap_mode=mmap_mode)
+        self._swap_listeners: List[Callable[[Dict[str, Any], Dict[str, Any]], None]] = []
+        self._pointer_stamp = self._read_pointer_stamp()
+        self._update_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def model(self) -> Any:
+        """The active model."""
+        return self._active[0]
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        """The manifest of the active model."""
+        return self._active[1]
+
+    @property
+    def version(self) -> str:
+        return self._active[1]['version']
+
+    def get(self) -> Tuple[Any, Dict[str, Any]]:
+        """Returns the active (model, manifest) pair as one consistent snapshot."""
+        return self._active
+
+    def add_swap_listener(self, callback: Callable[[Dict[str, Any], Dict[str, Any]], None]) -> None:
+        """Registers `callback(old_manifest, new_manifest)`, called after every swap."""
+        self._swap_listeners.append(callback)
+
+    def check_for_update(self) -> bool:
+        """
+        Swaps in the registry's current version if it changed since the last check.
+
+        The new model is fully loaded (and hash-verified) before the swap, so a failed
+        load leaves the active model in place; the change is then retried on the next check.
+
+        Returns:
+            True if a new model was swapped in.
+        """
+        with self._update_lock:
+            stamp = self._read_pointer_stamp()
+            if stamp == self._pointer_stamp:
+                return False
+            new_version = self.registry.current_version()
+            if new_version is None or new_version == self.version:
+                self._pointer_stamp = stamp
+                return False
+            try:
+                new_model, new_manifest = self.registry.load(new_version, mmap_mode=self.mmap_mode)
+            except Exception as e:
+                print(f"[ERROR] Model hot-swap to version {new_version} failed; keeping {self.version}: {e}")
+                return False
+            old_manifest = self.manifest
+            self._active = (new_model, new_manifest)  # Single reference assignment: atomic for readers
+            self._pointer_stamp = stamp
+        print(f"[INFO] Model hot-swap: {old_manifest['version']} -> {new_manifest['version']}.")
+        for callback in self._swap_listeners:
+            try:
+                callback(old_manifest, new_manifest)
+            except Exception as e:
+                print(f"[ERROR] Model swap listener {callback!r} failed: {e}")
+        return True
+
+    def start_watching(self) -> None:
+        """Starts a daemon thread that calls `check_for_update` every `poll_interval` seconds."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stops the watcher thread, if running."""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1.0)
+            self._watcher = None
+
+    def _watch_loop(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            self.check_for_update()
+
+    def _read_pointer_stamp(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, inode) of the CURRENT pointer; os.replace gives it a new inode on every switch."""
+        try:
+            stat = os.stat(self.registry.current_pointer_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino
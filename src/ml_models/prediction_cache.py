@@ -0,0 +1,152 @@
+"""
+SACI Prediction Cache.
+
+A quiet sensor node reports nearly the same values reading after reading:
+temperature at 0.1 °C resolution and smoke as an integer ADC value, so exact
+repeats of (temperature, humidity, smoke) are common. `PredictionCache` is an
+LRU cache in front of `predict_saci_fire_risk` keyed on that tuple, optionally
+after quantizing each value to a coarser step.
+
+With quantization, the model is evaluated on the quantized reading (the centre
+of its bin), so a cached result does not depend on which reading filled the bin.
+
+Entries belong to one model: the cache empties itself when called with a
+different model object, and `on_model_swap` can be registered as a
+HotSwappableModel swap listener. Predictions that depend on reading history
+(models with rolling features) are never cached.
+
+`stats()` reports hits, misses and the hit rate, i.e. how much inference the
+cache saves.
+"""
+# src/ml_models/prediction_cache.py
+
+# Standard library imports
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# Third-party imports
+import numpy as np
+
+# Local imports; the fallback covers running the predictor's directory as scripts.
+try:
+    from .saci_fire_predictor import predict_saci_fire_risk
+except ImportError:
+    from saci_fire_predictor import predict_saci_fire_risk
+
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class PredictionCache:
+    """
+    LRU cache of fire risk predictions keyed on (optionally quantized) sensor readings.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 quantization: Optional[Sequence[float]] = None):
+        """
+        Initializes the PredictionCache.
+
+        Args:
+            max_entries: Maximum cached readings; the least recently used is evicted beyond it.
+            quantization: Optional (temperature, humidity, smoke) step sizes, e.g. (0.5, 1.0, 10).
+                          None caches on exact values. A step of 0 leaves that value exact.
+
+        Raises:
+            ValueError: If max_entries < 1, or quantization is not three non-negative steps.
+        """
+        if max_entries < 1:
+            raise ValueError("PredictionCache needs max_entries >= 1.")
+        if quantization is not None and (len(quantization) != 3 or any(step < 0 for step in quantization)):
+            raise ValueError("quantization must be three non-negative steps (temperature, humidity, smoke).")
+        self.max_entries = max_entries
+        self.quantization = tuple(float(step) for step in quantization) if quantization is not None else None
+        self._entries: "OrderedDict[Tuple[float, float, float], Tuple[int, np.ndarray]]" = OrderedDict()
+        self._model_ref: Any = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def quantize(self, temperature: float, humidity: float, smoke: float) -> Tuple[float, float, float]:
+        """Returns the cache key (and model input) for a reading."""
+        values = (float(temperature), float(humidity), float(smoke))
+        if self.quantization is None:
+            return values
+        return tuple(round(round(value / step) * step, 6) if step else value
+                     for value, step in zip(values, self.quantization))
+
+    def predict(self, model: Any, temperature: float, humidity: float, smoke: float,
+                feature_engine: Any = None, device_id: str = 'default') -> Tuple[int, np.ndarray]:
+        """
+        Returns `predict_saci_fire_risk(model, ...)`, served from the cache when possible.
+
+        Args:
+            model: Fitted model or inference backend. A different object than on the
+                   previous call invalidates the cache first.
+            temperature: Temperature reading.
+            humidity: Humidity reading.
+            smoke: Smoke ADC reading.
+            feature_engine: Rolling feature engine of history-dependent models. If given,
+                            the prediction is computed directly and not cached.
+            device_id: Device the reading came from (used with `feature_engine`).
+
+        Returns:
+            A tuple of (predicted label, class probabilities), as from predict_saci_fire_risk.
+        """
+        if feature_engine is not None:
+            self.bypassed += 1
+            return predict_saci_fire_risk(model, temperature, humidity, smoke, feature_engine, device_id)
+
+        key = self.quantize(temperature, humidity, smoke)
+        with self._lock:
+            if model is not self._model_ref:
+                self._clear_locked()
+                self._model_ref = model
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[0], cached[1].copy()
+            self.misses += 1
+
+        label, probabilities = predict_saci_fire_risk(model, *key)
+        with self._lock:
+            if model is self._model_ref:  # Skip storing if the model was swapped meanwhile
+                self._entries[key] = (label, probabilities.copy())
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return label, probabilities
+
+    def invalidate(self) -> None:
+        """Drops all cached predictions."""
+        with self._lock:
+            self._clear_locked()
+            self._model_ref = None
+
+    def on_model_swap(self, old_manifest: Dict[str, Any], new_manifest: Dict[str, Any]) -> None:
+        """HotSwappableModel swap listener: invalidates the cache."""
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters, the hit rate over cacheable lookups, and the cache size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'bypassed': self.bypassed,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'quantization': self.quantization,
+        }
+
+    def _clear_locked(self) -> None:
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
@@ -0,0 +1,290 @@
+"""
+SACI Model Evaluation and Threshold-Sweep Report.
+
+`evaluate_model` in saci_fire_predictor scores a model at the fixed 0.5
+threshold. Choosing the operating threshold for P(fire) means trading false
+alarms against missed fires, which needs the whole picture. This module
+computes it from one vector of scores:
+
+- The confusion matrix at every distinct threshold, in a single sorted pass
+  (one argsort, then cumulative sums), giving ROC and precision-recall curves,
+  ROC AUC and average precision.
+- A recommended threshold: the best F1, optionally subject to a minimum recall
+  (missed fires are the costlier error).
+- A calibration curve (mean predicted P(fire) vs. observed fire rate per bin).
+- Per-device metrics at the chosen threshold.
+
+`build_evaluation_report` returns a JSON-serializable report and
+`write_evaluation_report` saves it as JSON plus CSV tables, which
+`ModelRegistry.publish(..., attachments=...)` can store with the model.
+"""
+# src/ml_models/saci_evaluation.py
+
+# Standard library imports
+import csv
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+# Third-party imports
+import numpy as np
+
+
+def metrics_from_confusion_matrix(cm: np.ndarray) -> Dict[str, float]:
+    """
+    Derives accuracy and support-weighted precision, recall and F1 from a confusion matrix.
+
+    Matches scikit-learn's `average='weighted', zero_division=0` results, but from
+    one confusion matrix instead of one pass over the labels per metric.
+
+    Args:
+        cm: Square confusion matrix, rows = actual class, columns = predicted class.
+
+    Returns:
+        Dict with 'accuracy', 'precision', 'recall' and 'f1'.
+    """
+    cm = np.asarray(cm, dtype=float)
+    true_positives = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    total = cm.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+        recall = np.where(support > 0, true_positives / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    weights = support / total if total else support
+    return {
+        'accuracy': float(true_positives.sum() / total) if total else 0.0,
+        'precision': float(np.dot(weights, precision)),
+        'recall': float(np.dot(weights, recall)),
+        'f1': float(np.dot(weights, f1)),
+    }
+
+
+def threshold_sweep(y_true: Sequence[int], scores: Sequence[float]) -> Dict[str, np.ndarray]:
+    """
+    Computes the binary confusion matrix at every distinct score threshold in one sorted pass.
+
+    A reading is predicted positive when its score is >= the threshold. Thresholds
+    are the distinct scores in decreasing order, preceded by +inf (nothing positive).
+
+    Args:
+        y_true: True labels (1 = fire).
+        scores: Predicted P(fire) (or any score where higher means more likely fire).
+
+    Returns:
+        Dict of equal-length arrays: 'threshold', 'tp', 'fp', 'fn', 'tn', 'precision',
+        'recall' (true positive rate), 'fpr', 'f1' and 'accuracy'.
+    """
+    y = np.asarray(y_true).astype(bool)
+    s = np.asarray(scores, dtype=float)
+    order = np.argsort(-s, kind='mergesort')
+    s_sorted, y_sorted = s[order], y[order]
+
+    # Last index of each run of equal scores: the confusion matrix changes only there.
+    boundaries = np.r_[np.flatnonzero(np.diff(s_sorted)), len(s_sorted) - 1] if len(s_sorted) else np.array([], int)
+    tp = np.r_[0, np.cumsum(y_sorted)[boundaries]]
+    fp = np.r_[0, (boundaries + 1) - tp[1:]]
+    positives, negatives = int(y.sum()), int((~y).sum())
+    fn, tn = positives - tp, negatives - fp
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+        recall = tp / positives if positives else np.zeros_like(tp, dtype=float)
+        fpr = fp / negatives if negatives else np.zeros_like(fp, dtype=float)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return {
+        'threshold': np.r_[np.inf, s_sorted[boundaries]],
+        'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+        'precision': precision, 'recall': recall, 'fpr': fpr, 'f1': f1,
+        'accuracy': (tp + tn) / max(len(y), 1),
+    }
+
+
+def roc_auc(sweep: Dict[str, np.ndarray]) -> float:
+    """Area under the ROC curve (trapezoidal) from a threshold sweep."""
+    fpr, tpr = sweep['fpr'], sweep['recall']
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2.0))
+
+
+def average_precision(sweep: Dict[str, np.ndarray]) -> float:
+    """Average precision (step-wise area under the precision-recall curve) from a threshold sweep."""
+    return float(np.sum(np.diff(sweep['recall']) * sweep['precision'][1:]))
+
+
+def select_threshold(sweep: Dict[str, np.ndarray], min_recall: Optional[float] = None) -> int:
+    """
+    Picks the operating point with the best F1, among those with recall >= `min_recall`.
+
+    Returns:
+        Index into the sweep arrays. Falls back to the best F1 overall if no point reaches
+        `min_recall`. The +inf threshold (nothing predicted positive) is never chosen.
+    """
+    f1 = sweep['f1'][1:]
+    candidates = np.ones_like(f1, dtype=bool)
+    if min_recall is not None:
+        candidates = sweep['recall'][1:] >= min_recall
+        if not candidates.any():
+            candidates[:] = True
+    return int(np.argmax(np.where(candidates, f1, -1.0))) + 1 if len(f1) else 0
+
+
+def calibration_curve(y_true: Sequence[int], probabilities: Sequence[float], n_bins: int = 10) -> Dict[str, np.ndarray]:
+    """
+    Mean predicted probability vs. observed positive rate in equal-width probability bins.
+
+    Returns:
+        Dict of arrays over non-empty bins: 'bin_lower', 'bin_upper', 'count',
+        'mean_predicted' and 'observed_rate'.
+    """
+    y = np.asarray(y_true, dtype=float)
+    p = np.clip(np.asarray(probabilities, dtype=float), 0.0, 1.0)
+    bins = np.minimum((p * n_bins).astype(int), n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    predicted_sum = np.bincount(bins, weights=p, minlength=n_bins)
+    observed_sum = np.bincount(bins, weights=y, minlength=n_bins)
+    used = count > 0
+    edges = np.linspace(0.0, 1.0, n_bins + 1)
+    return {
+        'bin_lower': edges[:-1][used], 'bin_upper': edges[1:][used], 'count': count[used],
+        'mean_predicted': predicted_sum[used] / count[used], 'observed_rate': observed_sum[used] / count[used],
+    }
+
+
+def expected_calibration_error(calibration: Dict[str, np.ndarray]) -> float:
+    """Count-weighted mean |observed rate - mean predicted probability| over calibration bins."""
+    count = calibration['count']
+    if not count.sum():
+        return 0.0
+    return float(np.dot(count, np.abs(calibration['observed_rate'] - calibration['mean_predicted'])) / count.sum())
+
+
+def per_device_metrics(y_true: Sequence[int], probabilities: Sequence[float],
+                       device_ids: Sequence[Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Confusion counts, recall, precision and false-alarm rate per device at `threshold`.
+
+    Computed for all devices at once with np.unique + bincount.
+    """
+    y = np.asarray(y_true).astype(bool)
+    predicted = np.asarray(probabilities, dtype=float) >= threshold
+    devices, inverse = np.unique(np.asarray(device_ids).astype(str), return_inverse=True)
+    n = len(devices)
+    tp = np.bincount(inverse, weights=y & predicted, minlength=n)
+    fp = np.bincount(inverse, weights=~y & predicted, minlength=n)
+    fn = np.bincount(inverse, weights=y & ~predicted, minlength=n)
+    tn = np.bincount(inverse, weights=~y & ~predicted, minlength=n)
+
+    rows = []
+    for i, device in enumerate(devices):
+        rows.append({
+            'device_id': device,
+            'count': int(tp[i] + fp[i] + fn[i] + tn[i]),
+            'tp': int(tp[i]), 'fp': int(fp[i]), 'fn': int(fn[i]), 'tn': int(tn[i]),
+            'recall': float(tp[i] / (tp[i] + fn[i])) if tp[i] + fn[i] else None,
+            'precision': float(tp[i] / (tp[i] + fp[i])) if tp[i] + fp[i] else None,
+            'false_alarm_rate': float(fp[i] / (fp[i] + tn[i])) if fp[i] + tn[i] else None,
+        })
+    return rows
+
+
+def _json_floats(values: Sequence[float]) -> List[Optional[float]]:
+    """Floats for JSON; the +inf sweep threshold becomes None (JSON has no infinity)."""
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+
+def _operating_point(sweep: Dict[str, np.ndarray], index: int) -> Dict[str, float]:
+    return {name: _json_floats([sweep[name][index]])[0] for name in
+            ('threshold', 'precision', 'recall', 'fpr', 'f1', 'accuracy', 'tp', 'fp', 'fn', 'tn')}
+
+
+def build_evaluation_report(y_true: Sequence[int],
+                            probabilities: Sequence[float],
+                            device_ids: Optional[Sequence[Any]] = None,
+                            min_recall: Optional[float] = None,
+                            n_calibration_bins: int = 10,
+                            model_name: str = '') -> Dict[str, Any]:
+    """
+    Builds the full evaluation report for P(fire) scores.
+
+    Args:
+        y_true: True labels (1 = fire).
+        probabilities: Predicted P(fire).
+        device_ids: Optional device of every reading, for the per-device breakdown.
+        min_recall: Minimum recall required of the recommended threshold.
+        n_calibration_bins: Bins of the calibration curve.
+        model_name: Name recorded in the report.
+
+    Returns:
+        JSON-serializable dict with 'summary', 'default_threshold' (0.5) and
+        'recommended_threshold' operating points, 'threshold_sweep', 'calibration'
+        and 'per_device' (empty without device_ids).
+    """
+    y = np.asarray(y_true).astype(int)
+    p = np.asarray(probabilities, dtype=float)
+    sweep = threshold_sweep(y, p)
+    calibration = calibration_curve(y, p, n_calibration_bins)
+    recommended = select_threshold(sweep, min_recall)
+    # Operating point at 0.5: the last (lowest) sweep threshold still >= 0.5.
+    default_index = int(np.flatnonzero(sweep['threshold'] >= 0.5)[-1])
+
+    chosen_threshold = float(sweep['threshold'][recommended])
+    return {
+        'model_name': model_name,
+        'summary': {
+            'samples': int(len(y)),
+            'positives': int(y.sum()),
+            'roc_auc': roc_auc(sweep),
+            'average_precision': average_precision(sweep),
+            'expected_calibration_error': expected_calibration_error(calibration),
+            'min_recall_constraint': min_recall,
+        },
+        'default_threshold': {**_operating_point(sweep, default_index), 'threshold': 0.5},
+        'recommended_threshold': _operating_point(sweep, recommended),
+        'threshold_sweep': {name: _json_floats(values) for name, values in sweep.items()},
+        'calibration': {name: _json_floats(values) for name, values in calibration.items()},
+        'per_device': per_device_metrics(y, p, device_ids, chosen_threshold) if device_ids is not None else [],
+    }
+
+
+def print_evaluation_summary(report: Dict[str, Any]) -> None:
+    """Prints the headline numbers of an evaluation report."""
+    summary, default, chosen = report['summary'], report['default_threshold'], report['recommended_threshold']
+    print(f"\n--- Threshold Sweep Report: {report['model_name']} ---")
+    print(f"  ROC AUC: {summary['roc_auc']:.4f} | Average precision: {summary['average_precision']:.4f} | "
+          f"ECE: {summary['expected_calibration_error']:.4f}")
+    for label, point in (("Threshold 0.5", default), ("Recommended", chosen)):
+        print(f"  {label:<14} P(fire) >= {point['threshold']:.4f}: recall {point['recall']:.4f}, "
+              f"precision {point['precision']:.4f}, false-alarm rate {point['fpr']:.4f}, F1 {point['f1']:.4f}")
+
+
+def write_evaluation_report(report: Dict[str, Any], output_dir: str, prefix: str = 'evaluation') -> List[str]:
+    """
+    Writes the report as `<prefix>_report.json` plus CSV tables of the threshold
+    sweep, calibration curve and per-device metrics.
+
+    Returns:
+        The paths written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, f"{prefix}_report.json")
+    with open(json_path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    paths = [json_path]
+
+    tables = {'threshold_sweep': report['threshold_sweep'], 'calibration': report['calibration']}
+    for name, columns in tables.items():
+        path = os.path.join(output_dir, f"{prefix}_{name}.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns.keys())
+            writer.writerows(zip(*columns.values()))
+        paths.append(path)
+    if report['per_device']:
+        path = os.path.join(output_dir, f"{prefix}_per_device.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(report['per_device'][0].keys()))
+            writer.writeheader()
+            writer.writerows(report['per_device'])
+        paths.append(path)
+    return paths
@@ -0,0 +1,257 @@
+"""
+SACI Rolling-Window Feature Engine.
+
+Fire onset shows up as a rate of change (temperature climbing, humidity
+dropping) more than as an absolute value, so this module derives per-device
+history features from the raw sensor readings:
+
+- `{column}_delta`: change since the device's previous reading.
+- `{column}_mean_{w}`: mean of the last `w` readings.
+- `{column}_slope_{w}`: least-squares slope of the last `w` readings, per reading.
+- `{column}_ewma_{span}`: exponentially weighted moving average (alpha = 2 / (span + 1)).
+
+Windows count readings, not wall-clock time, and the first readings of a device
+use the partial history available (a one-reading slope is 0).
+
+The same features are produced two ways, which agree to floating-point precision:
+- `RollingFeatureEngine.update()` for the live ingestion loop. Each device keeps a
+  fixed-size ring buffer plus running sums per window, so a reading costs O(1)
+  regardless of window length.
+- `RollingFeatureEngine.transform_frame()` for training, vectorized over a whole
+  DataFrame (e.g., `fire_risk_dataset.csv`) with pandas group-wise rolling operations.
+
+A model trained on these features records their names in `feature_names_in_`;
+`RollingFeatureEngine.from_feature_names()` rebuilds the matching engine from them.
+"""
+# src/ml_models/saci_feature_engine.py
+
+# Standard library imports
+import re
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Sequence
+
+# Third-party imports
+import numpy as np
+
+if TYPE_CHECKING:  # pandas is imported lazily, like in saci_fire_predictor
+    import pandas as pd
+
+
+BASE_FEATURE_COLUMNS = ('temperature', 'humidity', 'smoke_level')
+DEFAULT_WINDOWS = (4, 12)        # Readings; 1h and 3h at the dataset's 15 min cadence
+DEFAULT_EWMA_SPANS = (8,)
+DEVICE_COLUMN = 'device_id'
+TIMESTAMP_COLUMN = 'timestamp'
+
+_DERIVED_NAME_PATTERN = re.compile(r'^(?P<column>.+)_(?P<kind>mean|slope|ewma)_(?P<size>\d+)$')
+
+
+class _DeviceState:
+    """Ring buffer and running window sums for one device."""
+    __slots__ = ('buffer', 'count', 'sums', 'weighted_sums', 'ewma', 'previous')
+
+    def __init__(self, capacity: int, num_windows: int, num_columns: int, num_spans: int):
+        self.buffer = np.zeros((capacity, num_columns))
+        self.count = 0                                                # Readings seen so far
+        self.sums = np.zeros((num_windows, num_columns))              # Sum of y over each window
+        self.weighted_sums = np.zeros((num_windows, num_columns))     # Sum of i*y, i = 0 for the oldest
+        self.ewma = np.zeros((num_spans, num_columns))
+        self.previous = np.zeros(num_columns)
+
+
+class RollingFeatureEngine:
+    """
+    Computes per-device rolling mean, slope, EWMA and delta features.
+    """
+    def __init__(self,
+                 base_columns: Sequence[str] = BASE_FEATURE_COLUMNS,
+                 windows: Sequence[int] = DEFAULT_WINDOWS,
+                 ewma_spans: Sequence[int] = DEFAULT_EWMA_SPANS):
+        """
+        Initializes the RollingFeatureEngine.
+
+        Args:
+            base_columns: Raw sensor columns to derive features from.
+            windows: Rolling window lengths, in readings, for the mean and slope features.
+            ewma_spans: Spans for the EWMA features.
+
+        Raises:
+            ValueError: If there are no base columns or a window/span is smaller than 1.
+        """
+        if not base_columns:
+            raise ValueError("RollingFeatureEngine needs at least one base column.")
+        if any(size < 1 for size in list(windows) + list(ewma_spans)):
+            raise ValueError("Windows and EWMA spans must be at least 1.")
+        self.base_columns = list(base_columns)
+        self.windows = sorted(set(int(w) for w in windows))
+        self.ewma_spans = sorted(set(int(s) for s in ewma_spans))
+        self._alphas = np.array([2.0 / (span + 1.0) for span in self.ewma_spans])[:, None]
+        self._capacity = max(self.windows, default=1)
+        self._devices: Dict[str, _DeviceState] = {}
+
+        self.feature_names = list(self.base_columns)
+        for column in self.base_columns:
+            self.feature_names.append(f"{column}_delta")
+            self.feature_names.extend(f"{column}_mean_{w}" for w in self.windows)
+            self.feature_names.extend(f"{column}_slope_{w}" for w in self.windows)
+            self.feature_names.extend(f"{column}_ewma_{span}" for span in self.ewma_spans)
+
+    @classmethod
+    def from_feature_names(cls, feature_names: Iterable[str]) -> Optional['RollingFeatureEngine']:
+        """
+        Rebuilds the engine that produced `feature_names` (e.g., a model's `feature_names_in_`).
+
+        Args:
+            feature_names: Feature names a model was trained on.
+
+        Returns:
+            The matching engine, or None if the names contain no rolling features
+            (i.e., the model uses raw readings only).
+        """
+        names = list(feature_names)
+        windows, spans, derived_columns = set(), set(), []
+        for name in names:
+            match = _DERIVED_NAME_PATTERN.match(name)
+            if match is None:
+                continue
+            (spans if match['kind'] == 'ewma' else windows).add(int(match['size']))
+            if match['column'] not in derived_columns:
+                derived_columns.append(match['column'])
+        if not derived_columns:
+            return None
+        return cls(base_columns=derived_columns, windows=sorted(windows), ewma_spans=sorted(spans))
+
+    # --- Incremental (live) computation ---
+    def update(self, device_id: str, reading: Mapping[str, float]) -> Dict[str, float]:
+        """
+        Adds one reading for a device and returns its features, in O(1).
+
+        Args:
+            device_id: Identifier of the sensor node the reading came from.
+            reading: Mapping with a numeric value for every base column.
+
+        Returns:
+            Dict mapping every name in `feature_names` to its value for this reading.
+
+        Raises:
+            KeyError: If the reading lacks a base column.
+        """
+        values = np.array([float(reading[column]) for column in self.base_columns])
+        state = self._devices.get(device_id)
+        if state is None:
+            state = _DeviceState(self._capacity, len(self.windows), len(self.base_columns), len(self.ewma_spans))
+            self._devices[device_id] = state
+
+        t = state.count
+        means = np.empty_like(state.sums)
+        slopes = np.empty_like(state.sums)
+        for k, window in enumerate(self.windows):
+            if t < window:
+                # Window still filling: the new value gets index t.
+                state.weighted_sums[k] += t * values
+                state.sums[k] += values
+                n = t + 1
+            else:
+                # Drop the oldest value (index 0); the rest shift down one index.
+                oldest = state.buffer[(t - window) % self._capacity]
+                state.weighted_sums[k] -= state.sums[k] - oldest
+                state.sums[k] += values - oldest
+                state.weighted_sums[k] += (window - 1) * values
+                n = window
+            means[k] = state.sums[k] / n
+            # Least squares over i = 0..n-1: slope = (n*sum(i*y) - sum(i)*sum(y)) / (n*sum(i^2) - sum(i)^2)
+            sum_i = n * (n - 1) / 2.0
+            denominator = n * (n - 1) * (2 * n - 1) / 6.0 * n - sum_i ** 2
+            slopes[k] = (n * state.weighted_sums[k] - sum_i * state.sums[k]) / denominator if n > 1 else 0.0
+        state.buffer[t % self._capacity] = values
+
+        if t == 0:
+            state.ewma[:] = values
+            deltas = np.zeros_like(values)
+        else:
+            state.ewma = self._alphas * values + (1.0 - self._alphas) * state.ewma
+            deltas = values - state.previous
+        state.previous = values
+        state.count = t + 1
+
+        features = dict(zip(self.base_columns, values.tolist()))
+        for j, column in enumerate(self.base_columns):
+            features[f"{column}_delta"] = float(deltas[j])
+            for k, window in enumerate(self.windows):
+                features[f"{column}_mean_{window}"] = float(means[k, j])
+                features[f"{column}_slope_{window}"] = float(slopes[k, j])
+            for k, span in enumerate(self.ewma_spans):
+                features[f"{column}_ewma_{span}"] = float(state.ewma[k, j])
+        return features
+
+    def reset(self, device_id: Optional[str] = None) -> None:
+        """Forgets the history of one device, or of all devices if `device_id` is None."""
+        if device_id is None:
+            self._devices.clear()
+        else:
+            self._devices.pop(device_id, None)
+
+    # --- Vectorized (training) computation ---
+    def transform_frame(self, df: 'pd.DataFrame',
+                        device_column: str = DEVICE_COLUMN,
+                        timestamp_column: Optional[str] = TIMESTAMP_COLUMN) -> 'pd.DataFrame':
+        """
+        Computes the features for a whole DataFrame of readings at once.
+
+        Readings are processed per device in timestamp order (stable, so ties keep file
+        order), which is the order `update()` would see them in. Without a device column,
+        all rows are treated as one device.
+
+        Args:
+            df: Readings with every base column (no missing values), optionally a device
+                and a timestamp column.
+            device_column: Column identifying the device.
+            timestamp_column: Column to order readings by; None keeps the row order.
+
+        Returns:
+            A copy of `df` (same index and row order) with the derived feature columns added.
+
+        Raises:
+            ValueError: If a base column is missing or contains missing values.
+        """
+        import pandas as pd
+
+        missing = [column for column in self.base_columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"DataFrame is missing base feature columns: {missing}")
+        if df[self.base_columns].isnull().values.any():
+            raise ValueError("Base feature columns contain missing values; clean them before transform_frame().")
+
+        ordered = df
+        if timestamp_column is not None and timestamp_column in df.columns:
+            ordered = df.sort_values(timestamp_column, kind='mergesort')
+        devices = ordered[device_column] if device_column in ordered.columns else pd.Series(0, index=ordered.index)
+        grouped_positions = ordered.groupby(devices, sort=False).cumcount().astype(float)
+
+        derived = {}
+        for column in self.base_columns:
+            values = ordered[column].astype(float)
+            by_device = values.groupby(devices, sort=False)
+            derived[f"{column}_delta"] = by_device.diff().fillna(0.0)
+            # Position-weighted values; sum over the window of i*y with i relative to the window start.
+            weighted = (values * grouped_positions).groupby(devices, sort=False)
+            for window in self.windows:
+                sums = by_device.rolling(window, min_periods=1).sum().reset_index(level=0, drop=True)
+                position_sums = weighted.rolling(window, min_periods=1).sum().reset_index(level=0, drop=True)
+                n = np.minimum(grouped_positions + 1, window)
+                start = grouped_positions - n + 1
+                weighted_sums = position_sums - start * sums
+                sum_i = n * (n - 1) / 2.0
+                denominator = n * (n - 1) * (2 * n - 1) / 6.0 * n - sum_i ** 2
+                slope = (n * weighted_sums - sum_i * sums) / denominator.where(n > 1)
+                derived[f"{column}_mean_{window}"] = sums / n
+                derived[f"{column}_slope_{window}"] = slope.fillna(0.0)
+            for span in self.ewma_spans:
+                derived[f"{column}_ewma_{span}"] = by_device.transform(
+                    lambda group: group.ewm(alpha=2.0 / (span + 1.0), adjust=False).mean())
+
+        features = pd.DataFrame(derived, index=ordered.index).reindex(df.index)
+        result = df.copy()
+        for name in self.feature_names:
+            if name not in self.base_columns:
+                result[name] = features[name]
+        return result
@@ -2,34 +2,72 @@
 SACI Fire Prediction Model Training and Prediction Script.
 
 This script handles the complete lifecycle of a fire risk prediction model, including:
-- Loading data from a CSV file.
+- Loading data from a CSV file (or, for training, CSV/Parquet with explicit dtypes, column
+  pruning and optional chunked reading).
 - Preprocessing the data: feature selection and handling missing values (if any).
-- Training a Logistic Regression classification model.
+- Optionally adding per-device rolling features (see saci_feature_engine), computed
+  identically at training time and in the live prediction path.
+- Training a Logistic Regression classification model, either in memory or out-of-core
+  (SGD logistic regression fitted chunk by chunk with periodic checkpoints).
 - Evaluating the trained model using various metrics (accuracy, precision, recall, F1-score, confusion matrix).
 - Saving the trained model to disk using joblib.
 - Loading models from disk.
-- Providing a function to predict fire risk based on live sensor data.
+- Providing functions to predict fire risk for a live reading or a batch of readings,
+  with the model run natively or through an inference backend such as onnxruntime
+  (see inference_backend).
 - Demonstrating the training, evaluation, saving, loading, and prediction processes.
 
 The script is designed to be modular, with functions for each major step.
-The main execution block (`if __name__ == '__main__':`) orchestrates these steps.
+The main execution block (`if __name__ == '__main__':`) dispatches to the command-line
+pipelines: `train` (the default), `train-incremental`, `select-model` (parallel
+hyperparameter search across model families, picking the fastest model above an
+accuracy floor), `evaluate` (threshold-sweep report, see saci_evaluation), `export-onnx`
+and `compile-lut` (P(fire) precomputed on a 3-D grid for lookup-table scoring with a
+bounded error, see lookup_table_model).
 """
 # src/ml_models/saci_fire_predictor.py
 # Machine Learning model for SACI Fire Prediction
 
+# Postponed evaluation keeps pandas/sklearn names in annotations from being resolved at import time.
+from __future__ import annotations
+
 # Standard library imports first
+import argparse
 import os
+from typing import TYPE_CHECKING, Callable, Iterable
 # import pickle # Alternative for model saving - Removed as joblib is used.
 
 # Third-party imports
-import joblib
+# numpy is light enough to import eagerly. pandas, scikit-learn and joblib are
+# imported inside the functions that need them, so modules that only import this
+# file (e.g., the integration app or API) do not pay for the whole ML stack at
+# startup. Unpickling a model in load_model() pulls in scikit-learn anyway.
 import numpy as np
-import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import (accuracy_score, confusion_matrix, f1_score,
-                             precision_score, recall_score)
-from sklearn.model_selection import train_test_split
-from sklearn.exceptions import NotFittedError
+
+# Local imports; the fallback covers running this file directly as a script.
+try:
+    from .saci_feature_engine import DEFAULT_EWMA_SPANS, DEFAULT_WINDOWS, RollingFeatureEngine
+except ImportError:
+    from saci_feature_engine import DEFAULT_EWMA_SPANS, DEFAULT_WINDOWS, RollingFeatureEngine
+try:
+    from .saci_evaluation import (build_evaluation_report, metrics_from_confusion_matrix,
+                                  print_evaluation_summary, write_evaluation_report)
+except ImportError:
+    from saci_evaluation import (build_evaluation_report, metrics_from_confusion_matrix,
+                                 print_evaluation_summary, write_evaluation_report)
+try:
+    from .drift_monitor import build_training_profile
+except ImportError:
+    from drift_monitor import build_training_profile
+try:
+    from .inference_backend import InferenceBackend
+except ImportError:
+    from inference_backend import InferenceBackend
+
+if TYPE_CHECKING:  # Only evaluated by static type checkers
+    import pandas as pd
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
 
 
 # --- Constants ---
@@ -43,6 +81,38 @@ DATASET_PATH = 'data/synthetic/fire_risk_dataset.csv' # Path to the dataset
 LOG_REG_MODEL_FILENAME = 'saci_fire_risk_logistic_regression_model.joblib'
 # Construct full path for the model file, ensuring OS compatibility
 LOG_REG_MODEL_PATH = os.path.join(MODELS_DIR, LOG_REG_MODEL_FILENAME)
+SGD_MODEL_FILENAME = 'saci_fire_risk_sgd_model.joblib'
+SGD_MODEL_PATH = os.path.join(MODELS_DIR, SGD_MODEL_FILENAME)
+SELECTED_MODEL_FILENAME = 'saci_fire_risk_selected_model.joblib'
+SELECTED_MODEL_PATH = os.path.join(MODELS_DIR, SELECTED_MODEL_FILENAME)
+
+# Model input features (in training order) and target column.
+FEATURE_COLUMNS = ['temperature', 'humidity', 'smoke_level']
+TARGET_COLUMN = 'fire_risk_label'
+LUT_MODEL_PATH = os.path.join(MODELS_DIR, 'saci_fire_risk_lookup_table.npz')
+
+# Explicit dtypes for the columns of fire_risk_dataset.csv. Declaring them up front
+# skips pandas' type inference, stores sensor readings as float32 (half of the
+# inferred float64) and repeated device IDs as a categorical instead of Python strings.
+CSV_COLUMN_DTYPES = {
+    'device_id': 'category',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'temperature': 'float32',
+    'humidity': 'float32',
+    'smoke_level': 'float32',
+    'co2_ppm': 'float32',
+    'wind_speed': 'float32',
+    'wind_direction': 'float32',
+    'soil_moisture': 'float32',
+    'light_intensity': 'float32',
+    'air_pressure': 'float32',
+    'fire_risk_label': 'int8',
+}
+CSV_DATE_COLUMNS = ['timestamp']
+# Columns identifying a reading's device and time, needed for rolling features and per-device reports.
+CONTEXT_COLUMNS = ['timestamp', 'device_id']
+DEFAULT_CHUNK_ROWS = 250_000  # Rows per chunk when streaming training data
 
 
 def load_data(file_path: str) -> pd.DataFrame:
@@ -60,6 +130,8 @@ def load_data(file_path: str) -> pd.DataFrame:
         pd.errors.EmptyDataError: If the CSV file is empty.
         Exception: For other potential I/O errors during file loading (e.g., malformed CSV).
     """
+    import pandas as pd
+
     try:
         df = pd.read_csv(file_path)
         print(f"[INFO] Data loaded successfully from '{file_path}'. Shape: {df.shape}")
@@ -80,7 +152,249 @@ def load_data(file_path: str) -> pd.DataFrame:
         print(f"[ERROR] An error occurred while loading or parsing data from '{file_path}': {e}")
         raise # Re-raise
 
-def preprocess_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+def _is_parquet(file_path: str) -> bool:
+    """True if the file path has a Parquet extension."""
+    return file_path.lower().endswith(('.parquet', '.pq'))
+
+
+def with_context_columns(file_path: str, columns: list[str] | None = None) -> list[str]:
+    """
+    Returns `columns` (default FEATURE_COLUMNS plus TARGET_COLUMN) plus those CONTEXT_COLUMNS
+    the file has, reading only its header or schema.
+    """
+    import pandas as pd
+
+    columns = list(columns) if columns is not None else FEATURE_COLUMNS + [TARGET_COLUMN]
+    if _is_parquet(file_path):
+        import pyarrow.parquet as pq
+        available = pq.read_schema(file_path).names
+    else:
+        available = pd.read_csv(file_path, nrows=0).columns
+    return columns + [col for col in CONTEXT_COLUMNS if col in available and col not in columns]
+
+
+def iter_training_data(file_path: str,
+                       columns: list[str] | None = None,
+                       chunksize: int = DEFAULT_CHUNK_ROWS):
+    """
+    Streams training data from a CSV or Parquet file in chunks of at most `chunksize` rows.
+
+    Only the requested columns are read, with the dtypes from CSV_COLUMN_DTYPES
+    (float32 readings, categorical device_id, int8 label) and parsed timestamps,
+    so memory use is bounded by one chunk regardless of the file size.
+
+    Args:
+        file_path: Path to a .csv file, or a .parquet/.pq file (requires pyarrow).
+        columns: Columns to read. Defaults to FEATURE_COLUMNS plus TARGET_COLUMN.
+        chunksize: Maximum number of rows per yielded DataFrame.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If a requested column is not in the file.
+        ImportError: If a Parquet file is given and pyarrow is not installed.
+    """
+    import pandas as pd
+
+    columns = list(columns) if columns is not None else FEATURE_COLUMNS + [TARGET_COLUMN]
+    dtypes = {col: CSV_COLUMN_DTYPES[col] for col in columns if col in CSV_COLUMN_DTYPES}
+    date_columns = [col for col in columns if col in CSV_DATE_COLUMNS]
+
+    if _is_parquet(file_path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as ie:
+            raise ImportError("Reading Parquet training data requires pyarrow (pip install pyarrow).") from ie
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        parquet_file = pq.ParquetFile(file_path)
+        missing = [col for col in columns if col not in parquet_file.schema_arrow.names]
+        if missing:
+            raise ValueError(f"Missing columns in '{file_path}': {missing}")
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas()
+            # Parquet carries its own types; align them with the CSV path.
+            yield chunk.astype(dtypes, copy=False)
+        return
+
+    for chunk in pd.read_csv(file_path, usecols=columns, dtype=dtypes,
+                             parse_dates=date_columns or False, chunksize=chunksize):
+        yield chunk
+
+
+def load_training_data(file_path: str,
+                       columns: list[str] | None = None,
+                       chunksize: int | None = None) -> pd.DataFrame:
+    """
+    Loads training data with explicit dtypes and only the columns needed.
+
+    This is the memory-efficient replacement for `load_data` when training: it
+    prunes unused columns at read time and uses the compact dtypes from
+    CSV_COLUMN_DTYPES. With `chunksize`, the file is read in chunks that are
+    copied one at a time into columns preallocated from the file's row count
+    (see `_concat_chunks`), which keeps the parser's temporary buffers small and
+    peak memory at the result plus one chunk for very large files. Parquet
+    input (.parquet/.pq) is supported via pyarrow.
+
+    Args:
+        file_path: Path to a .csv file, or a .parquet/.pq file.
+        columns: Columns to load. Defaults to FEATURE_COLUMNS plus TARGET_COLUMN.
+        chunksize: If given, read in chunks of this many rows.
+
+    Returns:
+        The loaded data as a pandas DataFrame.
+
+    Raises:
+        FileNotFoundError: If the file is not found at the specified path.
+        ValueError: If a requested column is not in the file.
+        pd.errors.EmptyDataError: If the CSV file is empty.
+    """
+    import pandas as pd
+
+    try:
+        if chunksize is None and not _is_parquet(file_path):
+            columns = list(columns) if columns is not None else FEATURE_COLUMNS + [TARGET_COLUMN]
+            df = pd.read_csv(file_path, usecols=columns,
+                             dtype={col: CSV_COLUMN_DTYPES[col] for col in columns if col in CSV_COLUMN_DTYPES},
+                             parse_dates=[col for col in columns if col in CSV_DATE_COLUMNS] or False)
+        else:
+            chunks = iter_training_data(file_path, columns, chunksize or DEFAULT_CHUNK_ROWS)
+            df = _concat_chunks(chunks, capacity=_max_row_count(file_path))
+            if df is None:
+                df = pd.DataFrame(columns=columns if columns is not None else FEATURE_COLUMNS + [TARGET_COLUMN])
+    except FileNotFoundError:
+        print(f"[ERROR] File not found: '{file_path}'. Please ensure the path is correct.")
+        raise
+    except pd.errors.EmptyDataError:
+        print(f"[ERROR] No data: The file '{file_path}' is empty.")
+        raise
+
+    memory_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+    print(f"[INFO] Training data loaded from '{file_path}'. Shape: {df.shape}, memory: {memory_mb:.2f} MB")
+    return df
+
+
+def load_training_frame(file_path: str,
+                        feature_engine: RollingFeatureEngine | None = None) -> pd.DataFrame:
+    """
+    Loads training data with its context columns and, optionally, rolling features.
+
+    The device and timestamp columns (CONTEXT_COLUMNS) are loaded whenever the file has
+    them: rolling features must be computed per device in time order, exactly as the
+    live path sees readings, and evaluation reports break results down per device.
+
+    Args:
+        file_path: Path to a .csv file, or a .parquet/.pq file.
+        feature_engine: If given, its per-device rolling features are added.
+
+    Returns:
+        The loaded data as a pandas DataFrame.
+    """
+    data_df = load_training_data(file_path, with_context_columns(file_path))
+    if feature_engine is not None:
+        if 'device_id' not in data_df.columns:
+            print(f"[WARN] '{file_path}' has no device_id column; rolling features treat all rows as one device.")
+        data_df = feature_engine.transform_frame(data_df)
+    return data_df
+
+
+def _max_row_count(file_path: str) -> int:
+    """
+    Upper bound on the number of data rows, without parsing the file.
+
+    Parquet files record their row count; for CSV files every row ends with a
+    newline (quoted fields may add more), so counting newlines never undercounts.
+    """
+    if _is_parquet(file_path):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(file_path).metadata.num_rows
+    newlines = 0
+    with open(file_path, 'rb') as csv_file:
+        for block in iter(lambda: csv_file.read(1 << 20), b''):
+            newlines += block.count(b'\n')
+    return newlines + 1
+
+
+def _concat_chunks(chunks: Iterable[pd.DataFrame], capacity: int = 0) -> pd.DataFrame | None:
+    """
+    Concatenates chunks into one DataFrame as they arrive, keeping categorical columns categorical.
+
+    Each chunk is copied into per-column NumPy buffers of `capacity` rows (grown
+    by half when exceeded) and then released, so peak memory is the result plus
+    one chunk instead of every chunk plus their concatenation. Categorical
+    columns are stored as codes into the union of all chunks' categories, since
+    chunks usually carry different category sets and pd.concat would fall back
+    to an object column. Columns with other pandas extension dtypes are
+    concatenated with pd.concat at the end.
+
+    Returns:
+        The concatenated DataFrame, or None if there were no chunks.
+    """
+    import pandas as pd
+
+    columns: list | None = None
+    buffers: dict = {}
+    category_codes: dict = {}  # Categorical column -> {category: code} in order of appearance
+    other_pieces: dict = {}  # Extension-dtype column -> list of per-chunk Series
+    n_rows = 0
+    for chunk in chunks:
+        if columns is None:
+            columns = list(chunk.columns)
+            capacity = max(capacity, len(chunk))
+            for col in columns:
+                dtype = chunk[col].dtype
+                if isinstance(dtype, pd.CategoricalDtype):
+                    category_codes[col] = {}
+                    buffers[col] = np.empty(capacity, dtype=np.int32)
+                elif isinstance(dtype, np.dtype):
+                    buffers[col] = np.empty(capacity, dtype=dtype)
+                else:
+                    other_pieces[col] = []
+        end = n_rows + len(chunk)
+        if end > capacity:
+            capacity = max(end, capacity + capacity // 2)
+            for col, buffer in buffers.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:n_rows] = buffer[:n_rows]
+                buffers[col] = grown
+        for col in columns:
+            values = chunk[col]
+            if col in category_codes:
+                codes_by_category = category_codes[col]
+                lookup = np.array([codes_by_category.setdefault(category, len(codes_by_category))
+                                   for category in values.cat.categories] + [-1], dtype=np.int32)
+                buffers[col][n_rows:end] = lookup[values.cat.codes.to_numpy()]  # Code -1 (NaN) maps to -1
+            elif col in buffers:
+                array = values.to_numpy()
+                if not np.can_cast(array.dtype, buffers[col].dtype, casting='same_kind'):
+                    buffers[col] = buffers[col].astype(np.result_type(buffers[col].dtype, array.dtype))
+                buffers[col][n_rows:end] = array
+            else:
+                other_pieces[col].append(values)
+        n_rows = end
+
+    if columns is None:
+        return None
+    data = {}
+    for col in columns:
+        if col in category_codes:
+            categories = pd.Index(list(category_codes[col]))
+            order = categories.argsort()
+            remap = np.append(np.argsort(order).astype(np.int32), -1)  # Old code -> code among sorted categories
+            data[col] = pd.Categorical.from_codes(remap[buffers[col][:n_rows]], categories=categories[order])
+        elif col in buffers:
+            buffer = buffers[col]
+            buffer.resize(n_rows, refcheck=False)  # Shrinks in place; no view of the buffer exists
+            data[col] = buffer
+        else:
+            data[col] = pd.concat(other_pieces[col], ignore_index=True)
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+
+def preprocess_data(df: pd.DataFrame,
+                    feature_columns: list[str] | None = None) -> tuple[pd.DataFrame, pd.Series]:
     """
     Selects features and the target variable, and performs basic preprocessing.
 
@@ -93,6 +407,8 @@ def preprocess_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
 
     Args:
         df: The input DataFrame containing the raw data.
+        feature_columns: Features to select instead of FEATURE_COLUMNS (e.g., the
+                         raw readings plus rolling features from saci_feature_engine).
 
     Returns:
         A tuple containing:
@@ -106,8 +422,8 @@ def preprocess_data(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
     print("[INFO] Starting data preprocessing...")
 
     # Define the feature set and target variable name
-    features = ['temperature', 'humidity', 'smoke_level']
-    target_column = 'fire_risk_label' # Changed from 'target' for clarity
+    features = feature_columns if feature_columns is not None else FEATURE_COLUMNS
+    target_column = TARGET_COLUMN # Changed from 'target' for clarity
 
     # Check if all required feature columns are present in the DataFrame
     missing_feature_cols = [col for col in features if col not in df.columns]
@@ -159,6 +475,8 @@ def train_logistic_regression(X_train: pd.DataFrame,
     Returns:
         The trained LogisticRegression model.
     """
+    from sklearn.linear_model import LogisticRegression
+
     print("[INFO] Training Logistic Regression model...")
     # 'liblinear' solver is suitable for small datasets and supports L1/L2 regularization.
     # 'random_state' is used to ensure that results are reproducible across runs.
@@ -167,6 +485,285 @@ def train_logistic_regression(X_train: pd.DataFrame,
     print("[INFO] Logistic Regression model training completed successfully.")
     return model
 
+def train_incremental_sgd(chunk_factory: Callable[[], Iterable[pd.DataFrame]],
+                          classes: tuple[int, ...] = (0, 1),
+                          n_epochs: int = 1,
+                          checkpoint_path: str | None = None,
+                          checkpoint_every: int = 10,
+                          initial_model: Pipeline | None = None,
+                          random_state: int = 42) -> Pipeline:
+    """
+    Trains a logistic model out-of-core, one chunk of training data at a time.
+
+    Uses `SGDClassifier(loss='log_loss')`, i.e. logistic regression fitted by
+    stochastic gradient descent via `partial_fit`, behind a `StandardScaler`
+    (SGD needs standardized features). Only one chunk is held in memory at a
+    time, so the training set size is bounded by disk, not RAM.
+
+    The scaler statistics are accumulated in a first streaming pass, then each
+    epoch streams the data again and updates the classifier chunk by chunk (rows
+    shuffled within each chunk, since files are usually in time order, with a
+    seed derived from the epoch and chunk position).
+
+    Checkpoints are written atomically and record the position reached in
+    `checkpoint_position_` (epoch, chunks consumed in that epoch). Passing a
+    checkpoint as `initial_model` skips the chunks it already learned from, so
+    an interrupted run resumed from its last checkpoint ends with the same model
+    as an uninterrupted one.
+
+    The result is a Pipeline with `predict`/`predict_proba`, so it drops into
+    `predict_saci_fire_risk` like the batch-trained model.
+
+    Args:
+        chunk_factory: Callable returning a fresh iterable of DataFrame chunks containing
+                       FEATURE_COLUMNS and TARGET_COLUMN, e.g.
+                       `lambda: iter_training_data(DATASET_PATH, chunksize=100_000)`.
+                       It is called once per pass over the data.
+        classes: All target classes (required by partial_fit, as a chunk may lack some).
+        n_epochs: Total number of passes over the data for the classifier, including
+                  those already done by `initial_model`.
+        checkpoint_path: If given, the pipeline is saved here every `checkpoint_every`
+                         chunks and at the end of every epoch.
+        checkpoint_every: Number of chunks between checkpoints.
+        initial_model: A pipeline returned by an earlier call (e.g., a loaded checkpoint)
+                       to continue training from its `checkpoint_position_`; its scaler
+                       is kept as is.
+        random_state: Seed for the classifier and the within-chunk shuffling.
+
+    Returns:
+        The trained Pipeline of ('scaler', StandardScaler) and ('classifier', SGDClassifier).
+
+    Raises:
+        ValueError: If the data yields no rows or lacks the feature/target columns.
+    """
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    start_epoch, start_chunk = 1, 0
+    if initial_model is not None:
+        scaler = initial_model.named_steps['scaler']
+        classifier = initial_model.named_steps['classifier']
+        # Checkpoints written before positions were recorded resume from the start.
+        start_epoch, start_chunk = getattr(initial_model, 'checkpoint_position_', (1, 0))
+    else:
+        print("[INFO] Incremental training: computing feature scaling statistics (streaming pass)...")
+        scaler = StandardScaler()
+        rows_seen = 0
+        for chunk in chunk_factory():
+            missing = set(FEATURE_COLUMNS + [TARGET_COLUMN]) - set(chunk.columns)
+            if missing:
+                raise ValueError(f"Training data is missing required columns: {sorted(missing)}")
+            chunk = chunk.dropna(subset=FEATURE_COLUMNS)
+            if chunk.empty:
+                continue
+            scaler.partial_fit(chunk[FEATURE_COLUMNS])
+            rows_seen += len(chunk)
+        if rows_seen == 0:
+            raise ValueError("Incremental training received no data rows.")
+        classifier = SGDClassifier(loss='log_loss', random_state=random_state)
+    pipeline = Pipeline([('scaler', scaler), ('classifier', classifier)])
+    if start_epoch > 1 or start_chunk > 0:
+        print(f"[INFO] Incremental training: resuming at epoch {start_epoch}, chunk {start_chunk}.")
+
+    for epoch in range(start_epoch, n_epochs + 1):
+        epoch_rows = 0
+        skip = start_chunk if epoch == start_epoch else 0
+        for chunk_index, chunk in enumerate(chunk_factory()):
+            if chunk_index < skip:
+                continue  # Already learned from before the checkpoint
+            chunk = chunk.dropna(subset=FEATURE_COLUMNS + [TARGET_COLUMN])
+            if not chunk.empty:
+                order = np.random.default_rng([random_state, epoch, chunk_index]).permutation(len(chunk))
+                X_chunk = scaler.transform(chunk[FEATURE_COLUMNS].iloc[order])
+                y_chunk = chunk[TARGET_COLUMN].to_numpy()[order]
+                classifier.partial_fit(X_chunk, y_chunk, classes=np.asarray(classes))
+                epoch_rows += len(chunk)
+            pipeline.checkpoint_position_ = (epoch, chunk_index + 1)
+            if checkpoint_path and (chunk_index + 1) % checkpoint_every == 0:
+                save_model(pipeline, checkpoint_path)
+        print(f"[INFO] Incremental training: epoch {epoch}/{n_epochs} done ({epoch_rows} rows).")
+        pipeline.checkpoint_position_ = (epoch + 1, 0)
+        if checkpoint_path:
+            save_model(pipeline, checkpoint_path)
+
+    print("[INFO] Incremental SGD training completed successfully.")
+    return pipeline
+
+def _model_family_search_spaces(random_state: int = 42) -> dict[str, tuple[any, dict[str, list]]]:
+    """
+    Returns the candidate model families for `select_model` as {name: (estimator, parameter space)}.
+
+    xgboost is optional: without it, scikit-learn's HistGradientBoostingClassifier
+    stands in as the gradient boosting family, with early stopping on an internal
+    validation split.
+    """
+    import sklearn
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.utils.fixes import parse_version
+
+    # scikit-learn 1.8 deprecated `penalty` in favour of l1_ratio (0 = L2, 1 = L1).
+    if parse_version(sklearn.__version__) >= parse_version('1.8'):
+        regularization = {'l1_ratio': [0.0, 1.0]}
+    else:
+        regularization = {'penalty': ['l1', 'l2']}
+    spaces = {
+        'logistic_regression': (
+            LogisticRegression(random_state=random_state, solver='liblinear'),
+            {'C': [0.01, 0.1, 1.0, 10.0], **regularization},
+        ),
+        'random_forest': (
+            # n_jobs=1: the search already parallelizes across fits.
+            RandomForestClassifier(random_state=random_state, n_jobs=1),
+            {'n_estimators': [50, 100, 200], 'max_depth': [4, 8, None], 'min_samples_leaf': [1, 5]},
+        ),
+    }
+    try:
+        from xgboost import XGBClassifier
+        spaces['xgboost'] = (
+            # xgboost's own early stopping needs an eval_set, which a CV search cannot pass
+            # per fold; tree count is searched instead.
+            XGBClassifier(random_state=random_state, n_jobs=1, eval_metric='logloss', tree_method='hist'),
+            {'n_estimators': [50, 100, 200], 'max_depth': [3, 5, 7], 'learning_rate': [0.05, 0.1, 0.3]},
+        )
+    except ImportError:
+        print("[WARN] xgboost is not installed; using HistGradientBoostingClassifier for gradient boosting.")
+        spaces['hist_gradient_boosting'] = (
+            # 'auto' enables early stopping once there are more than 10k samples, where
+            # holding out a validation split is affordable.
+            HistGradientBoostingClassifier(random_state=random_state, early_stopping='auto',
+                                           validation_fraction=0.1, n_iter_no_change=10),
+            {'max_iter': [100, 300], 'max_depth': [3, 6, None], 'learning_rate': [0.05, 0.1, 0.3]},
+        )
+    return spaces
+
+
+def _measure_latency_per_row(model: any, X: pd.DataFrame, repeats: int = 5, sample_rows: int = 100) -> float:
+    """
+    Best-of-`repeats` mean wall time of single-row `model.predict` calls, in seconds.
+
+    Live readings are scored one at a time, so each of up to `sample_rows` rows is
+    predicted on its own; a batch predict would hide the per-call overhead.
+    """
+    import time
+
+    rows = [X.iloc[i:i + 1] for i in range(min(len(X), sample_rows))]
+    if not rows:
+        return 0.0
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for row in rows:
+            model.predict(row)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows)
+
+
+def select_model(X: pd.DataFrame,
+                 y: pd.Series,
+                 accuracy_floor: float = 0.85,
+                 search: str = 'grid',
+                 n_iter: int = 10,
+                 cv_folds: int = 5,
+                 n_jobs: int = -1,
+                 families: list[str] | None = None,
+                 random_state: int = 42) -> tuple[any, list[dict]]:
+    """
+    Searches hyperparameters across model families and picks the fastest adequate model.
+
+    Each family (logistic regression, random forest, gradient boosting) is tuned with a
+    grid or random search under stratified k-fold CV, scored on F1 and accuracy. Fits run
+    in a joblib process pool (`n_jobs`). The refitted best candidate of each family is then
+    timed on single-row predictions, and the family with the lowest inference latency per row whose
+    CV accuracy meets `accuracy_floor` wins. If none meets the floor, the most accurate
+    candidate is returned with a warning.
+
+    Args:
+        X: Training features.
+        y: Training target.
+        accuracy_floor: Minimum mean CV accuracy a model must reach to be eligible.
+        search: 'grid' for exhaustive search, 'random' for `n_iter` sampled settings per family.
+        n_iter: Settings sampled per family when `search='random'`.
+        cv_folds: Requested CV folds; capped by the size of the smallest class.
+        n_jobs: joblib worker processes for the search (-1 uses all cores).
+        families: Optional subset of family names to search (defaults to all available).
+        random_state: Seed for the estimators, the CV shuffling and random search.
+
+    Returns:
+        A tuple (selected model refitted on all of X, per-family result dicts). Each result
+        has 'family', 'best_params', 'cv_accuracy', 'cv_f1', 'fit_time_s' (mean per CV fit),
+        'refit_time_s', 'latency_per_row_s', 'meets_floor', 'selected' and 'model'.
+
+    Raises:
+        ValueError: If `search` is unknown, a family is unknown, or a class has fewer than two samples.
+    """
+    from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, StratifiedKFold
+
+    if search not in ('grid', 'random'):
+        raise ValueError(f"Unknown search strategy '{search}'; use 'grid' or 'random'.")
+    min_class_count = int(y.value_counts().min())
+    n_splits = min(cv_folds, min_class_count)
+    if n_splits < 2:
+        raise ValueError("Stratified CV needs at least two samples of every class.")
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+
+    spaces = _model_family_search_spaces(random_state)
+    if families is not None:
+        unknown = set(families) - set(spaces)
+        if unknown:
+            raise ValueError(f"Unknown model families: {sorted(unknown)}. Available: {sorted(spaces)}")
+        spaces = {name: spaces[name] for name in families}
+
+    results = []
+    for family, (estimator, space) in spaces.items():
+        print(f"[INFO] Model selection: searching {family} ({search} search, {n_splits}-fold CV)...")
+        common = dict(scoring={'f1': 'f1', 'accuracy': 'accuracy'}, refit='f1', cv=cv, n_jobs=n_jobs)
+        if search == 'grid':
+            searcher = GridSearchCV(estimator, space, **common)
+        else:
+            searcher = RandomizedSearchCV(estimator, space, n_iter=n_iter, random_state=random_state, **common)
+        searcher.fit(X, y)
+
+        best = searcher.best_index_
+        cv_results = searcher.cv_results_
+        results.append({
+            'family': family,
+            'best_params': searcher.best_params_,
+            'cv_accuracy': float(cv_results['mean_test_accuracy'][best]),
+            'cv_f1': float(cv_results['mean_test_f1'][best]),
+            'fit_time_s': float(cv_results['mean_fit_time'][best]),
+            'refit_time_s': float(searcher.refit_time_),
+            'latency_per_row_s': _measure_latency_per_row(searcher.best_estimator_, X),
+            'model': searcher.best_estimator_,
+        })
+
+    for result in results:
+        result['meets_floor'] = result['cv_accuracy'] >= accuracy_floor
+        result['selected'] = False
+    eligible = [result for result in results if result['meets_floor']]
+    if eligible:
+        chosen = min(eligible, key=lambda result: result['latency_per_row_s'])
+    else:
+        chosen = max(results, key=lambda result: (result['cv_accuracy'], result['cv_f1']))
+        print(f"[WARN] No model reached the accuracy floor of {accuracy_floor:.2f}; "
+              f"selecting the most accurate one ({chosen['family']}).")
+    chosen['selected'] = True
+    print(f"[INFO] Model selection completed. Selected: {chosen['family']} {chosen['best_params']}")
+    return chosen['model'], results
+
+
+def print_model_selection_report(results: list[dict], accuracy_floor: float) -> None:
+    """Prints the per-family model selection results as a table."""
+    print(f"\n--- Model Selection Report (accuracy floor: {accuracy_floor:.2f}) ---")
+    print(f"  {'Family':<24} {'CV Acc':>7} {'CV F1':>7} {'Fit (s)':>9} {'Refit (s)':>10} {'Latency/row':>12}")
+    for result in results:
+        marker = " <== selected" if result['selected'] else ("" if result['meets_floor'] else "  (below floor)")
+        print(f"  {result['family']:<24} {result['cv_accuracy']:>7.4f} {result['cv_f1']:>7.4f} "
+              f"{result['fit_time_s']:>9.3f} {result['refit_time_s']:>10.3f} "
+              f"{result['latency_per_row_s'] * 1e6:>9.2f} us{marker}")
+        print(f"    Params: {result['best_params']}")
+
 def evaluate_model(model: any,
                    X_test: pd.DataFrame,
                    y_test: pd.Series,
@@ -194,18 +791,19 @@ def evaluate_model(model: any,
             - f1 (float, weighted average)
             - cm (np.ndarray): The confusion matrix.
     """
+    from sklearn.metrics import confusion_matrix
+
     print(f"\n--- Evaluating Model Performance: {model_name} ---")
     y_pred = model.predict(X_test) # Predictions on the test set
 
-    # Calculate metrics
-    accuracy = accuracy_score(y_test, y_pred)
+    # Calculate metrics. All of them derive from the confusion matrix, so it is computed
+    # once instead of one pass over the labels per metric.
+    cm = confusion_matrix(y_test, y_pred) # Confusion matrix
     # 'weighted' average calculates metrics for each label and finds their average,
     # weighted by the number of true instances for each label (support).
     # This accounts for label imbalance.
-    precision = precision_score(y_test, y_pred, average='weighted', zero_division=0)
-    recall = recall_score(y_test, y_pred, average='weighted', zero_division=0)
-    f1 = f1_score(y_test, y_pred, average='weighted', zero_division=0)
-    cm = confusion_matrix(y_test, y_pred) # Confusion matrix
+    metrics = metrics_from_confusion_matrix(cm)
+    accuracy, precision, recall, f1 = metrics['accuracy'], metrics['precision'], metrics['recall'], metrics['f1']
 
     # Print the calculated metrics
     print(f"  Accuracy: {accuracy:.4f}")
@@ -231,10 +829,42 @@ def evaluate_model(model: any,
 
     return accuracy, precision, recall, f1, cm
 
+def evaluate_thresholds(model: any,
+                        X_test: pd.DataFrame,
+                        y_test: pd.Series,
+                        model_name: str,
+                        device_ids: pd.Series | None = None,
+                        min_recall: float | None = None,
+                        output_dir: str | None = None) -> tuple[dict, list[str]]:
+    """
+    Builds the threshold-sweep report (ROC/PR, calibration, per-device) for a model.
+
+    Args:
+        model: Trained classifier with `predict_proba`; column 1 is P(fire).
+        X_test: Test features.
+        y_test: Test labels.
+        model_name: Name recorded in the report.
+        device_ids: Optional device of every test row, for the per-device breakdown.
+        min_recall: Minimum recall for the recommended threshold.
+        output_dir: If given, the report is written there as JSON and CSV files.
+
+    Returns:
+        A tuple of (report dict, paths of the files written).
+    """
+    probabilities = model.predict_proba(X_test)[:, 1]
+    report = build_evaluation_report(y_test.to_numpy(), probabilities,
+                                     None if device_ids is None else device_ids.to_numpy(),
+                                     min_recall=min_recall, model_name=model_name)
+    print_evaluation_summary(report)
+    paths = write_evaluation_report(report, output_dir) if output_dir else []
+    return report, paths
+
 def save_model(model: any, file_path: str) -> None:
     """
     Saves the trained model to a specified file path using joblib for efficient serialization.
     This function also ensures that the directory for the model file exists before saving.
+    The model is written to a temporary file that then replaces `file_path`, so a crash
+    mid-save never leaves a truncated model (or checkpoint) behind.
 
     Args:
         model: The trained model object to be saved (e.g., a scikit-learn estimator).
@@ -245,12 +875,24 @@ def save_model(model: any, file_path: str) -> None:
         OSError: If directory creation fails (e.g., due to permission issues).
         Exception: For other errors that might occur during model serialization by joblib.
     """
+    import joblib
+
     try:
         dir_name = os.path.dirname(file_path)
         if dir_name:  # Only create the directory if the path is non-empty
             os.makedirs(dir_name, exist_ok=True)
-        # Serialize and save the model using joblib.dump
-        joblib.dump(model, file_path)
+        # Serialize to a temporary file next to the target, then atomically swap it in.
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as model_file:
+                joblib.dump(model, model_file)
+                model_file.flush()
+                os.fsync(model_file.fileno())
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
         print(f"[INFO] Model successfully saved to '{file_path}'")
     except OSError as e:
         print(f"[ERROR] Could not create directory for model at '{os.path.dirname(file_path)}': {e}")
@@ -259,12 +901,15 @@ def save_model(model: any, file_path: str) -> None:
         print(f"[ERROR] Failed to save model to '{file_path}' using joblib: {e}")
         raise # Re-raise other exceptions
 
-def load_model(file_path: str) -> any:
+def load_model(file_path: str, mmap_mode: str | None = None) -> any:
     """
     Loads a trained model from a specified file path using joblib.
 
     Args:
-        file_path: The path to the .joblib model file.
+        file_path: The path to the .joblib model file, or to a lookup table (.npz) saved
+                   by LookupTableRiskModel.save.
+        mmap_mode: joblib memory-map mode (e.g., 'r') for the model's numpy arrays, so
+                   processes loading the same uncompressed file share its pages.
 
     Returns:
         The loaded model object. This object can be used directly for predictions.
@@ -274,8 +919,18 @@ def load_model(file_path: str) -> any:
         Exception: For other errors during model deserialization by joblib (e.g.,
                    if the file is corrupted or not a valid joblib file).
     """
+    import joblib
+
+    if file_path.endswith('.npz'):  # Compiled lookup table (see lookup_table_model)
+        try:
+            from .lookup_table_model import LookupTableRiskModel
+        except ImportError:
+            from lookup_table_model import LookupTableRiskModel
+        model = LookupTableRiskModel.load(file_path)
+        print(f"[INFO] Lookup table model loaded successfully from '{file_path}'")
+        return model
     try:
-        model = joblib.load(file_path)
+        model = joblib.load(file_path, mmap_mode=mmap_mode)
         print(f"[INFO] Model loaded successfully from '{file_path}'")
         return model
     except FileNotFoundError:
@@ -285,16 +940,49 @@ def load_model(file_path: str) -> any:
         print(f"[ERROR] Failed to load model from '{file_path}'. File may be corrupted or incompatible: {e}")
         raise # Re-raise other exceptions
 
+def publish_to_registry(model: any,
+                        registry_dir: str,
+                        metrics: dict[str, float] | None = None,
+                        dataset_path: str | None = None,
+                        attachments: list[str] | None = None) -> dict:
+    """
+    Publishes a trained model as the new current version of a model registry.
+
+    Args:
+        model: The trained model.
+        registry_dir: Registry root directory (see model_registry).
+        metrics: Evaluation metrics to record in the manifest.
+        dataset_path: Training data path, recorded in the manifest.
+        attachments: Files stored alongside the model (e.g., evaluation reports).
+
+    Returns:
+        The manifest of the published version.
+    """
+    try:
+        from .model_registry import ModelRegistry
+    except ImportError:
+        from model_registry import ModelRegistry
+
+    feature_order = None if hasattr(model, 'feature_names_in_') else FEATURE_COLUMNS
+    return ModelRegistry(registry_dir).publish(model, metrics=metrics, feature_order=feature_order,
+                                               extra={'training_data': dataset_path},
+                                               attachments=attachments)
+
 def predict_saci_fire_risk(model: LogisticRegression,
                              live_temp: float,
                              live_hum: float,
-                             live_smoke_adc: float) -> tuple[int, np.ndarray]:
+                             live_smoke_adc: float,
+                             feature_engine: RollingFeatureEngine | None = None,
+                             device_id: str = 'default') -> tuple[int, np.ndarray]:
     """
     Predicts the fire risk label and associated probabilities for a given set of
     live sensor readings using a trained model.
 
     The input features must match those used during model training:
     'temperature', 'humidity', 'smoke_level'. The order must also be the same.
+    Models trained with rolling features (see saci_feature_engine) need the
+    `feature_engine` rebuilt from their `feature_names_in_`; the reading is then
+    added to the device's history and the model gets the derived features too.
 
     Args:
         model: A trained scikit-learn compatible classifier (e.g., LogisticRegression)
@@ -302,6 +990,8 @@ def predict_saci_fire_risk(model: LogisticRegression,
         live_temp: Current temperature reading (float).
         live_hum: Current humidity reading (float).
         live_smoke_adc: Current smoke sensor ADC value (float or int).
+        feature_engine: Engine holding per-device reading history, for rolling-feature models.
+        device_id: Device the reading came from (keys the engine's history).
 
     Returns:
         A tuple containing:
@@ -316,24 +1006,33 @@ def predict_saci_fire_risk(model: LogisticRegression,
         ValueError: If input data cannot be converted to the required format.
         Exception: For other errors that may occur during the prediction process.
     """
-    # Create a DataFrame from the live data with the correct feature names.
-    # This ensures the input is in the same format (and order) as the training data.
+    if feature_engine is None and hasattr(model, 'predict_reading'):  # LookupTableRiskModel
+        return model.predict_reading(live_temp, live_hum, live_smoke_adc)  # No DataFrame needed
+
+    from sklearn.exceptions import NotFittedError
+
+    # Arrange the reading in the training feature order. Inference backends take an
+    # array in their input dtype (float32 for onnxruntime) directly; native scikit-learn
+    # models get a DataFrame, since they check the feature names they were fitted with.
     try:
-        input_data = pd.DataFrame(
-            [[float(live_temp), float(live_hum), float(live_smoke_adc)]], # Ensure float type
-            columns=['temperature', 'humidity', 'smoke_level'] # Must match training feature names
-        )
+        reading = dict(zip(FEATURE_COLUMNS, [float(live_temp), float(live_hum), float(live_smoke_adc)])) # Ensure float type
+        features = feature_engine.update(device_id, reading) if feature_engine is not None else reading
+        feature_names = list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS)) # Training feature order
+        row = [features[name] for name in feature_names]
+        if isinstance(model, InferenceBackend):
+            input_data = np.array([row], dtype=model.input_dtype)
+        else:
+            import pandas as pd
+            input_data = pd.DataFrame([row], columns=feature_names)
     except ValueError as ve:
         print(f"[ERROR] Invalid input data for prediction: {ve}. Ensure inputs are numeric.")
         raise
 
     try:
-        # Get the predicted class label (e.g., 0 or 1)
-        predicted_label = model.predict(input_data)[0]
-        # Get the probabilities for each class. For a binary classification model
-        # trained with labels 0 (No Fire) and 1 (Fire), predict_proba typically returns
-        # an array like [P(No Fire), P(Fire)].
+        # One model run: for a binary model trained with labels 0 (No Fire) and 1 (Fire),
+        # predict_proba returns [P(No Fire), P(Fire)], and the label is the most probable class.
         predicted_probabilities = model.predict_proba(input_data)[0]
+        predicted_label = np.asarray(model.classes_)[np.argmax(predicted_probabilities)]
         # Ensure label is a standard Python int, as some models might return numpy int types
         return int(predicted_label), predicted_probabilities
     except NotFittedError as nfe:
@@ -344,13 +1043,65 @@ def predict_saci_fire_risk(model: LogisticRegression,
         raise # Re-raise other prediction-time errors
 
 
-# --- Main Execution Block ---
-if __name__ == '__main__':
+def predict_saci_fire_risk_batch(model: any,
+                                 readings: pd.DataFrame | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
     """
-    Main execution flow for the SACI Fire Predictor script.
-    This block orchestrates the loading of data, preprocessing, model training,
+    Predicts fire risk for many readings in one call.
+
+    Scoring a batch amortizes the per-call overhead that dominates single-reading
+    prediction. `model` may be a fitted model or an inference backend
+    (see inference_backend), e.g. an OnnxRuntimeBackend.
+
+    Args:
+        model: Fitted classifier or InferenceBackend.
+        readings: DataFrame with the model's feature columns, or an [n_rows, n_features]
+                  array in the model's feature order. Rolling-feature models expect the
+                  output of `RollingFeatureEngine.transform_frame`.
+
+    Returns:
+        A tuple of (predicted labels, [n_rows, n_classes] probabilities).
+    """
+    import pandas as pd
+
+    feature_names = list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS))
+    if isinstance(readings, pd.DataFrame):
+        input_data = readings[feature_names]
+    elif isinstance(model, InferenceBackend):
+        input_data = np.asarray(readings, dtype=model.input_dtype).reshape(-1, len(feature_names))
+    else:
+        input_data = pd.DataFrame(np.asarray(readings, dtype=float).reshape(-1, len(feature_names)),
+                                  columns=feature_names)
+    probabilities = model.predict_proba(input_data)
+    labels = np.asarray(model.classes_)[np.argmax(probabilities, axis=1)]
+    return labels, probabilities
+
+
+# --- Command-Line Pipelines ---
+def run_training_pipeline(dataset_path: str = DATASET_PATH,
+                          model_path: str = LOG_REG_MODEL_PATH,
+                          feature_engine: RollingFeatureEngine | None = None,
+                          registry_dir: str | None = None,
+                          report_dir: str | None = None,
+                          min_recall: float | None = None) -> None:
+    """
+    Main execution flow for the SACI Fire Predictor script (the default `train` command).
+    This function orchestrates the loading of data, preprocessing, model training,
     evaluation, model saving, and demonstration of prediction capabilities.
+
+    Args:
+        dataset_path: Path to the training dataset (CSV or Parquet).
+        model_path: Where to save the trained Logistic Regression model.
+        feature_engine: If given, its rolling per-device features are added to the raw
+                        readings before training (see saci_feature_engine).
+        registry_dir: If given, the model is also published to this model registry
+                      with its test-set metrics and threshold-sweep report.
+        report_dir: If given, the threshold-sweep report is written there as JSON/CSV.
+        min_recall: Minimum recall for the report's recommended threshold.
     """
+    import tempfile
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
     print("===== SACI Fire Risk Prediction Model Script Initializing =====")
 
     # --- Step 1: Load and Preprocess Data ---
@@ -358,15 +1109,19 @@ if __name__ == '__main__':
     # to handle critical errors like missing files or columns.
     try:
         print("\n[PHASE] 1. Data Loading and Preprocessing")
-        data_df = load_data(DATASET_PATH)
-        X, y = preprocess_data(data_df) # X = features, y = target
+        data_df = load_training_frame(dataset_path, feature_engine)
+        feature_columns = None
+        if feature_engine is not None:
+            feature_columns = feature_engine.feature_names
+            print(f"[INFO] Added rolling features; training on {len(feature_columns)} features.")
+        X, y = preprocess_data(data_df, feature_columns) # X = features, y = target
         print("[PHASE] 1. Data Loading and Preprocessing COMPLETED")
     except FileNotFoundError:
         # Specific handling for FileNotFoundError from load_data
-        print(f"[FATAL] Script terminated: Dataset file '{DATASET_PATH}' not found.")
+        print(f"[FATAL] Script terminated: Dataset file '{dataset_path}' not found.")
         exit(1) # Exit if data cannot be loaded
     except pd.errors.EmptyDataError:
-        print(f"[FATAL] Script terminated: Dataset file '{DATASET_PATH}' is empty.")
+        print(f"[FATAL] Script terminated: Dataset file '{dataset_path}' is empty.")
         exit(1)
     except ValueError as ve:
         # Specific handling for ValueError from preprocess_data (e.g., missing columns)
@@ -394,16 +1149,18 @@ if __name__ == '__main__':
     print("\n[PHASE] 3. Training Logistic Regression Model")
     # The train_logistic_regression function encapsulates model instantiation and fitting.
     log_reg_model = train_logistic_regression(X_train, y_train, random_state=42)
+    # Stored on the model so the live drift monitor can compare readings with the training data.
+    log_reg_model.training_profile_ = build_training_profile(X_train)
     print("[PHASE] 3. Logistic Regression Model Training COMPLETED")
 
     # --- Step 4: Save the Trained Logistic Regression Model ---
     # Models are saved to enable later use without retraining.
     print("\n[PHASE] 4. Saving Trained Model")
     try:
-        save_model(log_reg_model, LOG_REG_MODEL_PATH)
+        save_model(log_reg_model, model_path)
     except Exception as e:
         # Errors from save_model (directory creation, joblib dump) are critical.
-        print(f"[FATAL] Script terminated: Could not save the model to '{LOG_REG_MODEL_PATH}': {e}")
+        print(f"[FATAL] Script terminated: Could not save the model to '{model_path}': {e}")
         exit(1)
     print("[PHASE] 4. Model Saving COMPLETED")
 
@@ -416,6 +1173,17 @@ if __name__ == '__main__':
     )
     # Example: Further use of a specific metric
     print(f"  -> Logistic Regression weighted F1-score on test set: {lr_f1:.4f}")
+    # The threshold sweep shows what other P(fire) cut-offs would trade in false alarms vs. missed fires.
+    with tempfile.TemporaryDirectory() as temp_report_dir:
+        device_ids = data_df.loc[X_test.index, 'device_id'] if 'device_id' in data_df.columns else None
+        report, report_paths = evaluate_thresholds(
+            log_reg_model, X_test, y_test, "Logistic Regression (Primary MVP Model)", device_ids,
+            min_recall, report_dir or (temp_report_dir if registry_dir else None))
+        if registry_dir:
+            publish_to_registry(log_reg_model, registry_dir, dataset_path=dataset_path, attachments=report_paths,
+                                metrics={'accuracy': lr_accuracy, 'precision': lr_precision, 'recall': lr_recall,
+                                         'f1': lr_f1, 'roc_auc': report['summary']['roc_auc'],
+                                         'recommended_threshold': report['recommended_threshold']['threshold']})
     print("[PHASE] 5. Model Evaluation COMPLETED")
 
     # --- Step 6: Live Prediction Example (Using the Model Trained in This Session) ---
@@ -429,7 +1197,7 @@ if __name__ == '__main__':
               f"Hum={sample_hum_live}%, Smoke ADC={sample_smoke_live}")
         try:
             pred_label, pred_proba = predict_saci_fire_risk(
-                log_reg_model, sample_temp_live, sample_hum_live, sample_smoke_live
+                log_reg_model, sample_temp_live, sample_hum_live, sample_smoke_live, feature_engine
             )
             risk_status_live = "Fire Detected" if pred_label == 1 else "No Fire Detected"
             print(f"  Predicted Label: {pred_label} ({risk_status_live})")
@@ -452,15 +1220,16 @@ if __name__ == '__main__':
     sample_temp_loaded, sample_hum_loaded, sample_smoke_loaded = 45.0, 30.0, 750.0
 
     try:
-        print(f"  Attempting to load model from: '{LOG_REG_MODEL_PATH}'")
+        print(f"  Attempting to load model from: '{model_path}'")
         # Load the Logistic Regression model that was saved earlier in this script.
-        loaded_model_for_demo = load_model(LOG_REG_MODEL_PATH)
+        loaded_model_for_demo = load_model(model_path)
 
         if loaded_model_for_demo:
             print(f"  Input data for prediction with loaded model: Temp={sample_temp_loaded}°C, "
                   f"Hum={sample_hum_loaded}%, Smoke ADC={sample_smoke_loaded}")
             pred_label_loaded, pred_proba_loaded = predict_saci_fire_risk(
-                loaded_model_for_demo, sample_temp_loaded, sample_hum_loaded, sample_smoke_loaded
+                loaded_model_for_demo, sample_temp_loaded, sample_hum_loaded, sample_smoke_loaded,
+                RollingFeatureEngine.from_feature_names(getattr(loaded_model_for_demo, 'feature_names_in_', []))
             )
             risk_status_loaded = "Fire Detected" if pred_label_loaded == 1 else "No Fire Detected"
             print(f"  Predicted Label (from loaded model): {pred_label_loaded} ({risk_status_loaded})")
@@ -470,8 +1239,8 @@ if __name__ == '__main__':
             else: # Should not happen for binary logistic regression
                  print(f"  Prediction Probabilities (from loaded model): {pred_proba_loaded}")
     except FileNotFoundError:
-        # This handles if LOG_REG_MODEL_PATH does not exist (e.g., script run for the first time and save failed)
-        print(f"  [WARN] Demo with loaded model skipped: Model file '{LOG_REG_MODEL_PATH}' not found.")
+        # This handles if model_path does not exist (e.g., script run for the first time and save failed)
+        print(f"  [WARN] Demo with loaded model skipped: Model file '{model_path}' not found.")
     except Exception as e:
         # Catch other errors during loading or prediction with the loaded model
         print(f"  [WARN] Demo with loaded model skipped due to an error: {e}")
@@ -479,3 +1248,294 @@ if __name__ == '__main__':
 
     # --- Script Finished ---
     print("\n===== SACI Fire Predictor script execution finished. =====")
+
+
+def run_incremental_training_pipeline(dataset_path: str = DATASET_PATH,
+                                      model_path: str = SGD_MODEL_PATH,
+                                      chunksize: int = DEFAULT_CHUNK_ROWS,
+                                      n_epochs: int = 1,
+                                      checkpoint_every: int = 10,
+                                      eval_dataset_path: str | None = None,
+                                      resume: bool = False,
+                                      registry_dir: str | None = None) -> None:
+    """
+    Out-of-core training flow (the `train-incremental` command).
+
+    Streams the dataset in chunks through `train_incremental_sgd`, checkpointing
+    to `model_path`, and optionally evaluates the result on a separate dataset.
+
+    Args:
+        dataset_path: Training dataset (CSV or Parquet), read in chunks.
+        model_path: Checkpoint and final model path.
+        chunksize: Rows per chunk.
+        n_epochs: Passes over the data.
+        checkpoint_every: Chunks between checkpoints.
+        eval_dataset_path: Optional held-out dataset to evaluate the final model on.
+        resume: If True and `model_path` exists, continue training from the position
+                recorded in that checkpoint.
+        registry_dir: If given, the final model is also published to this model registry.
+    """
+    print("===== SACI Fire Risk Incremental (Out-of-Core) Training =====")
+    initial_model = None
+    if resume and os.path.exists(model_path):
+        initial_model = load_model(model_path)
+        print(f"[INFO] Resuming from checkpoint '{model_path}'.")
+
+    try:
+        model = train_incremental_sgd(
+            lambda: iter_training_data(dataset_path, chunksize=chunksize),
+            n_epochs=n_epochs, checkpoint_path=model_path, checkpoint_every=checkpoint_every,
+            initial_model=initial_model,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[FATAL] Script terminated: Incremental training failed: {e}")
+        exit(1)
+
+    metrics = {}
+    if eval_dataset_path:
+        X_eval, y_eval = preprocess_data(load_training_data(eval_dataset_path))
+        accuracy, precision, recall, f1, _ = evaluate_model(model, X_eval, y_eval,
+                                                            "SGD Logistic Regression (Incremental)")
+        metrics = {'accuracy': accuracy, 'precision': precision, 'recall': recall, 'f1': f1}
+    if registry_dir:
+        publish_to_registry(model, registry_dir, metrics, dataset_path)
+    print(f"\n===== Incremental training finished. Model saved to '{model_path}'. =====")
+
+
+def run_model_selection_pipeline(dataset_path: str = DATASET_PATH,
+                                 model_path: str = SELECTED_MODEL_PATH,
+                                 accuracy_floor: float = 0.85,
+                                 search: str = 'grid',
+                                 n_iter: int = 10,
+                                 cv_folds: int = 5,
+                                 n_jobs: int = -1,
+                                 registry_dir: str | None = None) -> None:
+    """
+    Model-selection flow (the `select-model` command).
+
+    Searches all model families with `select_model`, prints the comparison,
+    and saves the selected model to `model_path` (and publishes it to
+    `registry_dir` with its CV metrics, if given).
+    """
+    print("===== SACI Fire Risk Model Selection =====")
+    try:
+        X, y = preprocess_data(load_training_data(dataset_path, columns=FEATURE_COLUMNS + [TARGET_COLUMN]))
+        model, results = select_model(X, y, accuracy_floor=accuracy_floor, search=search,
+                                      n_iter=n_iter, cv_folds=cv_folds, n_jobs=n_jobs)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[FATAL] Script terminated: Model selection failed: {e}")
+        exit(1)
+    model.training_profile_ = build_training_profile(X)
+
+    print_model_selection_report(results, accuracy_floor)
+    save_model(model, model_path)
+    if registry_dir:
+        selected = next(result for result in results if result['selected'])
+        publish_to_registry(model, registry_dir, dataset_path=dataset_path, metrics={
+            'cv_accuracy': selected['cv_accuracy'], 'cv_f1': selected['cv_f1'],
+            'latency_per_row_s': selected['latency_per_row_s']})
+    print(f"\n===== Model selection finished. Selected model saved to '{model_path}'. =====")
+
+
+def run_evaluation_pipeline(model_path: str = LOG_REG_MODEL_PATH,
+                            dataset_path: str = DATASET_PATH,
+                            output_dir: str = os.path.join(MODELS_DIR, 'evaluation'),
+                            min_recall: float | None = None) -> None:
+    """
+    Evaluation flow (the `evaluate` command): threshold-sweep report of a saved model on a dataset.
+    """
+    model = load_model(model_path)
+    feature_engine = RollingFeatureEngine.from_feature_names(getattr(model, 'feature_names_in_', []))
+    data_df = load_training_frame(dataset_path, feature_engine)
+    X, y = preprocess_data(data_df, list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS)))
+    evaluate_model(model, X, y, os.path.basename(model_path))
+    _, paths = evaluate_thresholds(model, X, y, os.path.basename(model_path),
+                                   data_df.get('device_id'), min_recall, output_dir)
+    print(f"\n===== Evaluation report written: {', '.join(paths)} =====")
+
+
+def run_onnx_export_pipeline(model_path: str = LOG_REG_MODEL_PATH,
+                             onnx_path: str | None = None,
+                             dataset_path: str | None = DATASET_PATH) -> None:
+    """
+    ONNX export flow (the `export-onnx` command).
+
+    Converts a saved model to ONNX and, if a dataset is given, checks that
+    onnxruntime reproduces the native probabilities on it.
+    """
+    try:
+        from .inference_backend import OnnxRuntimeBackend, export_model_to_onnx
+    except ImportError:
+        from inference_backend import OnnxRuntimeBackend, export_model_to_onnx
+
+    onnx_path = onnx_path or os.path.splitext(model_path)[0] + '.onnx'
+    model = load_model(model_path)
+    try:
+        export_model_to_onnx(model, onnx_path, list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS)))
+    except ImportError as e:
+        print(f"[FATAL] Script terminated: ONNX export needs skl2onnx (and onnxmltools for xgboost): {e}")
+        exit(1)
+
+    if dataset_path:
+        feature_engine = RollingFeatureEngine.from_feature_names(getattr(model, 'feature_names_in_', []))
+        data_df = load_training_frame(dataset_path, feature_engine)
+        backend = OnnxRuntimeBackend(onnx_path, model.classes_)
+        _, native = predict_saci_fire_risk_batch(model, data_df)
+        _, exported = predict_saci_fire_risk_batch(backend, data_df)
+        print(f"[INFO] ONNX parity on '{dataset_path}': max |P difference| = {np.abs(native - exported).max():.2e}")
+
+
+def run_lut_compilation_pipeline(model_path: str = LOG_REG_MODEL_PATH,
+                                 lut_path: str = LUT_MODEL_PATH,
+                                 dataset_path: str | None = DATASET_PATH,
+                                 max_error: float = 0.01,
+                                 max_table_points: int = 2_000_000) -> None:
+    """
+    Lookup-table compilation flow (the `compile-lut` command).
+
+    Compiles a saved model with `compile_lookup_table`, saves the table to `lut_path`
+    (loadable with load_model) and prints its memory/latency/accuracy report against
+    the model on the dataset's readings (random readings within the bounds without one).
+    """
+    import pandas as pd
+    try:
+        from .lookup_table_model import compile_lookup_table, lookup_table_report, print_lookup_table_report
+    except ImportError:
+        from lookup_table_model import compile_lookup_table, lookup_table_report, print_lookup_table_report
+
+    print("===== SACI Fire Risk Lookup-Table Compilation =====")
+    model = load_model(model_path)
+    check_data = None
+    if dataset_path:
+        check_data = load_training_data(dataset_path, columns=FEATURE_COLUMNS)[FEATURE_COLUMNS].astype(float)
+    try:
+        lut = compile_lookup_table(model, max_error=max_error, max_table_points=max_table_points,
+                                   check_data=check_data)
+    except ValueError as e:
+        print(f"[FATAL] Script terminated: Lookup-table compilation failed: {e}")
+        exit(1)
+    lut.save(lut_path)
+
+    if check_data is None:
+        rng = np.random.default_rng(0)
+        check_data = pd.DataFrame({name: rng.uniform(*lut.axes[axis][[0, -1]], 10_000)
+                                   for axis, name in enumerate(FEATURE_COLUMNS)})
+    print_lookup_table_report(lookup_table_report(lut, model, check_data))
+
+
+def parse_arguments() -> argparse.Namespace:
+    """
+    Parses command-line arguments. Without a command, the default `train` pipeline runs.
+
+    Returns:
+        argparse.Namespace: The parsed arguments; `command` names the selected pipeline.
+    """
+    parser = argparse.ArgumentParser(
+        description="SACI fire risk model training, evaluation and prediction tools.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    train_parser = subparsers.add_parser("train", help="Train, evaluate and save the Logistic Regression model.",
+                                         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    train_parser.add_argument("--data", default=DATASET_PATH, help="Training dataset (CSV or Parquet).")
+    train_parser.add_argument("--model_path", default=LOG_REG_MODEL_PATH, help="Output model file.")
+    train_parser.add_argument("--registry_dir", default=None,
+                              help="Also publish the model as a new version of this model registry.")
+    train_parser.add_argument("--report_dir", default=None,
+                              help="Write the threshold-sweep evaluation report (JSON/CSV) here.")
+    train_parser.add_argument("--min_recall", type=float, default=None,
+                              help="Minimum recall for the report's recommended P(fire) threshold.")
+    train_parser.add_argument("--rolling_features", action="store_true",
+                              help="Add per-device rolling mean/slope/EWMA/delta features.")
+    train_parser.add_argument("--windows", type=int, nargs="+", default=list(DEFAULT_WINDOWS),
+                              help="Rolling window lengths, in readings.")
+    train_parser.add_argument("--ewma_spans", type=int, nargs="+", default=list(DEFAULT_EWMA_SPANS),
+                              help="EWMA spans, in readings.")
+
+    incremental_parser = subparsers.add_parser(
+        "train-incremental", help="Train an SGD logistic model out-of-core on chunked data.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    incremental_parser.add_argument("--data", default=DATASET_PATH, help="Training dataset (CSV or Parquet).")
+    incremental_parser.add_argument("--model_path", default=SGD_MODEL_PATH, help="Checkpoint and output model file.")
+    incremental_parser.add_argument("--registry_dir", default=None,
+                                    help="Also publish the model as a new version of this model registry.")
+    incremental_parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per chunk.")
+    incremental_parser.add_argument("--epochs", type=int, default=1,
+                                    help="Total passes over the data (a resumed run continues up to this many).")
+    incremental_parser.add_argument("--checkpoint_every", type=int, default=10, help="Chunks between checkpoints.")
+    incremental_parser.add_argument("--eval_data", default=None, help="Optional held-out dataset for evaluation.")
+    incremental_parser.add_argument("--resume", action="store_true",
+                                    help="Continue from the position recorded in an existing checkpoint.")
+
+    selection_parser = subparsers.add_parser(
+        "select-model", help="Search model families and hyperparameters; save the fastest adequate model.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    selection_parser.add_argument("--data", default=DATASET_PATH, help="Training dataset (CSV or Parquet).")
+    selection_parser.add_argument("--model_path", default=SELECTED_MODEL_PATH, help="Output model file.")
+    selection_parser.add_argument("--registry_dir", default=None,
+                                  help="Also publish the model as a new version of this model registry.")
+    selection_parser.add_argument("--accuracy_floor", type=float, default=0.85,
+                                  help="Minimum CV accuracy for a model to be eligible.")
+    selection_parser.add_argument("--search", choices=["grid", "random"], default="grid", help="Search strategy.")
+    selection_parser.add_argument("--n_iter", type=int, default=10, help="Settings per family for random search.")
+    selection_parser.add_argument("--cv_folds", type=int, default=5, help="Stratified CV folds.")
+    selection_parser.add_argument("--n_jobs", type=int, default=-1, help="Worker processes (-1 = all cores).")
+
+    evaluate_parser = subparsers.add_parser(
+        "evaluate", help="Write a threshold-sweep evaluation report (ROC/PR, calibration, per-device).",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    evaluate_parser.add_argument("--model_path", default=LOG_REG_MODEL_PATH, help="Saved model to evaluate.")
+    evaluate_parser.add_argument("--data", default=DATASET_PATH, help="Labelled dataset (CSV or Parquet).")
+    evaluate_parser.add_argument("--output_dir", default=os.path.join(MODELS_DIR, 'evaluation'),
+                                 help="Directory for the JSON/CSV report.")
+    evaluate_parser.add_argument("--min_recall", type=float, default=None,
+                                 help="Minimum recall for the recommended P(fire) threshold.")
+
+    export_parser = subparsers.add_parser(
+        "export-onnx", help="Export a saved model to ONNX for the onnxruntime inference backend.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    export_parser.add_argument("--model_path", default=LOG_REG_MODEL_PATH, help="Saved model to export.")
+    export_parser.add_argument("--onnx_path", default=None, help="Output file (default: model path with .onnx).")
+    export_parser.add_argument("--data", default=DATASET_PATH,
+                               help="Dataset for the parity check against the native model ('' to skip).")
+
+    lut_parser = subparsers.add_parser(
+        "compile-lut", help="Compile a saved model into a lookup table scored by trilinear interpolation.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    lut_parser.add_argument("--model_path", default=LOG_REG_MODEL_PATH, help="Saved model to compile.")
+    lut_parser.add_argument("--lut_path", default=LUT_MODEL_PATH, help="Output lookup table (.npz).")
+    lut_parser.add_argument("--data", default=DATASET_PATH,
+                            help="Dataset whose readings are verified and used for the report ('' to skip).")
+    lut_parser.add_argument("--max_error", type=float, default=0.01,
+                            help="Bound on the |P(fire)| difference from the model.")
+    lut_parser.add_argument("--max_table_points", type=int, default=2_000_000,
+                            help="Largest grid (nodes) the refinement may build.")
+
+    return parser.parse_args()
+
+
+# --- Main Execution Block ---
+if __name__ == '__main__':
+    args = parse_arguments()
+    if args.command == "train-incremental":
+        run_incremental_training_pipeline(args.data, args.model_path, args.chunksize, args.epochs,
+                                          args.checkpoint_every, args.eval_data, args.resume, args.registry_dir)
+    elif args.command == "evaluate":
+        run_evaluation_pipeline(args.model_path, args.data, args.output_dir, args.min_recall)
+    elif args.command == "export-onnx":
+        run_onnx_export_pipeline(args.model_path, args.onnx_path, args.data)
+    elif args.command == "compile-lut":
+        run_lut_compilation_pipeline(args.model_path, args.lut_path, args.data, args.max_error,
+                                     args.max_table_points)
+    elif args.command == "select-model":
+        run_model_selection_pipeline(args.data, args.model_path, args.accuracy_floor, args.search,
+                                     args.n_iter, args.cv_folds, args.n_jobs, args.registry_dir)
+    elif args.command == "train":
+        feature_engine = None
+        if args.rolling_features:
+            feature_engine = RollingFeatureEngine(FEATURE_COLUMNS, args.windows, args.ewma_spans)
+        run_training_pipeline(args.data, args.model_path, feature_engine, args.registry_dir,
+                              args.report_dir, args.min_recall)
+    else:
+        run_training_pipeline()
@@ -0,0 +1,183 @@
+"""
+ANHANGÁ Route Cache
+
+Emergency traffic concentrates on a few sender/recipient pairs (the coordination
+center and its field teams), so most messages would repeat the same path search.
+RouteCache keeps the paths MeshRouter found, keyed by (sender, recipient, priority
+class), in LRU order with a bound on the number of entries.
+
+Entries are invalidated selectively. A reverse index maps every link and node to the
+cached entries whose primary or backup paths use it, and the cache follows the
+topology's change notifications:
+
+- A link on a cached path that fails, or whose cost for the entry's priority class
+  rises (higher latency, lower reliability or bandwidth), drops that entry only.
+- A node on a cached path that goes down drops the entries through it.
+- Links that get better or come back up, and new nodes or links, drop nothing: the
+  cached paths still work, though a cheaper one may now exist. `max_age_seconds`
+  bounds how long such an entry is served.
+
+Paths are cached as node and link indices, not the router's arcs: adding a node or link
+rebuilds and re-sorts the arc arrays, while node and link indices never change.
+
+Unreachable recipients are not cached, so a recovered link is used right away.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# The fallback covers running this file directly as a script.
+try:
+    from .anhanga_routing import (DEFAULT_BACKUP_PATHS, DEFAULT_PRIORITY, MeshRoute, MeshRouter,
+                                  priority_class)
+except ImportError:
+    from anhanga_routing import (DEFAULT_BACKUP_PATHS, DEFAULT_PRIORITY, MeshRoute, MeshRouter,
+                                 priority_class)
+
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_AGE_SECONDS = 300.0
+
+RouteKey = Tuple[int, int, str]   # (sender node, recipient node, priority class)
+
+
+class _CacheEntry:
+    """Cached paths of one key: (nodes, links, cost) best first, with the cost of each link when cached."""
+    __slots__ = ("paths", "link_costs", "nodes", "created")
+
+    def __init__(self, paths: List[Tuple[List[int], List[int], float]], link_costs: Dict[int, float],
+                 nodes: Set[int], created: float):
+        self.paths = paths
+        self.link_costs = link_costs
+        self.nodes = nodes
+        self.created = created
+
+
+class RouteCache:
+    """
+    LRU cache of MeshRouter paths with selective invalidation on topology changes.
+    """
+    def __init__(self, router: MeshRouter, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_age_seconds: Optional[float] = DEFAULT_MAX_AGE_SECONDS,
+                 n_backups: int = DEFAULT_BACKUP_PATHS):
+        """
+        Initializes the RouteCache and subscribes it to the router's topology.
+
+        Args:
+            router: The router whose paths are cached.
+            max_entries: Entries kept; the least recently used one is evicted beyond it.
+            max_age_seconds: Entries older than this are recomputed (None: no limit).
+            n_backups: Link-disjoint backup paths found with every primary path.
+        """
+        self.router = router
+        self.max_entries = max(int(max_entries), 1)
+        self.max_age_seconds = max_age_seconds
+        self.n_backups = n_backups
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0   # Entries dropped by topology changes
+        self.evictions = 0       # Entries dropped by the size bound or their age
+        self._entries: "OrderedDict[RouteKey, _CacheEntry]" = OrderedDict()
+        self._by_link: Dict[int, Set[RouteKey]] = {}
+        self._by_node: Dict[int, Set[RouteKey]] = {}
+        self._lock = threading.RLock()
+        self._unsubscribe = router.topology.subscribe(self._on_topology_change)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def route(self, sender_id: str, recipient_id: str, priority: str = DEFAULT_PRIORITY,
+              message_bytes: Optional[int] = None) -> Optional[Tuple[MeshRoute, List[MeshRoute]]]:
+        """
+        Same as `MeshRouter.route` (with this cache's `n_backups`), served from the cache when possible.
+
+        Raises:
+            KeyError: If the sender or recipient is not a node of the mesh.
+        """
+        topology = self.router.topology
+        key = (topology.node_index[sender_id], topology.node_index[recipient_id], priority_class(priority))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.max_age_seconds is not None \
+                    and time.monotonic() - entry.created > self.max_age_seconds:
+                self._drop(key)
+                self.evictions += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                paths = self.router._find_paths(key[0], key[1], key[2], self.n_backups)
+                if not paths:
+                    return None
+                entry = self._store(key, paths)
+        routes = [self.router._describe_links(nodes, links, cost, message_bytes)
+                  for nodes, links, cost in entry.paths]
+        return routes[0], routes[1:]
+
+    def invalidate(self) -> None:
+        """Drops every entry (e.g., after reloading link measurements in bulk)."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_link.clear()
+            self._by_node.clear()
+
+    def close(self) -> None:
+        """Drops every entry and stops following the topology's changes."""
+        self._unsubscribe()
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy as a JSON-friendly dict."""
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations, "evictions": self.evictions}
+
+    # ---- Entries and the reverse index ----
+
+    def _store(self, key: RouteKey, paths: List[Tuple[List[int], float]]) -> _CacheEntry:
+        router = self.router
+        _, arc_target, arc_link = router.topology.arcs()
+        paths = [([key[0]] + [arc_target[arc] for arc in arcs], [arc_link[arc] for arc in arcs], cost)
+                 for arcs, cost in paths]
+        links = {link for _, path_links, _ in paths for link in path_links}
+        nodes = {node for path_nodes, _, _ in paths for node in path_nodes}
+        entry = _CacheEntry(paths, {link: router._link_cost(link, key[2]) for link in links}, nodes,
+                            time.monotonic())
+        self._entries[key] = entry
+        for link in links:
+            self._by_link.setdefault(link, set()).add(key)
+        for node in nodes:
+            self._by_node.setdefault(node, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+        return entry
+
+    def _drop(self, key: RouteKey) -> None:
+        entry = self._entries.pop(key)
+        for index, members in ((self._by_link, entry.link_costs), (self._by_node, entry.nodes)):
+            for element in members:
+                keys = index[element]
+                keys.discard(key)
+                if not keys:
+                    del index[element]
+
+    def _on_topology_change(self, kind: str, index: Optional[int]) -> None:
+        with self._lock:
+            if kind == "link":
+                stale = [key for key in self._by_link.get(index, ())
+                         if self.router._link_cost(index, key[2]) > self._entries[key].link_costs[index]]
+            elif kind == "node" and not self.router.topology.node_up[index]:
+                stale = list(self._by_node.get(index, ()))
+            else:
+                return
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
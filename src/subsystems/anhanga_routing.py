@@ -0,0 +1,485 @@
+"""
+ANHANGÁ Mesh Routing Engine
+
+This module defines the mesh topology behind AnhangaMeshNetwork and the router that
+picks paths for emergency messages.
+
+MeshTopology keeps nodes and bidirectional radio links in flat lists indexed by
+integer IDs. Each link has a latency (seconds), a reliability (probability that a
+transmission over it succeeds) and a bandwidth (kbit/s). The router searches a CSR
+arc array (two arcs per link) built from them. Attribute and status changes are
+written in place and announced to subscribers; only adding nodes or links rebuilds
+the arc arrays.
+
+MeshRouter runs A* with a binary heap (heapq) over the arcs. An arc's cost is:
+
+    latency + serialization time of the message + penalty(priority) * -ln(reliability)
+
+so higher-priority messages trade latency for reliable links. The A* heuristic uses
+landmarks (ALT): path costs from a few far-apart nodes, precomputed per priority
+level with scipy's compiled Dijkstra, bound the remaining cost from below through
+the triangle inequality. The bound is admissible and consistent, so the first path
+popped is optimal. Geographic distance makes a weak bound here, because the
+per-hop serialization time and reliability penalty do not scale with distance.
+Backup paths are found greedily: each one is the best path avoiding the links of
+the paths before it (link-disjoint).
+"""
+
+import heapq
+import math
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+PRIORITY_LEVELS = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+DEFAULT_PRIORITY = "MEDIUM"
+# Seconds of path cost per nat of link unreliability (-ln reliability), per priority level.
+RELIABILITY_PENALTY_SECONDS = {"CRITICAL": 20.0, "HIGH": 10.0, "MEDIUM": 2.0, "LOW": 0.0}
+DEFAULT_MESSAGE_BYTES = 1024
+DEFAULT_BACKUP_PATHS = 2
+DEFAULT_LINK_LATENCY_SECONDS = 0.05
+DEFAULT_LINK_RELIABILITY = 0.99
+DEFAULT_LINK_BANDWIDTH_KBPS = 250.0   # IEEE 802.15.4 radio
+DEFAULT_LANDMARKS = 8
+BOUNDS_CACHE_SIZE = 32   # Recent recipients whose A* bounds are kept (many-to-one traffic reuses them)
+
+# Listener(kind, index): kind is "link" or "node" (index of the changed element) or
+# "structure" (index None: nodes or links were added).
+TopologyListener = Callable[[str, Optional[int]], None]
+
+
+class MeshTopology:
+    """
+    Mesh network nodes and bidirectional links with latency, reliability and bandwidth.
+    """
+    def __init__(self):
+        self.node_ids: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.node_up: List[bool] = []
+        self.positions: List[Optional[Tuple[float, float]]] = []   # (latitude, longitude)
+        self.link_nodes: List[Tuple[int, int]] = []
+        self.link_index: Dict[Tuple[int, int], int] = {}           # (low, high) node indices -> link
+        self.link_latency_seconds: List[float] = []
+        self.link_reliability: List[float] = []
+        self.link_bandwidth_kbps: List[float] = []
+        self.link_up: List[bool] = []
+        self._arcs: Optional[Tuple[List[int], List[int], List[int]]] = None
+        self._listeners: List[TopologyListener] = []
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_links(self) -> int:
+        return len(self.link_nodes)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "MeshTopology":
+        """
+        Builds a topology from {"nodes": [...], "links": [...]}.
+
+        Nodes are IDs or dicts with `id` and optional `position` (latitude, longitude) and
+        `status`. Links are dicts with `source`, `target` and optional `latency_ms`,
+        `reliability`, `bandwidth_kbps` and `status`. A status other than "active"/"up"
+        marks the element as down.
+        """
+        topology = cls()
+        for node in data.get("nodes", []):
+            if isinstance(node, Mapping):
+                topology.add_node(str(node["id"]), node.get("position"))
+                if not _is_up(node.get("status")):
+                    topology.set_node_up(str(node["id"]), False)
+            else:
+                topology.add_node(str(node))
+        for link in data.get("links", []):
+            latency_ms = link.get("latency_ms")
+            topology.add_link(str(link["source"]), str(link["target"]),
+                              latency_seconds=None if latency_ms is None else float(latency_ms) / 1000.0,
+                              reliability=link.get("reliability"), bandwidth_kbps=link.get("bandwidth_kbps"))
+            if not _is_up(link.get("status")):
+                topology.set_link_up(str(link["source"]), str(link["target"]), False)
+        return topology
+
+    def subscribe(self, listener: TopologyListener) -> Callable[[], None]:
+        """
+        Calls `listener(kind, index)` after every change (see TopologyListener).
+
+        Returns:
+            A function that unsubscribes the listener.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _changed(self, kind: str, index: Optional[int]) -> None:
+        if kind == "structure":
+            self._arcs = None
+        for listener in self._listeners:
+            listener(kind, index)
+
+    def add_node(self, node_id: str, position: Optional[Sequence[float]] = None) -> int:
+        """Adds a node (or sets the position of an existing one) and returns its index."""
+        index = self.node_index.get(node_id)
+        if index is None:
+            index = self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.node_up.append(True)
+            self.positions.append(None)
+        if position is not None:
+            self.positions[index] = (float(position[0]), float(position[1]))
+        self._changed("structure", None)
+        return index
+
+    def add_link(self, node_a: str, node_b: str, latency_seconds: Optional[float] = None,
+                 reliability: Optional[float] = None, bandwidth_kbps: Optional[float] = None) -> int:
+        """
+        Adds a bidirectional link (adding unknown nodes), or updates an existing one.
+
+        Returns:
+            The link index.
+        """
+        a = self.node_index[node_a] if node_a in self.node_index else self.add_node(node_a)
+        b = self.node_index[node_b] if node_b in self.node_index else self.add_node(node_b)
+        key = (min(a, b), max(a, b))
+        if key in self.link_index:
+            self.update_link(node_a, node_b, latency_seconds, reliability, bandwidth_kbps)
+            return self.link_index[key]
+        link = self.link_index[key] = len(self.link_nodes)
+        self.link_nodes.append(key)
+        self.link_latency_seconds.append(DEFAULT_LINK_LATENCY_SECONDS if latency_seconds is None
+                                         else max(float(latency_seconds), 0.0))
+        self.link_reliability.append(DEFAULT_LINK_RELIABILITY if reliability is None
+                                     else min(max(float(reliability), 0.0), 1.0))
+        self.link_bandwidth_kbps.append(DEFAULT_LINK_BANDWIDTH_KBPS if bandwidth_kbps is None
+                                        else float(bandwidth_kbps))
+        self.link_up.append(True)
+        self._changed("structure", None)
+        return link
+
+    def link_between(self, node_a: str, node_b: str) -> int:
+        """
+        Index of the link between two nodes.
+
+        Raises:
+            KeyError: If there is no such link.
+        """
+        a, b = self.node_index[node_a], self.node_index[node_b]
+        return self.link_index[(min(a, b), max(a, b))]
+
+    def update_link(self, node_a: str, node_b: str, latency_seconds: Optional[float] = None,
+                    reliability: Optional[float] = None, bandwidth_kbps: Optional[float] = None) -> None:
+        """Updates a link's attributes in place (None keeps the current value)."""
+        link = self.link_between(node_a, node_b)
+        if latency_seconds is not None:
+            self.link_latency_seconds[link] = max(float(latency_seconds), 0.0)
+        if reliability is not None:
+            self.link_reliability[link] = min(max(float(reliability), 0.0), 1.0)
+        if bandwidth_kbps is not None:
+            self.link_bandwidth_kbps[link] = float(bandwidth_kbps)
+        self._changed("link", link)
+
+    def set_link_up(self, node_a: str, node_b: str, up: bool) -> None:
+        """Marks a link as working or failed."""
+        link = self.link_between(node_a, node_b)
+        self.link_up[link] = bool(up)
+        self._changed("link", link)
+
+    def set_node_up(self, node_id: str, up: bool) -> None:
+        """Marks a node as working or failed (a failed node relays nothing)."""
+        node = self.node_index[node_id]
+        self.node_up[node] = bool(up)
+        self._changed("node", node)
+
+    def arcs(self) -> Tuple[List[int], List[int], List[int]]:
+        """
+        CSR arcs as Python lists (fastest to index from a heapq loop): (arc_ptr, arc_target,
+        arc_link). Arcs of node u are arc_ptr[u]:arc_ptr[u+1]; each link has one arc per
+        direction. Built on first use after a structural change.
+        """
+        if self._arcs is None:
+            ends = np.asarray(self.link_nodes, dtype=np.int64).reshape(-1, 2)
+            sources = np.concatenate([ends[:, 0], ends[:, 1]])
+            targets = np.concatenate([ends[:, 1], ends[:, 0]])
+            links = np.concatenate([np.arange(len(ends))] * 2)
+            order = np.argsort(sources, kind="stable")
+            arc_ptr = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=self.num_nodes))])
+            self._arcs = (arc_ptr.tolist(), targets[order].tolist(), links[order].tolist())
+        return self._arcs
+
+
+def priority_class(priority: Any) -> str:
+    """The priority level routing uses for a message's `priority_level` (DEFAULT_PRIORITY if unknown)."""
+    return priority if priority in RELIABILITY_PENALTY_SECONDS else DEFAULT_PRIORITY
+
+
+def _is_up(status: Any) -> bool:
+    return status is None or str(status).strip().lower() in ("active", "up", "operational", "online")
+
+
+class MeshRoute:
+    """
+    A path through the mesh.
+
+    Attributes:
+        nodes: Node IDs from sender to recipient.
+        links: Link indices along the path.
+        delivery_time_seconds: Sum of link latencies and serialization times.
+        reliability: Probability that every hop succeeds (product of link reliabilities).
+        cost: Search cost of the path for the priority it was found for.
+    """
+    def __init__(self, nodes: List[str], links: List[int], delivery_time_seconds: float,
+                 reliability: float, cost: float):
+        self.nodes = nodes
+        self.links = links
+        self.delivery_time_seconds = delivery_time_seconds
+        self.reliability = reliability
+        self.cost = cost
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+
+class MeshRouter:
+    """
+    Priority-aware shortest-path routing over a MeshTopology (A* / Dijkstra with heapq).
+    """
+    def __init__(self, topology: MeshTopology, message_bytes: int = DEFAULT_MESSAGE_BYTES,
+                 n_landmarks: int = DEFAULT_LANDMARKS):
+        """
+        Initializes the MeshRouter.
+
+        Args:
+            topology: The mesh topology; the router follows its changes.
+            message_bytes: Nominal message size used in the arc costs.
+            n_landmarks: Landmarks of the A* lower bound (0: plain Dijkstra).
+        """
+        self.topology = topology
+        self.message_bytes = message_bytes
+        self.n_landmarks = n_landmarks
+        self._arc_costs: Dict[str, List[float]] = {}       # Per priority, built on first use
+        self._landmark_costs: Dict[str, np.ndarray] = {}   # Per priority: landmark x node path costs
+        self._bounds: "OrderedDict[Tuple[int, str], Tuple[np.ndarray, List[float]]]" = OrderedDict()
+        self._landmark_link_costs: Dict[str, List[float]] = {}  # Per priority: link costs the landmarks saw
+        self._unsubscribe = topology.subscribe(self._on_topology_change)
+
+    def close(self) -> None:
+        """Stops following the topology's changes; do not route with this router afterwards."""
+        self._unsubscribe()
+
+    def _on_topology_change(self, kind: str, index: Optional[int]) -> None:
+        if kind == "structure":
+            self._arc_costs.clear()
+            self._landmark_costs.clear()
+            self._landmark_link_costs.clear()
+        elif kind == "link":
+            for priority, seen in list(self._landmark_link_costs.items()):
+                if self._link_cost(index, priority, ignore_status=True) < seen[index]:
+                    # A link cheaper than when the landmarks were computed can shorten paths
+                    # below their bounds. Dearer links keep the bounds valid, and so do
+                    # failures and repairs: the landmarks see every link as up.
+                    del self._landmark_costs[priority], self._landmark_link_costs[priority]
+            if self._arc_costs:
+                arcs = self._link_arcs(index)
+                for priority, costs in self._arc_costs.items():
+                    cost = self._link_cost(index, priority)
+                    for arc in arcs:
+                        costs[arc] = cost
+        # Node status is checked during the search; the bounds ignore it (still valid).
+
+    def _link_arcs(self, link: int) -> Tuple[int, int]:
+        arc_ptr, arc_target, _ = self.topology.arcs()
+        a, b = self.topology.link_nodes[link]
+        return (next(arc for arc in range(arc_ptr[a], arc_ptr[a + 1]) if arc_target[arc] == b),
+                next(arc for arc in range(arc_ptr[b], arc_ptr[b + 1]) if arc_target[arc] == a))
+
+    def _link_cost(self, link: int, priority: str, message_bytes: Optional[int] = None,
+                   ignore_status: bool = False) -> float:
+        topology = self.topology
+        reliability = topology.link_reliability[link]
+        bandwidth = topology.link_bandwidth_kbps[link]
+        if not (topology.link_up[link] or ignore_status) or reliability <= 0.0 or bandwidth <= 0.0:
+            return math.inf
+        serialization = (message_bytes or self.message_bytes) * 8 / (bandwidth * 1000.0)
+        return (topology.link_latency_seconds[link] + serialization
+                - RELIABILITY_PENALTY_SECONDS[priority] * math.log(reliability))
+
+    def _costs(self, priority: str) -> List[float]:
+        """Cost of every arc for a priority level, built on first use."""
+        costs = self._arc_costs.get(priority)
+        if costs is None:
+            _, _, arc_link = self.topology.arcs()
+            link_costs = [self._link_cost(link, priority) for link in range(self.topology.num_links)]
+            costs = self._arc_costs[priority] = [link_costs[link] for link in arc_link]
+        return costs
+
+    def _landmarks(self, priority: str) -> Optional[np.ndarray]:
+        """
+        Path costs from each landmark to every node for a priority level (inf: unreachable).
+
+        Landmarks are picked farthest-first: each one is the node whose cost from the
+        landmarks so far is largest. They are computed with scipy's compiled Dijkstra,
+        with every link taken as up, on first use and again after a link gets cheaper
+        than it was then.
+        """
+        if self.n_landmarks <= 0 or self.topology.num_nodes == 0:
+            return None
+        table = self._landmark_costs.get(priority)
+        if table is None:
+            from scipy.sparse import csr_matrix
+            from scipy.sparse.csgraph import dijkstra
+
+            arc_ptr, arc_target, arc_link = self.topology.arcs()
+            n_nodes = self.topology.num_nodes
+            link_costs = [self._link_cost(link, priority, ignore_status=True) for link in range(self.topology.num_links)]
+            graph = csr_matrix((np.asarray(link_costs)[arc_link], arc_target, arc_ptr), shape=(n_nodes, n_nodes))
+            rows = []
+            closest = np.full(n_nodes, np.inf)
+            landmark = int(np.argmax(np.diff(arc_ptr)))  # Start from the best-connected node
+            for _ in range(min(self.n_landmarks, n_nodes)):
+                rows.append(dijkstra(graph, indices=landmark))
+                closest = np.minimum(closest, rows[-1])
+                spread = np.where(np.isfinite(closest), closest, -1.0)
+                landmark = int(np.argmax(spread))
+                if spread[landmark] <= 0:
+                    break
+            table = self._landmark_costs[priority] = np.vstack(rows)
+            self._landmark_link_costs[priority] = link_costs
+        return table
+
+    def lower_bounds(self, target: int, priority: str = DEFAULT_PRIORITY) -> Optional[List[float]]:
+        """
+        Lower bound on the path cost from every node to `target` (the A* heuristic).
+
+        By the triangle inequality, cost(v, t) >= |cost(L, t) - cost(L, v)| for every
+        landmark L, on an undirected mesh.
+        """
+        table = self._landmarks(priority)
+        if table is None:
+            return None
+        key = (target, priority)
+        cached = self._bounds.get(key)
+        if cached is not None and cached[0] is table:   # Computed from the current landmarks
+            self._bounds.move_to_end(key)
+            return cached[1]
+        to_target = table[:, target:target + 1]
+        known = np.isfinite(table) & np.isfinite(to_target)
+        bounds = np.where(known, np.abs(table - np.where(known, to_target, 0.0)), 0.0).max(axis=0).tolist()
+        self._bounds[key] = (table, bounds)
+        if len(self._bounds) > BOUNDS_CACHE_SIZE:
+            self._bounds.popitem(last=False)
+        return bounds
+
+    def shortest_path(self, source: int, target: int, priority: str = DEFAULT_PRIORITY,
+                      excluded_links: Optional[Set[int]] = None,
+                      bounds: Optional[List[float]] = None) -> Optional[Tuple[List[int], float]]:
+        """
+        Cheapest path between two node indices.
+
+        Args:
+            source: Node index of the sender.
+            target: Node index of the recipient.
+            priority: Priority level of the arc costs.
+            excluded_links: Links the path must not use.
+            bounds: `lower_bounds(target, priority)`, if already computed.
+
+        Returns:
+            (arcs along the path, cost), or None if the target is unreachable.
+        """
+        if bounds is None:
+            bounds = self.lower_bounds(target, priority)
+        costs = self._costs(priority)
+        arc_ptr, arc_target, arc_link = self.topology.arcs()
+        node_up = self.topology.node_up
+
+        best = [math.inf] * len(node_up)
+        best[source] = 0.0
+        parent = {source: (-1, -1)}   # node -> (previous node, arc from it)
+        heap = [(0.0, 0.0, source)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        while heap:
+            _, cost, node = heappop(heap)
+            if node == target:
+                break
+            if cost > best[node]:
+                continue  # Stale heap entry
+            for arc in range(arc_ptr[node], arc_ptr[node + 1]):
+                next_cost = cost + costs[arc]
+                neighbor = arc_target[arc]
+                if next_cost < best[neighbor] and node_up[neighbor]:
+                    if excluded_links and arc_link[arc] in excluded_links:
+                        continue
+                    best[neighbor] = next_cost
+                    parent[neighbor] = (node, arc)
+                    heappush(heap, (next_cost + bounds[neighbor] if bounds else next_cost, next_cost, neighbor))
+        else:
+            return None
+
+        arcs = []
+        node, arc = parent[target]
+        while arc >= 0:
+            arcs.append(arc)
+            node, arc = parent[node]
+        return arcs[::-1], best[target]
+
+    def route(self, sender_id: str, recipient_id: str, priority: str = DEFAULT_PRIORITY,
+              n_backups: int = DEFAULT_BACKUP_PATHS,
+              message_bytes: Optional[int] = None) -> Optional[Tuple[MeshRoute, List[MeshRoute]]]:
+        """
+        Best path between two nodes plus up to `n_backups` link-disjoint backup paths.
+
+        Args:
+            sender_id: Node sending the message.
+            recipient_id: Node receiving it.
+            priority: Priority level (see PRIORITY_LEVELS); unknown levels use DEFAULT_PRIORITY.
+            n_backups: Backup paths to look for.
+            message_bytes: Message size for the delivery time estimate (default: the nominal size).
+
+        Returns:
+            (primary route, backup routes), or None if the recipient is unreachable.
+
+        Raises:
+            KeyError: If the sender or recipient is not a node of the mesh.
+        """
+        topology = self.topology
+        source, target = topology.node_index[sender_id], topology.node_index[recipient_id]
+        paths = self._find_paths(source, target, priority_class(priority), n_backups)
+        if not paths:
+            return None
+        routes = [self._describe(source, arcs, cost, message_bytes) for arcs, cost in paths]
+        return routes[0], routes[1:]
+
+    def _find_paths(self, source: int, target: int, priority: str,
+                    n_backups: int) -> List[Tuple[List[int], float]]:
+        """The primary path and link-disjoint backups as (arcs, cost), best first (empty if unreachable)."""
+        if not (self.topology.node_up[source] and self.topology.node_up[target]):
+            return []
+        _, _, arc_link = self.topology.arcs()
+        paths: List[Tuple[List[int], float]] = []
+        used_links: Set[int] = set()
+        bounds = self.lower_bounds(target, priority)
+        for _ in range(1 + max(n_backups, 0)):
+            found = self.shortest_path(source, target, priority, used_links, bounds)
+            if found is None:
+                break
+            paths.append(found)
+            used_links.update(arc_link[arc] for arc in found[0])
+            if not found[0]:
+                break  # Sender is the recipient
+        return paths
+
+    def _describe(self, source: int, arcs: List[int], cost: float, message_bytes: Optional[int]) -> MeshRoute:
+        _, arc_target, arc_link = self.topology.arcs()
+        return self._describe_links([source] + [arc_target[arc] for arc in arcs], [arc_link[arc] for arc in arcs],
+                                    cost, message_bytes)
+
+    def _describe_links(self, nodes: List[int], links: List[int], cost: float,
+                        message_bytes: Optional[int]) -> MeshRoute:
+        """A path given by node and link indices, which (unlike arcs) survive structural changes."""
+        topology = self.topology
+        bits = (message_bytes or self.message_bytes) * 8
+        delivery = sum(topology.link_latency_seconds[link] + bits / (topology.link_bandwidth_kbps[link] * 1000.0)
+                       for link in links)
+        reliability = math.prod(topology.link_reliability[link] for link in links)
+        return MeshRoute([topology.node_ids[node] for node in nodes], links, delivery, reliability, cost)
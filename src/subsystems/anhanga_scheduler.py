@@ -0,0 +1,344 @@
+"""
+ANHANGÁ Link Scheduler
+
+Mesh radio links carry tens to hundreds of kbit/s, so during an emergency bulk LOW
+traffic (status reports, media) can fill a link and hold back evacuation orders.
+LinkScheduler queues the messages waiting for one outgoing link, one queue per
+priority level:
+
+- Strict priority: CRITICAL messages always go first.
+- Weighted fair queueing for the other levels: deficit round robin (DRR). Each turn a
+  level earns `weight * quantum_bytes` of credit and sends while its credit covers
+  the message at the head of its queue. A saturating level cannot starve the others;
+  each gets its weight's share of the capacity the CRITICAL traffic leaves.
+- Bandwidth is a token bucket filled at the link's rate, holding up to `burst_bytes`.
+  A message leaves when the bucket holds its size in bits.
+- Each level's queue holds at most `max_queue_bytes`; arrivals beyond it are dropped.
+
+The scheduler does not keep time itself: callers pass `now` (seconds) to every call,
+so the same code runs behind AnhangaMeshNetwork (monotonic clock) and in
+discrete-event simulations (simulated clock). MeshSendPipeline keeps one scheduler
+per directed link of a MeshTopology and follows its bandwidth changes.
+"""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# The fallback covers running this file directly as a script.
+try:
+    from .anhanga_routing import PRIORITY_LEVELS, MeshTopology, priority_class
+except ImportError:
+    from anhanga_routing import PRIORITY_LEVELS, MeshTopology, priority_class
+
+
+STRICT_PRIORITY_LEVELS = ("CRITICAL",)
+FAIR_SHARE_WEIGHTS = {"HIGH": 4, "MEDIUM": 2, "LOW": 1}
+DEFAULT_QUANTUM_BYTES = 512
+DEFAULT_BURST_BYTES = 4096
+DEFAULT_MAX_QUEUE_BYTES = 256 * 1024   # Per priority level and link
+TOKEN_TOLERANCE_BITS = 1e-6            # Absorbs float rounding when refilling up to a send time
+
+
+class TokenBucket:
+    """
+    Token bucket in bits: refilled at `rate_bps` up to `burst_bits`.
+    """
+    def __init__(self, rate_bps: float, burst_bits: float, now: float = 0.0):
+        self.rate_bps = rate_bps
+        self.burst_bits = burst_bits
+        self.tokens = burst_bits
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst_bits, self.tokens + (now - self.updated) * self.rate_bps)
+            self.updated = now
+
+    def ready_time(self, bits: float, now: float) -> float:
+        """Earliest time (>= now) at which `bits` can be sent (inf at rate 0)."""
+        self._refill(now)
+        needed = min(bits, self.burst_bits) - self.tokens  # Larger messages wait for a full bucket
+        if needed <= TOKEN_TOLERANCE_BITS:
+            return now
+        return now + needed / self.rate_bps if self.rate_bps > 0 else float("inf")
+
+    def consume(self, bits: float, now: float) -> None:
+        """Takes `bits` out of the bucket (it may go negative for messages larger than the burst)."""
+        self._refill(now)
+        self.tokens -= bits
+
+
+class QueuedMessage:
+    """A message waiting for a link: the caller's `item`, its size, level and arrival time."""
+    __slots__ = ("item", "size_bytes", "priority", "enqueued_at")
+
+    def __init__(self, item: Any, size_bytes: int, priority: str, enqueued_at: float):
+        self.item = item
+        self.size_bytes = size_bytes
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+
+
+class LinkScheduler:
+    """
+    Strict-priority plus deficit-round-robin scheduler for one outgoing link.
+    """
+    def __init__(self, rate_kbps: float, burst_bytes: int = DEFAULT_BURST_BYTES,
+                 weights: Optional[Mapping[str, int]] = None,
+                 strict_levels: Sequence[str] = STRICT_PRIORITY_LEVELS,
+                 quantum_bytes: int = DEFAULT_QUANTUM_BYTES,
+                 max_queue_bytes: Optional[int] = DEFAULT_MAX_QUEUE_BYTES, now: float = 0.0):
+        """
+        Initializes the LinkScheduler with empty queues and a full token bucket.
+
+        Args:
+            rate_kbps: Link bandwidth (kbit/s), the token bucket's rate.
+            burst_bytes: Token bucket depth.
+            weights: DRR weight of each non-strict level (default FAIR_SHARE_WEIGHTS).
+            strict_levels: Levels served before all others, in order.
+            quantum_bytes: Credit per unit of weight each DRR turn.
+            max_queue_bytes: Queue limit per level (None: unbounded).
+            now: Current time (seconds).
+        """
+        self.bucket = TokenBucket(rate_kbps * 1000.0, burst_bytes * 8, now)
+        self.strict_levels = tuple(strict_levels)
+        weights = FAIR_SHARE_WEIGHTS if weights is None else weights
+        self.fair_levels = tuple(level for level in PRIORITY_LEVELS
+                                 if level not in self.strict_levels and level in weights)
+        self.weights = {level: weights[level] for level in self.fair_levels}
+        self.quantum_bytes = quantum_bytes
+        self.max_queue_bytes = max_queue_bytes
+        self.queues: Dict[str, Deque[QueuedMessage]] = {level: deque() for level in PRIORITY_LEVELS}
+        self.queued_bytes = {level: 0 for level in PRIORITY_LEVELS}
+        self.sent = {level: 0 for level in PRIORITY_LEVELS}
+        self.sent_bytes = {level: 0 for level in PRIORITY_LEVELS}
+        self.dropped = {level: 0 for level in PRIORITY_LEVELS}
+        self._deficits = {level: 0 for level in self.fair_levels}
+        self._turn = 0            # Position in fair_levels of the level being served
+        self._turn_credited = False
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    @property
+    def rate_kbps(self) -> float:
+        return self.bucket.rate_bps / 1000.0
+
+    @rate_kbps.setter
+    def rate_kbps(self, rate_kbps: float) -> None:
+        self.bucket.rate_bps = rate_kbps * 1000.0
+
+    def _level(self, priority: str) -> str:
+        """Queue of a priority level: levels without a queue policy share the lowest fair level."""
+        priority = priority_class(priority)
+        if priority in self.strict_levels or priority in self.weights:
+            return priority
+        return self.fair_levels[-1] if self.fair_levels else self.strict_levels[-1]
+
+    def enqueue(self, item: Any, size_bytes: int, priority: str, now: float) -> bool:
+        """
+        Queues a message for the link.
+
+        Returns:
+            False if the level's queue is full and the message was dropped.
+        """
+        level = self._level(priority)
+        if self.max_queue_bytes is not None and self.queued_bytes[level] + size_bytes > self.max_queue_bytes:
+            self.dropped[level] += 1
+            return False
+        self.queues[level].append(QueuedMessage(item, size_bytes, level, now))
+        self.queued_bytes[level] += size_bytes
+        return True
+
+    def _select(self) -> Optional[str]:
+        """Level whose head message goes next. Repeated calls agree until the next dequeue."""
+        for level in self.strict_levels:
+            if self.queues[level]:
+                return level
+        if self._turn_credited:   # Fast path: the level being served can send again
+            queue = self.queues[self.fair_levels[self._turn]]
+            if queue and self._deficits[self.fair_levels[self._turn]] >= queue[0].size_bytes:
+                return self.fair_levels[self._turn]
+        active = [level for level in self.fair_levels if self.queues[level]]
+        if not active:
+            return None
+        turns_without_send = 0
+        while True:
+            level = self.fair_levels[self._turn]
+            queue = self.queues[level]
+            if not queue:
+                self._deficits[level] = 0
+                self._next_turn()
+                continue
+            if not self._turn_credited:
+                self._deficits[level] += self.weights[level] * self.quantum_bytes
+                self._turn_credited = True
+            if self._deficits[level] >= queue[0].size_bytes:
+                return level
+            self._next_turn()
+            turns_without_send += 1
+            if turns_without_send == len(active):
+                # A whole round without a send (messages larger than the quanta): credit
+                # the rounds until the first level can send in one step instead of looping.
+                rounds = min(math.ceil((self.queues[other][0].size_bytes - self._deficits[other])
+                                       / (self.weights[other] * self.quantum_bytes)) for other in active)
+                for other in active:
+                    self._deficits[other] += (rounds - 1) * self.weights[other] * self.quantum_bytes
+                turns_without_send = 0
+
+    def _next_turn(self) -> None:
+        self._turn = (self._turn + 1) % len(self.fair_levels)
+        self._turn_credited = False
+
+    def next_send_time(self, now: float) -> Optional[float]:
+        """When the next message can leave (>= now), or None if nothing is queued."""
+        level = self._select()
+        if level is None:
+            return None
+        return self.bucket.ready_time(self.queues[level][0].size_bytes * 8, now)
+
+    def dequeue(self, now: float) -> Optional[QueuedMessage]:
+        """
+        Takes the next message off its queue if the link can send it at `now`.
+
+        Returns:
+            The message (its queueing delay is now - enqueued_at), or None if nothing is
+            queued or the token bucket is short (see `next_send_time`).
+        """
+        level = self._select()
+        if level is None:
+            return None
+        queue = self.queues[level]
+        bits = queue[0].size_bytes * 8
+        if self.bucket.ready_time(bits, now) > now:
+            return None
+        message = queue.popleft()
+        self.bucket.consume(bits, now)
+        self.queued_bytes[level] -= message.size_bytes
+        self.sent[level] += 1
+        self.sent_bytes[level] += message.size_bytes
+        if level in self._deficits:
+            self._deficits[level] -= message.size_bytes
+            if not queue:
+                self._deficits[level] = 0
+                self._next_turn()
+        return message
+
+    def dequeue_due(self, now: float) -> List[Tuple[float, QueuedMessage]]:
+        """
+        Takes off the queues every message the link would have sent by `now` had it been
+        served continuously since it was last polled, each at the earliest time the token
+        bucket and its arrival allow. For callers that poll now and then rather than at
+        every `next_send_time`.
+
+        Returns:
+            (send time, message) pairs in send order.
+        """
+        sent = []
+        clock = self.bucket.updated
+        while True:
+            level = self._select()
+            if level is None:
+                break
+            head = self.queues[level][0]
+            at = self.bucket.ready_time(head.size_bytes * 8, max(clock, head.enqueued_at))
+            if at > now:
+                break
+            sent.append((at, self.dequeue(at)))
+            clock = at
+        return sent
+
+    def estimated_wait(self, size_bytes: int, priority: str) -> float:
+        """
+        Rough queueing delay (seconds) of a message of this size and level if queued now.
+
+        Counts the bytes served before it: strict levels ahead of it, its own queue, and
+        each other fair level's backlog up to its weighted share.
+        """
+        level = self._level(priority)
+        if level in self.strict_levels:
+            ahead = sum(self.queued_bytes[strict]
+                        for strict in self.strict_levels[:self.strict_levels.index(level) + 1])
+        else:
+            own = self.queued_bytes[level] + size_bytes
+            ahead = sum(self.queued_bytes[strict] for strict in self.strict_levels) + self.queued_bytes[level]
+            ahead += sum(min(self.queued_bytes[other], own * self.weights[other] / self.weights[level])
+                         for other in self.fair_levels if other != level)
+        rate = self.bucket.rate_bps
+        return ahead * 8 / rate if rate > 0 else float("inf")
+
+    def drain(self) -> List[QueuedMessage]:
+        """Empties every queue (e.g., when the link fails) and returns the messages, strict levels first."""
+        drained = [message for level in self.strict_levels + self.fair_levels for message in self.queues[level]]
+        for level in PRIORITY_LEVELS:
+            self.queues[level].clear()
+            self.queued_bytes[level] = 0
+        self._deficits = {level: 0 for level in self.fair_levels}
+        self._turn_credited = False
+        return drained
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per level: messages queued, sent and dropped, and bytes queued and sent."""
+        return {level: {"queued": len(self.queues[level]), "queued_bytes": self.queued_bytes[level],
+                        "sent": self.sent[level], "sent_bytes": self.sent_bytes[level],
+                        "dropped": self.dropped[level]}
+                for level in PRIORITY_LEVELS}
+
+
+class MeshSendPipeline:
+    """
+    One LinkScheduler per directed link of a mesh topology, created on first use.
+    """
+    def __init__(self, topology: MeshTopology, **scheduler_options: Any):
+        """
+        Initializes the MeshSendPipeline.
+
+        Args:
+            topology: The mesh; link bandwidth changes are applied to the schedulers.
+            **scheduler_options: LinkScheduler options (burst_bytes, weights, ...).
+        """
+        self.topology = topology
+        self.scheduler_options = scheduler_options
+        self.schedulers: Dict[Tuple[int, int], LinkScheduler] = {}   # (link, sending node) -> scheduler
+        self._unsubscribe = topology.subscribe(self._on_topology_change)
+
+    def close(self) -> None:
+        """Stops following the topology's changes (link bandwidths are no longer applied)."""
+        self._unsubscribe()
+
+    def scheduler(self, link: int, from_node: int, now: float = 0.0) -> LinkScheduler:
+        """The scheduler of `link` in the direction leaving `from_node`."""
+        key = (link, from_node)
+        scheduler = self.schedulers.get(key)
+        if scheduler is None:
+            scheduler = self.schedulers[key] = LinkScheduler(self.topology.link_bandwidth_kbps[link], now=now,
+                                                             **self.scheduler_options)
+        return scheduler
+
+    def _on_topology_change(self, kind: str, index: Optional[int]) -> None:
+        if kind == "link":
+            for direction in self.topology.link_nodes[index]:
+                scheduler = self.schedulers.get((index, direction))
+                if scheduler is not None:
+                    scheduler.rate_kbps = self.topology.link_bandwidth_kbps[index]
+
+    def submit(self, item: Any, link: int, from_node: int, size_bytes: int, priority: str,
+               now: float) -> Optional[float]:
+        """
+        Queues a message on a link.
+
+        Returns:
+            Its estimated queueing delay (seconds), or None if the queue dropped it.
+        """
+        scheduler = self.scheduler(link, from_node, now)
+        wait = scheduler.estimated_wait(size_bytes, priority)
+        return wait if scheduler.enqueue(item, size_bytes, priority, now) else None
+
+    def poll(self, now: float) -> List[Tuple[Tuple[int, int], float, QueuedMessage]]:
+        """
+        Takes every message the links have sent by `now` (see `LinkScheduler.dequeue_due`),
+        as ((link, sending node), send time, message).
+        """
+        return [(key, sent_at, message) for key, scheduler in self.schedulers.items()
+                for sent_at, message in scheduler.dequeue_due(now)]
@@ -0,0 +1,494 @@
+"""
+ANHANGÁ Mesh Network Simulator
+
+Discrete-event simulation of the mesh for capacity planning: how many emergency
+messages get through, and how fast, when nodes and links fail. Events sit in a
+binary heap (heapq) ordered by simulated time; nothing waits in real time, so hours
+of traffic on thousands of nodes run in seconds.
+
+The simulation drives the production code on a MeshTopology:
+
+- Messages arrive per `message_type` as Poisson processes (MessageTypeProfile): a
+  priority level, a size distribution and whether they flow to or from the hubs
+  (coordination centers) or between any two nodes.
+- The sender routes each message with MeshRouter through a RouteCache (source
+  routing). A relay whose next link or node has failed reroutes from where it is.
+- Every hop waits in the LinkScheduler of its outgoing link (strict priority, fair
+  shares, token-bucket bandwidth) and then takes the link's latency plus
+  serialization time. A transmission fails with probability 1 - reliability and is
+  retried up to `max_transmissions` times.
+- Nodes and links fail and recover with exponential times between failures and
+  repair times (FailureModel); `add_outage` schedules area-wide failures. Failures
+  go through `MeshTopology.set_node_up` / `set_link_up`, so the router, the route
+  cache and the schedulers see them exactly as in operation. Messages queued on a
+  failed link are rerouted; messages queued at, or arriving at, a failed node are lost.
+- Messages older than `ttl_seconds` expire when they leave a link queue or reach a
+  relay, so a saturated link does not deliver hour-old traffic. Messages still queued
+  past their TTL when the run ends count as expired too.
+
+`run()` reports the delivery ratio (delivered over generated, so messages still in
+flight at the end count as undelivered), latency percentiles per priority level, drops
+by reason and the route cache metrics.
+
+The simulator's router, route cache and link schedulers follow the topology's changes;
+`close()` (or a `with` block) unsubscribes them once the simulator is no longer used.
+"""
+
+import heapq
+import itertools
+import math
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The fallback covers running this file directly as a script.
+try:
+    from .anhanga_route_cache import RouteCache
+    from .anhanga_routing import PRIORITY_LEVELS, MeshRouter, MeshTopology
+    from .anhanga_scheduler import MeshSendPipeline
+except ImportError:
+    from anhanga_route_cache import RouteCache
+    from anhanga_routing import PRIORITY_LEVELS, MeshRouter, MeshTopology
+    from anhanga_scheduler import MeshSendPipeline
+
+
+DEFAULT_TTL_SECONDS = 600.0
+DEFAULT_MAX_TRANSMISSIONS = 3      # Per hop, first attempt included
+DEFAULT_MAX_REROUTES = 5
+DEFAULT_HUBS = 3
+DEFAULT_ROUTE_CACHE_ENTRIES = 65_536
+DROP_REASONS = ("sender_down", "no_route", "queue_full", "link_loss", "node_failure", "expired")
+
+# Event kinds, in the order they are handled at equal times.
+_NODE_DOWN, _LINK_DOWN, _NODE_UP, _LINK_UP, _HOP, _WAKE, _ARRIVAL = range(7)
+
+
+class MessageTypeProfile:
+    """
+    Traffic of one message type.
+
+    Attributes:
+        priority_level: Priority level of its messages.
+        messages_per_hour: Mean arrival rate over the whole mesh.
+        median_bytes: Median message size (sizes are lognormal).
+        direction: "to_hub" (field reports), "from_hub" (orders) or "any".
+    """
+    def __init__(self, priority_level: str, messages_per_hour: float, median_bytes: int,
+                 direction: str = "to_hub", size_sigma: float = 0.5):
+        self.priority_level = priority_level
+        self.messages_per_hour = messages_per_hour
+        self.median_bytes = median_bytes
+        self.direction = direction
+        self.size_sigma = size_sigma
+
+
+DEFAULT_TRAFFIC = {
+    "evacuation_order": MessageTypeProfile("CRITICAL", 120, 512, "from_hub"),
+    "medical_emergency": MessageTypeProfile("CRITICAL", 240, 768, "to_hub"),
+    "resource_request": MessageTypeProfile("HIGH", 600, 1024, "to_hub"),
+    "status_report": MessageTypeProfile("MEDIUM", 1800, 2048, "to_hub"),
+    "peer_coordination": MessageTypeProfile("MEDIUM", 600, 1024, "any"),
+    "media_upload": MessageTypeProfile("LOW", 300, 32768, "to_hub"),
+}
+
+
+class FailureModel:
+    """
+    Independent node and link failures: exponential times between failures (MTBF) and
+    repair times (MTTR), in hours. An MTBF of None disables that kind of failure.
+    """
+    def __init__(self, node_mtbf_hours: Optional[float] = 48.0, node_mttr_hours: float = 0.5,
+                 link_mtbf_hours: Optional[float] = 24.0, link_mttr_hours: float = 0.25):
+        self.node_mtbf_hours = node_mtbf_hours
+        self.node_mttr_hours = node_mttr_hours
+        self.link_mtbf_hours = link_mtbf_hours
+        self.link_mttr_hours = link_mttr_hours
+
+
+def synthetic_city_mesh(n_nodes: int, neighbors: int = 5, seed: int = 42,
+                        center: Tuple[float, float] = (-19.9167, -43.9345),
+                        span_degrees: float = 0.25) -> MeshTopology:
+    """
+    Seeded synthetic mesh for planning and benchmarks: nodes at random positions over a
+    city-sized square (Belo Horizonte by default), each linked to its `neighbors`
+    nearest nodes, with latency and reliability degrading with distance.
+    """
+    from scipy.spatial import cKDTree
+
+    rng = np.random.default_rng(seed)
+    positions = np.asarray(center) + rng.uniform(-0.5, 0.5, (n_nodes, 2)) * span_degrees
+    distances, nearest = cKDTree(positions).query(positions, k=neighbors + 1)
+    topology = MeshTopology()
+    for index, position in enumerate(positions):
+        topology.add_node(f"mesh_node_{index:05d}", position)
+    for index in range(n_nodes):
+        for distance, other in zip(distances[index, 1:], nearest[index, 1:]):
+            distance_km = distance * 111.0
+            topology.add_link(topology.node_ids[index], topology.node_ids[other],
+                              latency_seconds=0.005 + distance_km * 0.01 * rng.uniform(1.0, 2.0),
+                              reliability=max(0.5, 0.999 - distance_km * 0.05 * rng.random()),
+                              bandwidth_kbps=float(rng.choice([50.0, 250.0, 1000.0])))
+    return topology
+
+
+class _SimMessage:
+    __slots__ = ("message_type", "priority", "size_bytes", "target", "created", "path", "links", "hop",
+                 "attempts", "reroutes")
+
+    def __init__(self, message_type: str, priority: str, size_bytes: int, target: int, created: float):
+        self.message_type = message_type
+        self.priority = priority
+        self.size_bytes = size_bytes
+        self.target = target
+        self.created = created
+        self.path: List[int] = []     # Node indices, path[hop] is where the message is
+        self.links: List[int] = []
+        self.hop = 0
+        self.attempts = 0             # Transmissions over the current hop
+        self.reroutes = 0
+
+
+class MeshSimulator:
+    """
+    Heap-based discrete-event simulator of emergency traffic over a mesh topology.
+    """
+    def __init__(self, topology: MeshTopology, traffic: Optional[Mapping[str, MessageTypeProfile]] = None,
+                 failures: Optional[FailureModel] = None, hubs: Optional[Sequence[str]] = None,
+                 seed: Optional[int] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_transmissions: int = DEFAULT_MAX_TRANSMISSIONS,
+                 route_cache_entries: int = DEFAULT_ROUTE_CACHE_ENTRIES):
+        """
+        Initializes the MeshSimulator with its own router, route cache and link schedulers.
+
+        Args:
+            topology: The mesh. Failures are applied to it in place during `run()`, and
+                      every failed element is brought back up when the run ends.
+            traffic: Profile per message type (default DEFAULT_TRAFFIC).
+            failures: Random failure model (default FailureModel(); FailureModel(None,
+                      link_mtbf_hours=None) for none).
+            hubs: Coordination center node IDs (default: the DEFAULT_HUBS best-connected nodes).
+            seed: Seed of the arrivals, sizes, failures and transmission losses.
+            ttl_seconds: Messages older than this are dropped when they next leave a queue
+                         or reach a relay.
+            max_transmissions: Attempts per hop before a message is lost.
+            route_cache_entries: Size bound of the route cache.
+        """
+        self.topology = topology
+        self.traffic = dict(DEFAULT_TRAFFIC if traffic is None else traffic)
+        self.failures = FailureModel() if failures is None else failures
+        self.ttl_seconds = ttl_seconds
+        self.max_transmissions = max_transmissions
+        self.rng = np.random.default_rng(seed)
+        self.router = MeshRouter(topology)
+        self.route_cache = RouteCache(self.router, max_entries=route_cache_entries, max_age_seconds=None,
+                                      n_backups=0)
+        self.pipeline = MeshSendPipeline(topology)
+        if hubs is None:
+            degree = np.diff(topology.arcs()[0])
+            hubs = [topology.node_ids[node] for node in np.argsort(-degree, kind="stable")[:DEFAULT_HUBS]]
+        self.hubs = [topology.node_index[hub] for hub in hubs]
+        self._outages: List[Tuple[float, float, List[int], List[int]]] = []
+
+    def close(self) -> None:
+        """Unsubscribes the router, route cache and link schedulers from the topology."""
+        self.route_cache.close()
+        self.router.close()
+        self.pipeline.close()
+
+    def __enter__(self) -> "MeshSimulator":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.close()
+
+    def add_outage(self, start_seconds: float, duration_seconds: float, node_ids: Sequence[str] = (),
+                   links: Sequence[Tuple[str, str]] = ()) -> None:
+        """
+        Schedules nodes and links (as node ID pairs) to fail together for a while (e.g., a
+        power outage over a district). Overlapping failures keep an element down until
+        all of them are repaired.
+        """
+        self._outages.append((start_seconds, duration_seconds,
+                              [self.topology.node_index[node_id] for node_id in node_ids],
+                              [self.topology.link_between(a, b) for a, b in links]))
+
+    # ---- Run ----
+
+    def run(self, duration_seconds: float) -> Dict[str, Any]:
+        """
+        Simulates `duration_seconds` of traffic from an empty network at time 0.
+
+        Returns:
+            The report (see `_report`) as a JSON-friendly dict.
+        """
+        started = time.perf_counter()
+        topology = self.topology
+        self._heap: List[Tuple[float, int, int, Any]] = []
+        self._sequence = itertools.count()
+        self._wakes: Dict[Tuple[int, int], float] = {}
+        self._node_down = [0] * topology.num_nodes
+        self._link_down = [0] * topology.num_links
+        self._generated = {message_type: 0 for message_type in self.traffic}
+        self._delivered = {message_type: 0 for message_type in self.traffic}
+        self._latencies: Dict[str, List[float]] = {level: [] for level in PRIORITY_LEVELS}
+        self._generated_by_level = {level: 0 for level in PRIORITY_LEVELS}
+        self._dropped_by_level = {level: 0 for level in PRIORITY_LEVELS}
+        self._drops = {reason: 0 for reason in DROP_REASONS}
+        self._reroutes = self._node_failures = self._link_failures = 0
+
+        for message_type, profile in self.traffic.items():
+            if profile.messages_per_hour > 0:
+                self._push(self.rng.exponential(3600.0 / profile.messages_per_hour), _ARRIVAL, message_type)
+        model = self.failures
+        if model.node_mtbf_hours:
+            for node, at in enumerate(self.rng.exponential(model.node_mtbf_hours * 3600.0, topology.num_nodes)):
+                self._push(at, _NODE_DOWN, (node, True))
+        if model.link_mtbf_hours:
+            for link, at in enumerate(self.rng.exponential(model.link_mtbf_hours * 3600.0, topology.num_links)):
+                self._push(at, _LINK_DOWN, (link, True))
+        for start, duration, nodes, links in self._outages:
+            for node in nodes:
+                self._push(start, _NODE_DOWN, (node, False))
+                self._push(start + duration, _NODE_UP, (node, False))
+            for link in links:
+                self._push(start, _LINK_DOWN, (link, False))
+                self._push(start + duration, _LINK_UP, (link, False))
+
+        events = 0
+        heap = self._heap
+        while heap and heap[0][0] <= duration_seconds:
+            now, _, kind, payload = heapq.heappop(heap)
+            events += 1
+            if kind == _HOP:
+                self._on_hop(payload, now)
+            elif kind == _WAKE:
+                self._on_wake(payload, now)
+            elif kind == _ARRIVAL:
+                self._on_arrival(payload, now)
+            elif kind == _NODE_DOWN or kind == _NODE_UP:
+                self._on_node_event(payload, kind == _NODE_DOWN, now)
+            else:
+                self._on_link_event(payload, kind == _LINK_DOWN, now)
+
+        # Bring the topology back to its state before the run.
+        for node, count in enumerate(self._node_down):
+            if count:
+                topology.set_node_up(topology.node_ids[node], True)
+        for link, count in enumerate(self._link_down):
+            if count:
+                a, b = topology.link_nodes[link]
+                topology.set_link_up(topology.node_ids[a], topology.node_ids[b], True)
+        for scheduler in self.pipeline.schedulers.values():
+            for queued in scheduler.drain():
+                if duration_seconds - queued.item.created > self.ttl_seconds:
+                    self._drop(queued.item, "expired")
+        return self._report(duration_seconds, events, time.perf_counter() - started)
+
+    def _push(self, at: float, kind: int, payload: Any) -> None:
+        heapq.heappush(self._heap, (at, next(self._sequence), kind, payload))
+
+    # ---- Messages ----
+
+    def _on_arrival(self, message_type: str, now: float) -> None:
+        profile = self.traffic[message_type]
+        rng = self.rng
+        self._push(now + rng.exponential(3600.0 / profile.messages_per_hour), _ARRIVAL, message_type)
+        n_nodes = self.topology.num_nodes
+        hub = self.hubs[int(rng.integers(len(self.hubs)))]
+        other = int(rng.integers(n_nodes))
+        if profile.direction == "from_hub":
+            source, target = hub, other
+        elif profile.direction == "to_hub":
+            source, target = other, hub
+        else:
+            source, target = other, int(rng.integers(n_nodes))
+        if source == target:
+            target = (target + 1 + int(rng.integers(n_nodes - 1))) % n_nodes if n_nodes > 1 else target
+        size = max(64, int(profile.median_bytes * math.exp(profile.size_sigma * rng.standard_normal())))
+        message = _SimMessage(message_type, profile.priority_level, size, target, now)
+        self._generated[message_type] += 1
+        self._generated_by_level[message.priority] += 1
+        if not self.topology.node_up[source]:
+            self._drop(message, "sender_down")
+        elif self._route(message, source):
+            self._forward(message, now)
+
+    def _route(self, message: _SimMessage, node: int) -> bool:
+        """Routes `message` from `node` (the sender, or a relay after a failure); drops it if it cannot."""
+        topology = self.topology
+        found = self.route_cache.route(topology.node_ids[node], topology.node_ids[message.target], message.priority)
+        if found is None:
+            self._drop(message, "no_route")
+            return False
+        node_index = topology.node_index
+        message.path = [node_index[node_id] for node_id in found[0].nodes]
+        message.links = found[0].links
+        message.hop = 0
+        return True
+
+    def _forward(self, message: _SimMessage, now: float) -> None:
+        """Queues `message` on the next link of its path (it is at path[hop])."""
+        topology = self.topology
+        if message.hop == len(message.path) - 1:
+            self._delivered[message.message_type] += 1
+            self._latencies[message.priority].append(now - message.created)
+            return
+        node, link = message.path[message.hop], message.links[message.hop]
+        if not (topology.link_up[link] and topology.node_up[message.path[message.hop + 1]]):
+            message.reroutes += 1
+            self._reroutes += 1
+            if message.reroutes > DEFAULT_MAX_REROUTES:
+                self._drop(message, "no_route")
+                return
+            if not self._route(message, node):
+                return
+            self._forward(message, now)
+            return
+        key = (link, node)
+        scheduler = self.pipeline.scheduler(link, node, now)
+        if not scheduler.enqueue(message, message.size_bytes, message.priority, now):
+            self._drop(message, "queue_full")
+            return
+        self._schedule_wake(key, scheduler, now)
+
+    def _schedule_wake(self, key: Tuple[int, int], scheduler: Any, now: float) -> None:
+        at = scheduler.next_send_time(now)
+        if at is None or at == math.inf:
+            return
+        pending = self._wakes.get(key)
+        if pending is None or at < pending:
+            self._wakes[key] = at   # An earlier pending wake makes the later one stale
+            self._push(at, _WAKE, key)
+
+    def _on_wake(self, key: Tuple[int, int], now: float) -> None:
+        if self._wakes.get(key) != now:
+            return  # Stale wake
+        del self._wakes[key]
+        link, node = key
+        scheduler = self.pipeline.schedulers[key]
+        topology = self.topology
+        hop_seconds = topology.link_latency_seconds[link]
+        bits_per_second = topology.link_bandwidth_kbps[link] * 1000.0
+        reliability = topology.link_reliability[link]
+        random = self.rng.random
+        while True:
+            queued = scheduler.dequeue(now)
+            if queued is None:
+                break
+            message = queued.item
+            if now - message.created > self.ttl_seconds:
+                self._drop(message, "expired")
+                continue
+            if not topology.node_up[message.path[message.hop + 1]]:
+                self._forward(message, now)   # Next node failed while the message waited: reroute
+                continue
+            message.attempts += 1
+            if random() < reliability:
+                message.attempts = 0
+                self._push(now + hop_seconds + message.size_bytes * 8 / bits_per_second, _HOP, message)
+            elif message.attempts < self.max_transmissions:
+                if not scheduler.enqueue(message, message.size_bytes, message.priority, now):
+                    self._drop(message, "queue_full")
+            else:
+                self._drop(message, "link_loss")
+        self._schedule_wake(key, scheduler, now)
+
+    def _on_hop(self, message: _SimMessage, now: float) -> None:
+        message.hop += 1
+        if not self.topology.node_up[message.path[message.hop]]:
+            self._drop(message, "node_failure")
+        elif message.hop < len(message.path) - 1 and now - message.created > self.ttl_seconds:
+            self._drop(message, "expired")
+        else:
+            self._forward(message, now)
+
+    def _drop(self, message: _SimMessage, reason: str) -> None:
+        self._drops[reason] += 1
+        self._dropped_by_level[message.priority] += 1
+
+    # ---- Failures ----
+
+    def _on_node_event(self, payload: Tuple[int, bool], down: bool, now: float) -> None:
+        node, random_failure = payload
+        topology, model = self.topology, self.failures
+        self._node_down[node] += 1 if down else -1
+        if down and self._node_down[node] == 1:
+            self._node_failures += 1
+            topology.set_node_up(topology.node_ids[node], False)
+            arc_ptr, _, arc_link = topology.arcs()
+            for arc in range(arc_ptr[node], arc_ptr[node + 1]):
+                scheduler = self.pipeline.schedulers.get((arc_link[arc], node))
+                if scheduler is not None:
+                    for queued in scheduler.drain():
+                        self._drop(queued.item, "node_failure")
+        elif not down and self._node_down[node] == 0:
+            topology.set_node_up(topology.node_ids[node], True)
+        if random_failure:
+            if down:
+                self._push(now + self.rng.exponential(model.node_mttr_hours * 3600.0), _NODE_UP, payload)
+            else:
+                self._push(now + self.rng.exponential(model.node_mtbf_hours * 3600.0), _NODE_DOWN, payload)
+
+    def _on_link_event(self, payload: Tuple[int, bool], down: bool, now: float) -> None:
+        link, random_failure = payload
+        topology, model = self.topology, self.failures
+        a, b = topology.link_nodes[link]
+        self._link_down[link] += 1 if down else -1
+        if down and self._link_down[link] == 1:
+            self._link_failures += 1
+            topology.set_link_up(topology.node_ids[a], topology.node_ids[b], False)
+            for node in (a, b):
+                scheduler = self.pipeline.schedulers.get((link, node))
+                if scheduler is not None:
+                    for queued in scheduler.drain():
+                        self._forward(queued.item, now)   # Reroutes around the failed link
+        elif not down and self._link_down[link] == 0:
+            topology.set_link_up(topology.node_ids[a], topology.node_ids[b], True)
+        if random_failure:
+            if down:
+                self._push(now + self.rng.exponential(model.link_mttr_hours * 3600.0), _LINK_UP, payload)
+            else:
+                self._push(now + self.rng.exponential(model.link_mtbf_hours * 3600.0), _LINK_DOWN, payload)
+
+    # ---- Report ----
+
+    def _report(self, duration_seconds: float, events: int, wall_seconds: float) -> Dict[str, Any]:
+        generated = sum(self._generated.values())
+        delivered = sum(self._delivered.values())
+        dropped = sum(self._drops.values())
+        settled = delivered + dropped
+
+        def percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+            return {f"p{q}": round(float(np.percentile(latencies, q)), 4) if latencies else None
+                    for q in (50, 95, 99)}
+
+        def ratio(delivered: int, generated: int) -> Optional[float]:
+            return round(delivered / generated, 4) if generated else None
+
+        all_latencies = [latency for level in PRIORITY_LEVELS for latency in self._latencies[level]]
+        return {
+            "simulated_seconds": duration_seconds,
+            "wall_seconds": round(wall_seconds, 3),
+            "events": events,
+            "messages_generated": generated,
+            "messages_delivered": delivered,
+            "messages_in_flight": generated - settled,
+            "delivery_ratio": ratio(delivered, generated),
+            "latency_seconds": percentiles(all_latencies),
+            "by_priority": {
+                level: {"generated": self._generated_by_level[level], "delivered": len(self._latencies[level]),
+                        "dropped": self._dropped_by_level[level],
+                        "delivery_ratio": ratio(len(self._latencies[level]), self._generated_by_level[level]),
+                        "latency_seconds": percentiles(self._latencies[level])}
+                for level in PRIORITY_LEVELS},
+            "by_message_type": {
+                message_type: {"generated": self._generated[message_type],
+                               "delivered": self._delivered[message_type]}
+                for message_type in self.traffic},
+            "drops": dict(self._drops),
+            "reroutes": self._reroutes,
+            "node_failures": self._node_failures,
+            "link_failures": self._link_failures,
+            "route_cache": self.route_cache.stats(),
+        }
@@ -5,7 +5,26 @@ This module defines the AnhangaMeshNetwork class, responsible for
 maintaining resilient emergency communications through adaptive mesh networking.
 """
 
-from typing import Dict
+import json
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# The fallback covers running this file directly as a script.
+try:
+    from .anhanga_route_cache import RouteCache
+    from .anhanga_routing import (DEFAULT_BACKUP_PATHS, DEFAULT_MESSAGE_BYTES, DEFAULT_PRIORITY, MeshRouter,
+                                  MeshTopology)
+    from .anhanga_scheduler import MeshSendPipeline
+except ImportError:
+    from anhanga_route_cache import RouteCache
+    from anhanga_routing import (DEFAULT_BACKUP_PATHS, DEFAULT_MESSAGE_BYTES, DEFAULT_PRIORITY, MeshRouter,
+                                 MeshTopology)
+    from anhanga_scheduler import MeshSendPipeline
+
+# Fallback channels suggested when the mesh has no path to the recipient.
+ALTERNATIVE_CHANNELS = ["satellite_uplink", "long_range_radio"]
+MAX_SENDABLE_MESSAGES = 4096   # Messages off the link queues awaiting transmit_queued_messages
 
 class AnhangaMeshNetwork:
     """
@@ -13,10 +32,14 @@ class AnhangaMeshNetwork:
     connectivity during infrastructure failures, providing intelligent routing
     and message prioritization for emergency communications.
     """
-    def __init__(self):
+    def __init__(self, mesh_topology: Optional[Any] = None):
         """
         Initializes the AnhangaMeshNetwork system.
 
+        Args:
+            mesh_topology (Optional[Any]): The mesh network: a MeshTopology, or anything
+                                           `load_mesh_topology` accepts.
+
         Conceptually, this would set up:
         - self.mesh_topology: A dynamic representation of the current mesh network
                              topology, including active nodes, connection quality,
@@ -29,15 +52,61 @@ class AnhangaMeshNetwork:
                                  the mesh network considering factors like latency,
                                  reliability, and bandwidth.
         """
-        self.mesh_topology = None           # Placeholder for mesh network topology manager
+        self.mesh_topology: Optional[MeshTopology] = None    # Mesh nodes and links (see anhanga_routing)
         self.message_intelligence_ai = None # Placeholder for message analysis AI
-        self.routing_optimizer = None       # Placeholder for routing optimization engine
+        self.routing_optimizer: Optional[MeshRouter] = None  # Shortest-path router over mesh_topology
+        self.route_cache: Optional[RouteCache] = None        # Recent routes, invalidated on link changes
+        self.send_pipeline: Optional[MeshSendPipeline] = None  # Priority queues of the outgoing links
+        # Messages the links have already sent, oldest dropped beyond the bound.
+        self._sendable: deque = deque(maxlen=MAX_SENDABLE_MESSAGES)
+        if mesh_topology is not None:
+            self.load_mesh_topology(mesh_topology)
         print("AnhangaMeshNetwork initialized.")
 
+    def load_mesh_topology(self, source: Any) -> MeshTopology:
+        """
+        Loads the mesh network topology and sets up the router over it, replacing (and
+        closing) the router, route cache and send pipeline of a previous topology.
+
+        Args:
+            source (Any): A MeshTopology; a dict with "nodes" and "links" (see
+                          `MeshTopology.from_dict`); or a JSON file path or JSON text of one.
+
+        Returns:
+            MeshTopology: The loaded topology, also stored as `mesh_topology`.
+        """
+        if isinstance(source, str):
+            if source.lstrip().startswith("{"):
+                source = json.loads(source)
+            else:
+                with open(source, "r", encoding="utf-8") as file:
+                    source = json.load(file)
+        topology = source if isinstance(source, MeshTopology) else MeshTopology.from_dict(source)
+        # The previous router, cache and pipeline would otherwise keep following their topology.
+        for follower in (self.route_cache, self.routing_optimizer, self.send_pipeline):
+            if follower is not None:
+                follower.close()
+        self.mesh_topology = topology
+        self.routing_optimizer = MeshRouter(topology)
+        self.route_cache = RouteCache(self.routing_optimizer, n_backups=DEFAULT_BACKUP_PATHS)
+        self.send_pipeline = MeshSendPipeline(topology)
+        self._sendable.clear()
+        print(f"Mesh topology loaded: {topology.num_nodes} nodes, {topology.num_links} links")
+        return topology
+
     def adaptive_emergency_routing(self, message: Dict) -> Dict:
         """
         Determines the optimal routing path for an emergency message through the mesh network.
 
+        The router (see anhanga_routing) picks the cheapest path for the message's
+        priority level (higher levels weigh link reliability more), then up to
+        DEFAULT_BACKUP_PATHS link-disjoint backup paths. Paths are reused from the route
+        cache until a link or node on them degrades or fails. The message is then queued
+        on the first link of the path (see anhanga_scheduler: CRITICAL first, fair shares
+        for the other levels, link bandwidth as a token bucket). Every call first takes off
+        the queues what the links have sent by now, so the queues drain as time passes even
+        when nobody calls `transmit_queued_messages`, which returns those messages.
+
         Args:
             message (Dict): A dictionary containing the emergency message and metadata.
                            Example:
@@ -60,48 +129,141 @@ class AnhangaMeshNetwork:
                       "routing_successful": True,
                       "selected_path": ["node_A", "node_B", "node_C", "destination"],
                       "estimated_delivery_time_seconds": 5.2,
+                      "estimated_queueing_delay_seconds": 0.4,
                       "path_reliability_score": 0.95,
                       "backup_paths_available": 2,
+                      "backup_paths": [["node_A", "node_D", "destination"], ["node_A", "node_E", "destination"]],
                       "transmission_method": "multi_hop_mesh",
-                      "encryption_applied": True,
                       "delivery_confirmation": "pending"
                   }
                   Returns a dict with "routing_successful": False if no viable
-                  path to the recipient can be established.
+                  path to the recipient can be established or the first link's
+                  queue for the message's priority level is full.
         """
-        # Placeholder implementation: In a real scenario, this method would:
-        # 1. Analyze message priority and content using self.message_intelligence_ai.
-        # 2. Query self.mesh_topology for current network state and available paths.
-        # 3. Use self.routing_optimizer to find the best route considering factors like:
-        #    - Message priority (higher priority gets faster, more reliable paths)
-        #    - Current network congestion
-        #    - Node reliability and signal strength
-        #    - Geographic constraints
-        # 4. Initiate message transmission and return routing details.
         sender = message.get('sender_id', 'Unknown')
         recipient = message.get('recipient_id', 'Unknown')
-        priority = message.get('priority_level', 'MEDIUM')
-        
+        priority = message.get('priority_level', DEFAULT_PRIORITY)
+
         print(f"Routing {priority} priority message from {sender} to {recipient}")
-        pass
-        # Example return for successful routing:
-        # return {
-        #     "routing_successful": True,
-        #     "selected_path": ["mesh_node_001", "mesh_node_045", "destination"],
-        #     "estimated_delivery_time_seconds": 3.8,
-        #     "path_reliability_score": 0.92
-        # }
-        # Example return for failed routing:
-        # return {
-        #     "routing_successful": False,
-        #     "error_reason": "No viable path to recipient",
-        #     "suggested_alternatives": ["satellite_uplink", "long_range_radio"]
-        # }
-        return {}
+        topology = self.mesh_topology
+        if topology is None or sender not in topology.node_index or recipient not in topology.node_index:
+            return {"routing_successful": False, "error_reason": "Sender or recipient is not a mesh node",
+                    "suggested_alternatives": list(ALTERNATIVE_CHANNELS)}
+
+        content = message.get('content')
+        message_bytes = len(str(content).encode('utf-8')) if content else None
+        found = self.route_cache.route(sender, recipient, priority, message_bytes=message_bytes)
+        if found is None:
+            return {"routing_successful": False, "error_reason": "No viable path to recipient",
+                    "suggested_alternatives": list(ALTERNATIVE_CHANNELS)}
+        route, backups = found
+        queueing_delay = 0.0
+        if route.links:
+            now = time.monotonic()
+            self._poll_links(now)
+            queueing_delay = self.send_pipeline.submit(
+                {"message_id": message.get('message_id'), "path": route.nodes},
+                route.links[0], topology.node_index[sender], message_bytes or DEFAULT_MESSAGE_BYTES,
+                priority, now)
+            if queueing_delay is None:
+                return {"routing_successful": False, "error_reason": "Outgoing link queue is full",
+                        "suggested_alternatives": list(ALTERNATIVE_CHANNELS)}
+        return {
+            "routing_successful": True,
+            "selected_path": route.nodes,
+            "estimated_delivery_time_seconds": round(route.delivery_time_seconds + queueing_delay, 4),
+            "estimated_queueing_delay_seconds": round(queueing_delay, 4),
+            "path_reliability_score": round(route.reliability, 4),
+            "backup_paths_available": len(backups),
+            "backup_paths": [backup.nodes for backup in backups],
+            "transmission_method": "multi_hop_mesh" if len(route) > 1 else "direct_link",
+            "delivery_confirmation": "pending" if message.get('requires_acknowledgment') else "not_requested",
+        }
+
+    def transmit_queued_messages(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the messages the links have sent since the last call, and takes off the
+        link queues every message they can send now, in send order.
+
+        Args:
+            now (Optional[float]): Time on the `time.monotonic()` clock (default: now).
+
+        Returns:
+            List[Dict[str, Any]]: Per message: message_id, path, priority_level,
+                                  next_hop and queueing_delay_seconds.
+        """
+        if self.send_pipeline is None:
+            return []
+        self._poll_links(time.monotonic() if now is None else now)
+        sent = list(self._sendable)
+        self._sendable.clear()
+        return sent
+
+    def _poll_links(self, now: float) -> None:
+        """Moves every message the links can send by `now` from their queues to `_sendable`."""
+        for (link, from_node), sent_at, queued in self.send_pipeline.poll(now):
+            a, b = self.mesh_topology.link_nodes[link]
+            self._sendable.append({**queued.item, "priority_level": queued.priority,
+                                   "next_hop": self.mesh_topology.node_ids[b if from_node == a else a],
+                                   "queueing_delay_seconds": round(sent_at - queued.enqueued_at, 4)})
+
+    def get_route_cache_stats(self) -> Dict[str, Any]:
+        """
+        Returns the route cache's hit/miss metrics (see `RouteCache.stats`).
+
+        Returns:
+            Dict[str, Any]: Counters and occupancy; empty if no topology is loaded.
+        """
+        return self.route_cache.stats() if self.route_cache is not None else {}
+
+    async def execute_response_plan(self, actions: List[Dict]) -> List[Dict]:
+        """
+        Executes the orchestrator's actions for ANHANGÁ.
+
+        "broadcast_emergency_alert" routes an alert from `parameters["sender_id"]` to every
+        node in `parameters["recipient_ids"]` (see `adaptive_emergency_routing`), at
+        `parameters["priority_level"]` (default CRITICAL).
+
+        Args:
+            actions (List[Dict]): Actions from a response plan (action_id, action_type,
+                                  target_area, priority, parameters).
+
+        Returns:
+            List[Dict]: One result per action: action_id, status ("completed", "failed" when
+                        a recipient could not be reached, or "skipped") and the recipients reached.
+        """
+        results = []
+        for action in actions:
+            parameters = action.get("parameters", {})
+            recipients = parameters.get("recipient_ids") or []
+            if action.get("action_type") != "broadcast_emergency_alert" or not parameters.get("sender_id") \
+                    or not recipients:
+                results.append({"action_id": action["action_id"], "status": "skipped",
+                                "reason": "Unsupported action or no sender_id/recipient_ids"})
+                continue
+            reached, unreachable = [], []
+            for recipient in recipients:
+                routing = self.adaptive_emergency_routing({
+                    "message_id": f"{action['action_id']}:{recipient}", "sender_id": parameters["sender_id"],
+                    "recipient_id": recipient, "content": parameters.get("content"),
+                    "priority_level": parameters.get("priority_level", "CRITICAL"),
+                    "message_type": "emergency_alert", "location": action.get("target_area")})
+                (reached if routing["routing_successful"] else unreachable).append(recipient)
+            results.append({"action_id": action["action_id"], "status": "failed" if unreachable else "completed",
+                            "recipients_reached": reached, "recipients_unreachable": unreachable})
+        return results
 
 if __name__ == '__main__':
     # Example Usage
-    anhanga = AnhangaMeshNetwork()
+    anhanga = AnhangaMeshNetwork(mesh_topology={
+        "nodes": ["rescue_coordination_center", "relay_tower_1", "relay_tower_2", "field_rescue_team_07"],
+        "links": [
+            {"source": "rescue_coordination_center", "target": "relay_tower_1", "latency_ms": 20, "reliability": 0.99},
+            {"source": "relay_tower_1", "target": "field_rescue_team_07", "latency_ms": 35, "reliability": 0.95},
+            {"source": "rescue_coordination_center", "target": "relay_tower_2", "latency_ms": 40, "reliability": 0.9},
+            {"source": "relay_tower_2", "target": "field_rescue_team_07", "latency_ms": 30, "reliability": 0.9},
+        ],
+    })
     
     sample_message = {
         "message_id": "EMRG-TEST-001",
@@ -117,3 +279,6 @@ if __name__ == '__main__':
     
     routing_result = anhanga.adaptive_emergency_routing(sample_message)
     print(f"Anhangá Routing Result: {routing_result}")
+    anhanga.adaptive_emergency_routing(sample_message)
+    print(f"Route cache: {anhanga.get_route_cache_stats()}")
+    print(f"Transmitted: {anhanga.transmit_queued_messages()}")
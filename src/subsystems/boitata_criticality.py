@@ -0,0 +1,428 @@
+"""
+BOITATÁ Criticality Index
+
+Dashboards and the orchestrator keep asking which infrastructure components are the
+most critical. Answering from scratch means running cascades per request, so
+CriticalityIndex precomputes per-component metrics on a DependencyGraph and serves them
+as array reads:
+
+- downstream reach: the components a failure of the component cascades to. A component
+  counts when its most probable failure chain is at least `min_probability`, as in
+  `DependencyGraph.cascade`.
+- expected population impact: the component's own population plus the population of
+  every reached component, weighted by that component's failure probability.
+- betweenness: the normalized share of shortest dependency chains that pass through
+  the component. It uses Brandes' algorithm from a fixed, seeded sample of source
+  components.
+
+A combined criticality score (the mean of the three percentile ranks) sets the
+`risco_impacto_falha` level served to `NodeDataImpactoFalha` and
+`DependencyGraphResponse` consumers.
+
+Searches run for a batch of components at once over (component, node) pairs with
+NumPy, so their cost follows what the components actually reach. A dijkstra call per
+component would touch all n nodes for every one of them.
+
+Components whose status is failed are out of the network. They neither pass failures on
+nor count as impacted, since their dependents are already affected. When dependencies or
+statuses change, reach and impact are recomputed only for components that can reach the
+change with at least `min_probability` (found by a reverse search from the change).
+Betweenness has no such shortcut (a changed dependency moves shortest chains anywhere), so
+it is recomputed in full only once it is `betweenness_max_age` seconds out of date. Until
+then refreshes serve the last betweenness and flag it as `betweenness_stale`.
+"""
+
+import copy
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# The fallback covers running this file directly as a script.
+try:
+    from .boitata_dependency_graph import DEFAULT_MIN_PROBABILITY, DependencyGraph
+except ImportError:
+    from boitata_dependency_graph import DEFAULT_MIN_PROBABILITY, DependencyGraph
+
+
+DEFAULT_BETWEENNESS_SAMPLES = 2048  # Brandes source components (all of them in smaller graphs)
+DEFAULT_BETWEENNESS_MAX_AGE = 300.0 # Seconds a betweenness predating later changes is still served
+SOURCE_BATCH = 4096                 # Components whose cascades are searched together
+PIVOT_BATCH = 256                   # Brandes sources searched together
+
+# Operational states (NodeDataStatusOperacional.estado_atual) that take a component out of the network.
+FAILED_STATUSES = frozenset({"falha", "inoperante", "offline", "failed", "failure", "down"})
+
+# Minimum criticality score of each `risco_impacto_falha` level, highest first.
+RISK_LEVELS: Tuple[Tuple[float, str], ...] = ((0.95, "Crítico"), (0.80, "Alto"), (0.50, "Médio"), (0.0, "Baixo"))
+
+
+def is_failed_status(status: Any) -> bool:
+    """True if an operational state (e.g., "Falha") means the component is down."""
+    return str(status or "").strip().lower() in FAILED_STATUSES
+
+
+def _out_edges(indptr: np.ndarray, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Edges leaving `nodes` in a CSR graph, with the position in `nodes` each one leaves from."""
+    starts, counts = indptr[nodes], indptr[nodes + 1] - indptr[nodes]
+    owner = np.repeat(np.arange(len(nodes)), counts)
+    edges = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    return owner, edges
+
+
+def _percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """Fraction of the other components with a strictly lower value (0.0 to 1.0)."""
+    if len(values) < 2:
+        return np.zeros(len(values))
+    return np.searchsorted(np.sort(values), values, side="left") / (len(values) - 1)
+
+
+class CriticalityIndex:
+    """
+    Precomputed criticality metrics of every component of a DependencyGraph.
+    """
+    def __init__(self, graph: DependencyGraph,
+                 min_probability: float = DEFAULT_MIN_PROBABILITY,
+                 statuses: Optional[Mapping[str, Any]] = None,
+                 betweenness_samples: int = DEFAULT_BETWEENNESS_SAMPLES,
+                 seed: int = 0,
+                 betweenness_max_age: Optional[float] = DEFAULT_BETWEENNESS_MAX_AGE):
+        """
+        Initializes the CriticalityIndex and computes every metric.
+
+        Args:
+            graph: The city dependency graph. Change its dependencies through this index
+                   (`set_dependency` / `remove_dependency`) so the metrics follow.
+            min_probability: Failures less likely than this do not count as reached.
+            statuses: Operational state per component ID (e.g., {"SUB-003": "Falha"}).
+            betweenness_samples: Source components sampled for betweenness.
+            seed: Seed of the betweenness sample.
+            betweenness_max_age: Seconds after which a refresh recomputes a betweenness that
+                                 later changes made stale (0 for every refresh; None for
+                                 `refresh(full=True)` only).
+        """
+        self.graph = graph
+        self.min_probability = min_probability
+        self.betweenness_samples = betweenness_samples
+        self.seed = seed
+        self.betweenness_max_age = betweenness_max_age
+        n_nodes = graph.num_nodes
+        self.statuses: Dict[str, Any] = {}
+        self.failed = np.zeros(n_nodes, dtype=bool)
+        self.downstream_reach = np.zeros(n_nodes, dtype=np.int64)
+        self.expected_population_impact = np.zeros(n_nodes)
+        self.betweenness = np.zeros(n_nodes)
+        self.criticality_score = np.zeros(n_nodes)
+        self.betweenness_stale = False        # Changes since betweenness was last computed
+        self.betweenness_computed_at = 0.0    # time.monotonic() of that computation
+        self.version = 0                      # Incremented by every refresh that changed a metric
+        self._changed_nodes: List[int] = []   # Components whose upstream side needs recomputing
+        self._live_graph = None               # CSR of the dependencies between live components
+        for node_id, status in (statuses or {}).items():
+            self.set_status(node_id, status, refresh=False)
+        self._recompute(np.arange(n_nodes))
+        self._changed_nodes.clear()
+        self._refresh_betweenness()
+        self._refresh_scores()
+
+    # ---- Changes ----
+
+    def set_status(self, node_id: str, status: Any, refresh: bool = True) -> None:
+        """
+        Records a component's operational state (e.g., "Operacional", "Falha").
+
+        Args:
+            node_id: Component ID.
+            status: Its new state; see FAILED_STATUSES.
+            refresh: Recompute the affected metrics now (False to batch several changes
+                     before one `refresh()`).
+
+        Raises:
+            KeyError: If the component is not in the graph.
+        """
+        node = self.graph.node_index[node_id]
+        self.statuses[node_id] = status
+        failed = is_failed_status(status)
+        if failed != self.failed[node]:
+            self.failed[node] = failed
+            self._changed_nodes.append(node)
+            self._live_graph = None
+        if refresh:
+            self.refresh()
+
+    def set_dependency(self, dependent_id: str, upstream_id: str, weight: Optional[float] = None,
+                       latency_minutes: Optional[float] = None, refresh: bool = True) -> None:
+        """Adds or updates a dependency in the graph (see `DependencyGraph.set_dependency`)."""
+        self.graph.set_dependency(dependent_id, upstream_id, weight, latency_minutes)
+        self._changed_nodes.append(self.graph.node_index[upstream_id])
+        self._live_graph = None
+        if refresh:
+            self.refresh()
+
+    def remove_dependency(self, dependent_id: str, upstream_id: str, refresh: bool = True) -> bool:
+        """Removes a dependency from the graph (see `DependencyGraph.remove_dependency`)."""
+        removed = self.graph.remove_dependency(dependent_id, upstream_id)
+        if removed:
+            self._changed_nodes.append(self.graph.node_index[upstream_id])
+            self._live_graph = None
+            if refresh:
+                self.refresh()
+        return removed
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Recomputes the metrics affected by the changes since the last refresh.
+
+        Reach and impact are always brought up to date. A stale betweenness is recomputed
+        once it is older than `betweenness_max_age`, so a refresh with no new changes may
+        still pick it up.
+
+        Args:
+            full: Recompute a stale betweenness now, whatever its age.
+
+        Returns:
+            Number of components whose reach and impact were recomputed.
+        """
+        affected = np.zeros(0, dtype=np.int64)
+        if self._changed_nodes:
+            affected = self._upstream_of(np.unique(self._changed_nodes))
+            self._changed_nodes.clear()
+            self._recompute(affected)
+            self.betweenness_stale = True
+        betweenness_due = self.betweenness_stale and (
+            full or (self.betweenness_max_age is not None
+                     and time.monotonic() - self.betweenness_computed_at >= self.betweenness_max_age))
+        if betweenness_due:
+            self._refresh_betweenness()
+        if len(affected) or betweenness_due:
+            self._refresh_scores()
+        return len(affected)
+
+    # ---- Computation ----
+
+    def _live_edges(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR (indptr, indices, weights) of the dependencies between components that are not failed."""
+        if self._live_graph is None:
+            graph = self.graph
+            live = ~(self.failed[graph._edge_sources()] | self.failed[graph.indices])
+            indptr = np.concatenate([[0], np.cumsum(np.bincount(graph._edge_sources()[live],
+                                                                 minlength=graph.num_nodes))])
+            self._live_graph = (indptr, graph.indices[live].astype(np.int64), graph.weights[live])
+        return self._live_graph
+
+    def _most_probable_reach(self, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                             sources: np.ndarray, groups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best chain probability from each group of sources to every node it reaches with at least
+        `min_probability`, as sorted (group * n + node) keys and probabilities.
+
+        All groups are searched together, label-correcting: each round expands the
+        (group, node) pairs whose probability improved along their edges.
+        """
+        n_nodes = self.graph.num_nodes
+        best_keys = np.unique(groups * n_nodes + sources)
+        best_probability = np.ones(len(best_keys))
+        frontier_keys, frontier_probability = best_keys, best_probability
+        while len(frontier_keys):
+            owner, edges = _out_edges(indptr, frontier_keys % n_nodes)
+            probability = frontier_probability[owner] * weights[edges]
+            keep = (probability >= self.min_probability) & (probability > 0)
+            keys = (frontier_keys[owner[keep]] // n_nodes) * n_nodes + indices[edges[keep]]
+            probability = probability[keep]
+            order = np.lexsort((-probability, keys))  # Best candidate per key first
+            keys, probability = keys[order], probability[order]
+            distinct = np.concatenate([[True], keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=bool)
+            keys, probability = keys[distinct], probability[distinct]
+
+            position = np.searchsorted(best_keys, keys)
+            found = position < len(best_keys)
+            found[found] = best_keys[position[found]] == keys[found]
+            improved = ~found
+            improved[found] = probability[found] > best_probability[position[found]]
+            best_probability[position[found & improved]] = probability[found & improved]
+            if not found.all():
+                best_keys = np.concatenate([best_keys, keys[~found]])
+                best_probability = np.concatenate([best_probability, probability[~found]])
+                order = np.argsort(best_keys, kind="stable")
+                best_keys, best_probability = best_keys[order], best_probability[order]
+            frontier_keys, frontier_probability = keys[improved], probability[improved]
+        return best_keys, best_probability
+
+    def _upstream_of(self, nodes: np.ndarray) -> np.ndarray:
+        """`nodes` and the components that reach one of them with at least `min_probability`."""
+        graph = self.graph
+        order = np.argsort(graph.indices, kind="stable")  # Reverse CSR: rows list upstream components
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(graph.indices, minlength=graph.num_nodes))])
+        keys, _ = self._most_probable_reach(indptr, graph._edge_sources()[order].astype(np.int64),
+                                            graph.weights[order], nodes, np.zeros(len(nodes), dtype=np.int64))
+        return keys  # A single group: the keys are the node indices
+
+    def _recompute(self, nodes: np.ndarray) -> None:
+        """Recomputes the downstream reach and expected population impact of `nodes`."""
+        indptr, indices, weights = self._live_edges()
+        population = np.where(self.failed, 0, self.graph.population).astype(np.float64)
+        # Components without live dependents reach nothing; only the rest need a search.
+        self.downstream_reach[nodes] = 0
+        self.expected_population_impact[nodes] = population[nodes]
+        sources = nodes[np.diff(indptr)[nodes] > 0]
+        for start in range(0, len(sources), SOURCE_BATCH):
+            batch = sources[start:start + SOURCE_BATCH]
+            keys, probability = self._most_probable_reach(indptr, indices, weights, batch, np.arange(len(batch)))
+            group, reached = np.divmod(keys, self.graph.num_nodes)
+            self.downstream_reach[batch] = np.bincount(group, minlength=len(batch)) - 1
+            self.expected_population_impact[batch] = np.bincount(group, weights=probability * population[reached],
+                                                                 minlength=len(batch))
+
+    def _refresh_betweenness(self) -> None:
+        self.betweenness = self._sampled_betweenness()
+        self.betweenness_stale = False
+        self.betweenness_computed_at = time.monotonic()
+
+    def _refresh_scores(self) -> None:
+        """Recomputes the rank-based criticality scores."""
+        self.criticality_score = (_percentile_ranks(self.downstream_reach)
+                                  + _percentile_ranks(self.expected_population_impact)
+                                  + _percentile_ranks(self.betweenness)) / 3.0
+        self.version += 1
+
+    def _sampled_betweenness(self) -> np.ndarray:
+        """
+        Normalized betweenness over unweighted dependency chains, by Brandes' algorithm.
+
+        A batch of sources is searched together as (source, node) pairs, one breadth-first
+        level at a time, so the work follows what the sources actually reach. With k < n
+        sources sampled, the sum is scaled by n / k.
+        """
+        indptr, indices, _ = self._live_edges()
+        n_nodes = self.graph.num_nodes
+        live_nodes = np.flatnonzero(~self.failed)
+        betweenness = np.zeros(n_nodes)
+        if len(live_nodes) < 3:
+            return betweenness
+        k = min(self.betweenness_samples, len(live_nodes))
+        pivots = (live_nodes if k == len(live_nodes)
+                  else np.sort(np.random.default_rng(self.seed).choice(live_nodes, k, replace=False)))
+
+        for start in range(0, k, PIVOT_BATCH):
+            batch = pivots[start:start + PIVOT_BATCH]
+            # Forward: the (source, node) keys of each level and their shortest-chain counts.
+            level_keys = [np.arange(len(batch)) * n_nodes + batch]
+            level_sigma = [np.ones(len(batch))]
+            visited = level_keys[0]
+            while True:
+                owner, edges = _out_edges(indptr, level_keys[-1] % n_nodes)
+                keys = (level_keys[-1][owner] // n_nodes) * n_nodes + indices[edges]
+                order = np.argsort(keys, kind="stable")
+                keys, sigma = keys[order], level_sigma[-1][owner[order]]
+                if not len(keys):
+                    break
+                first = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+                keys, sigma = keys[first], np.add.reduceat(sigma, first)
+                position = np.searchsorted(visited, keys)
+                seen = position < len(visited)
+                seen[seen] = visited[position[seen]] == keys[seen]
+                if seen.all():
+                    break
+                level_keys.append(keys[~seen])
+                level_sigma.append(sigma[~seen])
+                visited = np.union1d(visited, keys[~seen])
+            # Backward: delta(v) = sigma(v) * sum over children w of (1 + delta(w)) / sigma(w).
+            delta = np.zeros(len(level_keys[-1]))
+            for depth in range(len(level_keys) - 1, 0, -1):
+                coefficient = (1.0 + delta) / level_sigma[depth]
+                parents = level_keys[depth - 1]
+                owner, edges = _out_edges(indptr, parents % n_nodes)
+                children = (parents[owner] // n_nodes) * n_nodes + indices[edges]
+                position = np.minimum(np.searchsorted(level_keys[depth], children), len(level_keys[depth]) - 1)
+                hit = level_keys[depth][position] == children
+                delta = level_sigma[depth - 1] * np.bincount(owner[hit], weights=coefficient[position[hit]],
+                                                             minlength=len(parents))
+                if depth > 1:  # Level 0 holds the sources themselves
+                    betweenness += np.bincount(parents % n_nodes, weights=delta, minlength=n_nodes)
+
+        n_live = len(live_nodes)
+        return betweenness * (n_live / k) / ((n_live - 1) * (n_live - 2))
+
+    # ---- Serving ----
+
+    def copy_metrics(self) -> "CriticalityIndex":
+        """
+        A copy of the current metrics that later changes and refreshes leave alone, to
+        serve from while this index keeps changing. It shares the graph; do not change it.
+        """
+        metrics = copy.copy(self)
+        for name in ("failed", "downstream_reach", "expected_population_impact", "betweenness",
+                     "criticality_score"):
+            setattr(metrics, name, getattr(self, name).copy())
+        metrics.statuses = dict(self.statuses)
+        metrics._changed_nodes = []
+        return metrics
+
+    def risk_level(self, node: int) -> str:
+        score = self.criticality_score[node]
+        return next(label for threshold, label in RISK_LEVELS if score >= threshold)
+
+    def metrics(self, node_id: str) -> Dict[str, Any]:
+        """
+        Criticality metrics of one component (O(1)).
+
+        Raises:
+            KeyError: If the component is not in the graph.
+        """
+        node = self.graph.node_index[node_id]
+        return {
+            "component": node_id,
+            "component_type": self.graph.node_types[self.graph.type_codes[node]],
+            "failed": bool(self.failed[node]),
+            "downstream_reach": int(self.downstream_reach[node]),
+            "expected_population_impact": round(float(self.expected_population_impact[node]), 1),
+            "betweenness": float(self.betweenness[node]),
+            "criticality_score": round(float(self.criticality_score[node]), 4),
+            "risk_level": self.risk_level(node),
+        }
+
+    def impacto_falha(self, node_id: str) -> Dict[str, Any]:
+        """
+        Criticality of one component as `NodeDataImpactoFalha` fields (O(1)).
+
+        Raises:
+            KeyError: If the component is not in the graph.
+        """
+        node = self.graph.node_index[node_id]
+        return {
+            "risco_impacto_falha": self.risk_level(node),
+            "alcance_cascata_componentes": int(self.downstream_reach[node]),
+            "impacto_populacional_esperado": round(float(self.expected_population_impact[node]), 1),
+            "centralidade_intermediacao": round(float(self.betweenness[node]), 6),
+            "indice_criticidade": round(float(self.criticality_score[node]), 4),
+        }
+
+    def annotate_dependency_graph_response(self, response: Any) -> Dict[str, Any]:
+        """
+        Fills `data.impacto_falha` (and `data.risco_impacto_falha`) of every node of a
+        `DependencyGraphResponse` (model or dict) that is in the index. Fields already
+        present on a node are kept unless the index computes them.
+
+        Returns:
+            The response as a dict.
+        """
+        if hasattr(response, "model_dump"):
+            response = response.model_dump(by_alias=True)
+        for node in response.get("nodes", []):
+            if node.get("id") not in self.graph.node_index:
+                continue
+            data = node.setdefault("data", {}) or {}
+            node["data"] = data
+            impact = self.impacto_falha(node["id"])
+            data["impacto_falha"] = {**(data.get("impacto_falha") or {}), **impact}
+            data["risco_impacto_falha"] = impact["risco_impacto_falha"]
+        return response
+
+    def most_critical(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Metrics of the `limit` components with the highest criticality score, highest first."""
+        limit = min(limit, self.graph.num_nodes)
+        if limit <= 0:
+            return []
+        top = np.argpartition(-self.criticality_score, limit - 1)[:limit]
+        top = top[np.lexsort((-self.expected_population_impact[top], -self.criticality_score[top]))]
+        return [self.metrics(self.graph.node_ids[node]) for node in top]
@@ -0,0 +1,268 @@
+"""
+BOITATÁ Versioned Dependency Graph
+
+`DependencyGraphResponse` carries the whole node and edge list, so a dashboard that
+re-fetches it after every status change re-downloads megabytes for a city with
+thousands of assets. VersionedDependencyGraph wraps the city's DependencyGraph with
+a version number and a bounded change log:
+
+- Node status updates are O(1): a dict write and a log append. The CSR adjacency
+  arrays are not touched. An attached CriticalityIndex is only told which
+  component changed; it recomputes on its next `refresh()`.
+- Dependency changes go to the CSR arrays (`DependencyGraph.set_dependency`) and are
+  logged the same way.
+- Every change gets the next version. `changes_since(n)` returns the changes after
+  version n, or None when n is older than the log (the client refetches the snapshot).
+- Subscribers (e.g., WebSocket connections) get each change as it is applied. A
+  failing subscriber is logged and does not fail the change, which is already applied.
+- `snapshot()` copies what it serves under the lock and serializes outside it, so status
+  updates are not held up by a large graph.
+
+Changes are JSON-friendly dicts:
+    {"version": 42, "op": "node_status", "node_id": "SUB-003",
+     "data": {"estado_atual": "Falha"}, "timestamp": "2024-05-01T12:00:00"}
+with `op` one of "node_status", "edge_upsert" (source/target/data) and "edge_remove"
+(source/target). As in `DependencyGraphResponse`, an edge's `source` depends on its
+`target`.
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional
+
+# The fallback covers running this file directly as a script.
+try:
+    from .boitata_criticality import CriticalityIndex
+    from .boitata_dependency_graph import DependencyGraph
+except ImportError:
+    from boitata_criticality import CriticalityIndex
+    from boitata_dependency_graph import DependencyGraph
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHANGES = 10_000      # Changes kept for delta queries
+DEFAULT_STATUS = "operational"    # boitata.infrastructure_elements.status default (sql/init.sql)
+DEPENDENCY_EDGE_TYPE = "Dependência"
+
+ChangeListener = Callable[[Dict[str, Any]], None]
+
+
+def statuses_from_source(source: Any) -> Dict[str, str]:
+    """
+    Reads component statuses from a graph source: `status` of `boitata.infrastructure_elements`
+    rows, or `data.status_operacional.estado_atual` of `DependencyGraphResponse` nodes.
+    Other sources (e.g., a DependencyGraph or a JSON file path) carry no statuses.
+    """
+    if hasattr(source, "model_dump"):
+        source = source.model_dump(by_alias=False)
+    if isinstance(source, Mapping):
+        statuses = {}
+        for node in source.get("nodes", []):
+            status = (((node.get("data") or {}).get("status_operacional") or {}).get("estado_atual"))
+            if status is not None:
+                statuses[str(node["id"])] = status
+        return statuses
+    if isinstance(source, list):
+        return {str(row["id"]): row["status"] for row in source
+                if isinstance(row, Mapping) and row.get("status") is not None}
+    return {}
+
+
+class VersionedDependencyGraph:
+    """
+    A DependencyGraph with component statuses, a version number and a change log.
+    """
+    def __init__(self, graph: DependencyGraph, statuses: Optional[Mapping[str, Any]] = None,
+                 max_changes: int = DEFAULT_MAX_CHANGES):
+        """
+        Initializes the VersionedDependencyGraph at version 0.
+
+        Args:
+            graph: The city dependency graph. Change it through this object from now on.
+            statuses: Initial operational state per component ID (DEFAULT_STATUS otherwise).
+            max_changes: Changes kept in the log; older versions need a full resync.
+        """
+        self.graph = graph
+        self.statuses: Dict[str, Dict[str, Any]] = {
+            node_id: {"estado_atual": status} for node_id, status in (statuses or {}).items()
+            if node_id in graph.node_index}
+        self.version = 0
+        self.criticality_index: Optional[CriticalityIndex] = None
+        self._changes: Deque[Dict[str, Any]] = deque(maxlen=max_changes)
+        self._listeners: List[ChangeListener] = []
+        self._lock = threading.Lock()
+
+    def status_of(self, node_id: str) -> Dict[str, Any]:
+        """Operational state fields of a component (`estado_atual` and any extra fields)."""
+        return self.statuses.get(node_id) or {"estado_atual": DEFAULT_STATUS}
+
+    def attach_criticality_index(self, index: CriticalityIndex) -> None:
+        """
+        Forwards later status and dependency changes to `index` (built on the same graph).
+        Statuses recorded while the index was being built are passed on here.
+        """
+        with self._lock:
+            for node_id, fields in self.statuses.items():
+                if index.statuses.get(node_id) != fields["estado_atual"]:
+                    index.set_status(node_id, fields["estado_atual"], refresh=False)
+            self.criticality_index = index
+
+    def refreshed_criticality_index(self) -> Optional[CriticalityIndex]:
+        """The attached criticality index, brought up to date with the changes since its last refresh."""
+        with self._lock:
+            if self.criticality_index is not None:
+                self.criticality_index.refresh()
+            return self.criticality_index
+
+    # ---- Changes ----
+
+    def update_node_status(self, node_id: str, estado_atual: str, **fields: Any) -> int:
+        """
+        Records a component's operational state in O(1).
+
+        Args:
+            node_id: Component ID.
+            estado_atual: Its new state (e.g., "Operacional", "Falha").
+            **fields: Other `NodeDataStatusOperacional` fields to record
+                      (e.g., capacidade_operacional_percentual=40.0).
+
+        Returns:
+            The new graph version.
+
+        Raises:
+            KeyError: If the component is not in the graph.
+        """
+        if node_id not in self.graph.node_index:
+            raise KeyError(node_id)
+        data = {"estado_atual": estado_atual, **fields}
+        with self._lock:
+            self.statuses[node_id] = data
+            if self.criticality_index is not None:
+                self.criticality_index.set_status(node_id, estado_atual, refresh=False)
+            change = self._record("node_status", data, node_id=node_id)
+        self._notify(change)
+        return change["version"]
+
+    def set_dependency(self, dependent_id: str, upstream_id: str, weight: Optional[float] = None,
+                       latency_minutes: Optional[float] = None) -> int:
+        """
+        Adds or updates a dependency (see `DependencyGraph.set_dependency`).
+
+        Returns:
+            The new graph version.
+        """
+        with self._lock:
+            if self.criticality_index is not None:
+                self.criticality_index.set_dependency(dependent_id, upstream_id, weight, latency_minutes,
+                                                      refresh=False)
+            else:
+                self.graph.set_dependency(dependent_id, upstream_id, weight, latency_minutes)
+            change = self._record("edge_upsert", self._edge_data(dependent_id, upstream_id),
+                                  source=dependent_id, target=upstream_id)
+        self._notify(change)
+        return change["version"]
+
+    def remove_dependency(self, dependent_id: str, upstream_id: str) -> Optional[int]:
+        """
+        Removes a dependency (see `DependencyGraph.remove_dependency`).
+
+        Returns:
+            The new graph version, or None if there was no such dependency.
+        """
+        with self._lock:
+            if self.criticality_index is not None:
+                removed = self.criticality_index.remove_dependency(dependent_id, upstream_id, refresh=False)
+            else:
+                removed = self.graph.remove_dependency(dependent_id, upstream_id)
+            if not removed:
+                return None
+            change = self._record("edge_remove", None, source=dependent_id, target=upstream_id)
+        self._notify(change)
+        return change["version"]
+
+    def _record(self, op: str, data: Optional[Dict[str, Any]], **keys: str) -> Dict[str, Any]:
+        self.version += 1
+        change = {"version": self.version, "op": op, **keys, "data": data,
+                  "timestamp": datetime.utcnow().isoformat()}
+        self._changes.append(change)
+        return change
+
+    def _notify(self, change: Dict[str, Any]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception:  # E.g., call_soon_threadsafe on the closed loop of a finished WebSocket
+                logger.exception("Graph change listener failed on version %d", change["version"])
+
+    # ---- Deltas and snapshots ----
+
+    def changes_since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Changes applied after `version`, oldest first.
+
+        Returns:
+            The changes (empty if `version` is current), or None if `version` is older than
+            the change log or newer than the graph: the client must refetch the snapshot.
+        """
+        with self._lock:
+            if version == self.version:
+                return []
+            oldest = self._changes[0]["version"] if self._changes else self.version + 1
+            if version > self.version or version < oldest - 1:
+                return None
+            start = version - oldest + 1  # Versions in the log are consecutive
+            return [self._changes[position] for position in range(start, len(self._changes))]
+
+    def subscribe(self, listener: ChangeListener) -> Callable[[], None]:
+        """
+        Calls `listener(change)` for every change applied from now on, after the change is
+        applied (on the thread that applied it). Exceptions it raises are logged.
+
+        Returns:
+            A function that unsubscribes the listener.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _edge_data(self, dependent_id: str, upstream_id: str) -> Dict[str, float]:
+        graph = self.graph
+        position, _ = graph._edge_position(graph.node_index[upstream_id], graph.node_index[dependent_id])
+        return {"forca_dependencia_score": round(float(graph.weights[position]), 4),
+                "latencia_impacto_horas": round(float(graph.latency_minutes[position]) / 60.0, 4)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        The whole graph in the `DependencyGraphResponse` shape, plus its `version`. Node
+        data carries the operational status and, with an attached criticality index, the
+        precomputed `impacto_falha`.
+
+        Serializing a large graph takes a while; async callers should run this in an executor.
+        """
+        graph = self.graph
+        with self._lock:
+            index = self.criticality_index
+            if index is not None:
+                index.refresh()
+                index = index.copy_metrics()
+            version, statuses = self.version, dict(self.statuses)
+            # Dependency changes rewrite these arrays; serialize from copies.
+            indices, upstream = graph.indices.copy(), graph._edge_sources().copy()
+            weights, latency_minutes = graph.weights.copy(), graph.latency_minutes.copy()
+
+        nodes = []
+        for node, node_id in enumerate(graph.node_ids):
+            data: Dict[str, Any] = {"status_operacional": statuses.get(node_id) or {"estado_atual": DEFAULT_STATUS}}
+            if index is not None:
+                data["impacto_falha"] = index.impacto_falha(node_id)
+                data["risco_impacto_falha"] = data["impacto_falha"]["risco_impacto_falha"]
+            nodes.append({"id": node_id, "label": node_id,
+                          "type": graph.node_types[graph.type_codes[node]], "data": data})
+        edges = [{"source": graph.node_ids[indices[edge]], "target": graph.node_ids[upstream[edge]],
+                  "type": DEPENDENCY_EDGE_TYPE,
+                  "data": {"forca_dependencia_score": round(float(weights[edge]), 4),
+                           "latencia_impacto_horas": round(float(latency_minutes[edge]) / 60.0, 4)}}
+                 for edge in range(len(indices))]
+        return {"version": version, "nodes": nodes, "edges": edges}
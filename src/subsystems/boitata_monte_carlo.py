@@ -0,0 +1,244 @@
+"""
+BOITATÁ Monte Carlo Cascade Analysis
+
+`DependencyGraph.cascade` follows each component's most probable failure chain and
+reports one deterministic outcome. This module samples the independent cascade model
+instead: in every run each dependency passes a failure on with probability equal to
+its strength, drawn independently, and the initial failure itself happens with
+probability `initial_probability`. Thousands of runs give per-component failure
+probabilities, the distribution of impacted population, and confidence intervals.
+
+Runs are simulated together: for every component, the runs in which it failed form a
+bit set, and every propagation level draws the coins of all runs at once with NumPy. Runs are cut
+into fixed-size shards, each seeded from its own child of one SeedSequence, and shards
+are spread across a process pool; results depend only on the seed, not on the number
+of workers.
+
+Only the part of the graph the initial failure can reach within the horizon is
+simulated. Latencies enter through that horizon: a component counts as failed in a
+run when a live dependency chain reaches it and its earliest possible failure time
+(over all dependencies) is within the horizon.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+# The fallback covers running this file directly as a script.
+try:
+    from .boitata_dependency_graph import DependencyGraph
+except ImportError:
+    from boitata_dependency_graph import DependencyGraph
+
+
+DEFAULT_RUNS = 1000
+RUNS_PER_SHARD = 256            # Fixed shard size keeps results independent of the worker count
+MAX_COINS_PER_BLOCK = 1 << 22   # Dependency coins drawn at once (float32: 16 MiB)
+
+
+def _pack_runs(flags: np.ndarray) -> np.ndarray:
+    """Packs a boolean [rows x runs] matrix into [rows x words] uint64 bit sets (bit r = run r)."""
+    packed = np.packbits(flags, axis=1, bitorder="little")
+    words = -(-flags.shape[1] // 64)
+    padded = np.zeros((flags.shape[0], words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view(np.uint64)
+
+
+def _simulate_shard(indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                    sources: np.ndarray, population: np.ndarray, initial_probability: float,
+                    n_runs: int, seed: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulates `n_runs` independent cascades on a (sub)graph in CSR form.
+
+    The runs in which a component has failed are a bit set (uint64 words), so one
+    bitwise operation advances 64 runs.
+
+    Returns:
+        A tuple of (runs in which each component failed, impacted population of each run).
+    """
+    rng = np.random.default_rng(seed)
+    n_nodes = len(indptr) - 1
+    words = -(-n_runs // 64)
+    failed = np.zeros((n_nodes, words), dtype=np.uint64)
+    failed[sources] = _pack_runs((rng.random(n_runs) < initial_probability)[None, :])
+    incoming = np.zeros((n_nodes, words), dtype=np.uint64)
+    frontier, newly_failed = sources, failed[sources]
+    block = max(1, MAX_COINS_PER_BLOCK // n_runs)
+
+    while len(frontier):
+        # Dependencies leaving the components that newly failed (in at least one run).
+        starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+        owner = np.repeat(np.arange(len(frontier)), counts)
+        edges = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        touched = []
+        for begin in range(0, len(edges), block):
+            edge_block, owner_block = edges[begin:begin + block], owner[begin:begin + block]
+            live = _pack_runs(rng.random((len(edge_block), n_runs), dtype=np.float32) < weights[edge_block, None])
+            dependents = indices[edge_block]
+            order = np.argsort(dependents, kind="stable")
+            targets, first = np.unique(dependents[order], return_index=True)
+            transmitted = (newly_failed[owner_block] & live)[order]
+            incoming[targets] |= np.bitwise_or.reduceat(transmitted, first, axis=0)
+            touched.append(targets)
+        if not touched:
+            break
+        targets = np.unique(np.concatenate(touched))
+        new = incoming[targets] & ~failed[targets]
+        incoming[targets] = 0
+        failed[targets] |= new
+        keep = new.any(axis=1)
+        frontier, newly_failed = targets[keep], new[keep]
+
+    failed_runs = np.unpackbits(failed.view(np.uint8), axis=1, count=n_runs, bitorder="little")
+    return failed_runs.sum(axis=1), population.astype(np.float64) @ failed_runs
+
+
+class MonteCarloCascadeResult:
+    """
+    Outcome of a Monte Carlo cascade analysis.
+
+    Attributes:
+        nodes: Node indices of the components that failed in at least one run.
+        failure_probability: Fraction of runs in which each of `nodes` failed.
+        ci_low, ci_high: Wilson confidence interval of each failure probability.
+        impacted_population: Population impacted in every run (initial failures excluded).
+        n_runs, seed, confidence: The analysis settings.
+    """
+    def __init__(self, graph: DependencyGraph, nodes: np.ndarray, failure_counts: np.ndarray,
+                 earliest_minutes: np.ndarray, impacted_population: np.ndarray, n_runs: int,
+                 seed: int, confidence: float):
+        self.graph = graph
+        self.n_runs = n_runs
+        self.seed = seed
+        self.confidence = confidence
+        order = np.argsort(-failure_counts, kind="stable")
+        observed = order[failure_counts[order] > 0]
+        self.nodes = nodes[observed]
+        self.earliest_time_to_failure_minutes = earliest_minutes[observed]
+        self.failure_probability = failure_counts[observed] / n_runs
+        self.ci_low, self.ci_high = self._wilson_interval(self.failure_probability)
+        self.impacted_population = impacted_population
+
+    def _wilson_interval(self, probability: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        n = self.n_runs
+        centre = (probability + z * z / (2 * n)) / (1 + z * z / n)
+        half_width = z * np.sqrt(probability * (1 - probability) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return np.clip(centre - half_width, 0.0, 1.0), np.clip(centre + half_width, 0.0, 1.0)
+
+    @property
+    def expected_impacted_population(self) -> float:
+        return float(self.impacted_population.mean())
+
+    def impacted_population_interval(self) -> Tuple[float, float]:
+        """Confidence interval of the expected impacted population (normal approximation)."""
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        half_width = z * self.impacted_population.std(ddof=1) / np.sqrt(self.n_runs) if self.n_runs > 1 else 0.0
+        mean = self.expected_impacted_population
+        return max(0.0, mean - half_width), mean + half_width
+
+    def summary(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns the analysis as a JSON-friendly dict, most probable failures first.
+
+        Args:
+            limit: Maximum number of components listed (None for all).
+        """
+        graph = self.graph
+        low, high = self.impacted_population_interval()
+        components = []
+        for position in range(len(self.nodes) if limit is None else min(limit, len(self.nodes))):
+            node = int(self.nodes[position])
+            probability = float(self.failure_probability[position])
+            components.append({
+                "affected_system": graph.node_types[graph.type_codes[node]],
+                "affected_component": graph.node_ids[node],
+                "failure_probability": round(probability, 4),
+                "failure_probability_ci": [round(float(self.ci_low[position]), 4),
+                                           round(float(self.ci_high[position]), 4)],
+                "expected_impact_population": int(round(graph.population[node] * probability)),
+                "earliest_time_to_failure_minutes": round(float(self.earliest_time_to_failure_minutes[position]), 2),
+            })
+        return {
+            "n_runs": self.n_runs,
+            "seed": self.seed,
+            "confidence": self.confidence,
+            "expected_impacted_population": round(self.expected_impacted_population, 1),
+            "impacted_population_ci": [round(float(low), 1), round(float(high), 1)],
+            "impacted_population_percentiles": {
+                f"p{q}": float(np.percentile(self.impacted_population, q)) for q in (5, 50, 95)},
+            "affected_components": components,
+        }
+
+
+def run_monte_carlo_cascade(graph: DependencyGraph,
+                            initial_failures: Union[str, Iterable[str]],
+                            n_runs: int = DEFAULT_RUNS,
+                            initial_probability: float = 1.0,
+                            max_minutes: Optional[float] = None,
+                            seed: Optional[int] = None,
+                            n_workers: Optional[int] = 1,
+                            confidence: float = 0.95) -> MonteCarloCascadeResult:
+    """
+    Runs `n_runs` stochastic cascades from the initial failures.
+
+    Args:
+        graph: City dependency graph.
+        initial_failures: Component ID(s) that fail together at time 0 (in a run where
+                          the initial failure happens).
+        n_runs: Number of cascades to sample.
+        initial_probability: Probability that the initial failure happens in a run.
+        max_minutes: Horizon; components whose earliest possible failure is later never fail.
+        seed: Seed of the run; None draws fresh entropy (reported as `result.seed`).
+        n_workers: Processes to spread the run shards over (None for all CPUs, 1 to run inline).
+        confidence: Level of the confidence intervals.
+
+    Returns:
+        MonteCarloCascadeResult.
+
+    Raises:
+        KeyError: If an initial failure is not a component of the graph.
+        ValueError: If n_runs < 1.
+    """
+    if n_runs < 1:
+        raise ValueError("Monte Carlo cascade analysis needs n_runs >= 1.")
+    if isinstance(initial_failures, str):
+        initial_failures = [initial_failures]
+    initial_failures = list(initial_failures)
+    seed_sequence = np.random.SeedSequence(seed)
+
+    # Restrict the simulation to what any run could reach: every dependency live.
+    reachable = graph.cascade(initial_failures, initial_probability=1.0, min_probability=0.0,
+                              max_minutes=max_minutes)
+    nodes = reachable.nodes
+    local = np.full(graph.num_nodes, -1, dtype=np.int64)
+    local[nodes] = np.arange(len(nodes))
+    rows = np.repeat(np.arange(graph.num_nodes), np.diff(graph.indptr))
+    inside = np.flatnonzero((local[rows] >= 0) & (local[graph.indices] >= 0))
+    inside = inside[np.argsort(local[rows[inside]], kind="stable")]  # CSR rows in local order
+    sub_rows, sub_indices = local[rows[inside]], local[graph.indices[inside]]
+    sub_indptr = np.concatenate([[0], np.cumsum(np.bincount(sub_rows, minlength=len(nodes)))])
+    sources = local[[graph.node_index[node_id] for node_id in initial_failures]]
+    population = graph.population[nodes].copy()
+    population[sources] = 0  # The initial failure is given, not a cascade impact
+
+    shard_sizes = [min(RUNS_PER_SHARD, n_runs - start) for start in range(0, n_runs, RUNS_PER_SHARD)]
+    shard_args = [(sub_indptr, sub_indices, graph.weights[inside], sources, population,
+                   initial_probability, size, child)
+                  for size, child in zip(shard_sizes, seed_sequence.spawn(len(shard_sizes)))]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(shard_args))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            shards = list(executor.map(_simulate_shard, *zip(*shard_args)))
+    else:
+        shards = [_simulate_shard(*args) for args in shard_args]
+
+    failure_counts = np.sum([counts for counts, _ in shards], axis=0)
+    impacted = np.concatenate([impacted for _, impacted in shards])
+    failure_counts[sources] = 0  # Report cascaded failures only
+    return MonteCarloCascadeResult(graph, nodes, failure_counts, reachable.time_to_failure_minutes,
+                                   impacted, n_runs, seed_sequence.entropy, confidence)
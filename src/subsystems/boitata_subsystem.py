@@ -5,7 +5,20 @@ This module defines the BoitataUrbanTwin class, responsible for
 simulating urban infrastructure dependencies and predicting cascade effects.
 """
 
-from typing import Dict, List
+import threading
+from typing import Any, Dict, List, Optional
+
+# The fallback covers running this file directly as a script.
+try:
+    from .boitata_criticality import CriticalityIndex
+    from .boitata_dependency_graph import DependencyGraph
+    from .boitata_graph_store import VersionedDependencyGraph, statuses_from_source
+    from .boitata_monte_carlo import DEFAULT_RUNS, run_monte_carlo_cascade
+except ImportError:
+    from boitata_criticality import CriticalityIndex
+    from boitata_dependency_graph import DependencyGraph
+    from boitata_graph_store import VersionedDependencyGraph, statuses_from_source
+    from boitata_monte_carlo import DEFAULT_RUNS, run_monte_carlo_cascade
 
 class BoitataUrbanTwin:
     """
@@ -13,13 +26,15 @@ class BoitataUrbanTwin:
     modeling dependencies between critical services (power, water, communications, etc.)
     and simulating cascade failure effects to predict and prevent urban crises.
     """
-    def __init__(self, city_name: str = "belo_horizonte"):
+    def __init__(self, city_name: str = "belo_horizonte", dependency_graph: Optional[Any] = None):
         """
         Initializes the BoitataUrbanTwin for a specific city.
 
         Args:
             city_name (str): The name/identifier of the city to model.
                            Default is "belo_horizonte".
+            dependency_graph (Optional[Any]): The city's infrastructure dependencies: a
+                           DependencyGraph, or anything `load_dependency_graph` accepts.
 
         Conceptually, this would set up:
         - self.city_name (str): The target city for this digital twin instance.
@@ -33,15 +48,50 @@ class BoitataUrbanTwin:
                                  "what-if" scenarios and testing mitigation strategies.
         """
         self.city_name: str = city_name
-        self.city_dependency_graph = None    # Placeholder for infrastructure dependency network
+        self.city_dependency_graph: Optional[DependencyGraph] = None  # Infrastructure dependency network
+        self.graph_store: Optional[VersionedDependencyGraph] = None  # Versioned graph, statuses and change log
         self.cascade_predictor = None        # Placeholder for cascade prediction model
         self.simulation_engine = None        # Placeholder for urban simulation engine
+        self._criticality_build_lock = threading.Lock()  # One criticality index build at a time
+        if dependency_graph is not None:
+            self.load_dependency_graph(dependency_graph)
         print(f"BoitataUrbanTwin initialized for city: {self.city_name}")
 
-    def simulate_cascade_effects(self, initial_failure: Dict) -> List[Dict]:
+    def load_dependency_graph(self, source: Any) -> DependencyGraph:
+        """
+        Loads the city's infrastructure dependency graph.
+
+        Args:
+            source (Any): A DependencyGraph; a JSON file path or JSON text; a list of
+                         `boitata.infrastructure_elements` rows; or a DependencyGraphResponse
+                         (model or dict with "nodes" and "edges").
+
+        Component statuses in the source (row `status`, or node
+        `data.status_operacional.estado_atual`) seed `graph_store`, which versions later changes.
+
+        Returns:
+            DependencyGraph: The loaded graph, also stored as `city_dependency_graph`.
+        """
+        if isinstance(source, DependencyGraph):
+            graph = source
+        elif hasattr(source, "model_dump"):
+            graph = DependencyGraph.from_dependency_graph_response(source)
+        else:
+            graph = DependencyGraph.load_json(source)
+        self.city_dependency_graph = graph
+        self.graph_store = VersionedDependencyGraph(graph, statuses_from_source(source))
+        print(f"Dependency graph loaded for {self.city_name}: {graph.num_nodes} components, "
+              f"{graph.num_edges} dependencies")
+        return graph
+
+    def simulate_cascade_effects(self, initial_failure: Dict, max_results: Optional[int] = None) -> List[Dict]:
         """
         Simulates the cascade effects of an initial infrastructure failure.
 
+        The failure propagates through `city_dependency_graph` (see boitata_dependency_graph):
+        `failure_severity` is the probability of the initial failure, and the cascade is
+        limited to `estimated_duration_hours` when given.
+
         Args:
             initial_failure (Dict): A dictionary describing the initial failure event.
                                    Example:
@@ -52,6 +102,8 @@ class BoitataUrbanTwin:
                                        "location": (-19.9167, -43.9333),
                                        "estimated_duration_hours": 6
                                    }
+            max_results (Optional[int]): Maximum number of cascaded failures to return,
+                                   earliest first (None for all).
 
         Returns:
             List[Dict]: A list of dictionaries representing cascaded failure events.
@@ -77,30 +129,152 @@ class BoitataUrbanTwin:
                        ]
                        Returns an empty list if no cascade effects are predicted.
         """
-        # Placeholder implementation: In a real scenario, this method would:
-        # 1. Use self.city_dependency_graph to identify systems dependent on the failed component.
-        # 2. Apply self.cascade_predictor to estimate failure probabilities and timing.
-        # 3. Use self.simulation_engine to run detailed simulations of the cascade.
-        # 4. Return a prioritized list of potential secondary failures.
         print(f"Simulating cascade effects for failure in {initial_failure.get('system_type', 'Unknown')} "
               f"at {initial_failure.get('location', 'Unknown location')}")
-        pass
-        # Example return for no cascade effects:
-        # return []
-        # Example return with cascade effects:
-        # return [
-        #     {
-        #         "cascade_step": 1,
-        #         "affected_system": "water_distribution",
-        #         "failure_probability": 0.72,
-        #         "estimated_impact": "50000 residents without water"
-        #     }
-        # ]
-        return []
+        component = initial_failure.get("affected_component")
+        graph = self.city_dependency_graph
+        if graph is None or component not in graph.node_index:
+            # Without a graph (or for a component outside it) no cascade can be predicted.
+            return []
+
+        duration_hours = initial_failure.get("estimated_duration_hours")
+        result = graph.cascade(component,
+                               initial_probability=float(initial_failure.get("failure_severity", 1.0)),
+                               max_minutes=None if duration_hours is None else float(duration_hours) * 60.0)
+        return result.to_cascade_steps(limit=max_results)
+
+    def get_criticality_index(self) -> Optional[CriticalityIndex]:
+        """
+        Returns the criticality index of `city_dependency_graph` (see boitata_criticality),
+        computing it on first call and refreshing it with the changes made through
+        `graph_store` since.
+
+        The first call takes seconds on a large graph and later ones may recompute
+        betweenness; async callers should run this in an executor.
+
+        Returns:
+            Optional[CriticalityIndex]: None if no dependency graph is loaded.
+        """
+        store = self.graph_store
+        if store is None:
+            return None
+        if store.criticality_index is None:
+            with self._criticality_build_lock:
+                if store.criticality_index is None:
+                    statuses = {node_id: fields["estado_atual"] for node_id, fields in dict(store.statuses).items()}
+                    store.attach_criticality_index(CriticalityIndex(store.graph, statuses=statuses))
+        return store.refreshed_criticality_index()
+
+    def assess_component_criticality(self, component_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a component's precomputed failure impact as `NodeDataImpactoFalha` fields:
+        risk level, cascade reach, expected population impact, betweenness and criticality score.
+
+        Args:
+            component_id (str): ID of the infrastructure component.
+
+        Returns:
+            Optional[Dict[str, Any]]: None without a graph or for an unknown component.
+        """
+        index = self.get_criticality_index()
+        if index is None or component_id not in index.graph.node_index:
+            return None
+        return index.impacto_falha(component_id)
+
+    def update_component_status(self, component_id: str, estado_atual: str, **fields: Any) -> Optional[int]:
+        """
+        Records a component's operational state (O(1); see boitata_graph_store).
+
+        Args:
+            component_id (str): ID of the infrastructure component.
+            estado_atual (str): Its new state (e.g., "Operacional", "Falha").
+            **fields: Other `NodeDataStatusOperacional` fields to record.
+
+        Returns:
+            Optional[int]: The new graph version; None without a graph or for an unknown component.
+        """
+        store = self.graph_store
+        if store is None or component_id not in store.graph.node_index:
+            return None
+        return store.update_node_status(component_id, estado_atual, **fields)
+
+    def simulate_cascade_monte_carlo(self, initial_failure: Dict, n_runs: int = DEFAULT_RUNS,
+                                     seed: Optional[int] = None, n_workers: Optional[int] = 1,
+                                     confidence: float = 0.95, max_results: Optional[int] = None) -> Dict:
+        """
+        Runs `n_runs` stochastic cascades of an initial failure (see boitata_monte_carlo).
+
+        Each dependency passes a failure on independently with probability equal to its
+        strength, and the initial failure happens with probability `failure_severity`.
+
+        Args:
+            initial_failure (Dict): The initial failure, as for `simulate_cascade_effects`.
+            n_runs (int): Number of cascades to sample.
+            seed (Optional[int]): Seed for reproducible runs (None: fresh, reported in the result).
+            n_workers (Optional[int]): Processes to spread the runs over (None for all CPUs).
+            confidence (float): Level of the confidence intervals.
+            max_results (Optional[int]): Maximum number of components listed, most probable first.
+
+        Returns:
+            Dict: n_runs, seed, expected_impacted_population with its confidence interval and
+                  percentiles, and `affected_components` with each component's failure
+                  probability and its confidence interval. Without a graph (or for a
+                  component outside it) `affected_components` is empty.
+        """
+        component = initial_failure.get("affected_component")
+        graph = self.city_dependency_graph
+        if graph is None or component not in graph.node_index:
+            return {"n_runs": 0, "seed": seed, "expected_impacted_population": 0.0, "affected_components": []}
+
+        duration_hours = initial_failure.get("estimated_duration_hours")
+        result = run_monte_carlo_cascade(graph, component, n_runs=n_runs,
+                                         initial_probability=float(initial_failure.get("failure_severity", 1.0)),
+                                         max_minutes=None if duration_hours is None else float(duration_hours) * 60.0,
+                                         seed=seed, n_workers=n_workers, confidence=confidence)
+        return result.summary(limit=max_results)
+
+    async def execute_response_plan(self, actions: List[Dict]) -> List[Dict]:
+        """
+        Executes the orchestrator's actions for BOITATÁ.
+
+        "assess_cascade_risk" runs `simulate_cascade_effects` for the failure described by
+        the action's `parameters` (at least "affected_component"); the action's priority
+        is the failure severity unless `parameters` give "failure_severity".
+
+        Args:
+            actions (List[Dict]): Actions from a response plan (action_id, action_type,
+                                  target_area, priority, parameters).
+
+        Returns:
+            List[Dict]: One result per action: action_id, status ("completed" or "skipped") and,
+                        when completed, the predicted `cascade_steps`.
+        """
+        results = []
+        graph = self.city_dependency_graph
+        for action in actions:
+            parameters = action.get("parameters", {})
+            if (action.get("action_type") != "assess_cascade_risk" or graph is None
+                    or parameters.get("affected_component") not in graph.node_index):
+                results.append({"action_id": action["action_id"], "status": "skipped",
+                                "reason": "Unsupported action or component not in the dependency graph"})
+                continue
+            failure = {"failure_severity": action.get("priority", 1.0), "location": action.get("target_area"),
+                       **parameters}
+            results.append({"action_id": action["action_id"], "status": "completed",
+                            "cascade_steps": self.simulate_cascade_effects(failure)})
+        return results
 
 if __name__ == '__main__':
     # Example Usage
-    boitata = BoitataUrbanTwin(city_name="sao_paulo")
+    boitata = BoitataUrbanTwin(city_name="sao_paulo", dependency_graph=[
+        {"id": "main_transformer_station", "element_type": "electrical_grid"},
+        {"id": "pump_station_beta", "element_type": "water_treatment", "population_served": 50000,
+         "dependencies": [{"id": "main_transformer_station", "weight": 0.8, "latency_minutes": 45}]},
+        {"id": "cell_tower_gamma", "element_type": "telecommunications", "population_served": 25000,
+         "dependencies": [{"id": "main_transformer_station", "weight": 0.6, "latency_minutes": 120}]},
+        {"id": "hospital_central", "element_type": "hospital", "population_served": 2000,
+         "dependencies": ["pump_station_beta", "cell_tower_gamma"]},
+    ])
     
     sample_failure = {
         "system_type": "electrical_grid",
@@ -115,3 +289,4 @@ if __name__ == '__main__':
     print(f"Predicted cascade effects: {len(cascade_effects)} secondary failures")
     for effect in cascade_effects:
         print(f"  - {effect}")
+    print(f"Most critical component: {boitata.get_criticality_index().most_critical(1)[0]}")
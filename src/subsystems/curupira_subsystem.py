@@ -5,7 +5,7 @@ This module defines the CurupiraHybridDetector class, responsible for
 detecting coordinated physical and cyber threats to critical infrastructures.
 """
 
-from typing import Dict
+from typing import Dict, List, Set
 
 class CurupiraHybridDetector:
     """
@@ -27,6 +27,7 @@ class CurupiraHybridDetector:
         self.physical_monitor = None  # Placeholder for physical monitoring component
         self.network_analyzer = None  # Placeholder for network analysis component
         self.fusion_ai = None         # Placeholder for the AI-driven fusion engine
+        self.isolated_segments: Set[str] = set()  # Network segments cut off by response plans
         print("CurupiraHybridDetector initialized.")
 
     def detect_coordinated_attack(self, physical_sensors_data: Dict, network_activity_data: Dict) -> Dict:
@@ -79,6 +80,30 @@ class CurupiraHybridDetector:
         # }
         return {}
 
+    async def execute_response_plan(self, actions: List[Dict]) -> List[Dict]:
+        """
+        Executes the orchestrator's actions for CURUPIRA.
+
+        "isolate_network_segment" adds `parameters["target_segment"]` to `isolated_segments`.
+
+        Args:
+            actions (List[Dict]): Actions from a response plan (action_id, action_type,
+                                  target_area, priority, parameters).
+
+        Returns:
+            List[Dict]: One result per action: action_id, status ("completed" or "skipped") and details.
+        """
+        results = []
+        for action in actions:
+            segment = action.get("parameters", {}).get("target_segment")
+            if action.get("action_type") != "isolate_network_segment" or segment is None:
+                results.append({"action_id": action["action_id"], "status": "skipped",
+                                "reason": "Unsupported action or no target_segment"})
+                continue
+            self.isolated_segments.add(segment)
+            results.append({"action_id": action["action_id"], "status": "completed", "isolated_segment": segment})
+        return results
+
 if __name__ == '__main__':
     # Example Usage
     curupira = CurupiraHybridDetector()
@@ -0,0 +1,368 @@
+"""
+IARA Region Risk Ensembles
+
+Scores a whole table of regions at once. A RegionTable holds the regions as columns
+(population density, recent case counts per pathogen, environmental factors,
+vaccination rate), and every pathogen becomes one MetapopulationSEIR model over all
+regions, so a state's thousands of regions cost a few vectorized runs instead of
+thousands of Python calls.
+
+Uncertainty comes from parameter-perturbed ensembles: each member scales a pathogen's
+R0, incubation and infectious periods, and every region's case count, by mean-one
+log-normal factors (PERTURBATION_SIGMAS). Members are stacked into one block-diagonal
+model per pathogen, so a shard of members is still a single SEIR run. Members are cut
+into fixed-size shards, each seeded from its own child of one SeedSequence, and shards
+are spread across a process pool; results depend only on the seed, not on the number
+of workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# The fallback covers running this file directly as a script.
+try:
+    from .iara_seir import DEFAULT_HORIZON_DAYS, MetapopulationSEIR
+except ImportError:
+    from iara_seir import DEFAULT_HORIZON_DAYS, MetapopulationSEIR
+
+# Natural history per pathogen (key of `recent_case_counts`).
+PATHOGEN_PARAMETERS = {
+    "dengue": {"r0": 2.2, "incubation_days": 5.5, "infectious_days": 5.0, "vector_borne": True},
+    "flu": {"r0": 1.4, "incubation_days": 2.0, "infectious_days": 4.0, "vaccine_preventable": True},
+    "influenza": {"r0": 1.4, "incubation_days": 2.0, "infectious_days": 4.0, "vaccine_preventable": True},
+    "covid19": {"r0": 2.5, "incubation_days": 5.0, "infectious_days": 7.0, "vaccine_preventable": True},
+}
+DEFAULT_PATHOGEN_PARAMETERS = {"r0": 1.8, "incubation_days": 4.0, "infectious_days": 5.0}
+VACCINE_EFFICACY = 0.7
+DEFAULT_REGION_AREA_KM2 = 100.0     # Population = density * area when `population` is missing
+REFERENCE_DENSITY = 1000.0          # people/km^2 at which density does not change transmission
+
+# Region columns, with the value used when a column (or a record's field) is missing.
+REGION_DEFAULTS = {"population_density": REFERENCE_DENSITY, "avg_temperature_c": 25.0,
+                   "avg_humidity_percent": 70.0, "air_quality_index": 50.0, "vaccination_rate": 0.0}
+
+# Log-normal sigma of each ensemble perturbation ("cases" is drawn per region).
+PERTURBATION_SIGMAS = {"r0": 0.15, "incubation_days": 0.1, "infectious_days": 0.1, "cases": 0.3}
+DEFAULT_ENSEMBLE_MEMBERS = 64
+MEMBERS_PER_SHARD = 16      # Fixed shard size keeps results independent of the worker count
+
+# Spread speed labels of the heatmap, by effective reproduction number.
+SPREAD_SPEED_THRESHOLDS = ((1.0, "baixa"), (1.5, "moderada"), (float("inf"), "alta"))
+
+
+class RegionTable:
+    """
+    Regions as columns of equal length.
+
+    Attributes:
+        columns: Column name -> float array: "population", plus every REGION_DEFAULTS column.
+        case_counts: Pathogen -> recent case counts per region.
+        region_ids: Region IDs (default: "region_<i>").
+        locations: Optional (latitude, longitude) per region, for heatmaps.
+    """
+    def __init__(self, population_density: Sequence[float], case_counts: Mapping[str, Sequence[float]],
+                 avg_temperature_c: Optional[Sequence[float]] = None,
+                 avg_humidity_percent: Optional[Sequence[float]] = None,
+                 air_quality_index: Optional[Sequence[float]] = None,
+                 vaccination_rate: Optional[Sequence[float]] = None,
+                 population: Optional[Sequence[float]] = None,
+                 region_ids: Optional[Sequence[str]] = None,
+                 locations: Optional[Sequence[Tuple[float, float]]] = None):
+        """
+        Initializes the RegionTable.
+
+        Missing columns take their REGION_DEFAULTS value; a missing population is the
+        density times DEFAULT_REGION_AREA_KM2.
+
+        Raises:
+            ValueError: If the columns differ in length.
+        """
+        density = np.asarray(population_density, dtype=np.float64)
+        n_regions = len(density)
+        given = {"population_density": density, "avg_temperature_c": avg_temperature_c,
+                 "avg_humidity_percent": avg_humidity_percent, "air_quality_index": air_quality_index,
+                 "vaccination_rate": vaccination_rate}
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, values in given.items():
+            self.columns[name] = (np.full(n_regions, REGION_DEFAULTS[name]) if values is None
+                                  else self._column(name, values, n_regions))
+        self.columns["population"] = (density * DEFAULT_REGION_AREA_KM2 if population is None
+                                      else self._column("population", population, n_regions))
+        self.case_counts = {pathogen: self._column(f"case_counts[{pathogen}]", counts, n_regions)
+                            for pathogen, counts in case_counts.items()}
+        self.region_ids = ([f"region_{index}" for index in range(n_regions)] if region_ids is None
+                           else [str(region_id) for region_id in region_ids])
+        self.locations = None if locations is None else [tuple(location) for location in locations]
+        if len(self.region_ids) != n_regions or (self.locations is not None and len(self.locations) != n_regions):
+            raise ValueError(f"region_ids and locations must have one entry per region ({n_regions}).")
+
+    @staticmethod
+    def _column(name: str, values: Sequence[float], n_regions: int) -> np.ndarray:
+        column = np.asarray(values, dtype=np.float64)
+        if column.shape != (n_regions,):
+            raise ValueError(f"Column {name} has shape {column.shape}, expected ({n_regions},).")
+        return column
+
+    @property
+    def n_regions(self) -> int:
+        return len(self.region_ids)
+
+    @classmethod
+    def from_records(cls, regions: Sequence[Dict]) -> "RegionTable":
+        """
+        Builds a table from `region_data` dicts (see IaraEpidemicPredictor), whose
+        environmental factors may be nested under "environmental_factors".
+        """
+        def field(region: Dict, name: str) -> Any:
+            value = region.get(name, (region.get("environmental_factors") or {}).get(name))
+            return REGION_DEFAULTS[name] if value is None else value
+
+        columns = {name: [field(region, name) for region in regions] for name in REGION_DEFAULTS}
+        population = [region.get("population") for region in regions]
+        pathogens = sorted({pathogen for region in regions for pathogen in region.get("recent_case_counts") or {}})
+        case_counts = {pathogen: [(region.get("recent_case_counts") or {}).get(pathogen, 0) for region in regions]
+                       for pathogen in pathogens}
+        locations = [region.get("location") for region in regions]
+        return cls(case_counts=case_counts,
+                   population=[density * DEFAULT_REGION_AREA_KM2 if people is None else people
+                               for people, density in zip(population, columns["population_density"])],
+                   region_ids=[region.get("region_id", f"region_{index}") for index, region in enumerate(regions)],
+                   locations=None if any(location is None for location in locations) else locations,
+                   **columns)
+
+
+def pathogen_parameters(pathogen: str) -> Dict[str, Any]:
+    """Natural history of a pathogen (DEFAULT_PATHOGEN_PARAMETERS when unknown)."""
+    return PATHOGEN_PARAMETERS.get(pathogen.lower(), DEFAULT_PATHOGEN_PARAMETERS)
+
+
+def _transmission_multiplier(parameters: Dict[str, Any], columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Coarse environmental modifiers of the transmission rate, per region: warm, humid
+    weather for vector-borne pathogens; crowding and poor air for the others.
+    """
+    if parameters.get("vector_borne"):
+        temperature = np.clip(1.0 + 0.08 * (columns["avg_temperature_c"] - 25.0), 0.2, 1.6)
+        humidity = np.clip(1.0 + 0.01 * (columns["avg_humidity_percent"] - 70.0), 0.5, 1.3)
+        return temperature * humidity
+    crowding = (np.maximum(columns["population_density"], 1.0) / REFERENCE_DENSITY) ** 0.1
+    air = np.clip(1.0 + 0.002 * (columns["air_quality_index"] - 50.0), 1.0, 1.3)
+    return crowding * air
+
+
+def pathogen_outlook(parameters: Dict[str, Any], columns: Dict[str, np.ndarray], cases: np.ndarray,
+                     mobility: Optional[Any] = None, horizon_days: float = DEFAULT_HORIZON_DAYS,
+                     factors: Optional[Dict[str, np.ndarray]] = None) -> Tuple[MetapopulationSEIR, Dict[str, np.ndarray]]:
+    """
+    Builds one pathogen's SEIR model over all regions and runs its outbreak outlook.
+
+    Args:
+        parameters: Natural history (see PATHOGEN_PARAMETERS).
+        columns: RegionTable columns.
+        cases: Recent case counts per region.
+        mobility: Sparse or dense mobility matrix (see MetapopulationSEIR), or None.
+        horizon_days: Prediction horizon.
+        factors: Ensemble perturbations (see PERTURBATION_SIGMAS): "r0", "incubation_days"
+                 and "infectious_days" of shape (n_members,), "cases" of shape
+                 (n_members, n_regions). The members are stacked into one block-diagonal
+                 model. None runs the nominal parameters once.
+
+    Returns:
+        (model, outlook): the model and MetapopulationSEIR.outbreak_probability, with every
+        array reshaped to (n_members, n_regions) when `factors` is given.
+    """
+    from scipy import sparse
+
+    n_regions = len(cases)
+    n_members = 1 if factors is None else len(factors["r0"])
+
+    def per_member(name: str) -> np.ndarray:
+        nominal = parameters[name]
+        return np.full(n_regions * n_members, nominal) if factors is None \
+            else np.repeat(nominal * factors[name], n_regions)
+
+    def tiled(column: np.ndarray) -> np.ndarray:
+        return np.tile(column, n_members)
+
+    infectious_days, incubation_days = per_member("infectious_days"), per_member("incubation_days")
+    population = tiled(columns["population"])
+    gamma = 1.0 / infectious_days
+    beta = per_member("r0") * gamma * tiled(_transmission_multiplier(parameters, columns))
+    if mobility is not None and n_members > 1:
+        mobility = sparse.kron(sparse.identity(n_members, format="csr"), sparse.csr_matrix(mobility), format="csr")
+    model = MetapopulationSEIR(population, beta, 1.0 / incubation_days, gamma, mobility)
+    immune = (np.clip(tiled(columns["vaccination_rate"]), 0.0, 1.0) * VACCINE_EFFICACY * population
+              if parameters.get("vaccine_preventable") else 0.0)
+    # Recent cases are taken as currently infectious, with as many exposed as a steady
+    # epidemic holds per infectious person (incubation / infectious period).
+    cases = tiled(cases) if factors is None else (factors["cases"] * cases).ravel()
+    infectious = np.minimum(cases, population)
+    exposed = infectious * incubation_days / infectious_days
+    state = model.initial_state(exposed=exposed, infectious=infectious, recovered=immune)
+    outlook = model.outbreak_probability(state, horizon_days)
+    if factors is not None:
+        outlook = {name: values.reshape(n_members, n_regions) for name, values in outlook.items()}
+    return model, outlook
+
+
+def _simulate_shard(columns: Dict[str, np.ndarray], case_counts: Dict[str, np.ndarray], mobility: Optional[Any],
+                    horizon_days: float, n_members: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Outbreak probabilities of `n_members` ensemble members, shape (n_members, n_pathogens, n_regions)."""
+    rng = np.random.default_rng(seed)
+    n_regions = len(columns["population"])
+    probabilities = np.empty((n_members, len(case_counts), n_regions))
+    for position, (pathogen, cases) in enumerate(case_counts.items()):
+        factors = {name: rng.lognormal(-sigma * sigma / 2, sigma, n_members if name != "cases" else (n_members, n_regions))
+                   for name, sigma in PERTURBATION_SIGMAS.items()}
+        _, outlook = pathogen_outlook(pathogen_parameters(pathogen), columns, cases, mobility, horizon_days, factors)
+        probabilities[:, position] = outlook["probability"]
+    return probabilities
+
+
+class RegionRiskResult:
+    """
+    Outbreak risk of every region of a RegionTable.
+
+    Attributes:
+        region_ids, locations: From the table.
+        pathogens: Pathogens scored (the table's case count columns).
+        probability: Outbreak probability of any pathogen with the nominal parameters.
+        pathogen_probability: Nominal probability per pathogen, shape (n_pathogens, n_regions).
+        reproduction_number: Nominal effective reproduction number per pathogen, same shape.
+        member_probability: Probability of each ensemble member, shape (n_members, n_regions).
+        ensemble_mean, band_low, band_high: Mean and central `confidence` band of the members
+                                            (the nominal probability without members).
+        n_members, seed, confidence: The ensemble settings.
+    """
+    def __init__(self, table: RegionTable, pathogen_probability: np.ndarray, reproduction_number: np.ndarray,
+                 member_pathogen_probability: np.ndarray, seed: int, confidence: float):
+        self.region_ids = table.region_ids
+        self.locations = table.locations
+        self.pathogens = list(table.case_counts)
+        self.pathogen_probability = pathogen_probability
+        self.reproduction_number = reproduction_number
+        self.probability = 1.0 - np.prod(1.0 - pathogen_probability, axis=0)
+        self.member_probability = 1.0 - np.prod(1.0 - member_pathogen_probability, axis=1)
+        self.n_members = len(member_pathogen_probability)
+        self.seed = seed
+        self.confidence = confidence
+        if self.n_members:
+            self.ensemble_mean = self.member_probability.mean(axis=0)
+            self.band_low, self.band_high = np.quantile(
+                self.member_probability, [(1 - confidence) / 2, (1 + confidence) / 2], axis=0)
+        else:
+            self.ensemble_mean = self.band_low = self.band_high = self.probability
+
+    def predominant_pathogens(self) -> List[Optional[str]]:
+        """Pathogen with the highest nominal outbreak probability per region (None when all are 0)."""
+        if not self.pathogens:
+            return [None] * len(self.region_ids)
+        best = self.pathogen_probability.argmax(axis=0)
+        top = self.pathogen_probability.max(axis=0)
+        return [self.pathogens[index] if probability > 0 else None for index, probability in zip(best, top)]
+
+    def spread_speeds(self) -> List[Optional[str]]:
+        """Spread speed label (SPREAD_SPEED_THRESHOLDS) of each region's predominant pathogen."""
+        speeds = []
+        for region, pathogen in enumerate(self.predominant_pathogens()):
+            if pathogen is None:
+                speeds.append(None)
+                continue
+            reproduction = self.reproduction_number[self.pathogens.index(pathogen), region]
+            speeds.append(next(label for limit, label in SPREAD_SPEED_THRESHOLDS if reproduction < limit))
+        return speeds
+
+    def heatmap_data_points(self) -> List[Dict[str, Any]]:
+        """
+        Regions as IaraHeatmapDataPoint dicts (ensemble mean as the risk score).
+
+        Raises:
+            ValueError: If the table has no locations.
+        """
+        if self.locations is None:
+            raise ValueError("Heatmap data points need region locations.")
+        return [{"geolocalizacao": location, "risco_epidemiologico_score": round(float(score), 4),
+                 "patogeno_predominante": pathogen, "velocidade_propagacao_estimada": speed}
+                for location, score, pathogen, speed in zip(self.locations, self.ensemble_mean,
+                                                            self.predominant_pathogens(), self.spread_speeds())]
+
+    def summary(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns the scores as a JSON-friendly dict, riskiest regions first.
+
+        Args:
+            limit: Maximum number of regions listed (None for all).
+        """
+        order = np.argsort(-self.ensemble_mean, kind="stable")[:limit]
+        pathogens = self.predominant_pathogens()
+        speeds = self.spread_speeds()
+        return {
+            "n_members": self.n_members,
+            "seed": self.seed,
+            "confidence": self.confidence,
+            "regions": [{
+                "region_id": self.region_ids[region],
+                "outbreak_probability": round(float(self.probability[region]), 4),
+                "ensemble_mean": round(float(self.ensemble_mean[region]), 4),
+                "uncertainty_band": [round(float(self.band_low[region]), 4), round(float(self.band_high[region]), 4)],
+                "predominant_pathogen": pathogens[region],
+                "spread_speed": speeds[region],
+            } for region in order],
+        }
+
+
+def run_risk_ensemble(table: RegionTable, mobility: Optional[Any] = None,
+                      horizon_days: float = DEFAULT_HORIZON_DAYS,
+                      n_members: int = DEFAULT_ENSEMBLE_MEMBERS,
+                      seed: Optional[int] = None,
+                      n_workers: Optional[int] = 1,
+                      confidence: float = 0.9) -> RegionRiskResult:
+    """
+    Scores every region of the table: nominal outbreak probabilities plus a perturbed ensemble.
+
+    Args:
+        table: Regions to score.
+        mobility: Sparse or dense mobility matrix between the table's regions, or None.
+        horizon_days: Prediction horizon.
+        n_members: Ensemble members (0 for the nominal probabilities only).
+        seed: Seed of the ensemble; None draws fresh entropy (reported as `result.seed`).
+        n_workers: Processes to spread the member shards over (None for all CPUs, 1 to run inline).
+        confidence: Coverage of the uncertainty bands.
+
+    Returns:
+        RegionRiskResult.
+
+    Raises:
+        ValueError: If n_members < 0.
+    """
+    from scipy import sparse
+
+    if n_members < 0:
+        raise ValueError("Risk ensembles need n_members >= 0.")
+    seed_sequence = np.random.SeedSequence(seed)
+    if mobility is not None:
+        mobility = sparse.csr_matrix(mobility, dtype=np.float64)
+    n_pathogens, n_regions = len(table.case_counts), table.n_regions
+
+    pathogen_probability = np.zeros((n_pathogens, n_regions))
+    reproduction_number = np.zeros((n_pathogens, n_regions))
+    for position, (pathogen, cases) in enumerate(table.case_counts.items()):
+        _, outlook = pathogen_outlook(pathogen_parameters(pathogen), table.columns, cases, mobility, horizon_days)
+        pathogen_probability[position] = outlook["probability"]
+        reproduction_number[position] = outlook["reproduction_number"]
+
+    shard_sizes = [min(MEMBERS_PER_SHARD, n_members - start) for start in range(0, n_members, MEMBERS_PER_SHARD)]
+    shard_args = [(table.columns, table.case_counts, mobility, horizon_days, size, child)
+                  for size, child in zip(shard_sizes, seed_sequence.spawn(len(shard_sizes)))]
+    n_workers = min(n_workers or os.cpu_count() or 1, max(len(shard_args), 1))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            shards = list(executor.map(_simulate_shard, *zip(*shard_args)))
+    else:
+        shards = [_simulate_shard(*args) for args in shard_args]
+    members = np.concatenate(shards) if shards else np.zeros((0, n_pathogens, n_regions))
+    return RegionRiskResult(table, pathogen_probability, reproduction_number, members,
+                            seed_sequence.entropy, confidence)
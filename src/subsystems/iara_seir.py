@@ -0,0 +1,236 @@
+"""
+IARA Metapopulation SEIR Engine
+
+Integrates an SEIR model for every region at once. The state is a (compartments x
+regions) NumPy array, and regions are coupled by a sparse mobility matrix, so one
+step costs two sparse matrix-vector products and a few array operations whatever
+the number of regions.
+
+Mobility follows the commuting model: M[i, j] is the fraction of their time residents
+of region i spend in region j (j != i), and they spend the rest at home. With the
+mixing matrix C = diag(1 - sum_j M[i, j]) + M, infection happens where people meet:
+
+    infectious present at j:   I_eff = C^T I       population present at j: N_eff = C^T N
+    force of infection on i:   lambda = C (beta * I_eff / N_eff)
+    dS/dt = -lambda S    dE/dt = lambda S - sigma E    dI/dt = sigma E - gamma I    dR/dt = gamma I
+
+where beta, sigma (1 / incubation period) and gamma (1 / infectious period) may differ
+per region. The integrator is a fixed-step classical Runge-Kutta (RK4) in NumPy, or
+scipy's adaptive RK45 (`method="RK45"`).
+
+Outbreak probabilities come from a branching-process approximation. While
+susceptibles are plentiful, each infection in region i starts a chain that dies out
+with probability q_i = min(1, 1 / R_i), where R_i = beta_i / gamma_i * S_i / N_i. With
+E_i + I_i infections now and a Poisson number of infections imported from other
+regions over the horizon (integrated along the trajectory):
+
+    P(outbreak in i) = 1 - q_i ** (E_i + I_i) * exp(-(1 - q_i) * imported_i)
+"""
+
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+DEFAULT_STEP_DAYS = 0.25
+DEFAULT_HORIZON_DAYS = 30
+
+# Compartment rows of the state array. IMPORTED accumulates the infections not caused
+# by a region's own residents at home (for the outbreak probability).
+S, E, I, R, IMPORTED = range(5)
+N_COMPARTMENTS = 5
+
+ArrayLike = Union[float, np.ndarray]
+
+
+class SEIRTrajectory:
+    """
+    Daily samples of a metapopulation SEIR run.
+
+    Attributes:
+        days: Sample times (days), shape (n_samples,).
+        susceptible, exposed, infectious, recovered: Shape (n_samples, n_regions).
+        imported_infections: Cumulative infections not caused by the region's own residents at home.
+    """
+    def __init__(self, days: np.ndarray, states: np.ndarray):
+        self.days = days
+        self.susceptible = states[:, S]
+        self.exposed = states[:, E]
+        self.infectious = states[:, I]
+        self.recovered = states[:, R]
+        self.imported_infections = states[:, IMPORTED]
+
+    @property
+    def peak_infectious(self) -> np.ndarray:
+        return self.infectious.max(axis=0)
+
+    @property
+    def peak_day(self) -> np.ndarray:
+        return self.days[self.infectious.argmax(axis=0)]
+
+    @property
+    def attack_rate(self) -> np.ndarray:
+        """Fraction of each region's population infected over the run (initial immunity excluded)."""
+        population = self.susceptible[0] + self.exposed[0] + self.infectious[0] + self.recovered[0]
+        return (self.susceptible[0] - self.susceptible[-1]) / np.maximum(population, 1.0)
+
+
+class MetapopulationSEIR:
+    """
+    SEIR dynamics for many regions coupled by mobility, integrated as arrays.
+    """
+    def __init__(self, population: np.ndarray, beta: ArrayLike, sigma: ArrayLike, gamma: ArrayLike,
+                 mobility: Optional[Any] = None):
+        """
+        Initializes the MetapopulationSEIR model.
+
+        Args:
+            population: Residents per region, shape (n_regions,).
+            beta: Transmission rate per day (per region or one value).
+            sigma: 1 / mean incubation period in days (per region or one value).
+            gamma: 1 / mean infectious period in days (per region or one value).
+            mobility: Sparse (scipy.sparse) or dense (n_regions x n_regions) matrix of the
+                      fraction of time residents of row i spend in region j; None for
+                      isolated regions. The diagonal is ignored.
+
+        Raises:
+            ValueError: If the mobility matrix has the wrong shape or a row sums above 1.
+        """
+        from scipy import sparse
+
+        self.population = np.asarray(population, dtype=np.float64)
+        n_regions = len(self.population)
+        self.n_regions = n_regions
+        self.beta = np.broadcast_to(np.asarray(beta, dtype=np.float64), (n_regions,)).copy()
+        self.sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float64), (n_regions,)).copy()
+        self.gamma = np.broadcast_to(np.asarray(gamma, dtype=np.float64), (n_regions,)).copy()
+
+        if mobility is None:
+            travel = sparse.csr_matrix((n_regions, n_regions))
+        else:
+            travel = sparse.csr_matrix(mobility, dtype=np.float64, copy=True)
+            if travel.shape != (n_regions, n_regions):
+                raise ValueError(f"Mobility matrix must be {n_regions}x{n_regions}, got {travel.shape}.")
+            travel.setdiag(0.0)
+            travel.eliminate_zeros()
+        away = np.asarray(travel.sum(axis=1)).ravel()
+        if np.any(away > 1.0 + 1e-9):
+            raise ValueError("Mobility rows must sum to at most 1 (fraction of time away from home).")
+        self.mixing = (sparse.diags(1.0 - away) + travel).tocsr()
+        self.mixing_t = self.mixing.T.tocsr()
+        self.present_population = self.mixing_t @ self.population
+        self._inverse_present = np.divide(1.0, self.present_population, out=np.zeros(n_regions),
+                                          where=self.present_population > 0)
+        self._home = 1.0 - away   # Diagonal of the mixing matrix
+
+    # ---- Dynamics ----
+
+    def force_of_infection(self, infectious: np.ndarray) -> np.ndarray:
+        """Per-capita infection rate of each region's susceptibles, lambda = C (beta * C^T I / N_eff)."""
+        return self.mixing @ (self.beta * (self.mixing_t @ infectious) * self._inverse_present)
+
+    def derivatives(self, state: np.ndarray) -> np.ndarray:
+        """Time derivative of a (N_COMPARTMENTS, n_regions) state."""
+        susceptible, exposed, infectious = state[S], state[E], state[I]
+        new_infections = self.force_of_infection(infectious) * susceptible
+        # Part of it from the region's own residents, met at home.
+        local = self._home * self._home * self.beta * infectious * self._inverse_present
+        onset = self.sigma * exposed
+        recovery = self.gamma * infectious
+        derivative = np.empty_like(state)
+        derivative[S] = -new_infections
+        derivative[E] = new_infections - onset
+        derivative[I] = onset - recovery
+        derivative[R] = recovery
+        derivative[IMPORTED] = np.maximum(new_infections - local * susceptible, 0.0)
+        return derivative
+
+    def initial_state(self, exposed: ArrayLike = 0.0, infectious: ArrayLike = 0.0,
+                      recovered: ArrayLike = 0.0) -> np.ndarray:
+        """State array with the given E, I, R counts per region and everyone else susceptible."""
+        state = np.zeros((N_COMPARTMENTS, self.n_regions))
+        state[E], state[I], state[R] = exposed, infectious, recovered
+        state[S] = np.maximum(self.population - state[E] - state[I] - state[R], 0.0)
+        return state
+
+    def simulate(self, state: np.ndarray, days: float, step_days: float = DEFAULT_STEP_DAYS,
+                 method: str = "RK4") -> SEIRTrajectory:
+        """
+        Integrates all regions for `days`, sampling the state once a day.
+
+        Args:
+            state: Initial (N_COMPARTMENTS, n_regions) state (see `initial_state`).
+            days: Simulated days.
+            step_days: RK4 step (days); RK45 adapts its steps up to 4 * step_days.
+            method: "RK4" (fixed step, NumPy) or "RK45" (adaptive, scipy.integrate.solve_ivp).
+
+        Returns:
+            SEIRTrajectory.
+
+        Raises:
+            ValueError: If the method is unknown.
+        """
+        n_days = int(np.ceil(days))
+        sample_days = np.minimum(np.arange(n_days + 1, dtype=np.float64), days)
+        state = np.asarray(state, dtype=np.float64)
+        if method.upper() == "RK4":
+            return SEIRTrajectory(sample_days, self._rk4(state, sample_days, step_days))
+        if method.upper() == "RK45":
+            from scipy.integrate import solve_ivp
+
+            shape = state.shape
+            solution = solve_ivp(lambda _, flat: self.derivatives(flat.reshape(shape)).ravel(),
+                                 (0.0, float(days)), state.ravel(), method="RK45", t_eval=sample_days,
+                                 max_step=step_days * 4, rtol=1e-6, atol=1e-6)
+            return SEIRTrajectory(sample_days, solution.y.T.reshape(len(sample_days), *shape))
+        raise ValueError(f"Unknown integration method: {method}")
+
+    def _rk4(self, state: np.ndarray, sample_days: np.ndarray, step_days: float) -> np.ndarray:
+        samples = np.empty((len(sample_days),) + state.shape)
+        samples[0] = state
+        derivatives = self.derivatives
+        now = 0.0
+        for sample in range(1, len(sample_days)):
+            end = sample_days[sample]
+            steps = max(1, int(np.ceil((end - now) / step_days - 1e-9)))
+            h = (end - now) / steps
+            for _ in range(steps):
+                k1 = derivatives(state)
+                k2 = derivatives(state + (0.5 * h) * k1)
+                k3 = derivatives(state + (0.5 * h) * k2)
+                k4 = derivatives(state + h * k3)
+                state = state + (h / 6.0) * (k1 + 2.0 * (k2 + k3) + k4)
+            np.maximum(state, 0.0, out=state)
+            now = end
+            samples[sample] = state
+        return samples
+
+    # ---- Outbreak probability ----
+
+    def reproduction_numbers(self, state: np.ndarray) -> np.ndarray:
+        """Effective reproduction number of each region, beta / gamma * S / N."""
+        susceptible_fraction = np.divide(state[S], self.population, out=np.zeros(self.n_regions),
+                                         where=self.population > 0)
+        return self.beta / self.gamma * susceptible_fraction
+
+    def outbreak_probability(self, state: np.ndarray, horizon_days: float = DEFAULT_HORIZON_DAYS,
+                             step_days: float = DEFAULT_STEP_DAYS) -> Dict[str, np.ndarray]:
+        """
+        Probability that each region sees sustained transmission within the horizon.
+
+        Runs the model over the horizon for the imported infections, then applies the
+        branching-process approximation (module docstring) to all regions at once.
+
+        Returns:
+            Dict of arrays per region: "probability", "reproduction_number",
+            "imported_infections", "peak_infectious" and "peak_day" (over the horizon).
+        """
+        trajectory = self.simulate(state, horizon_days, step_days)
+        reproduction = self.reproduction_numbers(state)
+        extinction = np.minimum(1.0, np.divide(1.0, reproduction, out=np.ones(self.n_regions),
+                                               where=reproduction > 0))
+        seeds = state[E] + state[I]
+        imported = trajectory.imported_infections[-1] - trajectory.imported_infections[0]
+        probability = 1.0 - extinction ** seeds * np.exp(-(1.0 - extinction) * imported)
+        return {"probability": np.clip(probability, 0.0, 1.0), "reproduction_number": reproduction,
+                "imported_infections": imported, "peak_infectious": trajectory.peak_infectious,
+                "peak_day": trajectory.peak_day}
@@ -5,7 +5,20 @@ This module defines the IaraEpidemicPredictor class, responsible for
 predicting disease outbreak probabilities based on environmental and health data.
 """
 
-from typing import Dict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+# The fallback covers running this file directly as a script.
+try:
+    from .iara_ensemble import (DEFAULT_ENSEMBLE_MEMBERS, RegionRiskResult, RegionTable, pathogen_outlook,
+                                pathogen_parameters, run_risk_ensemble)
+    from .iara_seir import DEFAULT_HORIZON_DAYS, MetapopulationSEIR
+except ImportError:
+    from iara_ensemble import (DEFAULT_ENSEMBLE_MEMBERS, RegionRiskResult, RegionTable, pathogen_outlook,
+                               pathogen_parameters, run_risk_ensemble)
+    from iara_seir import DEFAULT_HORIZON_DAYS, MetapopulationSEIR
+
 
 class IaraEpidemicPredictor:
     """
@@ -25,9 +38,10 @@ class IaraEpidemicPredictor:
         - self.data_aggregator: Component to collect and preprocess data from various sources
                                 (e.g., public health records, environmental sensors).
         """
-        self.seir_model = None          # Placeholder for the SEIR model component
+        self.seir_model: Dict[str, MetapopulationSEIR] = {}  # Per pathogen, from the last prediction
         self.environmental_ai = None    # Placeholder for the environmental AI component
         self.data_aggregator = None     # Placeholder for data aggregation logic
+        self.health_advisories: List[Dict[str, Any]] = []  # Advisories issued by response plans
         print("IaraEpidemicPredictor initialized.")
 
     def predict_outbreak_probability(self, region_data: Dict) -> float:
@@ -53,20 +67,103 @@ class IaraEpidemicPredictor:
             float: The predicted probability of an outbreak (0.0 to 1.0).
                    For example, 0.65 means a 65% chance of an outbreak.
         """
-        # Placeholder implementation: In a real scenario, this method would:
-        # 1. Preprocess region_data.
-        # 2. Input data into self.seir_model and self.environmental_ai.
-        # 3. Combine outputs from the models to calculate a final outbreak probability.
         print(f"Predicting outbreak probability for region: {region_data.get('region_id', 'Unknown')}")
-        pass
-        # Example return value:
-        # return 0.15 # 15% probability
-        return 0.0
+        return float(self.predict_outbreak_probabilities([region_data])[0])
+
+    def predict_outbreak_probabilities(self, regions: Sequence[Dict], mobility: Optional[Any] = None,
+                                       horizon_days: float = DEFAULT_HORIZON_DAYS) -> np.ndarray:
+        """
+        Predicts outbreak probabilities for many regions in one vectorized SEIR run per pathogen.
+
+        For every pathogen in the regions' `recent_case_counts`, a MetapopulationSEIR
+        model of all regions (coupled by `mobility`) gives the probability of sustained
+        transmission within the horizon; a region's probability is that of an outbreak
+        of any of them, 1 - prod(1 - p).
+
+        Args:
+            regions (Sequence[Dict]): `region_data` dicts (see `predict_outbreak_probability`),
+                                      optionally with "population" (default: density times
+                                      DEFAULT_REGION_AREA_KM2).
+            mobility (Optional[Any]): Sparse or dense matrix of the fraction of time residents
+                                      of region i spend in region j (see MetapopulationSEIR).
+            horizon_days (float): Prediction horizon.
+
+        Returns:
+            np.ndarray: Outbreak probability per region, in input order.
+        """
+        table = RegionTable.from_records(regions)
+        escape = np.ones(table.n_regions)
+        self.seir_model = {}
+        for pathogen, cases in table.case_counts.items():
+            model, outlook = pathogen_outlook(pathogen_parameters(pathogen), table.columns, cases,
+                                              mobility, horizon_days)
+            self.seir_model[pathogen] = model
+            escape *= 1.0 - outlook["probability"]
+        return 1.0 - escape
+
+    def predict_outbreak_risk_batch(self, regions: Union[RegionTable, Mapping[str, Any]],
+                                    mobility: Optional[Any] = None,
+                                    horizon_days: float = DEFAULT_HORIZON_DAYS,
+                                    n_members: int = DEFAULT_ENSEMBLE_MEMBERS,
+                                    seed: Optional[int] = None, n_workers: Optional[int] = 1,
+                                    confidence: float = 0.9) -> RegionRiskResult:
+        """
+        Scores a columnar table of regions, with ensemble uncertainty bands (see iara_ensemble).
+
+        Args:
+            regions (Union[RegionTable, Mapping[str, Any]]): A RegionTable, or its constructor
+                arguments as columns, e.g. {"population_density": [...], "case_counts":
+                {"dengue": [...]}, "avg_temperature_c": [...], "vaccination_rate": [...]}.
+            mobility (Optional[Any]): Sparse or dense mobility matrix between the regions.
+            horizon_days (float): Prediction horizon.
+            n_members (int): Parameter-perturbed SEIR ensemble members (0 for none).
+            seed (Optional[int]): Seed for reproducible ensembles (None: fresh, reported in the result).
+            n_workers (Optional[int]): Processes to spread the ensemble over (None for all CPUs).
+            confidence (float): Coverage of the uncertainty bands.
+
+        Returns:
+            RegionRiskResult: Per-region nominal probability, ensemble mean and band, and
+                              predominant pathogen; `heatmap_data_points()` gives the
+                              IaraHeatmapResponse entries when the table has locations.
+        """
+        table = regions if isinstance(regions, RegionTable) else RegionTable(**regions)
+        print(f"Scoring outbreak risk for {table.n_regions} regions with {n_members} ensemble members")
+        return run_risk_ensemble(table, mobility=mobility, horizon_days=horizon_days, n_members=n_members,
+                                 seed=seed, n_workers=n_workers, confidence=confidence)
+
+    async def execute_response_plan(self, actions: List[Dict]) -> List[Dict]:
+        """
+        Executes the orchestrator's actions for IARA.
+
+        "issue_health_advisory" records an advisory for the action's `target_area`; when
+        `parameters` carry region data (see `predict_outbreak_probability`, with
+        "recent_case_counts"), the advisory includes its outbreak probability.
+
+        Args:
+            actions (List[Dict]): Actions from a response plan (action_id, action_type,
+                                  target_area, priority, parameters).
+
+        Returns:
+            List[Dict]: One result per action: action_id, status ("completed" or "skipped") and details.
+        """
+        results = []
+        for action in actions:
+            if action.get("action_type") != "issue_health_advisory":
+                results.append({"action_id": action["action_id"], "status": "skipped",
+                                "reason": f"Unsupported action {action.get('action_type')}"})
+                continue
+            region_data = action.get("parameters", {})
+            advisory = {"action_id": action["action_id"], "target_area": action.get("target_area"),
+                        "outbreak_probability": (self.predict_outbreak_probability(region_data)
+                                                 if region_data.get("recent_case_counts") else None)}
+            self.health_advisories.append(advisory)
+            results.append({**advisory, "status": "completed"})
+        return results
 
 if __name__ == '__main__':
     # Example Usage
     iara = IaraEpidemicPredictor()
-    
+
     sample_region_data = {
         "region_id": "BR-SP-SaoPaulo",
         "population_density": 8000,
@@ -78,6 +175,17 @@ if __name__ == '__main__':
         },
         "vaccination_rate": 0.80
     }
-    
+
     probability = iara.predict_outbreak_probability(sample_region_data)
     print(f"Iara Outbreak Probability for {sample_region_data['region_id']}: {probability:.2f}")
+
+    batch = iara.predict_outbreak_risk_batch({
+        "region_ids": ["BR-SP-SaoPaulo", "BR-SP-Campinas", "BR-SP-Santos"],
+        "locations": [(-23.55, -46.63), (-22.91, -47.06), (-23.96, -46.33)],
+        "population_density": [8000, 1400, 1500],
+        "case_counts": {"dengue": [2, 1, 0], "flu": [3, 0, 0]},
+        "avg_temperature_c": [22, 24, 27],
+        "vaccination_rate": [0.80, 0.70, 0.65],
+    }, mobility=[[0.0, 0.02, 0.01], [0.05, 0.0, 0.0], [0.05, 0.0, 0.0]], n_members=32, seed=7)
+    for point in batch.summary()["regions"]:
+        print(point)
@@ -6,7 +6,11 @@ detecting wildfires and coordinating a swarm-based response.
 This is distinct from the saci_fire_predictor.py ML model script.
 """
 
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_DRONES_PER_DEPLOYMENT = 5
+DEFAULT_DEPLOYMENT_MINUTES = 30.0   # Time an agent spends on a deployment before it is idle again
 
 # Dummy class for individual agent representation if needed later
 class SwarmAgent:
@@ -14,6 +18,7 @@ class SwarmAgent:
         self.agent_id = agent_id
         self.status = "idle"
         self.location = None
+        self.deployed_until: Optional[float] = None  # time.monotonic() at which a deployment ends
         # Add other relevant agent attributes
 
 class SaciFireSwarmIntelligence:
@@ -90,6 +95,61 @@ class SaciFireSwarmIntelligence:
         # }
         return {}
 
+    def release_returned_agents(self, now: Optional[float] = None) -> int:
+        """
+        Puts agents whose deployment has ended back in the idle pool.
+
+        Args:
+            now (Optional[float]): Time on the `time.monotonic()` clock (default: now).
+
+        Returns:
+            int: Number of agents released.
+        """
+        now = time.monotonic() if now is None else now
+        released = 0
+        for agent in self.swarm_agents:
+            if agent.status == "deployed" and agent.deployed_until is not None and agent.deployed_until <= now:
+                agent.status, agent.deployed_until = "idle", None
+                released += 1
+        return released
+
+    async def execute_response_plan(self, actions: List[Dict], now: Optional[float] = None) -> List[Dict]:
+        """
+        Executes the orchestrator's actions for SACI.
+
+        "deploy_drones" sends up to `parameters["num_drones"]` (default DEFAULT_DRONES_PER_DEPLOYMENT)
+        idle agents to the action's `target_area` for `parameters["deployment_minutes"]`
+        (default DEFAULT_DEPLOYMENT_MINUTES). Agents whose deployment has ended are idle again.
+
+        Args:
+            actions (List[Dict]): Actions from a response plan (action_id, action_type,
+                                  target_area, priority, parameters).
+            now (Optional[float]): Time on the `time.monotonic()` clock (default: now).
+
+        Returns:
+            List[Dict]: One result per action: action_id, status ("completed", "failed" or
+                        "skipped") and details.
+        """
+        now = time.monotonic() if now is None else now
+        self.release_returned_agents(now)
+        results = []
+        for action in actions:
+            if action.get("action_type") != "deploy_drones":
+                results.append({"action_id": action["action_id"], "status": "skipped",
+                                "reason": f"Unsupported action {action.get('action_type')}"})
+                continue
+            parameters = action.get("parameters", {})
+            requested = int(parameters.get("num_drones", DEFAULT_DRONES_PER_DEPLOYMENT))
+            minutes = float(parameters.get("deployment_minutes", DEFAULT_DEPLOYMENT_MINUTES))
+            deployed = [agent for agent in self.swarm_agents if agent.status == "idle"][:requested]
+            for agent in deployed:
+                agent.status = "deployed"
+                agent.location = action.get("target_area")
+                agent.deployed_until = now + minutes * 60.0
+            results.append({"action_id": action["action_id"], "status": "completed" if deployed else "failed",
+                            "deployed_agents": [agent.agent_id for agent in deployed]})
+        return results
+
 if __name__ == '__main__':
     # Example Usage
     saci_system = SaciFireSwarmIntelligence(num_agents=50)
@@ -0,0 +1,106 @@
+"""
+Tests for the ANHANGÁ route cache and its selective invalidation.
+"""
+
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.anhanga_route_cache import RouteCache
+from subsystems.anhanga_routing import MeshRouter, MeshTopology
+from subsystems.anhanga_subsystem import AnhangaMeshNetwork
+
+MESH = {
+    "nodes": ["center", "relay_a", "relay_b", "team_1", "team_2"],
+    "links": [
+        {"source": "center", "target": "relay_a", "latency_ms": 20, "reliability": 0.99},
+        {"source": "relay_a", "target": "team_1", "latency_ms": 20, "reliability": 0.99},
+        {"source": "center", "target": "relay_b", "latency_ms": 40, "reliability": 0.95},
+        {"source": "relay_b", "target": "team_1", "latency_ms": 40, "reliability": 0.95},
+        {"source": "relay_b", "target": "team_2", "latency_ms": 40, "reliability": 0.95},
+    ],
+}
+
+
+def test_only_entries_on_a_degraded_or_failed_element_are_invalidated():
+    topology = MeshTopology.from_dict(MESH)
+    cache = RouteCache(MeshRouter(topology))
+    assert cache.route("center", "team_1", "CRITICAL")[0].nodes == ["center", "relay_a", "team_1"]
+    assert cache.route("center", "team_2", "CRITICAL")[0].nodes == ["center", "relay_b", "team_2"]
+    assert cache.route("center", "team_1", "LOW", message_bytes=10)[0].delivery_time_seconds < \
+        cache.route("center", "team_1", "LOW", message_bytes=10_000)[0].delivery_time_seconds
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+
+    # Better links invalidate nothing; relay_b -> team_2 is only on the team_2 route.
+    topology.update_link("relay_a", "team_1", latency_seconds=0.001)
+    topology.update_link("relay_b", "team_2", reliability=0.5)
+    assert len(cache) == 2 and cache.invalidations == 1
+
+    # relay_a -> team_1 carries both team_1 primaries; relay_b is a team_1 backup hop.
+    topology.set_link_up("relay_a", "team_1", False)
+    assert len(cache) == 0
+    assert cache.route("center", "team_1", "CRITICAL")[0].nodes == ["center", "relay_b", "team_1"]
+    topology.set_node_up("relay_a", False)
+    assert len(cache) == 1
+    topology.set_node_up("relay_b", False)
+    assert len(cache) == 0 and cache.route("center", "team_1", "CRITICAL") is None
+    assert cache.stats()["invalidations"] == 4
+
+
+def test_cached_paths_survive_new_nodes_and_links():
+    topology = MeshTopology.from_dict(MESH)
+    cache = RouteCache(MeshRouter(topology))
+    assert cache.route("relay_a", "team_2")[0].nodes == ["relay_a", "center", "relay_b", "team_2"]
+    # New links re-sort the router's arcs; the cached path must still name the same hops.
+    topology.add_link("team_1", "team_3", latency_seconds=1.0)
+    topology.add_link("center", "team_3", latency_seconds=1.0)
+    topology.add_node("team_4")
+    primary, backups = cache.route("relay_a", "team_2")
+    assert cache.hits == 1
+    assert primary.nodes == ["relay_a", "center", "relay_b", "team_2"]
+    assert [topology.link_nodes[link] for link in primary.links] == [
+        tuple(sorted((topology.node_index[a], topology.node_index[b])))
+        for a, b in zip(primary.nodes, primary.nodes[1:])]
+    assert all(backup.nodes[0] == "relay_a" and backup.nodes[-1] == "team_2" for backup in backups)
+
+
+def test_cache_is_bounded_in_lru_order():
+    cache = RouteCache(MeshRouter(MeshTopology.from_dict(MESH)), max_entries=2)
+    cache.route("center", "team_1")
+    cache.route("center", "team_2")
+    cache.route("center", "team_1")
+    cache.route("relay_a", "team_2")   # Evicts center -> team_2, the least recently used
+    cache.route("center", "team_1")
+    cache.route("center", "team_2")
+    assert len(cache) == 2 and cache.evictions == 2
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_network_serves_repeated_messages_from_the_cache():
+    network = AnhangaMeshNetwork(MESH)
+    message = {"sender_id": "center", "recipient_id": "team_1", "priority_level": "HIGH"}
+    first = network.adaptive_emergency_routing(message)
+    cached = network.adaptive_emergency_routing(message)
+    # The second message waits behind the first in the link queue; nothing else may differ.
+    queueing = ("estimated_delivery_time_seconds", "estimated_queueing_delay_seconds")
+    assert {k: v for k, v in cached.items() if k not in queueing} == \
+        {k: v for k, v in first.items() if k not in queueing}
+    assert cached["selected_path"] == ["center", "relay_a", "team_1"]
+    assert cached["estimated_delivery_time_seconds"] - cached["estimated_queueing_delay_seconds"] == \
+        pytest.approx(first["estimated_delivery_time_seconds"] - first["estimated_queueing_delay_seconds"],
+                      abs=1e-4)
+    assert network.get_route_cache_stats()["hit_rate"] == 0.5
+
+
+def test_reloading_a_topology_unsubscribes_the_previous_router_and_cache():
+    topology = MeshTopology.from_dict(MESH)
+    network = AnhangaMeshNetwork(topology)
+    for _ in range(3):
+        network.load_mesh_topology(topology)
+    assert len(topology._listeners) == 3   # Router, route cache and send pipeline of the last load
+    assert network.adaptive_emergency_routing({"sender_id": "center", "recipient_id": "team_2"})["routing_successful"]
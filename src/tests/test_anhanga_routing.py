@@ -0,0 +1,97 @@
+"""
+Tests for the ANHANGÁ mesh router.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.anhanga_routing import MeshRouter, MeshTopology
+from subsystems.anhanga_subsystem import AnhangaMeshNetwork
+
+MESH = {
+    "nodes": ["center", "relay_a", "relay_b", "relay_c", "team", {"id": "isolated", "status": "offline"}],
+    "links": [
+        {"source": "center", "target": "relay_a", "latency_ms": 20, "reliability": 0.99},
+        {"source": "relay_a", "target": "team", "latency_ms": 20, "reliability": 0.99},
+        {"source": "center", "target": "relay_b", "latency_ms": 15, "reliability": 0.80},
+        {"source": "relay_b", "target": "team", "latency_ms": 15, "reliability": 0.80},
+        {"source": "center", "target": "relay_c", "latency_ms": 200, "reliability": 0.95},
+        {"source": "relay_c", "target": "team", "latency_ms": 200, "reliability": 0.95},
+    ],
+}
+
+
+def random_mesh(n_nodes: int, n_links: int, seed: int) -> MeshTopology:
+    rng = np.random.default_rng(seed)
+    topology = MeshTopology()
+    for node in range(n_nodes):
+        topology.add_node(f"n{node}")
+    for a, b in rng.integers(0, n_nodes, (n_links, 2)):
+        if a != b:
+            topology.add_link(f"n{a}", f"n{b}", latency_seconds=rng.uniform(0.01, 0.5),
+                              reliability=rng.uniform(0.6, 1.0), bandwidth_kbps=rng.choice([50.0, 1000.0]))
+    return topology
+
+
+def test_a_star_matches_dijkstra_and_backups_are_link_disjoint():
+    topology = random_mesh(300, 700, seed=3)
+    a_star, dijkstra = MeshRouter(topology), MeshRouter(topology, n_landmarks=0)
+    rng = np.random.default_rng(4)
+    for _ in range(30):
+        source, target = (int(node) for node in rng.integers(0, 300, 2))
+        for priority in ("CRITICAL", "LOW"):
+            expected, found = dijkstra.shortest_path(source, target, priority), a_star.shortest_path(source, target, priority)
+            assert (expected is None) == (found is None)
+            if found is not None:
+                assert np.isclose(found[1], expected[1])
+
+    # Bounds must stay valid when links get cheaper after the landmarks were computed.
+    for link in range(0, topology.num_links, 7):
+        a, b = topology.link_nodes[link]
+        topology.update_link(topology.node_ids[a], topology.node_ids[b], latency_seconds=0.001, reliability=1.0)
+    for _ in range(30):
+        source, target = (int(node) for node in rng.integers(0, 300, 2))
+        expected, found = dijkstra.shortest_path(source, target, "HIGH"), a_star.shortest_path(source, target, "HIGH")
+        assert (expected is None) == (found is None)
+        if found is not None:
+            assert np.isclose(found[1], expected[1])
+
+    route, backups = a_star.route("n0", "n1", "CRITICAL", n_backups=3)
+    used = [set(path.links) for path in [route] + backups]
+    assert all(not (used[i] & used[j]) for i in range(len(used)) for j in range(i + 1, len(used)))
+    assert all(path.nodes[0] == "n0" and path.nodes[-1] == "n1" for path in [route] + backups)
+
+
+def test_priority_weighs_reliability_and_failed_links_are_avoided():
+    router = MeshRouter(MeshTopology.from_dict(MESH))
+    critical, backups = router.route("center", "team", "CRITICAL")
+    assert critical.nodes == ["center", "relay_a", "team"]
+    assert [backup.nodes for backup in backups] == [["center", "relay_c", "team"], ["center", "relay_b", "team"]]
+    low, _ = router.route("center", "team", "LOW", n_backups=0)
+    assert low.nodes == ["center", "relay_b", "team"]
+    assert np.isclose(critical.reliability, 0.99 ** 2)
+
+    router.topology.set_link_up("relay_a", "team", False)
+    assert router.route("center", "team", "CRITICAL")[0].nodes == ["center", "relay_c", "team"]
+    router.topology.set_link_up("relay_a", "team", True)
+    assert router.route("center", "team", "CRITICAL")[0].nodes == ["center", "relay_a", "team"]
+
+
+def test_adaptive_emergency_routing_reports_paths_and_failures():
+    network = AnhangaMeshNetwork(MESH)
+    result = network.adaptive_emergency_routing({"sender_id": "center", "recipient_id": "team",
+                                                 "priority_level": "CRITICAL", "content": "Ajuda",
+                                                 "requires_acknowledgment": True})
+    assert result["routing_successful"] and result["selected_path"] == ["center", "relay_a", "team"]
+    assert result["backup_paths_available"] == 2 and result["delivery_confirmation"] == "pending"
+    assert result["estimated_delivery_time_seconds"] > 0.04
+
+    for recipient in ("isolated", "nowhere"):
+        result = network.adaptive_emergency_routing({"sender_id": "center", "recipient_id": recipient})
+        assert not result["routing_successful"] and result["suggested_alternatives"]
@@ -0,0 +1,81 @@
+"""
+Tests for the ANHANGÁ link scheduler and the send pipeline behind adaptive_emergency_routing.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.anhanga_scheduler import LinkScheduler
+from subsystems.anhanga_subsystem import AnhangaMeshNetwork
+
+
+def test_critical_goes_first_and_the_token_bucket_paces_the_link():
+    scheduler = LinkScheduler(rate_kbps=8.0, burst_bytes=1000, max_queue_bytes=2000)   # 1000 bytes/s
+    assert scheduler.enqueue("bulk", 1000, "LOW", now=0.0)
+    assert scheduler.enqueue("evacuate", 500, "CRITICAL", now=0.0)
+    assert scheduler.enqueue("bulk-2", 1000, "LOW", now=0.0)
+    assert not scheduler.enqueue("bulk-3", 1000, "LOW", now=0.0)   # Over max_queue_bytes
+
+    assert scheduler.dequeue(0.0).item == "evacuate"
+    assert scheduler.next_send_time(0.0) == 0.5 and scheduler.dequeue(0.25) is None
+    assert scheduler.dequeue(0.5).item == "bulk"
+    assert abs(scheduler.next_send_time(0.5) - 1.5) < 1e-9
+    assert scheduler.stats()["LOW"] == {"queued": 1, "queued_bytes": 1000, "sent": 1, "sent_bytes": 1000,
+                                        "dropped": 1}
+
+
+def test_fair_levels_share_the_link_by_weight():
+    scheduler = LinkScheduler(rate_kbps=1e9, max_queue_bytes=None)
+    for level in ("HIGH", "MEDIUM", "LOW"):
+        for index in range(1000):
+            scheduler.enqueue(index, 512, level, now=0.0)
+    for step in range(700):
+        scheduler.dequeue(float(step))
+    assert [scheduler.sent[level] for level in ("HIGH", "MEDIUM", "LOW")] == [400, 200, 100]
+    assert scheduler.estimated_wait(512, "LOW") > scheduler.estimated_wait(512, "HIGH")
+
+
+def test_network_queues_messages_on_the_first_link():
+    network = AnhangaMeshNetwork({"nodes": ["center", "team"],
+                                  "links": [{"source": "center", "target": "team", "bandwidth_kbps": 8.0}]})
+    low = {"message_id": "M1", "sender_id": "center", "recipient_id": "team", "priority_level": "LOW",
+           "content": "x" * 4000}
+    critical = {"message_id": "M2", "sender_id": "center", "recipient_id": "team", "priority_level": "CRITICAL",
+                "content": "Evacuar"}
+    assert network.adaptive_emergency_routing(low)["estimated_queueing_delay_seconds"] == 0.0
+    # The first message left right away on the idle link; the second waits for bandwidth.
+    assert network.adaptive_emergency_routing({**low, "message_id": "M3"})["routing_successful"]
+    assert network.adaptive_emergency_routing(critical)["routing_successful"]
+
+    sent = network.transmit_queued_messages(now=1e9)
+    assert [message["message_id"] for message in sent] == ["M1", "M2", "M3"]
+    assert sent[1]["next_hop"] == "team" and sent[1]["priority_level"] == "CRITICAL"
+
+
+def test_link_queues_drain_between_routing_calls(monkeypatch):
+    from subsystems import anhanga_subsystem
+
+    clock = [1000.0]
+    monkeypatch.setattr(anhanga_subsystem, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    network = AnhangaMeshNetwork({"nodes": ["center", "team"], "links": [{"source": "center", "target": "team"}]})
+    message = {"sender_id": "center", "recipient_id": "team", "priority_level": "CRITICAL", "content": "x" * 1024}
+
+    # A burst of 300 KB fills the 256 KB queue of a 250 kbit/s link...
+    burst = [network.adaptive_emergency_routing({**message, "message_id": f"B{i}"}) for i in range(300)]
+    assert not burst[-1]["routing_successful"]
+    accepted = sum(result["routing_successful"] for result in burst)
+
+    # ...which sends it in about 8.4 s, so later messages route again without anyone polling.
+    for second in range(1, 31):
+        clock[0] = 1000.0 + 12.0 + second
+        result = network.adaptive_emergency_routing({**message, "message_id": f"L{second}"})
+        assert result["routing_successful"] and result["estimated_queueing_delay_seconds"] < 0.1
+    sent = network.transmit_queued_messages()
+    assert len(sent) == accepted + 30
+    assert all(0.0 <= message["queueing_delay_seconds"] <= 12.0 for message in sent)
+    assert network.send_pipeline.schedulers[(0, 0)].sent["CRITICAL"] == accepted + 30
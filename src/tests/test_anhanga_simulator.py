@@ -0,0 +1,79 @@
+"""
+Tests for the ANHANGÁ discrete-event mesh simulator.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.anhanga_routing import MeshTopology
+from subsystems.anhanga_simulator import FailureModel, MeshSimulator, MessageTypeProfile, synthetic_city_mesh
+
+NO_FAILURES = FailureModel(node_mtbf_hours=None, link_mtbf_hours=None)
+
+
+def test_runs_are_reproducible_and_restore_the_topology():
+    reports = []
+    for _ in range(2):
+        topology = synthetic_city_mesh(150, seed=7)
+        simulator = MeshSimulator(topology, failures=FailureModel(node_mtbf_hours=2.0, link_mtbf_hours=1.0),
+                                  seed=11)
+        report = simulator.run(1800.0)
+        assert all(topology.node_up) and all(topology.link_up)
+        report.pop("wall_seconds")
+        reports.append(report)
+    assert reports[0] == reports[1]
+    report = reports[0]
+    assert report["node_failures"] > 0 and report["link_failures"] > 0
+    assert report["messages_generated"] == report["messages_delivered"] + sum(report["drops"].values()) \
+        + report["messages_in_flight"]
+    assert 0.8 < report["delivery_ratio"] <= 1.0
+    assert report["latency_seconds"]["p50"] <= report["latency_seconds"]["p99"]
+
+
+def test_outage_of_the_only_relay_cuts_delivery_until_repaired():
+    topology = MeshTopology.from_dict({"nodes": ["hub", "relay", "team"],
+                                       "links": [{"source": "hub", "target": "relay", "reliability": 1.0},
+                                                 {"source": "relay", "target": "team", "reliability": 1.0}]})
+    traffic = {"status_report": MessageTypeProfile("MEDIUM", 3600, 256, "from_hub", size_sigma=0.0)}
+    simulator = MeshSimulator(topology, traffic=traffic, failures=NO_FAILURES, hubs=["hub"], seed=1)
+    simulator.add_outage(600.0, 600.0, ["relay"])
+    report = simulator.run(1800.0)
+    assert report["drops"]["no_route"] + report["drops"]["sender_down"] > 100
+    assert report["drops"]["no_route"] > 0 and topology.node_up == [True, True, True]
+    assert 0.3 < report["delivery_ratio"] < 0.8
+
+
+def test_critical_traffic_overtakes_bulk_on_a_saturated_link():
+    topology = MeshTopology.from_dict({"nodes": ["hub", "team"],
+                                       "links": [{"source": "hub", "target": "team", "reliability": 1.0,
+                                                  "bandwidth_kbps": 16.0}]})
+    traffic = {"evacuation_order": MessageTypeProfile("CRITICAL", 120, 256, "to_hub", size_sigma=0.0),
+               "media_upload": MessageTypeProfile("LOW", 2000, 8192, "to_hub", size_sigma=0.0)}
+    simulator = MeshSimulator(topology, traffic=traffic, failures=NO_FAILURES, hubs=["hub"], seed=3)
+    report = simulator.run(3600.0)
+    critical, low = report["by_priority"]["CRITICAL"], report["by_priority"]["LOW"]
+    assert critical["delivery_ratio"] == 1.0
+    assert critical["latency_seconds"]["p99"] < 4.0 and low["latency_seconds"]["p50"] > 20.0
+
+
+def test_messages_expire_in_saturated_queues_and_count_as_undelivered():
+    topology = MeshTopology.from_dict({"nodes": ["hub", "team"],
+                                       "links": [{"source": "hub", "target": "team", "reliability": 1.0,
+                                                  "bandwidth_kbps": 16.0}]})
+    traffic = {"media_upload": MessageTypeProfile("LOW", 2000, 8192, "to_hub", size_sigma=0.0)}
+    with MeshSimulator(topology, traffic=traffic, failures=NO_FAILURES, hubs=["hub"], seed=3,
+                       ttl_seconds=120.0) as simulator:
+        assert len(topology._listeners) == 3   # Router, route cache and link schedulers
+        report = simulator.run(3600.0)
+    assert topology._listeners == []
+
+    low = report["by_priority"]["LOW"]
+    assert report["drops"]["expired"] > 0
+    # Nothing waits past its TTL: the last hop adds one 4.1 s serialization at most.
+    assert low["latency_seconds"]["p99"] <= 120.0 + 8192 * 8 / 16000.0
+    assert report["delivery_ratio"] == round(report["messages_delivered"] / report["messages_generated"], 4)
+    assert low["generated"] == low["delivered"] + low["dropped"] + report["messages_in_flight"]
@@ -0,0 +1,103 @@
+"""
+Tests for the BOITATÁ criticality index.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from benchmarks.boitata_cascade import make_city_graph
+from subsystems.boitata_criticality import CriticalityIndex
+from subsystems.boitata_dependency_graph import DependencyGraph
+
+
+def assert_same_metrics(index: CriticalityIndex, expected: CriticalityIndex) -> None:
+    np.testing.assert_array_equal(index.downstream_reach, expected.downstream_reach)
+    np.testing.assert_allclose(index.expected_population_impact, expected.expected_population_impact)
+    np.testing.assert_allclose(index.betweenness, expected.betweenness)
+
+
+def test_reach_and_impact_match_the_cascade_engine():
+    graph = make_city_graph(1500, seed=3)
+    index = CriticalityIndex(graph)
+    for node in range(0, graph.num_nodes, 50):
+        result = graph.cascade(graph.node_ids[node])
+        assert index.downstream_reach[node] == len(result) - 1
+        expected_impact = (result.failure_probability * graph.population[result.nodes]).sum()
+        assert np.isclose(index.expected_population_impact[node], expected_impact)
+
+
+def test_betweenness_is_exact_when_every_source_is_used():
+    # a -> b -> c -> d (failures travel from a to d): b and c lie on the longer chains.
+    graph = DependencyGraph.from_infrastructure_elements([
+        {"id": "a", "element_type": "power_grid"},
+        {"id": "b", "element_type": "power_grid", "dependencies": ["a"]},
+        {"id": "c", "element_type": "power_grid", "dependencies": ["b"]},
+        {"id": "d", "element_type": "hospital", "dependencies": ["c"]},
+    ])
+    index = CriticalityIndex(graph)
+    # b is inside a->c and a->d, c inside a->d and b->d; normalized by (n - 1)(n - 2) = 6.
+    np.testing.assert_allclose(index.betweenness[[graph.node_index[n] for n in "abcd"]], [0, 2 / 6, 2 / 6, 0])
+    assert index.most_critical(1)[0]["component"] in ("b", "c")
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    graph = make_city_graph(1500, seed=5)
+    index = CriticalityIndex(graph, betweenness_samples=300, betweenness_max_age=0)
+    index.set_status("power_substation_3", "Falha")
+    index.set_dependency("building_900", "power_plant_0", weight=0.9)  # New dependency
+    index.set_dependency("water_pumping_60", "power_substation_10", weight=0.2, refresh=False)
+    assert index.refresh() > 0
+    upstream, dependent = graph.node_ids[0], graph.node_ids[graph.indices[graph.indptr[0]]]
+    assert index.remove_dependency(dependent, upstream)
+
+    rebuilt = CriticalityIndex(graph, statuses={"power_substation_3": "Falha"}, betweenness_samples=300)
+    assert_same_metrics(index, rebuilt)
+    assert index.metrics("power_substation_3")["downstream_reach"] == 0
+
+    index.set_status("power_substation_3", "Operacional")
+    assert_same_metrics(index, CriticalityIndex(graph, betweenness_samples=300))
+
+
+def test_stale_betweenness_is_recomputed_once_old_enough():
+    graph = make_city_graph(1500, seed=5)
+    index = CriticalityIndex(graph, betweenness_samples=300, betweenness_max_age=3600)
+    initial = index.betweenness.copy()
+    index.set_status("power_substation_3", "Falha")
+    rebuilt = CriticalityIndex(graph, statuses={"power_substation_3": "Falha"}, betweenness_samples=300)
+
+    # Reach and impact follow at once; betweenness waits for its schedule.
+    np.testing.assert_array_equal(index.downstream_reach, rebuilt.downstream_reach)
+    np.testing.assert_array_equal(index.betweenness, initial)
+    assert index.betweenness_stale
+    assert index.refresh() == 0
+    assert index.betweenness_stale
+
+    index.betweenness_computed_at -= 3600
+    assert index.refresh() == 0  # No new changes, but the stale betweenness is due
+    assert not index.betweenness_stale
+    assert_same_metrics(index, rebuilt)
+    np.testing.assert_allclose(index.criticality_score, rebuilt.criticality_score)
+
+    index.set_status("power_substation_3", "Operacional", refresh=False)
+    index.refresh(full=True)
+    assert_same_metrics(index, CriticalityIndex(graph, betweenness_samples=300))
+
+
+def test_serves_node_data_impacto_falha_fields():
+    graph = make_city_graph(500, seed=1)
+    index = CriticalityIndex(graph)
+    response = {"nodes": [{"id": "power_plant_0", "label": "Usina", "type": "power_plant",
+                           "data": {"impacto_falha": {"servicos_criticos_interrompidos": ["UTI"]}}},
+                          {"id": "not_in_graph", "label": "?", "type": "?", "data": {}}],
+                "edges": []}
+    annotated = index.annotate_dependency_graph_response(response)
+    impact = annotated["nodes"][0]["data"]["impacto_falha"]
+    assert impact == {"servicos_criticos_interrompidos": ["UTI"], **index.impacto_falha("power_plant_0")}
+    assert impact["risco_impacto_falha"] in ("Baixo", "Médio", "Alto", "Crítico")
+    assert annotated["nodes"][1]["data"] == {}
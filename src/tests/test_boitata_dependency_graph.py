@@ -0,0 +1,104 @@
+"""
+Tests for the BOITATÁ dependency graph and cascade engine.
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.boitata_dependency_graph import DependencyGraph
+from subsystems.boitata_subsystem import BoitataUrbanTwin
+
+ELEMENTS = [
+    {"id": "substation", "element_type": "power_grid"},
+    {"id": "pump", "element_type": "water_treatment", "population_served": 50000,
+     "dependencies": json.dumps([{"id": "substation", "weight": 0.8, "latency_minutes": 45}])},
+    {"id": "tower", "element_type": "telecommunications", "population_served": 25000,
+     "dependencies": [{"id": "substation", "weight": 0.5, "latency_minutes": 120}]},
+    {"id": "hospital", "element_type": "hospital", "population_served": 2000,
+     "dependencies": [{"id": "pump", "weight": 1.0, "latency_minutes": 60},
+                      {"id": "tower", "weight": 1.0, "latency_minutes": 10}]},
+]
+
+
+def test_cascade_orders_failures_by_time_and_follows_dependencies():
+    steps = DependencyGraph.from_infrastructure_elements(ELEMENTS).cascade("substation").to_cascade_steps()
+    assert [step["affected_component"] for step in steps] == ["pump", "hospital", "tower"]
+    pump, hospital, tower = steps
+    assert pump == {"cascade_step": 1, "affected_system": "water_treatment", "affected_component": "pump",
+                    "failure_probability": 0.8, "estimated_impact_population": 40000,
+                    "time_to_failure_minutes": 45.0}
+    # Earliest path (via the pump, 105 min) beats the tower path (130 min); the most probable chain is 0.8.
+    assert hospital["time_to_failure_minutes"] == 105.0
+    assert hospital["cascade_step"] == 2
+    assert hospital["failure_probability"] == 0.8
+    assert tower["time_to_failure_minutes"] == 120.0
+
+
+def test_min_probability_and_horizon_prune_the_cascade():
+    graph = DependencyGraph.from_infrastructure_elements(ELEMENTS)
+    components = lambda result: [graph.node_ids[node] for node in result.nodes]
+    assert components(graph.cascade("substation", initial_probability=0.5, min_probability=0.3)) == [
+        "substation", "pump", "hospital"]
+    assert components(graph.cascade("substation", max_minutes=60)) == ["substation", "pump"]
+
+
+def test_dependency_graph_response_shape_matches_elements():
+    response = {
+        "nodes": [{"id": "substation", "label": "Sub", "type": "power_grid", "data": {}},
+                  {"id": "pump", "label": "Pump", "type": "water_treatment",
+                   "data": {"impacto_falha": {"populacao_diretamente_afetada": "50000 moradores"}}}],
+        "edges": [{"source": "pump", "target": "substation", "type": "Dependência Elétrica",
+                   "data": {"latencia_impacto_horas": 0.75, "forca_dependencia_score": 0.8}}],
+    }
+    steps = DependencyGraph.load_json(json.dumps(response)).cascade("substation").to_cascade_steps()
+    assert steps == [{"cascade_step": 1, "affected_system": "water_treatment", "affected_component": "pump",
+                      "failure_probability": 0.8, "estimated_impact_population": 40000,
+                      "time_to_failure_minutes": 45.0}]
+
+
+def test_cascade_matches_reference_propagation_on_random_graph():
+    rng = np.random.default_rng(3)
+    n = 300
+    dependent = np.repeat(np.arange(1, n), 2)
+    upstream = (dependent * rng.random(len(dependent))).astype(int)
+    weights, latency = rng.uniform(0.6, 1.0, len(dependent)), rng.uniform(1, 60, len(dependent))
+    graph = DependencyGraph.from_edges([f"n{i}" for i in range(n)], ["x"] * n, upstream, dependent,
+                                       weights, latency)
+    result = graph.cascade("n0", min_probability=0.2)
+
+    # Reference: Bellman-Ford style relaxation of both passes.
+    best_probability = np.zeros(n)
+    best_probability[0] = 1.0
+    for _ in range(n):
+        np.maximum.at(best_probability, dependent, best_probability[upstream] * weights)
+    best_probability[best_probability < 0.2] = 0
+    times = np.full(n, np.inf)
+    times[0] = 0
+    carried = best_probability[upstream] * weights >= 0.2
+    for _ in range(n):
+        np.minimum.at(times, dependent[carried], times[upstream[carried]] + latency[carried])
+    reached = np.flatnonzero(np.isfinite(times))
+    assert sorted(result.nodes.tolist()) == reached.tolist()
+    np.testing.assert_allclose(result.time_to_failure_minutes, times[result.nodes])
+    np.testing.assert_allclose(result.failure_probability, best_probability[result.nodes])
+    step_of = dict(zip(result.nodes.tolist(), result.cascade_step.tolist()))
+    for node, parent, step in zip(result.nodes[1:], result.parents[1:], result.cascade_step[1:]):
+        assert step == step_of[parent] + 1
+    assert np.all(np.diff(result.time_to_failure_minutes) >= 0)
+
+
+def test_urban_twin_simulates_cascades_from_its_graph():
+    twin = BoitataUrbanTwin(city_name="belo_horizonte", dependency_graph=ELEMENTS)
+    failure = {"system_type": "power_grid", "affected_component": "substation", "failure_severity": 1.0,
+               "estimated_duration_hours": 1}
+    assert [step["affected_component"] for step in twin.simulate_cascade_effects(failure)] == ["pump"]
+    assert twin.simulate_cascade_effects({**failure, "affected_component": "missing"}) == []
+    assert BoitataUrbanTwin().simulate_cascade_effects(failure) == []
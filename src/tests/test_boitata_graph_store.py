@@ -0,0 +1,95 @@
+"""
+Tests for the BOITATÁ versioned dependency graph and its change log.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.boitata_dependency_graph import DependencyGraph
+from subsystems.boitata_graph_store import VersionedDependencyGraph
+from subsystems.boitata_subsystem import BoitataUrbanTwin
+
+ELEMENTS = [
+    {"id": "substation", "element_type": "power_grid", "status": "operational"},
+    {"id": "pump", "element_type": "water_treatment", "population_served": 50000, "status": "operational",
+     "dependencies": [{"id": "substation", "weight": 0.8, "latency_minutes": 45}]},
+    {"id": "hospital", "element_type": "hospital", "population_served": 2000, "status": "maintenance",
+     "dependencies": [{"id": "pump", "weight": 1.0, "latency_minutes": 60}]},
+]
+
+
+def test_status_updates_are_versioned_without_touching_the_adjacency_arrays():
+    store = VersionedDependencyGraph(DependencyGraph.from_infrastructure_elements(ELEMENTS), max_changes=3)
+    indptr, indices = store.graph.indptr, store.graph.indices
+    received = []
+    unsubscribe = store.subscribe(received.append)
+
+    assert store.update_node_status("pump", "Falha", capacidade_operacional_percentual=0.0) == 1
+    assert store.update_node_status("pump", "Operacional") == 2
+    assert store.graph.indptr is indptr and store.graph.indices is indices
+    assert store.status_of("pump") == {"estado_atual": "Operacional"}
+    assert [change["version"] for change in received] == [1, 2]
+    assert store.changes_since(2) == [] and store.changes_since(1) == received[1:]
+    assert store.changes_since(0)[0]["data"] == {"estado_atual": "Falha", "capacidade_operacional_percentual": 0.0}
+
+    unsubscribe()
+    for _ in range(3):
+        store.update_node_status("hospital", "Alerta Gerador")
+    assert len(received) == 2
+    assert store.changes_since(1) is None and len(store.changes_since(2)) == 3  # Log keeps 3 changes
+    assert store.changes_since(99) is None
+
+
+def test_dependency_changes_are_logged_and_snapshot_round_trips():
+    store = VersionedDependencyGraph(DependencyGraph.from_infrastructure_elements(ELEMENTS))
+    store.set_dependency("hospital", "substation", weight=0.5, latency_minutes=30)
+    assert store.remove_dependency("pump", "hospital") is None  # No such dependency: not logged
+    store.remove_dependency("hospital", "pump")
+    ops = [(change["op"], change["source"], change["target"]) for change in store.changes_since(0)]
+    assert ops == [("edge_upsert", "hospital", "substation"), ("edge_remove", "hospital", "pump")]
+    assert store.changes_since(0)[0]["data"] == {"forca_dependencia_score": 0.5, "latencia_impacto_horas": 0.5}
+
+    snapshot = store.snapshot()
+    assert snapshot["version"] == 2
+    rebuilt = DependencyGraph.from_dependency_graph_response(snapshot)
+    np.testing.assert_allclose(rebuilt.weights, store.graph.weights)
+    np.testing.assert_allclose(rebuilt.latency_minutes, store.graph.latency_minutes)
+
+
+def test_failing_listener_does_not_fail_the_change():
+    store = VersionedDependencyGraph(DependencyGraph.from_infrastructure_elements(ELEMENTS))
+    received = []
+
+    def closed_loop_listener(change):
+        raise RuntimeError("Event loop is closed")
+
+    store.subscribe(closed_loop_listener)
+    store.subscribe(received.append)
+    assert store.update_node_status("pump", "Falha") == 1
+    assert [change["version"] for change in received] == [1]
+    assert store.status_of("pump") == {"estado_atual": "Falha"}
+
+
+def test_urban_twin_statuses_feed_the_criticality_index():
+    twin = BoitataUrbanTwin(dependency_graph=ELEMENTS)
+    assert twin.graph_store.status_of("hospital") == {"estado_atual": "maintenance"}
+    assert twin.assess_component_criticality("substation")["alcance_cascata_componentes"] == 2
+
+    assert twin.update_component_status("pump", "Falha") == 1
+    assert twin.assess_component_criticality("substation")["alcance_cascata_componentes"] == 0
+    assert twin.update_component_status("unknown", "Falha") is None
+    node = next(node for node in twin.graph_store.snapshot()["nodes"] if node["id"] == "pump")
+    assert node["data"]["status_operacional"] == {"estado_atual": "Falha"}
+    assert node["data"]["impacto_falha"]["impacto_populacional_esperado"] == 0.0
+
+    # Snapshots serialize a copy of the metrics, which later changes leave alone.
+    served = twin.graph_store.criticality_index.copy_metrics()
+    twin.update_component_status("pump", "Operacional")
+    assert twin.assess_component_criticality("substation")["alcance_cascata_componentes"] == 2
+    assert served.impacto_falha("substation")["alcance_cascata_componentes"] == 0
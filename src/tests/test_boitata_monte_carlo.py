@@ -0,0 +1,62 @@
+"""
+Tests for the BOITATÁ Monte Carlo cascade analysis.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.boitata_dependency_graph import DependencyGraph
+from subsystems.boitata_monte_carlo import run_monte_carlo_cascade
+from subsystems.boitata_subsystem import BoitataUrbanTwin
+
+# Diamond: the hospital fails if either of two half-reliable feeders passes the failure on.
+ELEMENTS = [
+    {"id": "substation", "element_type": "power_grid"},
+    {"id": "feeder_a", "element_type": "power_grid", "population_served": 1000,
+     "dependencies": [{"id": "substation", "weight": 0.5, "latency_minutes": 10}]},
+    {"id": "feeder_b", "element_type": "power_grid", "population_served": 1000,
+     "dependencies": [{"id": "substation", "weight": 0.5, "latency_minutes": 20}]},
+    {"id": "hospital", "element_type": "hospital", "population_served": 2000,
+     "dependencies": [{"id": "feeder_a", "weight": 1.0, "latency_minutes": 30},
+                      {"id": "feeder_b", "weight": 1.0, "latency_minutes": 30}]},
+]
+
+
+def test_failure_probabilities_match_the_independent_cascade_model():
+    graph = DependencyGraph.from_infrastructure_elements(ELEMENTS)
+    result = run_monte_carlo_cascade(graph, "substation", n_runs=4000, seed=7, confidence=0.99)
+    probabilities = {graph.node_ids[node]: p for node, p in zip(result.nodes, result.failure_probability)}
+    expected = {"feeder_a": 0.5, "feeder_b": 0.5, "hospital": 0.75}
+    for component, probability in expected.items():
+        position = list(result.nodes).index(graph.node_index[component])
+        assert result.ci_low[position] <= probability <= result.ci_high[position]
+        assert abs(probabilities[component] - probability) < 0.03
+    low, high = result.impacted_population_interval()
+    assert low <= 0.5 * 1000 * 2 + 0.75 * 2000 <= high
+
+
+def test_results_are_reproducible_and_independent_of_worker_count():
+    graph = DependencyGraph.from_infrastructure_elements(ELEMENTS)
+    inline = run_monte_carlo_cascade(graph, "substation", n_runs=600, seed=11, n_workers=1)
+    pooled = run_monte_carlo_cascade(graph, "substation", n_runs=600, seed=11, n_workers=2)
+    np.testing.assert_array_equal(inline.nodes, pooled.nodes)
+    np.testing.assert_array_equal(inline.failure_probability, pooled.failure_probability)
+    np.testing.assert_array_equal(inline.impacted_population, pooled.impacted_population)
+
+
+def test_urban_twin_monte_carlo_summary():
+    twin = BoitataUrbanTwin(dependency_graph=ELEMENTS)
+    failure = {"affected_component": "substation", "failure_severity": 0.0}
+    summary = twin.simulate_cascade_monte_carlo(failure, n_runs=100, seed=1)
+    assert summary["affected_components"] == [] and summary["expected_impacted_population"] == 0.0
+
+    summary = twin.simulate_cascade_monte_carlo({**failure, "failure_severity": 1.0, "estimated_duration_hours": 0.25},
+                                                n_runs=500, seed=1)
+    assert [c["affected_component"] for c in summary["affected_components"]] == ["feeder_a"]
+    assert summary["seed"] == 1 and summary["n_runs"] == 500
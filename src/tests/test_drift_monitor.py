@@ -0,0 +1,91 @@
+"""
+Tests for the SACI drift and data-quality monitor.
+"""
+
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.drift_monitor import DriftMonitor, build_training_profile
+
+
+def make_training_features(rows: int = 2000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'temperature': rng.normal(27, 5, rows).round(1),
+                         'humidity': rng.uniform(20, 90, rows).round(1),
+                         'smoke_level': rng.uniform(50, 900, rows).round()})
+
+
+def feed(monitor: DriftMonitor, frame: pd.DataFrame, device_id: str = 'esp32-1') -> None:
+    for reading in frame.to_dict('records'):
+        monitor.observe(device_id, reading)
+
+
+def test_training_profile_is_json_serializable_and_normalized():
+    profile = build_training_profile(make_training_features())
+    assert json.loads(json.dumps(profile)) == profile
+    for summary in profile.values():
+        assert len(summary['proportions']) == len(summary['edges']) + 1
+        assert abs(sum(summary['proportions']) - 1.0) < 1e-9
+
+
+def test_no_drift_alert_for_readings_like_the_training_data(caplog):
+    monitor = DriftMonitor(build_training_profile(make_training_features()), window=500)
+    with caplog.at_level(logging.WARNING, logger='ml_models.drift_monitor'):
+        feed(monitor, make_training_features(rows=1000, seed=1))
+    assert not caplog.records
+    assert all(scores['psi'] < monitor.psi_threshold for scores in monitor.latest_scores.values())
+
+
+def test_shifted_feature_raises_a_drift_alert(caplog):
+    monitor = DriftMonitor(build_training_profile(make_training_features()), window=500)
+    live = make_training_features(rows=500, seed=2)
+    live['smoke_level'] += 1500  # A fouled smoke sensor reads far higher than in training
+    with caplog.at_level(logging.WARNING, logger='ml_models.drift_monitor'):
+        feed(monitor, live)
+    drifted = {alert['feature'] for alert in monitor.recent_alerts() if alert['kind'] == 'drift'}
+    assert drifted == {'smoke_level'}
+    assert any('Drift alert' in record.getMessage() for record in caplog.records)
+
+
+def test_data_quality_checks():
+    monitor = DriftMonitor(build_training_profile(make_training_features()), stuck_readings=5)
+    monitor.observe('esp32-1', {'temperature': None, 'humidity': 140.0, 'smoke_level': 300.0})
+    for _ in range(5):
+        monitor.observe('esp32-1', {'temperature': 25.0, 'humidity': 50.0, 'smoke_level': 300.0})
+    kinds = {(alert['kind'], alert['feature']) for alert in monitor.recent_alerts()}
+    assert ('missing_value', 'temperature') in kinds
+    assert ('out_of_range', 'humidity') in kinds
+    assert ('stuck_sensor', 'smoke_level') in kinds
+    assert monitor.status()['quality_issues'] == len(monitor.recent_alerts())
+
+
+def test_persisting_quality_issue_is_alerted_once_per_episode(caplog):
+    monitor = DriftMonitor(build_training_profile(make_training_features()), repeat_alert_every=100,
+                           stuck_readings=1000)
+    broken = {'temperature': 25.0, 'humidity': 140.0, 'smoke_level': None}
+    with caplog.at_level(logging.WARNING, logger='ml_models.drift_monitor'):
+        for _ in range(150):
+            monitor.observe('esp32-1', broken)
+        monitor.observe('esp32-2', broken)
+    per_device = [(alert['device_id'], alert['kind']) for alert in monitor.recent_alerts()]
+    # Start of each issue plus one reminder at reading 101, per device.
+    assert per_device.count(('esp32-1', 'out_of_range')) == 2
+    assert per_device.count(('esp32-1', 'missing_value')) == 2
+    assert per_device.count(('esp32-2', 'out_of_range')) == 1
+    assert len(caplog.records) == 6
+    assert monitor.status()['open_quality_issues'] == 4
+
+    # A valid reading closes the episode, so the next bad one is alerted again.
+    monitor.observe('esp32-1', {'temperature': 25.0, 'humidity': 50.0, 'smoke_level': 300.0})
+    monitor.observe('esp32-1', broken)
+    assert [alert['kind'] for alert in monitor.recent_alerts()[-2:]] == ['out_of_range', 'missing_value']
+    assert monitor.status()['open_quality_issues'] == 4
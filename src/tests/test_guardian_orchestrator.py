@@ -0,0 +1,99 @@
+"""
+Tests for the GuardianCentralOrchestrator.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from core_logic.guardian_orchestrator import GuardianCentralOrchestrator, ThreatEvent
+
+
+def test_subsystems_and_ml_libraries_load_on_first_use(tmp_path):
+    # A fresh interpreter: other tests in this session have already imported the heavy modules.
+    dataset = tmp_path / "readings.csv"
+    dataset.write_text("temperature,humidity,smoke_level,fire_risk_label\n30.0,40.0,5.0,0\n")
+    script = textwrap.dedent(f"""
+        import sys
+        from core_logic.guardian_orchestrator import GuardianCentralOrchestrator
+        from ml_models import saci_fire_predictor
+
+        heavy = ("pandas", "sklearn")
+        orchestrator = GuardianCentralOrchestrator(subsystem_options={{"saci": {{"num_agents": 3}}}})
+        assert not [name for name in heavy if name in sys.modules], "heavy module imported at startup"
+        assert orchestrator.initialized_subsystems == []
+        assert "subsystems.saci_subsystem" not in sys.modules
+
+        assert len(orchestrator.saci.swarm_agents) == 3
+        assert orchestrator.saci is orchestrator.saci
+        assert orchestrator.initialized_subsystems == ["saci"]
+        assert "subsystems.boitata_subsystem" not in sys.modules
+
+        saci_fire_predictor.load_data({str(dataset)!r})
+        assert "pandas" in sys.modules
+    """)
+    completed = subprocess.run([sys.executable, "-c", script], cwd=SRC_DIR, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_correlated_threats_are_planned_and_dispatched_to_subsystems():
+    orchestrator = GuardianCentralOrchestrator(max_response_history=2, subsystem_options={
+        "saci": {"num_agents": 3},
+        "boitata": {"dependency_graph": [
+            {"id": "substation", "element_type": "power_grid"},
+            {"id": "hospital", "element_type": "hospital", "population_served": 2000,
+             "dependencies": [{"id": "substation", "weight": 0.9, "latency_minutes": 30}]}]},
+        "anhanga": {"mesh_topology": {"nodes": ["center", "relay", "team"],
+                                      "links": [{"source": "center", "target": "relay"},
+                                                {"source": "relay", "target": "team"}]}},
+    })
+    events = [
+        ThreatEvent("FIRE-1", "saci", "wildfire", 0.9, (-19.9, -43.9), metadata={"num_drones": 2}),
+        ThreatEvent("GRID-1", "boitata", "substation_failure", 0.8, (-19.9, -43.9),
+                    metadata={"affected_component": "substation"}),
+        ThreatEvent("ALERT-1", "anhanga", "evacuation", 0.7, (-19.9, -43.9),
+                    metadata={"sender_id": "center", "recipient_ids": ["team", "nowhere"]}),
+        ThreatEvent("OTHER-1", "unknown", "test", 0.1, (-19.9, -43.9)),
+    ]
+    plan = asyncio.run(orchestrator.coordinate_multi_threat_response(events))
+
+    assert plan["correlation_groups"] == {"group_auto_1": ["FIRE-1", "GRID-1", "ALERT-1", "OTHER-1"]}
+    assert set(plan["subsystem_actions"]) == {"saci", "boitata", "anhanga", "unknown"}
+    results = {result["action_id"]: result for result in plan["action_results"]}
+    assert results["saci_deploy_drones_FIRE-1"]["deployed_agents"] == ["saci_agent_0", "saci_agent_1"]
+    assert [step["affected_component"] for step in results["boitata_assess_cascade_risk_GRID-1"]["cascade_steps"]] \
+        == ["hospital"]
+    alert = results["anhanga_broadcast_emergency_alert_ALERT-1"]
+    assert alert["status"] == "failed" and alert["recipients_reached"] == ["team"]
+    assert results["unknown_monitor_OTHER-1"]["status"] == "not_dispatched"
+    assert plan["coordination_successful"] is False
+    assert sorted(orchestrator.initialized_subsystems) == ["anhanga", "boitata", "saci"]
+
+    # The history keeps only the newest plans.
+    for _ in range(2):
+        asyncio.run(orchestrator.coordinate_multi_threat_response(events[:1]))
+    assert len(orchestrator.response_history) == 2
+    assert plan not in orchestrator.response_history
+
+
+def test_saci_agents_return_to_the_pool_after_a_deployment():
+    from subsystems.saci_subsystem import DEFAULT_DEPLOYMENT_MINUTES, SaciFireSwarmIntelligence
+
+    saci = SaciFireSwarmIntelligence(num_agents=10)
+    deploy = [{"action_id": "deploy", "action_type": "deploy_drones", "target_area": (-19.9, -43.9),
+               "parameters": {"num_drones": 5}}]
+
+    async def plans(times):
+        return [(await saci.execute_response_plan(deploy, now=now))[0]["status"] for now in times]
+
+    # Ten drones cover two concurrent deployments; the third waits for one to come back.
+    assert asyncio.run(plans([0.0, 1.0, 2.0])) == ["completed", "completed", "failed"]
+    step = DEFAULT_DEPLOYMENT_MINUTES * 60.0
+    assert asyncio.run(plans([step + 1.0 + i * step for i in range(25)])) == ["completed"] * 25
+    assert saci.release_returned_agents(now=100 * step) == 5
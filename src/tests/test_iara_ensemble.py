@@ -0,0 +1,76 @@
+"""
+Tests for the IARA batch region risk scoring and its SEIR ensembles.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.iara_ensemble import RegionTable, pathogen_outlook, pathogen_parameters, run_risk_ensemble
+from subsystems.iara_subsystem import IaraEpidemicPredictor
+
+TABLE = {
+    "region_ids": ["centro", "norte", "litoral", "serra"],
+    "locations": [(-19.92, -43.94), (-19.80, -43.95), (-20.30, -40.30), (-20.50, -43.90)],
+    "population_density": [6000, 2500, 1500, 200],
+    "case_counts": {"dengue": [3, 1, 0, 0], "flu": [5, 0, 2, 0]},
+    "avg_temperature_c": [24, 25, 28, 18],
+    "avg_humidity_percent": [65, 70, 80, 60],
+    "vaccination_rate": [0.6, 0.5, 0.4, 0.7],
+}
+MOBILITY = [[0.0, 0.03, 0.0, 0.0], [0.05, 0.0, 0.0, 0.0], [0.02, 0.0, 0.0, 0.0], [0.01, 0.0, 0.0, 0.0]]
+
+
+def test_stacked_members_match_separate_runs():
+    table = RegionTable(**TABLE)
+    parameters = pathogen_parameters("dengue")
+    cases = table.case_counts["dengue"]
+    _, nominal = pathogen_outlook(parameters, table.columns, cases, MOBILITY)
+    factors = {"r0": np.array([1.0, 0.8]), "incubation_days": np.ones(2), "infectious_days": np.ones(2),
+               "cases": np.ones((2, table.n_regions))}
+    _, stacked = pathogen_outlook(parameters, table.columns, cases, MOBILITY, factors=factors)
+    np.testing.assert_allclose(stacked["probability"][0], nominal["probability"], atol=1e-12)
+    scaled = dict(parameters, r0=parameters["r0"] * 0.8)
+    _, weaker = pathogen_outlook(scaled, table.columns, cases, MOBILITY)
+    np.testing.assert_allclose(stacked["probability"][1], weaker["probability"], atol=1e-12)
+
+
+def test_ensembles_are_reproducible_and_independent_of_worker_count():
+    table = RegionTable(**TABLE)
+    inline = run_risk_ensemble(table, MOBILITY, n_members=40, seed=5, n_workers=1)
+    pooled = run_risk_ensemble(table, MOBILITY, n_members=40, seed=5, n_workers=2)
+    np.testing.assert_array_equal(inline.member_probability, pooled.member_probability)
+    assert inline.member_probability.shape == (40, 4)
+    assert np.all(inline.band_low <= inline.ensemble_mean) and np.all(inline.ensemble_mean <= inline.band_high)
+    assert np.all(inline.band_high - inline.band_low < 1.0) and np.any(inline.band_high > inline.band_low)
+    # Seeded regions are the riskiest; the cool, unseeded highland only sees imports.
+    assert inline.probability[0] > inline.probability[3]
+    assert inline.summary()["regions"][0]["region_id"] == "centro"
+
+
+def test_batch_scores_agree_with_the_record_api_and_fill_the_heatmap():
+    predictor = IaraEpidemicPredictor()
+    result = predictor.predict_outbreak_risk_batch(TABLE, mobility=MOBILITY, n_members=0)
+    records = [{"region_id": region_id, "population_density": density,
+                "recent_case_counts": {"dengue": dengue, "flu": flu},
+                "environmental_factors": {"avg_temperature_c": temperature, "avg_humidity_percent": humidity},
+                "vaccination_rate": vaccination}
+               for region_id, density, dengue, flu, temperature, humidity, vaccination in zip(
+                   TABLE["region_ids"], TABLE["population_density"], TABLE["case_counts"]["dengue"],
+                   TABLE["case_counts"]["flu"], TABLE["avg_temperature_c"], TABLE["avg_humidity_percent"],
+                   TABLE["vaccination_rate"])]
+    np.testing.assert_allclose(result.probability, predictor.predict_outbreak_probabilities(records, MOBILITY))
+    np.testing.assert_array_equal(result.band_low, result.probability)
+
+    points = result.heatmap_data_points()
+    assert [point["geolocalizacao"] for point in points] == TABLE["locations"]
+    assert all(0.0 <= point["risco_epidemiologico_score"] <= 1.0 for point in points)
+    assert points[0]["patogeno_predominante"] in ("dengue", "flu")
+    with pytest.raises(ValueError):
+        RegionTable(population_density=[1.0, 2.0], case_counts={"flu": [1.0]})
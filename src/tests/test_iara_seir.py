@@ -0,0 +1,59 @@
+"""
+Tests for the IARA metapopulation SEIR engine.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from subsystems.iara_seir import MetapopulationSEIR
+from subsystems.iara_subsystem import IaraEpidemicPredictor
+
+
+def test_isolated_region_reaches_the_final_size_and_conserves_population():
+    model = MetapopulationSEIR([1e6, 1e6], beta=0.4, sigma=0.2, gamma=0.2)
+    state = model.initial_state(infectious=[10.0, 0.0])
+    for method in ("RK4", "RK45"):
+        trajectory = model.simulate(state, 365, method=method)
+        totals = trajectory.susceptible + trajectory.exposed + trajectory.infectious + trajectory.recovered
+        assert np.allclose(totals, 1e6)
+        attack = trajectory.attack_rate
+        # Final size relation for R0 = 2: 1 - r = exp(-2 r), r ~ 0.797
+        assert attack[0] == pytest.approx(0.797, abs=0.002)
+        assert attack[1] == 0.0
+
+
+def test_mobility_carries_the_epidemic_to_unseeded_regions():
+    mobility = np.array([[0.0, 0.05, 0.0], [0.0, 0.0, 0.05], [0.0, 0.0, 0.0]])
+    model = MetapopulationSEIR([1e5, 1e5, 1e5], beta=0.5, sigma=0.25, gamma=0.25, mobility=mobility)
+    trajectory = model.simulate(model.initial_state(infectious=[10.0, 0.0, 0.0]), 365)
+    assert np.all(trajectory.attack_rate > 0.7)
+    assert trajectory.peak_day[0] < trajectory.peak_day[1] < trajectory.peak_day[2]
+    with pytest.raises(ValueError):
+        MetapopulationSEIR([1.0, 1.0], 0.5, 0.25, 0.25, mobility=[[0.0, 1.5], [0.0, 0.0]])
+
+
+def test_outbreak_probability_follows_the_branching_process():
+    model = MetapopulationSEIR([1e6, 1e6, 1e6], beta=[0.4, 0.1, 0.4], sigma=0.2, gamma=0.2)
+    outlook = model.outbreak_probability(model.initial_state(infectious=[1.0, 50.0, 0.0]))
+    # R0 = 2 from one case: 1 - 1/2; R0 < 1 never takes off; no cases and no imports: nothing.
+    assert outlook["probability"] == pytest.approx([0.5, 0.0, 0.0], abs=1e-5)
+
+    predictor = IaraEpidemicPredictor()
+    regions = [{"region_id": "seeded", "population": 200_000, "recent_case_counts": {"covid19": 40}},
+               {"region_id": "quiet", "population": 200_000, "recent_case_counts": {"covid19": 0}},
+               {"region_id": "vaccinated", "population": 200_000, "vaccination_rate": 1.0,
+                "recent_case_counts": {"covid19": 0}}]
+    probabilities = predictor.predict_outbreak_probabilities(
+        regions, mobility=[[0.0, 0.0, 0.0], [0.05, 0.0, 0.0], [0.05, 0.0, 0.0]])
+    assert probabilities[0] > 0.99
+    # Imports reach both; 70% effective vaccination brings R = 2.5 below 1.
+    assert probabilities[1] > 0.5 and probabilities[2] == 0.0
+    single = predictor.predict_outbreak_probability(regions[1])
+    assert isinstance(single, float) and single == 0.0
@@ -0,0 +1,77 @@
+"""
+Tests for the SACI inference backends, including ONNX parity with scikit-learn.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.inference_backend import InferenceBackend, create_backend
+from ml_models.saci_fire_predictor import FEATURE_COLUMNS, predict_saci_fire_risk, predict_saci_fire_risk_batch
+
+
+def make_data(rows: int = 400, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({'temperature': rng.normal(28, 6, rows), 'humidity': rng.uniform(15, 90, rows),
+                      'smoke_level': rng.gamma(2.0, 1.5, rows)})[FEATURE_COLUMNS]
+    y = (((X['temperature'] > 32) & (X['humidity'] < 40)) | (X['smoke_level'] > 6)).astype(int)
+    return X, y
+
+
+def test_sklearn_backend_matches_model():
+    X, y = make_data()
+    model = LogisticRegression(solver='liblinear').fit(X, y)
+    backend = create_backend('sklearn', model)
+    labels, probabilities = predict_saci_fire_risk_batch(backend, X.to_numpy())
+    np.testing.assert_array_equal(labels, model.predict(X))
+    np.testing.assert_allclose(probabilities, model.predict_proba(X))
+    reading = pd.DataFrame([[45.0, 20.0, 9.0]], columns=FEATURE_COLUMNS)
+    assert predict_saci_fire_risk(backend, 45.0, 20.0, 9.0)[0] == model.predict(reading)[0]
+
+
+class RecordingBackend(InferenceBackend):
+    """Returns fixed probabilities and records every input it is given."""
+    def __init__(self):
+        super().__init__(FEATURE_COLUMNS, classes=(0, 1))
+        self.inputs = []
+
+    def predict_proba(self, X):
+        self.inputs.append(X)
+        return np.tile([0.3, 0.7], (len(X), 1))
+
+
+def test_single_reading_runs_the_backend_once_on_a_float32_row():
+    backend = RecordingBackend()
+    label, probabilities = predict_saci_fire_risk(backend, 30.5, 55.2, 3.5)
+    assert label == 1 and probabilities.tolist() == [0.3, 0.7]
+    [row] = backend.inputs
+    assert isinstance(row, np.ndarray) and row.dtype == np.float32
+    np.testing.assert_array_equal(row, np.array([[30.5, 55.2, 3.5]], dtype=np.float32))
+    with pytest.raises(TypeError):
+        InferenceBackend(FEATURE_COLUMNS, (0, 1))  # Abstract: predict_proba is not implemented
+
+
+@pytest.mark.parametrize('estimator', [LogisticRegression(solver='liblinear'),
+                                       HistGradientBoostingClassifier(max_iter=50, random_state=0)])
+def test_onnxruntime_backend_parity(tmp_path, estimator):
+    pytest.importorskip('skl2onnx')
+    pytest.importorskip('onnxruntime')
+    X, y = make_data()
+    model = estimator.fit(X, y)
+    backend = create_backend('onnxruntime', model, onnx_path=str(tmp_path / 'model.onnx'))
+
+    native_labels, native_probabilities = predict_saci_fire_risk_batch(model, X)
+    onnx_labels, onnx_probabilities = predict_saci_fire_risk_batch(backend, X)
+    np.testing.assert_allclose(onnx_probabilities, native_probabilities, atol=1e-4)  # float32 graph
+    assert (onnx_labels == native_labels).mean() > 0.99
+    label, probabilities = predict_saci_fire_risk(backend, 30.5, 55.2, 3.5)
+    assert label in (0, 1) and probabilities.shape == (2,)
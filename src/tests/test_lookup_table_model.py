@@ -0,0 +1,78 @@
+"""
+Tests for the SACI lookup-table risk model compiler.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.lookup_table_model import LookupTableRiskModel, compile_lookup_table, lookup_table_report
+from ml_models.saci_fire_predictor import FEATURE_COLUMNS, load_model, predict_saci_fire_risk
+
+
+def make_model(rows: int = 2000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({'temperature': rng.normal(27, 6, rows).round(1),
+                      'humidity': rng.uniform(15, 90, rows).round(1),
+                      'smoke_level': rng.uniform(0, 2000, rows).round()})[FEATURE_COLUMNS]
+    y = (((X['temperature'] > 32) & (X['humidity'] < 40)) | (X['smoke_level'] > 1200)).astype(int)
+    return LogisticRegression(max_iter=1000).fit(X, y), X
+
+
+def test_compiled_table_stays_within_the_error_bound():
+    model, X = make_model()
+    lut = compile_lookup_table(model, max_error=0.01, check_data=X)
+    report = lookup_table_report(lut, model, X)
+    assert lut.max_error_ <= 0.01
+    assert report['max_abs_error'] <= 0.01
+    assert report['label_agreement'] > 0.99
+
+
+def test_single_reading_path_matches_batch_and_survives_save_load(tmp_path):
+    model, X = make_model()
+    lut = compile_lookup_table(model, max_error=0.02)
+    path = str(tmp_path / 'lut.npz')
+    lut.save(path)
+    loaded = load_model(path)
+    assert isinstance(loaded, LookupTableRiskModel)
+    np.testing.assert_array_equal(loaded.table, lut.table)
+
+    batch = loaded.predict_proba(X.head(50))
+    for row, expected in zip(X.head(50).to_numpy(), batch):
+        label, probabilities = predict_saci_fire_risk(loaded, *row)
+        np.testing.assert_allclose(probabilities, expected, atol=1e-6)
+        assert label == int(expected[1] > 0.5)
+    # Readings outside the grid bounds are clipped to them.
+    assert predict_saci_fire_risk(loaded, 500.0, -5.0, 1e6)[1].shape == (2,)
+
+
+def test_single_readings_score_from_the_table_itself(tmp_path):
+    from ml_models.model_registry import ModelRegistry
+
+    model, X = make_model()
+    lut = compile_lookup_table(model, max_error=0.02)
+    assert lut._flat_table.obj is lut.table  # A view, not a second copy of the table
+
+    # Published models are pickled and memory mapped back; the view is rebuilt over the mapping.
+    registry = ModelRegistry(str(tmp_path))
+    registry.publish(lut)
+    mapped, _ = registry.load()
+    assert isinstance(mapped.table, np.memmap)
+    reading = X.iloc[0].tolist()
+    np.testing.assert_allclose(mapped.predict_reading(*reading)[1], lut.predict_reading(*reading)[1])
+
+
+def test_rejects_models_over_other_features():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({'temperature': rng.normal(size=50), 'temperature_delta': rng.normal(size=50)})
+    model = LogisticRegression().fit(X, (X['temperature'] > 0).astype(int))
+    with pytest.raises(ValueError):
+        compile_lookup_table(model)
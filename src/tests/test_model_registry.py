@@ -0,0 +1,104 @@
+"""
+Tests for the SACI model registry and hot-swappable model.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.model_registry import HotSwappableModel, ModelRegistry
+
+
+def make_model(seed: int) -> LogisticRegression:
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(40, 3)), columns=['temperature', 'humidity', 'smoke_level'])
+    y = (X['temperature'] + rng.normal(scale=0.1, size=40) > 0).astype(int)
+    return LogisticRegression().fit(X, y)
+
+
+def test_publish_and_load_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    first = registry.publish(make_model(1), metrics={'f1': 0.9})
+    second = registry.publish(make_model(2), activate=False)
+
+    assert registry.list_versions() == ['v0001', 'v0002']
+    assert registry.current_version() == 'v0001'
+    assert first['feature_order'] == ['temperature', 'humidity', 'smoke_level']
+    assert first['metrics'] == {'f1': 0.9}
+
+    model, manifest = registry.load()
+    assert manifest == first
+    assert isinstance(model.coef_, np.memmap)  # Arrays are mapped, not copied
+    registry.activate(second['version'])
+    assert registry.load()[1]['version'] == 'v0002'
+
+
+def test_load_rejects_tampered_artifact(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    manifest = registry.publish(make_model(1))
+    with open(os.path.join(str(tmp_path), manifest['version'], manifest['model_file']), 'ab') as f:
+        f.write(b'\0')
+    with pytest.raises(ValueError):
+        registry.load()
+
+
+def test_hot_swap_replaces_model_and_notifies(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.publish(make_model(1))
+    hot_model = HotSwappableModel(registry)
+    swaps = []
+    hot_model.add_swap_listener(lambda old, new: swaps.append((old['version'], new['version'])))
+    held_model = hot_model.model
+
+    assert hot_model.check_for_update() is False
+    registry.publish(make_model(2))
+    assert hot_model.check_for_update() is True
+    assert hot_model.version == 'v0002'
+    assert hot_model.model is not held_model
+    reading = pd.DataFrame([[0.0, 0.0, 0.0]], columns=['temperature', 'humidity', 'smoke_level'])
+    assert held_model.predict(reading).shape == (1,)  # Old reference stays usable
+    assert swaps == [('v0001', 'v0002')]
+
+
+def test_failed_hot_swap_is_retried(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.publish(make_model(1))
+    hot_model = HotSwappableModel(registry)
+    manifest = registry.publish(make_model(2))
+    model_path = os.path.join(str(tmp_path), manifest['version'], manifest['model_file'])
+    with open(model_path, 'rb') as f:
+        intact = f.read()
+    with open(model_path, 'ab') as f:
+        f.write(b'\0')  # E.g., a copy still in progress
+
+    assert hot_model.check_for_update() is False
+    assert hot_model.version == 'v0001'
+    with open(model_path, 'wb') as f:
+        f.write(intact)
+    assert hot_model.check_for_update() is True
+    assert hot_model.version == 'v0002'
+
+
+def test_concurrent_publishers_get_distinct_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    model = make_model(1)
+    manifests = []
+    publishers = [threading.Thread(target=lambda: manifests.append(ModelRegistry(str(tmp_path)).publish(model)))
+                  for _ in range(8)]
+    for publisher in publishers:
+        publisher.start()
+    for publisher in publishers:
+        publisher.join()
+
+    assert sorted(manifest['version'] for manifest in manifests) == [f"v{i:04d}" for i in range(1, 9)]
+    assert registry.list_versions() == [f"v{i:04d}" for i in range(1, 9)]
+    assert sorted(os.listdir(str(tmp_path))) == ['CURRENT'] + registry.list_versions()
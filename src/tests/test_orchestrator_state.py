@@ -0,0 +1,94 @@
+"""
+Tests for orchestrator snapshots, journaling and warm restart.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from core_logic.guardian_orchestrator import GuardianCentralOrchestrator, ThreatEvent
+from core_logic.orchestrator_state import OrchestratorStateStore
+
+
+def make_batch(batch_index: int):
+    # An unknown subsystem source keeps the test from constructing real subsystems.
+    return [ThreatEvent(event_id=f"EVT-{batch_index}-{i}", subsystem_source="test", threat_type="test",
+                        severity=0.5, location=(-19.9, -43.9)) for i in range(2)]
+
+
+def run_batches(orchestrator, batch_indices):
+    async def scenario():
+        for batch_index in batch_indices:
+            await orchestrator.coordinate_multi_threat_response(make_batch(batch_index))
+    asyncio.run(scenario())
+
+
+def test_restart_restores_snapshot_and_journal_tail(tmp_path):
+    store = OrchestratorStateStore(str(tmp_path))
+    orchestrator = GuardianCentralOrchestrator(state_store=store, snapshot_interval=4)
+    run_batches(orchestrator, range(3))  # 6 journal records: one snapshot at 4, then 2 in the tail
+    store.close()
+    assert os.path.exists(store.snapshot_path)
+
+    restarted_store = OrchestratorStateStore(str(tmp_path))
+    restarted = GuardianCentralOrchestrator(state_store=restarted_store, snapshot_interval=4)
+    assert [e.event_id for e in restarted.active_threats] == [e.event_id for e in orchestrator.active_threats]
+    assert [p["plan_id"] for p in restarted.response_history] == [p["plan_id"] for p in orchestrator.response_history]
+    assert restarted_store.records_since_snapshot == 2
+
+    # The restored orchestrator keeps journaling with fresh sequence numbers.
+    run_batches(restarted, [3])
+    restarted_store.close()
+    again = GuardianCentralOrchestrator(state_store=OrchestratorStateStore(str(tmp_path)), snapshot_interval=4)
+    assert len(again.active_threats) == 8
+    assert len(again.response_history) == 4
+
+
+def test_torn_journal_tail_is_dropped(tmp_path):
+    store = OrchestratorStateStore(str(tmp_path))
+    orchestrator = GuardianCentralOrchestrator(state_store=store)
+    run_batches(orchestrator, range(2))
+    store.close()
+    with open(store.journal_path, "ab") as journal_file:
+        journal_file.write(b"\x05\x00\x00\x00partial")  # Simulates a crash mid-append
+
+    restarted_store = OrchestratorStateStore(str(tmp_path))
+    restarted = GuardianCentralOrchestrator(state_store=restarted_store)
+    assert len(restarted.active_threats) == 4
+    assert len(restarted.response_history) == 2
+    run_batches(restarted, [2])
+    restarted_store.close()
+    assert len(GuardianCentralOrchestrator(state_store=OrchestratorStateStore(str(tmp_path))).active_threats) == 6
+
+
+def test_snapshot_is_written_off_the_event_loop_and_survives_a_crash_after_rotation(tmp_path):
+    store = OrchestratorStateStore(str(tmp_path))
+    orchestrator = GuardianCentralOrchestrator(state_store=store, snapshot_interval=4, max_active_threats=5)
+    writer_threads = []
+    write_snapshot = store.write_snapshot
+    store.write_snapshot = lambda *args: (writer_threads.append(threading.get_ident()), write_snapshot(*args))
+
+    async def scenario():
+        for batch_index in range(3):
+            await orchestrator.coordinate_multi_threat_response(make_batch(batch_index))
+        await orchestrator.wait_for_snapshot()
+    asyncio.run(scenario())
+    assert writer_threads and threading.get_ident() not in writer_threads
+    assert [e.event_id for e in orchestrator.active_threats] == ["EVT-0-1", "EVT-1-0", "EVT-1-1", "EVT-2-0", "EVT-2-1"]
+
+    # Crash after the journal was rotated but before the next snapshot was written.
+    store.rotate_journal()
+    run_batches(orchestrator, [3])
+    store.close()
+    assert os.path.exists(store.rotated_journal_path)
+
+    restarted = GuardianCentralOrchestrator(state_store=OrchestratorStateStore(str(tmp_path)), max_active_threats=5)
+    assert [e.event_id for e in restarted.active_threats] == [e.event_id for e in orchestrator.active_threats]
+    assert [p["plan_id"] for p in restarted.response_history] == [p["plan_id"] for p in orchestrator.response_history]
+    restarted.snapshot_state()
+    assert not os.path.exists(restarted.state_store.rotated_journal_path)
@@ -0,0 +1,85 @@
+"""
+Tests for the SACI prediction cache.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.prediction_cache import PredictionCache
+from ml_models.saci_feature_engine import RollingFeatureEngine
+from ml_models.saci_fire_predictor import FEATURE_COLUMNS, predict_saci_fire_risk
+
+
+class CountingModel:
+    """Wraps a model and counts predict_proba calls."""
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+        self.classes_ = model.classes_
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+
+def make_model(seed: int = 0) -> CountingModel:
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({'temperature': rng.normal(28, 6, 200), 'humidity': rng.uniform(15, 90, 200),
+                      'smoke_level': rng.uniform(0, 900, 200)})[FEATURE_COLUMNS]
+    y = ((X['temperature'] > 30) & (X['humidity'] < 50)).astype(int)
+    return CountingModel(LogisticRegression(solver='liblinear').fit(X, y))
+
+
+def test_repeated_readings_are_served_from_cache():
+    model = make_model()
+    cache = PredictionCache(max_entries=2)
+    first = cache.predict(model, 30.5, 55.2, 350)
+    second = cache.predict(model, 30.5, 55.2, 350)
+    assert model.calls == 1
+    assert first[0] == second[0] and np.array_equal(first[1], second[1])
+    assert first[1].tolist() == predict_saci_fire_risk(model.model, 30.5, 55.2, 350)[1].tolist()
+
+    cache.predict(model, 31.0, 50.0, 300)
+    cache.predict(model, 32.0, 45.0, 310)  # Evicts the least recently used (30.5, 55.2, 350)
+    cache.predict(model, 30.5, 55.2, 350)
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 4 and stats['evictions'] == 2
+    assert stats['hit_rate'] == 0.2
+
+
+def test_quantized_readings_share_an_entry():
+    model = make_model()
+    cache = PredictionCache(quantization=(0.5, 1.0, 10))
+    a = cache.predict(model, 30.6, 55.2, 351)
+    b = cache.predict(model, 30.4, 54.8, 348)
+    assert model.calls == 1 and np.array_equal(a[1], b[1])
+    assert np.array_equal(a[1], predict_saci_fire_risk(model.model, 30.5, 55.0, 350)[1])
+
+
+def test_model_change_invalidates_and_history_models_bypass():
+    cache = PredictionCache()
+    old_model, new_model = make_model(0), make_model(1)
+    cache.predict(old_model, 30.5, 55.2, 350)
+    cache.predict(new_model, 30.5, 55.2, 350)
+    assert new_model.calls == 1 and cache.stats()['invalidations'] == 1
+
+    cache.on_model_swap({'version': 'v0001'}, {'version': 'v0002'})
+    assert cache.stats()['size'] == 0
+
+    engine = RollingFeatureEngine(windows=(2,), ewma_spans=(2,))
+    rolling_model = LogisticRegression().fit(
+        pd.DataFrame(np.random.default_rng(2).normal(size=(20, len(engine.feature_names))),
+                     columns=engine.feature_names), [0, 1] * 10)
+    cache.predict(rolling_model, 30.5, 55.2, 350, feature_engine=engine, device_id='ESP32_001')
+    assert cache.stats()['bypassed'] == 1 and cache.stats()['size'] == 0
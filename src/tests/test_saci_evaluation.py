@@ -0,0 +1,59 @@
+"""
+Tests for the vectorized SACI evaluation and threshold-sweep report.
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+from sklearn.metrics import (average_precision_score, confusion_matrix, f1_score,
+                             precision_score, recall_score, roc_auc_score)
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.saci_evaluation import (build_evaluation_report, metrics_from_confusion_matrix,
+                                       threshold_sweep, write_evaluation_report)
+
+
+def make_scores(rows: int = 2000, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, rows)
+    scores = np.round(np.clip(0.3 * y + rng.normal(0.35, 0.2, rows), 0, 1), 2)  # Rounded: many ties
+    return y, scores
+
+
+def test_sweep_matches_per_threshold_confusion_matrices():
+    y, scores = make_scores()
+    sweep = threshold_sweep(y, scores)
+    for index in (1, len(sweep['threshold']) // 2, len(sweep['threshold']) - 1):
+        predicted = scores >= sweep['threshold'][index]
+        tn, fp, fn, tp = confusion_matrix(y, predicted).ravel()
+        assert (sweep['tp'][index], sweep['fp'][index], sweep['fn'][index], sweep['tn'][index]) == (tp, fp, fn, tn)
+
+
+def test_report_matches_sklearn_curves_and_is_json_serializable(tmp_path):
+    y, scores = make_scores()
+    devices = np.where(np.arange(len(y)) % 2, 'ESP32_001', 'ESP32_002')
+    report = build_evaluation_report(y, scores, devices, min_recall=0.9)
+
+    assert np.isclose(report['summary']['roc_auc'], roc_auc_score(y, scores))
+    assert np.isclose(report['summary']['average_precision'], average_precision_score(y, scores))
+    assert report['recommended_threshold']['recall'] >= 0.9
+    assert sum(row['count'] for row in report['per_device']) == len(y)
+
+    paths = write_evaluation_report(report, str(tmp_path))
+    with open(paths[0]) as f:
+        assert json.load(f)['summary'] == report['summary']
+    assert len(paths) == 4
+
+
+def test_metrics_from_confusion_matrix_match_sklearn_weighted_scores():
+    y, scores = make_scores()
+    predicted = (scores >= 0.5).astype(int)
+    metrics = metrics_from_confusion_matrix(confusion_matrix(y, predicted))
+    assert np.isclose(metrics['precision'], precision_score(y, predicted, average='weighted'))
+    assert np.isclose(metrics['recall'], recall_score(y, predicted, average='weighted'))
+    assert np.isclose(metrics['f1'], f1_score(y, predicted, average='weighted'))
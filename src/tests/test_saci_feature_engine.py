@@ -0,0 +1,73 @@
+"""
+Tests for the SACI rolling-window feature engine.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.saci_feature_engine import RollingFeatureEngine
+from ml_models.saci_fire_predictor import load_training_frame
+
+
+def make_readings(rows: int = 300, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'device_id': rng.choice(['ESP32_001', 'ESP32_002', 'ESP32_003'], rows),
+        'timestamp': rng.permutation(rows),  # Rows deliberately out of time order
+        'temperature': rng.normal(30, 5, rows),
+        'humidity': rng.normal(50, 10, rows),
+        'smoke_level': rng.normal(100, 20, rows),
+    })
+
+
+def test_incremental_updates_match_vectorized_transform():
+    readings = make_readings()
+    engine = RollingFeatureEngine(windows=(1, 3, 12), ewma_spans=(4, 8))
+    vectorized = engine.transform_frame(readings)
+
+    live = RollingFeatureEngine(windows=(1, 3, 12), ewma_spans=(4, 8))
+    rows = {index: live.update(row['device_id'], row)
+            for index, row in readings.sort_values('timestamp').iterrows()}
+    incremental = pd.DataFrame.from_dict(rows, orient='index').reindex(readings.index)
+
+    np.testing.assert_allclose(incremental[engine.feature_names].to_numpy(),
+                               vectorized[engine.feature_names].to_numpy(dtype=float), atol=1e-9)
+
+
+def test_window_features_on_a_linear_ramp():
+    engine = RollingFeatureEngine(base_columns=['temperature'], windows=(3,), ewma_spans=(1,))
+    features = [engine.update('dev', {'temperature': 10.0 + 2.0 * step}) for step in range(5)]
+    assert features[0]['temperature_slope_3'] == 0.0
+    assert features[0]['temperature_delta'] == 0.0
+    assert features[4]['temperature_slope_3'] == 2.0
+    assert features[4]['temperature_mean_3'] == 16.0  # mean of 14, 16, 18
+    assert features[4]['temperature_ewma_1'] == 18.0  # span 1 means alpha 1
+
+
+def test_engine_round_trips_through_feature_names():
+    engine = RollingFeatureEngine(windows=(4, 12), ewma_spans=(8,))
+    rebuilt = RollingFeatureEngine.from_feature_names(engine.feature_names)
+    assert rebuilt.feature_names == engine.feature_names
+    assert RollingFeatureEngine.from_feature_names(['temperature', 'humidity', 'smoke_level']) is None
+
+
+def test_training_frame_rolling_features_are_computed_per_device(tmp_path):
+    readings = make_readings(rows=120)
+    readings['timestamp'] = pd.Timestamp('2025-01-01') + pd.to_timedelta(readings['timestamp'], unit='min')
+    readings['fire_risk_label'] = (readings['temperature'] > 32).astype(int)
+    path = tmp_path / "readings.csv"
+    readings.to_csv(path, index=False)
+
+    engine = RollingFeatureEngine(windows=(3,), ewma_spans=(4,))
+    frame = load_training_frame(str(path), engine)
+    for device_id, device_rows in frame.groupby('device_id', observed=True):
+        alone = engine.transform_frame(device_rows[['device_id', 'timestamp'] + engine.base_columns])
+        np.testing.assert_allclose(device_rows[engine.feature_names].to_numpy(dtype=float),
+                                   alone[engine.feature_names].to_numpy(dtype=float), atol=1e-4)
@@ -0,0 +1,51 @@
+"""
+Tests for model-family selection in the SACI fire predictor.
+"""
+
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.saci_fire_predictor import FEATURE_COLUMNS, select_model
+
+
+def make_dataset(rows: int = 120, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        'temperature': rng.uniform(15, 45, rows),
+        'humidity': rng.uniform(10, 90, rows),
+        'smoke_level': rng.uniform(0, 5, rows),
+    })[FEATURE_COLUMNS]
+    y = pd.Series(((X['temperature'] > 30) & (X['humidity'] < 50)).astype(int), name='fire_risk_label')
+    return X, y
+
+
+def test_selects_fastest_family_meeting_accuracy_floor():
+    X, y = make_dataset()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)  # e.g. LogisticRegression's deprecated `penalty`
+        select_model(X, y, search='grid', cv_folds=3, n_jobs=1, families=['logistic_regression'])
+        model, results = select_model(X, y, accuracy_floor=0.5, search='random', n_iter=2, cv_folds=3,
+                                      n_jobs=1, families=['logistic_regression', 'random_forest'])
+    assert {r['family'] for r in results} == {'logistic_regression', 'random_forest'}
+    selected = [r for r in results if r['selected']]
+    assert len(selected) == 1 and selected[0]['model'] is model
+    eligible = [r for r in results if r['meets_floor']]
+    assert selected[0]['latency_per_row_s'] == min(r['latency_per_row_s'] for r in eligible)
+    assert model.predict(X.head(3)).shape == (3,)
+
+
+def test_falls_back_to_most_accurate_when_floor_unreachable():
+    X, y = make_dataset()
+    _, results = select_model(X, y, accuracy_floor=1.01, search='random', n_iter=2, cv_folds=3,
+                              n_jobs=1, families=['logistic_regression', 'random_forest'])
+    selected = next(r for r in results if r['selected'])
+    assert not any(r['meets_floor'] for r in results)
+    assert selected['cv_accuracy'] == max(r['cv_accuracy'] for r in results)
@@ -0,0 +1,127 @@
+"""
+Tests for loading SACI training data (typed, chunked and Parquet reads) and
+out-of-core training on it.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from ml_models.saci_fire_predictor import (FEATURE_COLUMNS, TARGET_COLUMN, iter_training_data, load_model,
+                                           load_training_data, train_incremental_sgd, with_context_columns)
+
+
+def write_dataset(path, rows: int = 50, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2025-01-01', periods=rows, freq='min').astype(str),
+        # Later rows introduce new devices, so chunks carry different category sets.
+        'device_id': [f"ESP32_{i * 4 // rows}" for i in range(rows)],
+        'temperature': rng.uniform(15, 45, rows).round(1),
+        'humidity': rng.uniform(10, 90, rows).round(1),
+        'smoke_level': rng.integers(0, 500, rows).astype(float),
+        'co2_ppm': rng.uniform(400, 900, rows),
+        TARGET_COLUMN: rng.integers(0, 2, rows),
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_typed_load_prunes_columns_and_uses_compact_dtypes(tmp_path):
+    path = str(tmp_path / "readings.csv")
+    write_dataset(path)
+    df = load_training_data(path)
+    assert list(df.columns) == FEATURE_COLUMNS + [TARGET_COLUMN]
+    assert all(df[col].dtype == np.float32 for col in FEATURE_COLUMNS)
+    assert df[TARGET_COLUMN].dtype == np.int8
+
+    columns = with_context_columns(path)
+    assert columns == FEATURE_COLUMNS + [TARGET_COLUMN, 'timestamp', 'device_id']
+    with_context = load_training_data(path, columns)
+    assert isinstance(with_context['device_id'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(with_context['timestamp'])
+
+
+@pytest.mark.parametrize("chunksize", [7, 50, 1000])
+def test_chunked_load_matches_single_read(tmp_path, chunksize):
+    path = str(tmp_path / "readings.csv")
+    original = write_dataset(path)
+    columns = with_context_columns(path)
+    assert [len(chunk) for chunk in iter_training_data(path, columns, chunksize=chunksize)][0] == min(chunksize, 50)
+
+    chunked = load_training_data(path, columns, chunksize=chunksize)
+    single = load_training_data(path, columns)
+    pd.testing.assert_frame_equal(chunked, single)
+    assert list(chunked['device_id'].cat.categories) == sorted(original['device_id'].unique())
+
+    header_only = str(tmp_path / "empty.csv")
+    original.head(0).to_csv(header_only, index=False)
+    assert load_training_data(header_only, columns, chunksize=chunksize).empty
+
+
+def test_parquet_load_matches_csv(tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path = str(tmp_path / "readings.csv")
+    parquet_path = str(tmp_path / "readings.parquet")
+    write_dataset(csv_path)
+    pd.read_csv(csv_path, parse_dates=['timestamp']).to_parquet(parquet_path)
+    columns = with_context_columns(parquet_path)
+
+    from_csv = load_training_data(csv_path, columns)
+    for chunksize in (None, 7):
+        from_parquet = load_training_data(parquet_path, columns, chunksize=chunksize)
+        pd.testing.assert_frame_equal(from_parquet, from_csv, check_dtype=False, check_categorical=False)
+        assert all(from_parquet[col].dtype == np.float32 for col in FEATURE_COLUMNS)
+    with pytest.raises(ValueError):
+        list(iter_training_data(parquet_path, ['no_such_column']))
+
+
+class Interrupted(Exception):
+    pass
+
+
+def labelled_chunks(n_chunks: int = 6, rows: int = 40, fail_at: int | None = None):
+    rng = np.random.default_rng(11)
+    chunks = []
+    for _ in range(n_chunks):
+        X = pd.DataFrame({'temperature': rng.uniform(15, 45, rows), 'humidity': rng.uniform(10, 90, rows),
+                          'smoke_level': rng.uniform(0, 500, rows)})
+        X[TARGET_COLUMN] = ((X['temperature'] > 30) & (X['humidity'] < 50)).astype(int)
+        chunks.append(X)
+
+    def factory():
+        for index, chunk in enumerate(chunks):
+            if index == fail_at:
+                raise Interrupted()
+            yield chunk
+    return factory, pd.concat(chunks, ignore_index=True)
+
+
+def test_incremental_training_checkpoints_and_resumes_where_it_stopped(tmp_path):
+    factory, data = labelled_chunks()
+    uninterrupted = train_incremental_sgd(factory, n_epochs=2)
+    assert uninterrupted.score(data[FEATURE_COLUMNS], data[TARGET_COLUMN]) > 0.8
+    assert uninterrupted.checkpoint_position_ == (3, 0)
+
+    # Passes: scaling statistics, epoch 1, epoch 2. The second epoch fails at chunk 5,
+    # after the checkpoint taken at chunk 4.
+    checkpoint = str(tmp_path / "sgd.joblib")
+    passes = iter([factory, factory, labelled_chunks(fail_at=5)[0]])
+    with pytest.raises(Interrupted):
+        train_incremental_sgd(lambda: next(passes)(), n_epochs=2, checkpoint_path=checkpoint, checkpoint_every=2)
+    assert os.listdir(tmp_path) == ["sgd.joblib"]  # No temporary file left behind
+    restored = load_model(checkpoint)
+    assert restored.checkpoint_position_ == (2, 4)
+
+    resumed = train_incremental_sgd(factory, n_epochs=2, checkpoint_path=checkpoint, checkpoint_every=2,
+                                    initial_model=restored)
+    np.testing.assert_array_equal(resumed.named_steps['classifier'].coef_,
+                                  uninterrupted.named_steps['classifier'].coef_)
+    assert load_model(checkpoint).checkpoint_position_ == (3, 0)
@@ -0,0 +1,101 @@
+"""
+Tests for region-sharded orchestration: geohash routing, border detection and
+a round trip through real shard processes.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from core_logic.guardian_orchestrator import ThreatEvent
+from core_logic.sharded_orchestrator import (ShardedGuardianOrchestrator, geohash_bounds, geohash_encode,
+                                             geohash_neighbors)
+
+
+def test_geohash_matches_reference_values():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert sorted(geohash_neighbors("u4pru")) == sorted(
+        ["u4pre", "u4prs", "u4prt", "u4prg", "u4prv", "u4r25", "u4r2h", "u4r2j"]
+    )
+
+
+def test_events_are_routed_by_region_and_border_events_reach_coordinator():
+    events = [
+        ThreatEvent(event_id="FIRE-BH", subsystem_source="saci", threat_type="wildfire",
+                    severity=0.8, location=(-19.9167, -43.9333)),
+        ThreatEvent(event_id="CYBER-SP", subsystem_source="curupira", threat_type="coordinated_attack",
+                    severity=0.6, location=(-23.5505, -46.6333)),
+    ]
+
+    async def scenario(sharded):
+        return await sharded.coordinate_multi_threat_response(events)
+
+    with ShardedGuardianOrchestrator(num_shards=2) as sharded:
+        expected_shards = {sharded.shard_for_location(event.location) for event in events}
+        response = asyncio.run(scenario(sharded))
+
+        # A cell whose neighbour lies in a region owned by another shard is a border cell.
+        cell = geohash_encode(-19.9167, -43.9333, sharded.border_precision)
+        region = cell[:sharded.shard_precision]
+        crosses_shards = any(sharded.shard_for_region(n[:sharded.shard_precision]) != sharded.shard_for_region(region)
+                             for n in geohash_neighbors(cell))
+        assert sharded.is_border_cell(cell) == crosses_shards
+
+    assert set(response["shard_plans"]) == expected_shards
+    assert response["coordination_successful"]
+    routed_ids = sorted(i for plan in response["shard_plans"].values() for i in plan["target_event_ids"])
+    assert routed_ids == ["CYBER-SP", "FIRE-BH"]
+
+
+def _cross_shard_pair(sharded):
+    """Two adjacent fine cells near Belo Horizonte owned by different shards."""
+    for lat_step in range(40):
+        for lon_step in range(40):
+            cell = geohash_encode(-19.9 + lat_step * 0.01, -43.9 + lon_step * 0.01, sharded.border_precision)
+            shard = sharded.shard_for_region(cell[:sharded.shard_precision])
+            for neighbor in geohash_neighbors(cell):
+                if sharded.shard_for_region(neighbor[:sharded.shard_precision]) != shard:
+                    return cell, neighbor
+    raise AssertionError("No shard border found near Belo Horizonte")
+
+
+def _cell_center(cell):
+    lat_min, lat_max, lon_min, lon_max = geohash_bounds(cell)
+    return (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+
+
+def test_border_events_of_adjacent_shards_are_correlated():
+    with ShardedGuardianOrchestrator(num_shards=2, max_border_cells=1) as sharded:
+        cell, neighbor = _cross_shard_pair(sharded)
+        fire = ThreatEvent(event_id="FIRE-WEST", subsystem_source="saci", threat_type="wildfire",
+                           severity=0.8, location=_cell_center(cell))
+        grid = ThreatEvent(event_id="GRID-EAST", subsystem_source="boitata", threat_type="substation_failure",
+                           severity=0.7, location=_cell_center(neighbor))
+        interior = ThreatEvent(event_id="FAR-AWAY", subsystem_source="saci", threat_type="wildfire",
+                               severity=0.5, location=(-3.1, -60.0))
+
+        async def scenario():
+            first = await sharded.coordinate_multi_threat_response([fire])
+            second = await sharded.coordinate_multi_threat_response([grid])
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first["cross_shard_correlations"] == []
+        assert [sorted(group) for report in second["cross_shard_correlations"]
+                for group in report["correlation_groups"].values()] == [["FIRE-WEST", "GRID-EAST"]]
+        assert set(first["shard_plans"]) != set(second["shard_plans"])
+
+        # Only the most recent border cell is tracked with max_border_cells=1.
+        assert list(sharded.border_registry) == [neighbor]
+        assert len(sharded._border_cell_cache) == 1
+        third = asyncio.run(sharded.coordinate_multi_threat_response([interior, fire]))
+        assert third["coordination_successful"]
+
+    with pytest.raises(ValueError):
+        ShardedGuardianOrchestrator(num_shards=0)
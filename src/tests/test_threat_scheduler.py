@@ -0,0 +1,103 @@
+"""
+Tests for the ThreatPriorityScheduler.
+
+Uses a lightweight stand-in orchestrator that records the order in which
+batches are coordinated, so no subsystem is constructed.
+"""
+
+import asyncio
+import os
+import sys
+
+# The core_logic modules import their siblings relative to `src`, like the orchestrator does.
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from core_logic.guardian_orchestrator import ThreatEvent
+from core_logic.threat_scheduler import ThreatPriorityScheduler, compute_batch_priority
+
+
+class RecordingOrchestrator:
+    """Stand-in orchestrator that records coordinated event IDs in order."""
+    def __init__(self):
+        self.coordinated = []
+
+    async def coordinate_multi_threat_response(self, threat_events):
+        self.coordinated.append(threat_events[0].event_id)
+        await asyncio.sleep(0)
+        return {"coordination_successful": True, "target_event_ids": [e.event_id for e in threat_events]}
+
+
+def make_event(event_id: str, severity: float, confidence: float = 1.0) -> ThreatEvent:
+    return ThreatEvent(event_id=event_id, subsystem_source="test", threat_type="test",
+                       severity=severity, location=(-19.9, -43.9), confidence_score=confidence)
+
+
+def test_batch_priority_uses_most_urgent_event():
+    batch = [make_event("a", 0.9, 0.5), make_event("b", 0.6, 1.0)]
+    assert compute_batch_priority(batch) == 0.6
+    assert compute_batch_priority([]) == 0.0
+
+
+def test_critical_batch_overtakes_low_severity_burst():
+    async def scenario():
+        orchestrator = RecordingOrchestrator()
+        scheduler = ThreatPriorityScheduler(orchestrator, num_workers=1, aging_rate=0.0)
+        futures = [scheduler.submit([make_event(f"IARA-{i}", 0.2, 0.5)]) for i in range(5)]
+        futures.append(scheduler.submit([make_event("FIRE-001", 0.95, 0.9)]))
+        scheduler.start()
+        results = await asyncio.gather(*futures)
+        await scheduler.stop()
+        return orchestrator.coordinated, results, scheduler.get_queue_metrics()
+
+    order, results, metrics = asyncio.run(scenario())
+    assert order[0] == "FIRE-001"
+    assert order[1:] == [f"IARA-{i}" for i in range(5)]  # FIFO among equal priorities
+    assert results[-1]["target_event_ids"] == ["FIRE-001"]
+    assert metrics["bands"]["critical"]["processed"] == 1
+    assert metrics["bands"]["low"]["processed"] == 5
+    assert metrics["queue_depth"] == 0
+
+
+def test_aging_prevents_starvation():
+    async def scenario():
+        orchestrator = RecordingOrchestrator()
+        # Huge aging rate: a batch that waited even briefly outranks a fresh critical one.
+        scheduler = ThreatPriorityScheduler(orchestrator, num_workers=1, aging_rate=1e6)
+        old = scheduler.submit([make_event("OLD-LOW", 0.1)])
+        await asyncio.sleep(0.01)
+        new = scheduler.submit([make_event("NEW-CRITICAL", 1.0)])
+        scheduler.start()
+        await asyncio.gather(old, new)
+        await scheduler.stop()
+        return orchestrator.coordinated
+
+    assert asyncio.run(scenario()) == ["OLD-LOW", "NEW-CRITICAL"]
+
+
+class BlockingOrchestrator:
+    """Stand-in orchestrator whose coordination never finishes on its own."""
+    def __init__(self):
+        self.started = asyncio.Event()
+
+    async def coordinate_multi_threat_response(self, threat_events):
+        self.started.set()
+        await asyncio.Event().wait()
+
+
+def test_stop_without_drain_cancels_in_flight_batches():
+    async def scenario():
+        orchestrator = BlockingOrchestrator()
+        scheduler = ThreatPriorityScheduler(orchestrator, num_workers=1)
+        scheduler.start()
+        in_flight = scheduler.submit([make_event("running", 0.9)])
+        queued = scheduler.submit([make_event("waiting", 0.1)])
+        await orchestrator.started.wait()
+        await scheduler.stop(drain=False)
+        results = await asyncio.wait_for(asyncio.gather(in_flight, queued, return_exceptions=True), timeout=1.0)
+        return results, scheduler.is_running
+
+    results, running = asyncio.run(scenario())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert not running